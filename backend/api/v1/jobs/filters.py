@@ -5,6 +5,7 @@ Provides advanced filtering capabilities for job listings
 from django_filters import rest_framework as filters
 from django.db.models import Q
 from peeldb.models import JobPost, City, Skill, Industry, Qualification
+from search.backends import get_job_search
 
 
 class JobFilter(filters.FilterSet):
@@ -101,17 +102,18 @@ class JobFilter(filters.FilterSet):
 
     def filter_search(self, queryset, name, value):
         """
-        Search across title, company_name, and description
+        Search across title, company_name, description and job_role
+        using the configured job search backend (see search.backends)
         """
         if not value:
             return queryset
 
-        return queryset.filter(
-            Q(title__icontains=value) |
-            Q(company_name__icontains=value) |
-            Q(description__icontains=value) |
-            Q(job_role__icontains=value)
-        )
+        backend = get_job_search()
+        queryset = backend.search(queryset, value)
+        # read by JobPagination, to flag the count as a lower bound
+        if self.request is not None:
+            self.request.search_capped = getattr(backend, 'capped', False)
+        return queryset
 
     def filter_min_salary(self, queryset, name, value):
         """
@@ -209,12 +209,16 @@ class JobListSerializer(serializers.ModelSerializer):
 
     def get_applicants_count(self, obj):
         """Get number of applicants for this job"""
+        if hasattr(obj, 'applicants_count'):
+            return obj.applicants_count
         return AppliedJobs.objects.filter(job_post=obj).count()
 
     def get_is_saved(self, obj):
         """Check if job is saved by current user"""
         request = self.context.get('request')
         if request and request.user.is_authenticated:
+            if hasattr(obj, 'is_saved'):
+                return obj.is_saved
             return SavedJobs.objects.filter(job_post=obj, user=request.user).exists()
         return False
 
@@ -222,6 +226,8 @@ class JobListSerializer(serializers.ModelSerializer):
         """Check if user has already applied for this job"""
         request = self.context.get('request')
         if request and request.user.is_authenticated:
+            if hasattr(obj, 'is_applied'):
+                return obj.is_applied
             return AppliedJobs.objects.filter(job_post=obj, user=request.user).exists()
         return False
 
@@ -0,0 +1,206 @@
+"""
+Tests for Job listing API
+"""
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from elasticsearch import ConnectionError as ElasticsearchConnectionError
+from unittest.mock import patch
+from rest_framework.test import APIClient
+from rest_framework import status
+from peeldb.models import User, JobPost, AppliedJobs, SavedJobs, Skill
+from mpcomp import facets
+from search.backends import ElasticsearchJobSearch
+
+
+class JobAPITestCase(TestCase):
+    """Common setUp for job API test cases"""
+
+    def setUp(self):
+        """Set up test client, a recruiter and a job seeker"""
+        self.client = APIClient()
+        self.recruiter = User.objects.create(
+            username="recruiter@example.com",
+            email="recruiter@example.com",
+            user_type="RR",
+            is_active=True,
+        )
+        self.job_seeker = User.objects.create(
+            username="seeker@example.com",
+            email="seeker@example.com",
+            user_type="JS",
+            is_active=True,
+        )
+
+    def create_jobs(self, count):
+        jobs = []
+        for index in range(count):
+            jobs.append(
+                JobPost.objects.create(
+                    user=self.recruiter,
+                    title="Python Developer %s" % index,
+                    slug="/python-developer-%s/" % index,
+                    vacancies=1,
+                    description="Python developer",
+                    status="Live",
+                    job_type="full-time",
+                    published_on=timezone.now(),
+                )
+            )
+        return jobs
+
+
+class JobListAPITests(JobAPITestCase):
+    """Test suite for the job listing endpoint"""
+
+    def setUp(self):
+        super().setUp()
+        self.job_list_url = reverse("api:v1:jobs:job-list")
+
+    def count_list_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.job_list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries), response
+
+    def test_job_list_flags_for_authenticated_user(self):
+        """Test applicants_count, is_saved and is_applied come from the annotations"""
+        saved_job, applied_job = self.create_jobs(2)
+        SavedJobs.objects.create(job_post=saved_job, user=self.job_seeker)
+        AppliedJobs.objects.create(job_post=applied_job, user=self.job_seeker, status="Pending")
+        self.client.force_authenticate(user=self.job_seeker)
+
+        _, response = self.count_list_queries()
+
+        results = {job["id"]: job for job in response.data["results"]}
+        self.assertTrue(results[saved_job.id]["is_saved"])
+        self.assertFalse(results[saved_job.id]["is_applied"])
+        self.assertEqual(results[saved_job.id]["applicants_count"], 0)
+        self.assertFalse(results[applied_job.id]["is_saved"])
+        self.assertTrue(results[applied_job.id]["is_applied"])
+        self.assertEqual(results[applied_job.id]["applicants_count"], 1)
+
+    def test_job_list_query_count_does_not_grow_with_page_size(self):
+        """Test serializing a page runs no per-job queries"""
+        self.client.force_authenticate(user=self.job_seeker)
+        for job in self.create_jobs(2):
+            AppliedJobs.objects.create(job_post=job, user=self.job_seeker, status="Pending")
+        small_page_queries, _ = self.count_list_queries()
+
+        for job in self.create_jobs(8):
+            SavedJobs.objects.create(job_post=job, user=self.job_seeker)
+        large_page_queries, response = self.count_list_queries()
+
+        self.assertEqual(len(response.data["results"]), 10)
+        self.assertEqual(small_page_queries, large_page_queries)
+
+    @patch.object(ElasticsearchJobSearch, "job_ids")
+    def test_job_search_ordered_by_index_relevance(self, mock_job_ids):
+        """Test search results follow the ranking returned by the index"""
+        first, second, third = self.create_jobs(3)
+        mock_job_ids.return_value = [third.id, first.id]
+
+        response = self.client.get(self.job_list_url, {"search": "python"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([job["id"] for job in response.data["results"]], [third.id, first.id])
+
+    @patch.object(ElasticsearchJobSearch, "job_ids")
+    def test_job_search_falls_back_to_database(self, mock_job_ids):
+        """Test search still works from the database when the index is down"""
+        mock_job_ids.side_effect = ElasticsearchConnectionError("N/A", "unreachable", None)
+        golang_job, _ = self.create_jobs(2)
+        golang_job.title = "Golang Developer"
+        golang_job.save()
+
+        response = self.client.get(self.job_list_url, {"search": "golang"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([job["id"] for job in response.data["results"]], [golang_job.id])
+
+    @override_settings(JOB_SEARCH_BACKEND="search.backends.PostgresJobSearch")
+    def test_job_search_with_postgres_full_text(self):
+        """Test full text search ranks title matches above description matches"""
+        title_job, description_job, other_job = self.create_jobs(3)
+        title_job.title = "Kotlin Engineer"
+        title_job.save()
+        description_job.description = "Work on our kotlin services"
+        description_job.save()
+
+        response = self.client.get(self.job_list_url, {"search": "kotlin"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [job["id"] for job in response.data["results"]],
+            [title_job.id, description_job.id],
+        )
+
+    @override_settings(JOB_SEARCH_MAX_RESULTS=2)
+    @patch("search.backends.connections")
+    def test_job_search_count_flagged_when_capped(self, connections):
+        """Test a search matching more jobs than are fetched flags its count"""
+        first, second, third = self.create_jobs(3)
+        backend = connections.__getitem__.return_value.get_backend.return_value
+        backend.conn.search.return_value = {
+            "hits": {
+                "total": {"value": 3, "relation": "eq"},
+                "hits": [{"_source": {"django_id": str(job.id)}} for job in (third, first)],
+            }
+        }
+
+        response = self.client.get(self.job_list_url, {"search": "python"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 2)
+        self.assertTrue(response.data["count_capped"])
+        self.assertFalse(self.client.get(self.job_list_url).data["count_capped"])
+
+
+class JobFilterOptionsAPITests(JobAPITestCase):
+    """Test suite for the job filter options endpoint"""
+
+    def setUp(self):
+        super().setUp()
+        self.filter_options_url = reverse("api:v1:jobs:filter-options")
+        self.python = Skill.objects.create(name="Python", slug="python", status="Active")
+        self.django = Skill.objects.create(name="Django", slug="django", status="Active")
+        python_job, django_job, both_job = self.create_jobs(3)
+        python_job.skills.add(self.python)
+        django_job.skills.add(self.django)
+        both_job.skills.add(self.python, self.django)
+        both_job.job_type = "internship"
+        both_job.save()
+
+    def test_filter_options_counts_in_one_query(self):
+        """Test all facet counts are computed with a single query"""
+        with self.assertNumQueries(1):
+            response = self.client.get(self.filter_options_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        skills = {skill["slug"]: skill["count"] for skill in response.data["skills"]}
+        self.assertEqual(skills, {"python": 2, "django": 2})
+        job_types = {job_type["value"]: job_type["count"] for job_type in response.data["job_types"]}
+        self.assertEqual(job_types, {"full-time": 2, "internship": 1})
+
+    def test_filter_options_restricted_to_filters(self):
+        """Test counts are conditional on the passed job filters"""
+        response = self.client.get(self.filter_options_url, {"skills": "django", "job_type": "internship"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        skills = {skill["slug"]: skill["count"] for skill in response.data["skills"]}
+        self.assertEqual(skills, {"python": 1, "django": 1})
+
+    def test_invalidate_without_generation_changes_it(self):
+        """Test back to back invalidations each make the cached counts stale"""
+        caches["local"].clear()
+        generations = []
+        with patch.object(facets, "cache", caches["local"]), patch.object(
+            caches["local"], "incr", side_effect=ValueError
+        ):
+            for _ in range(2):
+                facets.invalidate()
+                generations.append(facets._generation())
+        self.assertLess(generations[0], generations[1])
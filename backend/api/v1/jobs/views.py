@@ -10,21 +10,74 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.pagination import PageNumberPagination
 from rest_framework import filters as drf_filters
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Count, Q
+from django.db.models import Count, Exists, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils.http import urlencode
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 
-from peeldb.models import JobPost, City, Skill, Industry, Qualification, SavedJobs, AppliedJobs
+from mpcomp import facets
+from peeldb.models import JobPost, SavedJobs, AppliedJobs
 from .serializers import JobListSerializer, JobDetailSerializer
 from .filters import JobFilter
 
 
+def annotate_applicant_flags(queryset, user):
+    """
+    Annotate applicants_count, is_saved and is_applied onto a JobPost queryset
+    (read by JobListSerializer instead of querying per job)
+    """
+    applicants = AppliedJobs.objects.filter(
+        job_post=OuterRef('pk')
+    ).order_by().values('job_post').annotate(total=Count('id')).values('total')
+    queryset = queryset.annotate(
+        applicants_count=Coalesce(Subquery(applicants, output_field=IntegerField()), 0)
+    )
+    if user is not None and user.is_authenticated:
+        return queryset.annotate(
+            is_saved=Exists(SavedJobs.objects.filter(job_post=OuterRef('pk'), user=user)),
+            is_applied=Exists(AppliedJobs.objects.filter(job_post=OuterRef('pk'), user=user)),
+        )
+    return queryset.annotate(is_saved=Value(False), is_applied=Value(False))
+
+
+class RelevanceOrderingFilter(drf_filters.OrderingFilter):
+    """
+    Order search results by relevance unless an explicit ordering is requested
+    """
+
+    def get_ordering(self, request, queryset, view):
+        if not request.query_params.get(self.ordering_param) and 'search_rank' in queryset.query.annotations:
+            return ['-search_rank', '-published_on']
+        return super().get_ordering(request, queryset, view)
+
+
 class JobPagination(PageNumberPagination):
-    """Custom pagination for job listings"""
+    """
+    Custom pagination for job listings. count_capped is true when a search
+    matched more jobs than JOB_SEARCH_MAX_RESULTS, so count is a lower bound
+    """
     page_size = 20
     page_size_query_param = 'page_size'
     max_page_size = 100
 
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.page.paginator.count,
+            'count_capped': getattr(self.request, 'search_capped', False),
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        schema = super().get_paginated_response_schema(schema)
+        schema['properties']['count_capped'] = {
+            'type': 'boolean',
+            'example': False,
+        }
+        return schema
+
 
 class JobViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -48,15 +101,14 @@ class JobViewSet(viewsets.ReadOnlyModelViewSet):
     - posted_after, posted_before: Date range filters
 
     Ordering:
-    - published_on (default: newest first)
+    - published_on (default: newest first, or relevance when searching)
     - title
     - min_salary, max_salary
     """
     permission_classes = [AllowAny]
     pagination_class = JobPagination
-    filter_backends = [DjangoFilterBackend, drf_filters.SearchFilter, drf_filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, RelevanceOrderingFilter]
     filterset_class = JobFilter
-    search_fields = ['title', 'company_name', 'description', 'job_role']
     ordering_fields = ['published_on', 'title', 'min_salary', 'max_salary', 'created_on']
     ordering = ['-published_on']
     lookup_field = 'id'
@@ -65,8 +117,10 @@ class JobViewSet(viewsets.ReadOnlyModelViewSet):
         """
         Get optimized queryset with prefetched relations
         Only returns Live jobs by default
+        Applicant counts and saved/applied flags for the current user are
+        annotated here so serializing a page costs no per-row queries
         """
-        return JobPost.objects.filter(
+        queryset = JobPost.objects.filter(
             status='Live'
         ).select_related(
             'company',
@@ -78,6 +132,7 @@ class JobViewSet(viewsets.ReadOnlyModelViewSet):
             'industry',
             'edu_qualification'
         ).distinct()
+        return annotate_applicant_flags(queryset, self.request.user)
 
     def get_serializer_class(self):
         """Use detailed serializer for retrieve, lightweight for list"""
@@ -257,8 +312,11 @@ class JobViewSet(viewsets.ReadOnlyModelViewSet):
         """
         if request.method == 'GET':
             # Get all saved jobs
-            saved_jobs = SavedJobs.objects.filter(user=request.user).select_related('job_post')
-            jobs = [saved.job_post for saved in saved_jobs if saved.job_post.status == 'Live']
+            saved_jobs = SavedJobs.objects.filter(user=request.user)
+            jobs_by_id = self.get_queryset().filter(
+                id__in=saved_jobs.values('job_post_id')
+            ).in_bulk()
+            jobs = [jobs_by_id[saved.job_post_id] for saved in saved_jobs if saved.job_post_id in jobs_by_id]
             serializer = JobListSerializer(jobs, many=True, context={'request': request})
             return Response(serializer.data)
 
@@ -411,6 +469,8 @@ class JobFilterOptionsView(APIView):
 
     Returns all available locations, skills, industries, and education
     options along with the count of live jobs for each option.
+    All counts come from a single query (see mpcomp.facets) and are cached
+    until a job post changes.
 
     This endpoint is useful for populating filter dropdowns/checkboxes
     with real-time counts.
@@ -419,7 +479,7 @@ class JobFilterOptionsView(APIView):
 
     @extend_schema(
         summary="Get filter options",
-        description="Retrieve all available filter options (locations, skills, industries, education) with job counts",
+        description="Retrieve all available filter options (locations, skills, industries, education) with job counts. Accepts the job list filters to get counts within the filtered jobs",
         responses={
             200: {
                 "type": "object",
@@ -457,55 +517,24 @@ class JobFilterOptionsView(APIView):
         tags=['Jobs'],
     )
     def get(self, request):
-        """Get all filter options with job counts"""
-
-        # Base queryset for live jobs
-        live_jobs = JobPost.objects.filter(status='Live')
-
-        # Get locations with job counts
-        locations = City.objects.filter(
-            locations__in=live_jobs
-        ).annotate(
-            count=Count('locations', filter=Q(locations__status='Live'))
-        ).order_by('-count', 'name').values('id', 'name', 'slug', 'count')[:50]
-
-        # Get skills with job counts
-        skills = Skill.objects.filter(
-            jobpost__in=live_jobs
-        ).annotate(
-            count=Count('jobpost', filter=Q(jobpost__status='Live'))
-        ).order_by('-count', 'name').values('id', 'name', 'slug', 'count')[:50]
-
-        # Get industries with job counts
-        industries = Industry.objects.filter(
-            jobpost__in=live_jobs
-        ).annotate(
-            count=Count('jobpost', filter=Q(jobpost__status='Live'))
-        ).order_by('-count', 'name').values('id', 'name', 'slug', 'count')
-
-        # Get education/qualifications with job counts
-        education = Qualification.objects.filter(
-            jobpost__in=live_jobs
-        ).annotate(
-            count=Count('jobpost', filter=Q(jobpost__status='Live'))
-        ).order_by('-count', 'name').values('id', 'name', 'slug', 'count')
-
-        # Get job types with counts
-        from peeldb.models import JOB_TYPE
-        job_types = []
-        for value, label in JOB_TYPE:
-            count = live_jobs.filter(job_type=value).count()
-            if count > 0:
-                job_types.append({
-                    'value': value,
-                    'label': label,
-                    'count': count
-                })
+        """
+        Get all filter options with job counts
+        When any job filter is passed (same parameters as the job list), the
+        counts are restricted to the jobs matching those filters
+        """
+        filters = sorted(
+            (key, value)
+            for key, values in request.query_params.lists()
+            if key in JobFilter.base_filters
+            for value in values
+            if value
+        )
+        if not filters:
+            return Response(facets.get_facets())
 
-        return Response({
-            'locations': list(locations),
-            'skills': list(skills),
-            'industries': list(industries),
-            'education': list(education),
-            'job_types': job_types,
-        })
+        filterset = JobFilter(
+            request.query_params, queryset=JobPost.objects.filter(status='Live')
+        )
+        if not filterset.is_valid():
+            return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
+        return Response(facets.get_facets(filterset.qs, urlencode(filters)))
@@ -9,6 +9,8 @@ from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiExample
 from django.utils import timezone
 
+from mpcomp import resume_parser
+
 from .serializers import ProfileSerializer, ProfileUpdateSerializer
 
 
@@ -289,11 +291,13 @@ class ProfileUploadView(APIView):
 
             user.resume = file
             user.save()
+            resume_parser.queue(user)
 
             return Response(
                 {
                     'message': 'Resume uploaded successfully',
-                    'resume_url': request.build_absolute_uri(user.resume.url)
+                    'resume_url': request.build_absolute_uri(user.resume.url),
+                    'resume_parse_status': user.resume_parse_status
                 },
                 status=status.HTTP_200_OK
             )
@@ -343,6 +347,8 @@ class ResumeDeleteView(APIView):
         user.resume = None
         user.resume_title = ''
         user.resume_text = ''
+        user.resume_parse_status = ''
+        user.resume_data = None
         user.save()
 
         return Response(
@@ -329,6 +329,7 @@ class ProfileSerializer(serializers.ModelSerializer):
 
             # Resume
             'resume', 'resume_url', 'resume_title', 'resume_text',
+            'resume_parse_status', 'resume_parsed_on',
 
             # Related Data
             'skills', 'employment_history', 'education', 'project', 'certifications',
@@ -343,7 +344,7 @@ class ProfileSerializer(serializers.ModelSerializer):
         read_only_fields = [
             'id', 'email', 'username', 'user_type', 'date_joined',
             'email_verified', 'mobile_verified', 'profile_updated',
-            'is_active'
+            'is_active', 'resume_parse_status', 'resume_parsed_on'
         ]
 
     def get_profile_pic_url(self, obj):
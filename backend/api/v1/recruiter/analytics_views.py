@@ -7,11 +7,15 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.db.models import Count
+from django.db.models.functions import TruncDate
 from django.utils import timezone
-from datetime import timedelta, datetime, date
+from datetime import timedelta, datetime
+from mpcomp.request_stats import query_budget
+from peeldb import recruiter_analytics
 from peeldb.models import JobPost, AppliedJobs
 
 
+@query_budget(6)
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_application_analytics(request):
@@ -44,161 +48,21 @@ def get_application_analytics(request):
         start_date = end_date - timedelta(days=30)
         prev_days = 30
 
-    prev_start_date = start_date - timedelta(days=prev_days)
-
-    # Get recruiter's jobs
-    jobs = JobPost.objects.filter(user=request.user)
-
-    # Applications in period
-    applications = AppliedJobs.objects.filter(
-        job_post__in=jobs,
-        applied_on__gte=start_date,
-        applied_on__lte=end_date
-    )
-
-    # Applications in previous period
-    prev_applications = AppliedJobs.objects.filter(
-        job_post__in=jobs,
-        applied_on__gte=prev_start_date,
-        applied_on__lt=start_date
+    analytics = recruiter_analytics.application_analytics(
+        request.user.id,
+        start_date,
+        end_date,
+        prev_days,
+        period=period if period != 'custom' else None,
     )
 
-    # Calculate overview metrics
-    total_applications = applications.count()
-    prev_total = prev_applications.count()
-
-    if prev_total > 0:
-        trend_pct = ((total_applications - prev_total) / prev_total) * 100
-        trend = f"{'+' if trend_pct > 0 else ''}{trend_pct:.1f}%"
-    else:
-        trend = "N/A"
-
-    avg_per_day = total_applications / prev_days if prev_days > 0 else 0
-
-    # Pipeline breakdown
-    pipeline = {
-        'pending': applications.filter(status='Pending').count(),
-        'shortlisted': applications.filter(status='Shortlisted').count(),
-        'hired': applications.filter(status='Hired').count(),
-        'rejected': applications.filter(status='Rejected').count(),
-    }
-
-    if total_applications > 0:
-        pipeline['conversion_rate'] = round(
-            (pipeline['hired'] / total_applications) * 100, 2
-        )
-    else:
-        pipeline['conversion_rate'] = 0
-
-    # Applications by day
-    applications_by_day = (
-        applications
-        .extra(select={'day': 'DATE(applied_on)'})
-        .values('day')
-        .annotate(count=Count('id'))
-        .order_by('day')
-    )
-
-    # Peak days (day of week analysis)
-    from django.db.models.functions import ExtractWeekDay
-    peak_days_data = (
-        applications
-        .annotate(weekday=ExtractWeekDay('applied_on'))
-        .values('weekday')
-        .annotate(count=Count('id'))
-    )
-
-    # Map weekday numbers to names (1=Sunday in Django)
-    weekday_map = {
-        1: 'sunday', 2: 'monday', 3: 'tuesday', 4: 'wednesday',
-        5: 'thursday', 6: 'friday', 7: 'saturday'
-    }
-    peak_days = {day: 0 for day in weekday_map.values()}
-    for item in peak_days_data:
-        day_name = weekday_map.get(item['weekday'])
-        if day_name:
-            peak_days[day_name] = item['count']
-
-    # Job performance
-    job_performance = []
-    for job in jobs.filter(status='Live'):
-        job_apps = applications.filter(job_post=job)
-        total_job_apps = job_apps.count()
-
-        # Calculate days active and avg per day
-        if job.created_on:
-            try:
-                # Convert created_on to timezone-aware datetime
-                if isinstance(job.created_on, datetime):
-                    # It's a datetime object
-                    created = job.created_on
-                    if not timezone.is_aware(created):
-                        # Make it timezone-aware
-                        created = timezone.make_aware(created)
-                elif isinstance(job.created_on, date):
-                    # It's a date object, convert to datetime first
-                    created = timezone.make_aware(
-                        datetime.combine(job.created_on, datetime.min.time())
-                    )
-                else:
-                    # Unknown type, skip calculation
-                    days_active = 0
-                    avg_per_day = 0
-                    created = None
-
-                if created:
-                    days_active = (timezone.now() - created).days
-                    # Prevent division by zero
-                    avg_per_day = total_job_apps / days_active if days_active > 0 else 0
-                else:
-                    days_active = 0
-                    avg_per_day = 0
-            except Exception:
-                # If anything goes wrong, default to 0
-                days_active = 0
-                avg_per_day = 0
-        else:
-            days_active = 0
-            avg_per_day = 0
-
-        hired_count = job_apps.filter(status='Hired').count()
-        conversion = (hired_count / total_job_apps * 100) if total_job_apps > 0 else 0
-
-        job_performance.append({
-            'job_id': job.id,
-            'job_title': job.title,
-            'total_applications': total_job_apps,
-            'new_applications': total_job_apps,
-            'pending': job_apps.filter(status='Pending').count(),
-            'shortlisted': job_apps.filter(status='Shortlisted').count(),
-            'hired': hired_count,
-            'rejected': job_apps.filter(status='Rejected').count(),
-            'conversion_rate': round(conversion, 2),
-            'days_active': days_active,
-            'avg_applications_per_day': round(avg_per_day, 1),
-            'status': job.status
-        })
-
-    # Sort by total applications
-    job_performance.sort(key=lambda x: x['total_applications'], reverse=True)
-
     return Response({
         'period': {
             'start': start_date.isoformat(),
             'end': end_date.isoformat(),
             'label': period
         },
-        'overview': {
-            'total_applications': total_applications,
-            'new_applications': total_applications,
-            'trend': trend,
-            'avg_per_day': round(avg_per_day, 1),
-            'total_jobs': jobs.filter(status='Live').count()
-        },
-        'pipeline': pipeline,
-        'applications_by_day': list(applications_by_day),
-        'job_performance': job_performance[:10],  # Top 10 jobs
-        'peak_days': peak_days
+        **analytics
     })
 
 
@@ -233,27 +97,12 @@ def get_job_application_analytics(request, job_id):
         applied_on__gte=start_date
     )
 
-    total_apps = applications.count()
-
-    # Pipeline
-    pipeline = {
-        'pending': applications.filter(status='Pending').count(),
-        'shortlisted': applications.filter(status='Shortlisted').count(),
-        'hired': applications.filter(status='Hired').count(),
-        'rejected': applications.filter(status='Rejected').count(),
-    }
-
-    if total_apps > 0:
-        pipeline['conversion_rate'] = round(
-            (pipeline['hired'] / total_apps) * 100, 2
-        )
-    else:
-        pipeline['conversion_rate'] = 0
+    total_apps, pipeline = recruiter_analytics.pipeline(applications)
 
     # Applications by day
     apps_by_day = (
         applications
-        .extra(select={'day': 'DATE(applied_on)'})
+        .annotate(day=TruncDate('applied_on'))
         .values('day')
         .annotate(count=Count('id'))
         .order_by('day')
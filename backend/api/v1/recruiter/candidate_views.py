@@ -0,0 +1,96 @@
+"""
+Recruiter Candidate Search API Views
+"""
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from drf_spectacular.types import OpenApiTypes
+
+from mpcomp.request_stats import query_budget
+from recruiter.permissions import RecruiterRequiredPermission
+from search.candidates import CandidateFilters, CandidateSearch, MAX_RESULT_WINDOW
+from .job_serializers import CandidateSearchResultSerializer
+
+
+CANDIDATES_PAGE_SIZE = 20
+CANDIDATES_MAX_PAGE_SIZE = 50
+
+
+def _names(value):
+    return tuple(name.strip() for name in (value or '').split(',') if name.strip())
+
+
+def _years(value):
+    if value in (None, ''):
+        return None
+    years = int(value)
+    if years < 0:
+        raise ValueError(value)
+    return years
+
+
+# authentication, the page's users with their skills and preferred cities,
+# and the fallback search's ids and count
+@query_budget(8)
+@extend_schema(
+    tags=["Recruiter - Candidates"],
+    summary="Search Candidates",
+    description=(
+        "Search job seekers by their profile, skills, experience, cities and "
+        "resume text. Returns a page of candidates by relevance, the total "
+        "and the facet counts (lower-cased skills, current_city, preferred_cities, "
+        "experience in years) of all matching candidates."
+    ),
+    parameters=[
+        OpenApiParameter('q', OpenApiTypes.STR, description='Search text'),
+        OpenApiParameter('skills', OpenApiTypes.STR, description='Comma separated skill names in any case, all required'),
+        OpenApiParameter('cities', OpenApiTypes.STR, description='Comma separated city names, current or preferred'),
+        OpenApiParameter('min_experience', OpenApiTypes.INT, description='Minimum experience in years'),
+        OpenApiParameter('max_experience', OpenApiTypes.INT, description='Maximum experience in years'),
+        OpenApiParameter('looking_for_job', OpenApiTypes.BOOL, description='Only candidates looking for a job'),
+        OpenApiParameter('page', OpenApiTypes.INT, description='Page number'),
+        OpenApiParameter('page_size', OpenApiTypes.INT, description='Candidates per page (default 20, max 50)'),
+    ],
+)
+@api_view(['GET'])
+@permission_classes([RecruiterRequiredPermission])
+def search_candidates(request):
+    """Search candidates, a page at a time with facet counts"""
+    try:
+        filters = CandidateFilters(
+            text=request.GET.get('q', '').strip(),
+            skills=_names(request.GET.get('skills')),
+            cities=_names(request.GET.get('cities')),
+            min_experience=_years(request.GET.get('min_experience')),
+            max_experience=_years(request.GET.get('max_experience')),
+            looking_for_job=request.GET.get('looking_for_job') in ('true', '1'),
+        )
+        page = max(int(request.GET.get('page', 1)), 1)
+        page_size = min(
+            max(int(request.GET.get('page_size', CANDIDATES_PAGE_SIZE)), 1),
+            CANDIDATES_MAX_PAGE_SIZE,
+        )
+    except ValueError:
+        return Response(
+            {"error": "page, page_size and experience must be positive numbers"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    offset = (page - 1) * page_size
+    if offset >= MAX_RESULT_WINDOW:
+        return Response(
+            {"error": "Page out of range, narrow down the search"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    result = CandidateSearch().search(filters, offset, page_size)
+    serializer = CandidateSearchResultSerializer(result.candidates, many=True)
+    return Response({
+        "candidates": serializer.data,
+        "total": result.total,
+        "page": page,
+        "page_size": page_size,
+        "has_next": offset + page_size < min(result.total, MAX_RESULT_WINDOW),
+        "facets": result.facets,
+    })
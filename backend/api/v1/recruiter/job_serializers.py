@@ -55,12 +55,13 @@ class RecruiterJobListSerializer(serializers.ModelSerializer):
 
     def get_applicants_count(self, obj):
         """Get number of applicants"""
+        if hasattr(obj, 'applicants_count'):
+            return obj.applicants_count
         return obj.appliedjobs_set.count()
 
     def get_views_count(self, obj):
-        """Get total views across all platforms"""
-        # Social media view fields have been removed
-        return 0  # TODO: Implement proper analytics tracking
+        """Get total views of the job post"""
+        return obj.views_count
 
     def get_time_ago(self, obj):
         """Calculate time since job was created"""
@@ -654,3 +655,57 @@ class ApplicantDetailSerializer(serializers.ModelSerializer):
             })
 
         return certifications
+
+
+class CandidateSearchResultSerializer(serializers.ModelSerializer):
+    """Serializer for a candidate in the recruiter candidate search"""
+    name = serializers.SerializerMethodField()
+    email = serializers.SerializerMethodField()
+    experience = serializers.SerializerMethodField()
+    current_location = serializers.SerializerMethodField()
+    preferred_locations = serializers.SerializerMethodField()
+    skills = serializers.SerializerMethodField()
+
+    class Meta:
+        model = User
+        fields = [
+            'id',
+            'name',
+            'email',
+            'profile_pic',
+            'job_role',
+            'resume_title',
+            'experience',
+            'current_location',
+            'preferred_locations',
+            'skills',
+            'notice_period',
+            'is_looking_for_job',
+            'is_open_to_offers',
+            'profile_updated',
+        ]
+
+    def get_name(self, obj):
+        return f"{obj.first_name} {obj.last_name or ''}".strip()
+
+    def get_email(self, obj):
+        """Only shown when the candidate chose to show it"""
+        return obj.email if obj.show_email else None
+
+    def get_experience(self, obj):
+        years = int(obj.year) if obj.year and obj.year.isdigit() else 0
+        months = int(obj.month) if obj.month and obj.month.isdigit() else 0
+        return {
+            'years': years,
+            'months': months,
+            'display': f"{years}y {months}m" if years > 0 else (f"{months}m" if months > 0 else "Fresher")
+        }
+
+    def get_current_location(self, obj):
+        return obj.current_city.name if obj.current_city else None
+
+    def get_preferred_locations(self, obj):
+        return [city.name for city in obj.preferred_city.all()]
+
+    def get_skills(self, obj):
+        return [tech_skill.skill.name for tech_skill in obj.skills.all()]
@@ -1,6 +1,8 @@
 """
 Recruiter Job Management API Views
 """
+import json
+
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
@@ -9,11 +11,16 @@ from rest_framework.pagination import PageNumberPagination
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 from django.db.models import Q, Count
+from django.http import StreamingHttpResponse
 from django.utils import timezone
+from rest_framework.utils.encoders import JSONEncoder
 
+from mpcomp.pagination import CursorPaginator, InvalidCursor
+from mpcomp.request_stats import query_budget
+from peeldb import exports, recruiter_analytics
 from peeldb.models import (
     JobPost, AppliedJobs, City, Skill, Industry,
-    Qualification, Country, State
+    Qualification, Country, State, DataExport
 )
 from .job_serializers import (
     RecruiterJobListSerializer,
@@ -25,6 +32,15 @@ from .job_serializers import (
 )
 
 
+APPLICANT_ORDERINGS = {
+    '-applied_on': ('-applied_on', '-id'),
+    'applied_on': ('applied_on', 'id'),
+}
+APPLICANTS_PAGE_SIZE = 50
+APPLICANTS_MAX_PAGE_SIZE = 200
+APPLICANTS_EXPORT_CHUNK_SIZE = 2000
+
+
 class JobPostPagination(PageNumberPagination):
     """Pagination for job listings"""
     page_size = 20
@@ -354,16 +370,23 @@ def close_job(request, job_id):
 @extend_schema(
     tags=["Recruiter - Jobs"],
     summary="Get Job Applicants",
-    description="Get all applicants for a specific job",
+    description=(
+        "Get the applicants for a specific job, a page at a time. Follow "
+        "`next_cursor` for the next page; `export=ndjson` streams every "
+        "matching applicant as newline delimited JSON instead."
+    ),
     parameters=[
-        OpenApiParameter('status', OpenApiTypes.STR, description='Filter by application status (Pending, Shortlisted, Selected, Rejected)'),
+        OpenApiParameter('status', OpenApiTypes.STR, description='Filter by application status (Pending, Shortlisted, Hired, Rejected)'),
         OpenApiParameter('ordering', OpenApiTypes.STR, description='Order by field (applied_on, -applied_on)'),
+        OpenApiParameter('cursor', OpenApiTypes.STR, description='Cursor of the page to fetch, from next_cursor'),
+        OpenApiParameter('page_size', OpenApiTypes.INT, description='Applicants per page (default 50, max 200)'),
+        OpenApiParameter('export', OpenApiTypes.STR, description='ndjson: stream all matching applicants'),
     ],
 )
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_job_applicants(request, job_id):
-    """Get all applicants for a job"""
+    """Get the applicants for a job, paginated by (applied_on, id)"""
     user = request.user
 
     try:
@@ -374,19 +397,64 @@ def get_job_applicants(request, job_id):
             status=status.HTTP_404_NOT_FOUND
         )
 
-    # Get applications for this job
-    applications = AppliedJobs.objects.filter(job_post=job).select_related('user')
+    applications = AppliedJobs.objects.filter(job_post=job).select_related(
+        'user', 'user__current_city'
+    )
 
     # Filter by status
     status_filter = request.GET.get('status')
     if status_filter:
         applications = applications.filter(status=status_filter)
 
-    # Ordering
+    # Ordering, on the (job_post, status, applied_on) index
     ordering = request.GET.get('ordering', '-applied_on')
-    applications = applications.order_by(ordering)
+    if ordering not in APPLICANT_ORDERINGS:
+        return Response(
+            {"error": f"Invalid ordering. Must be one of: {', '.join(APPLICANT_ORDERINGS)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    if request.GET.get('export') == 'ndjson':
+        rows = applications.order_by(*APPLICANT_ORDERINGS[ordering])
+        response = StreamingHttpResponse(
+            _applicant_lines(rows, request), content_type='application/x-ndjson'
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="job-{job.id}-applicants.ndjson"'
+        )
+        return response
 
-    serializer = JobApplicationSerializer(applications, many=True, context={'request': request})
+    try:
+        page_size = min(
+            int(request.GET.get('page_size', APPLICANTS_PAGE_SIZE)),
+            APPLICANTS_MAX_PAGE_SIZE,
+        )
+    except ValueError:
+        page_size = APPLICANTS_PAGE_SIZE
+    paginator = CursorPaginator(
+        applications, max(page_size, 1), APPLICANT_ORDERINGS[ordering]
+    )
+    try:
+        rows, next_cursor = paginator.page(request.GET.get('cursor'))
+    except InvalidCursor:
+        return Response(
+            {"error": "Invalid cursor"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    serializer = JobApplicationSerializer(rows, many=True, context={'request': request})
+
+    # Applicants per status, for all of the job's applications
+    counts = dict(
+        AppliedJobs.objects.filter(job_post=job)
+        .values_list('status')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    if status_filter:
+        total_applicants = counts.get(status_filter, 0)
+    else:
+        total_applicants = sum(counts.values())
 
     return Response({
         "job": {
@@ -395,16 +463,121 @@ def get_job_applicants(request, job_id):
             "status": job.status
         },
         "applications": serializer.data,
-        "total_applicants": applications.count(),
+        "next_cursor": next_cursor,
+        "total_applicants": total_applicants,
         "stats": {
-            "pending": applications.filter(status='Pending').count(),
-            "shortlisted": applications.filter(status='Shortlisted').count(),
-            "selected": applications.filter(status='Selected').count(),
-            "rejected": applications.filter(status='Rejected').count(),
+            "pending": counts.get('Pending', 0),
+            "shortlisted": counts.get('Shortlisted', 0),
+            "selected": counts.get('Selected', 0),
+            "hired": counts.get('Hired', 0),
+            "rejected": counts.get('Rejected', 0),
         }
     })
 
 
+def _applicant_lines(applications, request):
+    for application in applications.iterator(chunk_size=APPLICANTS_EXPORT_CHUNK_SIZE):
+        data = JobApplicationSerializer(application, context={'request': request}).data
+        yield json.dumps(data, cls=JSONEncoder) + "\n"
+
+
+def _export_data(export):
+    data = {
+        "id": export.id,
+        "kind": export.kind,
+        "format": export.file_format,
+        "status": export.status,
+        "rows": export.rows,
+        "created_on": export.created_on,
+        "finished_on": export.finished_on,
+        "download_url": None,
+    }
+    if export.status == 'Done':
+        data["download_url"] = exports.download_url(export)
+    return data
+
+
+@extend_schema(
+    tags=["Recruiter - Jobs"],
+    summary="Export Job Applicants",
+    description=(
+        "Export all the applicants of a job to a CSV or Excel file in the "
+        "background. The file is mailed to the recruiter when it is ready; "
+        "poll the returned export for its status meanwhile."
+    ),
+    parameters=[
+        OpenApiParameter('format', OpenApiTypes.STR, description='csv (default) or xlsx'),
+        OpenApiParameter('status', OpenApiTypes.STR, description='Only export applicants of this application status'),
+        OpenApiParameter('ordering', OpenApiTypes.STR, description='Order by field (applied_on, -applied_on)'),
+    ],
+)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def export_job_applicants(request, job_id):
+    """Queue an export of the applicants of a job"""
+    user = request.user
+
+    try:
+        job = JobPost.objects.get(id=job_id, user=user)
+    except JobPost.DoesNotExist:
+        return Response(
+            {"error": "Job not found"},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    file_format = request.data.get('format', 'csv')
+    if file_format not in exports.WRITERS:
+        return Response(
+            {"error": f"Invalid format. Must be one of: {', '.join(exports.WRITERS)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    ordering = request.data.get('ordering', '-applied_on')
+    if ordering not in APPLICANT_ORDERINGS:
+        return Response(
+            {"error": f"Invalid ordering. Must be one of: {', '.join(APPLICANT_ORDERINGS)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    export = exports.start(
+        user,
+        'job_applicants',
+        {
+            "job_id": job.id,
+            "status": request.data.get('status'),
+            "ordering": ordering,
+        },
+        file_format,
+    )
+    return Response(
+        {
+            "success": True,
+            "export": _export_data(export),
+            "message": f"The export will be mailed to {user.email} when it is ready"
+        },
+        status=status.HTTP_202_ACCEPTED
+    )
+
+
+@extend_schema(
+    tags=["Recruiter - Jobs"],
+    summary="Get Export",
+    description="Get the status of an export, and its download link once it is done",
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_export(request, export_id):
+    """Get an export of the recruiter"""
+    try:
+        export = DataExport.objects.get(id=export_id, requested_by=request.user)
+    except DataExport.DoesNotExist:
+        return Response(
+            {"error": "Export not found"},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    return Response({"export": _export_data(export)})
+
+
+@query_budget(10)
 @extend_schema(
     tags=["Recruiter - Jobs"],
     summary="Get Dashboard Stats",
@@ -418,105 +591,34 @@ def get_job_applicants(request, job_id):
 def get_dashboard_stats(request):
     """Get dashboard statistics for recruiter with application analytics"""
     user = request.user
-    period = request.GET.get('period', '30d')
-
-    # Parse period
-    if period == '7d':
-        days = 7
-    elif period == '90d':
-        days = 90
-    else:
-        days = 30
-
-    from datetime import timedelta
-    start_date = timezone.now() - timedelta(days=days)
-    prev_start_date = start_date - timedelta(days=days)
-
-    jobs = JobPost.objects.filter(user=user)
-
-    # Basic stats
-    total_jobs = jobs.count()
-    live_jobs = jobs.filter(status='Live').count()
-    draft_jobs = jobs.filter(status='Draft').count()
-    closed_jobs = jobs.filter(status='Disabled').count()
-    expired_jobs = jobs.filter(status='Expired').count()
-
-    # Application stats
-    all_applicants = AppliedJobs.objects.filter(job_post__user=user)
-    total_applicants = all_applicants.count()
-
-    # NEW: Applications in current period
-    new_applicants = all_applicants.filter(
-        applied_on__gte=start_date
-    ).count()
-
-    # NEW: Applications in previous period (for trend)
-    prev_applicants = all_applicants.filter(
-        applied_on__gte=prev_start_date,
-        applied_on__lt=start_date
-    ).count()
-
-    # Calculate trend
-    if prev_applicants > 0:
-        trend_pct = ((new_applicants - prev_applicants) / prev_applicants) * 100
-        applicants_trend = f"{'+' if trend_pct > 0 else ''}{trend_pct:.1f}%"
-    else:
-        applicants_trend = "N/A"
-
-    # NEW: Pipeline metrics
-    pipeline = {
-        'pending': all_applicants.filter(status='Pending').count(),
-        'shortlisted': all_applicants.filter(status='Shortlisted').count(),
-        'hired': all_applicants.filter(status='Hired').count(),
-        'rejected': all_applicants.filter(status='Rejected').count(),
-    }
-
-    # Conversion rate
-    if total_applicants > 0:
-        pipeline['conversion_rate'] = round(
-            (pipeline['hired'] / total_applicants) * 100, 2
-        )
-    else:
-        pipeline['conversion_rate'] = 0
-
-    # Average applications per live job
-    avg_applications_per_job = (
-        total_applicants / live_jobs if live_jobs > 0 else 0
+    dashboard = recruiter_analytics.dashboard_stats(
+        user.id, request.GET.get('period', '30d')
     )
 
-    # Recent jobs with enhanced data
-    recent_jobs = jobs.order_by('-created_on')[:5]
+    # Recent jobs with their application metrics
+    recent_jobs = {
+        job.id: job
+        for job in JobPost.objects.filter(
+            id__in=[job_id for job_id, _ in dashboard["recent_jobs"]]
+        ).prefetch_related('location')
+    }
     recent_jobs_data = []
 
-    for job in recent_jobs:
+    for job_id, metrics in dashboard["recent_jobs"]:
+        job = recent_jobs.get(job_id)
+        if job is None:
+            continue
+        job.applicants_count = metrics['applicants_count']
         job_data = RecruiterJobListSerializer(
             job, context={'request': request}
         ).data
-
-        # Add new application metrics
-        job_applicants = AppliedJobs.objects.filter(job_post=job)
-        new_apps_7d = job_applicants.filter(
-            applied_on__gte=timezone.now() - timedelta(days=7)
-        ).count()
-
-        job_data['new_applicants'] = new_apps_7d
-        job_data['pending_review'] = job_applicants.filter(status='Pending').count()
-
+        job_data['new_applicants'] = metrics['new_applicants']
+        job_data['pending_review'] = metrics['pending_review']
         recent_jobs_data.append(job_data)
 
     return Response({
-        "stats": {
-            "total_jobs": total_jobs,
-            "live_jobs": live_jobs,
-            "draft_jobs": draft_jobs,
-            "closed_jobs": closed_jobs,
-            "expired_jobs": expired_jobs,
-            "total_applicants": total_applicants,
-            "new_applicants": new_applicants,
-            "applicants_trend": applicants_trend,
-            "avg_applications_per_job": round(avg_applications_per_job, 1),
-        },
-        "pipeline": pipeline,
+        "stats": dashboard["stats"],
+        "pipeline": dashboard["pipeline"],
         "recent_jobs": recent_jobs_data
     })
 
@@ -0,0 +1,70 @@
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from elasticsearch import ElasticsearchException
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.v1.recruiter import analytics_views, candidate_views, job_views
+from mpcomp import request_stats
+from peeldb import recruiter_analytics
+from peeldb.models import AppliedJobs, JobPost, User
+from search.candidates import CandidateSearch
+
+
+@override_settings(
+    QUERY_BUDGET_STRICT=True,
+    REQUEST_STATS_CACHE="local",
+    REQUEST_STATS_FLUSH_INTERVAL=0,
+)
+class recruiter_query_budgets(TestCase):
+    """The recruiter endpoints stay within their declared query budgets."""
+
+    def setUp(self):
+        self.recruiter = User.objects.create(
+            email="recruiter@mp.com",
+            username="recruiter",
+            user_type="EM",
+            is_active=True,
+        )
+        applicant = User.objects.create(
+            email="test@mp.com", username="test", user_type="JS"
+        )
+        for index in range(3):
+            job = JobPost.objects.create(
+                user=self.recruiter,
+                title="Python Developer %s" % index,
+                vacancies=1,
+                description="Python developer",
+                job_type="full-time",
+                status="Live",
+            )
+            AppliedJobs.objects.create(job_post=job, user=applicant, status="Pending")
+        recruiter_analytics.invalidate(self.recruiter.id)
+
+    def get(self, view, **params):
+        request = APIRequestFactory().get("/", params)
+        force_authenticate(request, user=self.recruiter)
+        response = view(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Server-Timing", response)
+        return response
+
+    def test_endpoints_within_budget(self):
+        self.get(job_views.get_dashboard_stats, period="7d")
+        self.get(analytics_views.get_application_analytics)
+        with patch.object(
+            CandidateSearch, "results", side_effect=ElasticsearchException
+        ):
+            self.get(candidate_views.search_candidates, skills="python")
+
+    def test_exceeding_budget_fails(self):
+        def dashboard_stats(*args):
+            for _ in range(11):
+                JobPost.objects.count()
+            return {"stats": {}, "pipeline": {}, "recent_jobs": []}
+
+        with patch.object(
+            job_views.recruiter_analytics, "dashboard_stats", dashboard_stats
+        ):
+            with self.assertRaises(request_stats.QueryBudgetExceeded):
+                self.get(job_views.get_dashboard_stats)
@@ -1,8 +1,8 @@
 """
-URL routing for Recruiter API (Auth + Team Management + Jobs + Analytics)
+URL routing for Recruiter API (Auth + Team Management + Jobs + Analytics + Candidate Search)
 """
 from django.urls import path
-from . import views, auth_views, job_views, analytics_views
+from . import views, auth_views, job_views, analytics_views, candidate_views
 
 app_name = "recruiter"
 
@@ -74,8 +74,13 @@ urlpatterns = [
 
     # Job Applicants
     path("jobs/<int:job_id>/applicants/", job_views.get_job_applicants, name="jobs-applicants"),
+    path("jobs/<int:job_id>/applicants/export/", job_views.export_job_applicants, name="jobs-applicants-export"),
     path("jobs/<int:job_id>/applicants/<int:applicant_id>/", job_views.get_applicant_detail, name="applicant-detail"),
     path("jobs/<int:job_id>/applicants/<int:applicant_id>/update/", job_views.update_applicant_status, name="applicant-update"),
+    path("exports/<int:export_id>/", job_views.get_export, name="export-detail"),
+
+    # ===== CANDIDATE SEARCH =====
+    path("candidates/search/", candidate_views.search_candidates, name="candidates-search"),
 
     # ===== COMPANY PROFILE =====
     path("company/profile/", views.get_company_profile, name="company-profile"),
@@ -5,13 +5,13 @@ from django.shortcuts import render
 from django.http.response import HttpResponse, HttpResponseRedirect
 from django.db.models import Q
 from django.urls import reverse
-from django.template import loader, Template, Context
+from django.template import loader
 from django.utils.crypto import get_random_string
 
+from mpcomp.meta_registry import render_meta
 from mpcomp.views import get_prev_after_pages_count
 from candidate.forms import JobAlertForm, YEARS
 from peeldb.models import (
-    MetaData,
     User,
     City,
     Industry,
@@ -25,12 +25,7 @@ from dashboard.tasks import send_email
 
 def job_alert(request):
     if request.method == "GET":
-        meta_title = meta_description = h1_tag = ""
-        meta = MetaData.objects.filter(name="alerts_list")
-        if meta:
-            meta_title = Template(meta[0].meta_title).render(Context({}))
-            meta_description = Template(meta[0].meta_description).render(Context({}))
-            h1_tag = Template(meta[0].h1_tag).render(Context({}))
+        meta_title, meta_description, h1_tag = render_meta("alerts_list")
         template = "alert/job_alert.html"
         return render(
             request,
@@ -257,12 +252,7 @@ def modify_job_alert(request, job_alert_id):
 
 
 def alerts_list(request, **kwargs):
-    meta_title = meta_description = h1_tag = ""
-    meta = MetaData.objects.filter(name="alerts_list")
-    if meta:
-        meta_title = Template(meta[0].meta_title).render(Context({}))
-        meta_description = Template(meta[0].meta_description).render(Context({}))
-        h1_tag = Template(meta[0].h1_tag).render(Context({}))
+    meta_title, meta_description, h1_tag = render_meta("alerts_list")
     if request.user.is_authenticated:
         job_alerts = JobAlert.objects.filter(email=request.user.email)
 
@@ -8,7 +8,7 @@ from django.utils import timezone
 from datetime import datetime
 
 from mpcomp.views import jobseeker_login_required
-from mpcomp.views import get_resume_data, handle_uploaded_file
+from mpcomp import resume_parser
 from peeldb.models import City, Country, FunctionalArea, Industry, Language, Skill, UserMessage, Project, UserLanguage, EmploymentHistory, EducationDetails, EducationInstitue, Degree, Qualification, TechnicalSkill, Certification
 
 from candidate.forms import (
@@ -1814,21 +1814,9 @@ def upload_resume_modal(request):
             request.user.resume = resume_file
             request.user.profile_updated = timezone.now()
             
-            # Extract resume data (optional - keep existing functionality)
-            try:
-                handle_uploaded_file(resume_file, resume_file.name)
-                email, mobile, text = get_resume_data(resume_file)
-                request.user.resume_text = text
-                
-                # Update mobile if not set
-                if not request.user.mobile and mobile:
-                    request.user.mobile = mobile
-                    
-            except Exception:
-                # Continue even if text extraction fails
-                pass
-            
             request.user.save()
+            # Extract the text, mobile and skills in the background
+            resume_parser.queue(request.user)
             
             # Get resume URL directly from FileField
             resume_url = request.user.resume.url if request.user.resume else None
@@ -1841,7 +1829,8 @@ def upload_resume_modal(request):
                     'resume_url': resume_url,
                     'file_size': f"{file_size_kb:.1f} KB",
                     'upload_date': timezone.now().strftime('%B %d, %Y'),
-                    'profile_completion': request.user.profile_completion_percentage
+                    'profile_completion': request.user.profile_completion_percentage,
+                    'resume_parse_status': request.user.resume_parse_status
                 }
             })
             
@@ -1875,6 +1864,8 @@ def delete_resume_modal(request):
         # Clear resume-related fields
         request.user.resume_text = ""
         request.user.resume_title = ""
+        request.user.resume_parse_status = ""
+        request.user.resume_data = None
         request.user.profile_updated = timezone.now()
         request.user.save()
         
@@ -1995,21 +1986,9 @@ def update_resume_modal(request):
             request.user.resume = resume_file
             request.user.profile_updated = timezone.now()
             
-            # Extract resume data
-            try:
-                handle_uploaded_file(resume_file, resume_file.name)
-                email, mobile, text = get_resume_data(resume_file)
-                request.user.resume_text = text
-                
-                # Update mobile if not set
-                if not request.user.mobile and mobile:
-                    request.user.mobile = mobile
-                    
-            except Exception:
-                # Continue even if text extraction fails
-                pass
-            
             request.user.save()
+            # Extract the text, mobile and skills in the background
+            resume_parser.queue(request.user)
             
             # Get resume URL directly from FileField
             resume_url = request.user.resume.url if request.user.resume else None
@@ -2022,7 +2001,8 @@ def update_resume_modal(request):
                     'resume_url': resume_url,
                     'file_size': f"{file_size_kb:.1f} KB",
                     'upload_date': timezone.now().strftime('%B %d, %Y'),
-                    'profile_completion': request.user.profile_completion_percentage
+                    'profile_completion': request.user.profile_completion_percentage,
+                    'resume_parse_status': request.user.resume_parse_status
                 }
             })
             
@@ -6,10 +6,7 @@ from django.contrib.auth.decorators import login_required
 from django.utils import timezone
 
 from mpcomp.s3_utils import S3Connection
-from mpcomp.views import (
-    get_resume_data,
-    handle_uploaded_file,
-)
+from mpcomp import resume_parser
 
 
 @login_required
@@ -56,20 +53,14 @@ def upload_resume(request):
                 )
                 request.user.resume = path
                 request.user.profile_updated = timezone.now()
-                handle_uploaded_file(
-                    request.FILES["resume"], request.FILES["resume"].name
-                )
-                email, mobile, text = get_resume_data(request.FILES["resume"])
-                request.user.resume_text = text
-                if not request.user.mobile:
-                    request.user.mobile = mobile
                 request.user.save()
+                resume_parser.queue(request.user)
                 data = {
                     "error": False,
                     "data": "Resume Uploaded Successfully",
                     "profile_percantage": request.user.profile_completion_percentage,
                     "upload_resume": True,
-                    "email": email,
+                    "resume_parse_status": request.user.resume_parse_status,
                     "resume_name": request.FILES["resume"].name,
                     "resume_path": "https://"
                     + settings.AWS_STORAGE_BUCKET_NAME
@@ -0,0 +1,141 @@
+"""
+Matching engine for the daily "top matching jobs" alert mail.
+
+The day's new live jobs are loaded once into inverted indexes (skill id ->
+job ids, city id -> job ids), together with a skill index of all live jobs
+used to top up short lists. Job seekers are then streamed in id-ordered
+chunks with their skill ids prefetched, matched in memory, and the rendered
+mails of each chunk are queued with ``mpcomp.mailer.queue``.
+
+A user gets a mail when at least one new job shares a skill with them and is
+in their current city; the list is filled up to ``MAX_JOBS`` with other live
+jobs sharing a skill, newest first.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.db.models import Prefetch
+from django.template import loader
+
+from peeldb.models import JobPost, TechnicalSkill, User
+
+MAX_JOBS = 10
+CHUNK_SIZE = 500
+SUBJECT = "Top Matching Jobs for your Profile - PeelJobs"
+
+
+class JobIndex:
+    """Inverted indexes over a set of jobs, ranked newest first."""
+
+    def __init__(self, skill_rows, city_rows, ordered_ids):
+        self.by_skill = defaultdict(set)
+        self.by_city = defaultdict(set)
+        for job_id, skill_id in skill_rows:
+            self.by_skill[skill_id].add(job_id)
+        for job_id, city_id in city_rows:
+            self.by_city[city_id].add(job_id)
+        self.rank = {job_id: position for position, job_id in enumerate(ordered_ids)}
+
+    @classmethod
+    def for_jobs(cls, jobs):
+        job_ids = jobs.order_by().values("id")
+        return cls(
+            JobPost.skills.through.objects.filter(jobpost_id__in=job_ids).values_list(
+                "jobpost_id", "skill_id"
+            ),
+            JobPost.location.through.objects.filter(jobpost_id__in=job_ids).values_list(
+                "jobpost_id", "city_id"
+            ),
+            jobs.order_by("-published_on", "-id").values_list("id", flat=True),
+        )
+
+    def with_skills(self, skill_ids):
+        found = set()
+        for skill_id in skill_ids:
+            found |= self.by_skill.get(skill_id, set())
+        return found
+
+    def ranked(self, job_ids):
+        return sorted(job_ids, key=self.rank.__getitem__)
+
+
+def match_jobs(skill_ids, city_id, new_jobs, live_jobs, limit=MAX_JOBS):
+    """Ids of the jobs to mail to a user, or [] when nothing new matches."""
+    matched = new_jobs.with_skills(skill_ids) & new_jobs.by_city.get(city_id, set())
+    if not matched:
+        return []
+    job_ids = new_jobs.ranked(matched)[:limit]
+    if len(job_ids) < limit:
+        extra = live_jobs.with_skills(skill_ids) - matched
+        job_ids += live_jobs.ranked(extra)[: limit - len(job_ids)]
+    return job_ids
+
+
+def alert_users(skill_ids):
+    users = (
+        User.objects.filter(
+            email_notifications=True,
+            user_type="JS",
+            is_bounce=False,
+            is_unsubscribe=False,
+            skills__skill__id__in=skill_ids,
+        )
+        .distinct()
+        .only("id", "email", "unsubscribe_code", "current_city_id")
+        .prefetch_related(
+            Prefetch("skills", queryset=TechnicalSkill.objects.only("id", "skill_id"))
+        )
+        .order_by("id")
+    )
+    last_id = 0
+    while True:
+        chunk = list(users.filter(id__gt=last_id)[:CHUNK_SIZE])
+        if not chunk:
+            return
+        last_id = chunk[-1].id
+        yield chunk
+
+
+def load_jobs(job_ids, loaded):
+    """Fetch the jobs not in ``loaded`` yet, with everything the mail shows."""
+    missing = set(job_ids) - set(loaded)
+    if missing:
+        loaded.update(
+            JobPost.objects.filter(id__in=missing)
+            .select_related("company")
+            .prefetch_related("skills", "industry", "location")
+            .in_bulk()
+        )
+
+
+def build_messages(since=None):
+    """
+    Yield lists of ``(recipients, subject, body)`` mails, one list per chunk
+    of matching users.
+    """
+    since = since or datetime.now() - timedelta(days=1)
+    new_jobs_qs = JobPost.objects.filter(
+        published_on__range=(since, datetime.now()), status="Live"
+    )
+    new_jobs = JobIndex.for_jobs(new_jobs_qs)
+    if not new_jobs.by_skill:
+        return
+    live_jobs = JobIndex.for_jobs(JobPost.objects.filter(status="Live"))
+    template = loader.get_template("email/job_alert.html")
+    loaded = {}
+    for users in alert_users(list(new_jobs.by_skill)):
+        matches = []
+        for user in users:
+            skill_ids = {skill.skill_id for skill in user.skills.all()}
+            job_ids = match_jobs(skill_ids, user.current_city_id, new_jobs, live_jobs)
+            if job_ids:
+                matches.append((user, job_ids))
+        load_jobs([job_id for _, job_ids in matches for job_id in job_ids], loaded)
+        messages = []
+        for user, job_ids in matches:
+            body = template.render(
+                {"jobposts": [loaded[job_id] for job_id in job_ids], "user": user}
+            )
+            messages.append(([user.email], SUBJECT, body))
+        if messages:
+            yield messages
@@ -0,0 +1,186 @@
+"""
+Job, registration and application counts for the daily report mail
+(``dashboard.tasks.daily_report``) and the dashboard home
+(``dashboard.views.auth_views.index``).
+
+``metrics(start, end)`` counts what happened from ``start`` (inclusive) to
+``end`` (exclusive), or over all time without them, with conditional
+aggregation: every job type x poster x status count in one query over
+``JobPost``, every registration source and recruiter count in one query over
+``User``, the applicants of each source grouped over ``AppliedJobs``, plus
+one count each for applications and tickets. The ranges are plain
+comparisons on the timestamp columns, so they can use their indexes.
+
+``day_metrics(day)`` and ``total_metrics()`` are cached: a past day for
+``METRICS_CACHE_TIMEOUT`` seconds, today and the all-time totals for
+``METRICS_TODAY_CACHE_TIMEOUT``.
+"""
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Exists, OuterRef, Q
+
+from mpcomp.cache import cache_key
+from peeldb.models import AppliedJobs, JobPost, Ticket, User
+
+JOB_TYPES = ("full-time", "government", "internship", "walk-in")
+JOB_STATUSES = ("Draft", "Pending", "Published", "Live", "Disabled")
+# jobs posted by admins (superusers), by everyone else, and by anyone
+POSTERS = {
+    "admin": Q(user__is_superuser=True),
+    "others": Q(user__is_superuser=False),
+    "all": Q(),
+}
+REGISTRATION_SOURCES = ("Social", "Email", "Resume", "ResumePool")
+APPLICANT_FILTERS = {
+    "joined": Q(),
+    "login_once": Q(is_login=False),
+    "resume": ~Q(resume=""),
+    "profile": Q(profile_completeness__gte=50),
+    "applied": Q(applied=True),
+}
+RECRUITER_TYPES = ("RR", "AA")
+RECRUITER_FILTERS = {
+    "joined": Q(),
+    "active": Q(is_active=True),
+    "inactive": Q(is_active=False),
+    "mobile_verified": Q(mobile_verified=True),
+    "mobile_not_verified": Q(mobile_verified=False),
+}
+TICKET_STATUSES = ("Open", "Closed")
+
+
+def _range(field, start, end):
+    condition = Q()
+    if start is not None:
+        condition &= Q(**{field + "__gte": start})
+    if end is not None:
+        condition &= Q(**{field + "__lt": end})
+    return condition
+
+
+def _counts(queryset, conditions):
+    """``{name: count}`` of ``queryset`` rows matching each condition, in one query."""
+    aggregates = {
+        "c%s" % number: Count("id", filter=condition)
+        for number, condition in enumerate(conditions.values())
+    }
+    values = queryset.aggregate(**aggregates)
+    return {
+        name: values["c%s" % number] for number, name in enumerate(conditions)
+    }
+
+
+def job_counts(start=None, end=None):
+    """
+    Jobs published in the range: ``counts[poster][job_type][status]``, with
+    ``"all"`` for any job type or status.
+    """
+    conditions = {}
+    for poster, poster_condition in POSTERS.items():
+        for job_type in JOB_TYPES + ("all",):
+            type_condition = Q(job_type=job_type) if job_type != "all" else Q()
+            for status in JOB_STATUSES + ("all",):
+                status_condition = Q(status=status) if status != "all" else Q()
+                conditions[poster, job_type, status] = (
+                    poster_condition & type_condition & status_condition
+                )
+    jobs = JobPost.objects.filter(_range("published_on", start, end))
+    counts = {}
+    for (poster, job_type, status), count in _counts(jobs, conditions).items():
+        counts.setdefault(poster, {}).setdefault(job_type, {})[status] = count
+    return counts
+
+
+def user_counts(start=None, end=None):
+    """
+    Registrations in the range: ``applicants[source][filter]`` for job
+    seekers (``"all"`` for any source), ``recruiters[user_type][filter]``,
+    and ``applied_by_source[source]``, the users of each source who applied
+    for a job in the range, whenever they registered.
+    """
+    applications = AppliedJobs.objects.filter(_range("applied_on", start, end))
+    conditions = {}
+    for source in REGISTRATION_SOURCES + ("all",):
+        source_condition = Q(registered_from=source) if source != "all" else Q()
+        for name, condition in APPLICANT_FILTERS.items():
+            conditions["applicants", source, name] = (
+                Q(user_type="JS") & source_condition & condition
+            )
+    for user_type in RECRUITER_TYPES:
+        for name, condition in RECRUITER_FILTERS.items():
+            conditions["recruiters", user_type, name] = (
+                Q(user_type=user_type) & condition
+            )
+    # the applied subquery only runs for the users who joined in the range
+    users = User.objects.filter(_range("date_joined", start, end)).annotate(
+        applied=Exists(applications.filter(user=OuterRef("pk")))
+    )
+    counts = {"applicants": {}, "recruiters": {}, "applied_by_source": {}}
+    for (group, key, name), count in _counts(users, conditions).items():
+        counts[group].setdefault(key, {})[name] = count
+    applied = dict(
+        applications.filter(user__registered_from__in=REGISTRATION_SOURCES)
+        .values_list("user__registered_from")
+        .annotate(users=Count("user", distinct=True))
+        .order_by()
+    )
+    for source in REGISTRATION_SOURCES:
+        counts["applied_by_source"][source] = applied.get(source, 0)
+    return counts
+
+
+def metrics(start=None, end=None):
+    """All counts for the range, see ``job_counts`` and ``user_counts``."""
+    result = {"jobs": job_counts(start, end)}
+    result.update(user_counts(start, end))
+    result["applications"] = AppliedJobs.objects.filter(
+        _range("applied_on", start, end)
+    ).count()
+    result["tickets"] = _counts(
+        Ticket.objects.filter(_range("created_on", start, end)),
+        {status: Q(status=status) for status in TICKET_STATUSES},
+    )
+    return result
+
+
+def status_keys(counts, templates):
+    """
+    Flatten ``counts[job_type][status]`` into template context names:
+    ``templates`` maps a job type to a name with a ``%s`` for the lower-cased
+    status; without the ``%s_`` it names the count for any status.
+    """
+    context = {}
+    for job_type, template in templates.items():
+        context[template.replace("%s_", "")] = counts[job_type]["all"]
+        for status in JOB_STATUSES:
+            context[template % status.lower()] = counts[job_type][status]
+    return context
+
+
+def day_range(day):
+    start = datetime.combine(day, time.min)
+    return start, start + timedelta(days=1)
+
+
+def _cached(key, compute, today):
+    if today:
+        timeout = getattr(settings, "METRICS_TODAY_CACHE_TIMEOUT", 5 * 60)
+    else:
+        timeout = getattr(settings, "METRICS_CACHE_TIMEOUT", 24 * 60 * 60)
+    return cache.get_or_set(key, compute, timeout)
+
+
+def day_metrics(day):
+    """``metrics()`` of one calendar day, cached."""
+    return _cached(
+        cache_key("metrics", day.isoformat()),
+        lambda: metrics(*day_range(day)),
+        day >= datetime.now().date(),
+    )
+
+
+def total_metrics():
+    """All-time ``metrics()``, cached."""
+    return _cached(cache_key("metrics", "total"), metrics, True)
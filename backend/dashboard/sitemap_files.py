@@ -0,0 +1,352 @@
+"""
+Static XML sitemaps written by ``dashboard.tasks.sitemap_generation``.
+
+Which skill, city and skill-in-city listings have live jobs is read with a
+single grouped query over the job/skill/city joins (``live_combinations``)
+instead of a ``count()`` per listing. Every section is streamed to disk by a
+``SitemapWriter``, which starts a new file every ``URL_LIMIT`` URLs, and the
+files are listed in a ``sitemap.xml`` sitemap index.
+
+Files are written under a temporary name and renamed into place, so a
+crawler reading the directory during a run sees either the previous or the
+new version of a file, never a partial one. Files left over from a previous
+run that were not written again are removed once the index is in place.
+"""
+import math
+import os
+from collections import defaultdict
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import BooleanField, ExpressionWrapper, Q
+
+from peeldb.models import (
+    City,
+    Company,
+    Industry,
+    JobPost,
+    Qualification,
+    Skill,
+    State,
+    User,
+)
+
+SITE_URL = "https://peeljobs.com"
+# sitemaps.org limit on the number of URLs in one file
+URL_LIMIT = 50000
+INDEX_NAME = "sitemap.xml"
+LISTING_PAGE_SIZE = 100
+
+URLSET_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+)
+URLSET_FOOTER = "</urlset>\n"
+URL_ENTRY = (
+    "<url><loc>%s</loc><changefreq>%s</changefreq><priority>%s</priority></url>\n"
+)
+
+STATIC_PAGES = (
+    "/post-job/",
+    "/internship-jobs/",
+    "/government-jobs/",
+    "/full-time-jobs/",
+    "/walkin-jobs/",
+    "/alert/list/",
+    "/jobs-by-location/",
+    "/jobs-by-skill/",
+    "/jobs-by-industry/",
+    "/page/about-us/",
+    "/page/terms-conditions/",
+    "/page/privacy-policy/",
+    "/page/contact-us/",
+    "/page/faq/",
+    "/page/recruiter-faq/",
+    "/recruiters/",
+    "/companies/",
+    "/jobs/",
+    "/fresher-jobs-by-skills/",
+    "/walkin-jobs-by-skills/",
+    "/walkins-by-location/",
+    "/jobs-by-degree/",
+    "/fresher-jobs-by-location/",
+)
+
+
+class SitemapWriter:
+    """
+    Stream the URLs of one sitemap section into ``sitemap-<name>.xml``, then
+    ``sitemap-<name>-2.xml`` and so on every ``limit`` URLs.
+    """
+
+    def __init__(self, directory, name, limit=URL_LIMIT):
+        self.directory = directory
+        self.name = name
+        self.limit = limit
+        self.files = []
+        self._file = None
+        self._count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._discard()
+
+    def _filename(self):
+        number = len(self.files) + 1
+        suffix = "" if number == 1 else "-%d" % number
+        return "sitemap-%s%s.xml" % (self.name, suffix)
+
+    def _open(self):
+        filename = self._filename()
+        path = os.path.join(self.directory, filename)
+        self._path = path
+        self._file = open(path + ".tmp", "w", encoding="utf-8")
+        self._file.write(URLSET_HEADER)
+        self._count = 0
+        self.files.append(filename)
+
+    def _finish(self):
+        self._file.write(URLSET_FOOTER)
+        self._file.close()
+        os.replace(self._path + ".tmp", self._path)
+        self._file = None
+
+    def _discard(self):
+        if self._file is not None:
+            self._file.close()
+            os.remove(self._path + ".tmp")
+            self.files.pop()
+            self._file = None
+
+    def add(self, path, changefreq="daily", priority="0.5"):
+        if self._file is not None and self._count >= self.limit:
+            self._finish()
+        if self._file is None:
+            self._open()
+        self._file.write(URL_ENTRY % (escape(SITE_URL + path), changefreq, priority))
+        self._count += 1
+
+    def extend(self, paths):
+        for path in paths:
+            self.add(path)
+
+    def close(self):
+        """Finish the last file; a section without URLs writes no file."""
+        if self._file is not None:
+            self._finish()
+
+
+def write_index(directory, filenames):
+    """Write the ``sitemap.xml`` index of ``filenames``, atomically."""
+    path = os.path.join(directory, INDEX_NAME)
+    with open(path + ".tmp", "w", encoding="utf-8") as index:
+        index.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        )
+        for filename in filenames:
+            index.write(
+                "<sitemap><loc>%s</loc></sitemap>\n"
+                % escape("%s/sitemap/%s" % (SITE_URL, filename))
+            )
+        index.write("</sitemapindex>\n")
+    os.replace(path + ".tmp", path)
+
+
+class LiveCombinations:
+    """
+    Skills, cities and skill/city pairs with live jobs, keyed by ``"jobs"``
+    (any live job), by job type and by ``"fresher"`` (``min_year=0``).
+    """
+
+    def __init__(self, rows):
+        self.skills = defaultdict(set)
+        self.cities = defaultdict(set)
+        self.pairs = defaultdict(set)
+        for skill_id, city_id, job_type, fresher in rows:
+            kinds = ["jobs", job_type]
+            if fresher:
+                kinds.append("fresher")
+            for kind in kinds:
+                if skill_id is not None:
+                    self.skills[kind].add(skill_id)
+                if city_id is not None:
+                    self.cities[kind].add(city_id)
+                if skill_id is not None and city_id is not None:
+                    self.pairs[kind].add((skill_id, city_id))
+
+
+def live_combinations():
+    """Read the distinct (skill, city, job type, min_year=0) rows of live jobs."""
+    rows = (
+        JobPost.objects.filter(status="Live")
+        .annotate(
+            no_experience=ExpressionWrapper(
+                Q(min_year=0), output_field=BooleanField()
+            )
+        )
+        .values_list("skills", "location", "job_type", "no_experience")
+        .order_by()
+        .distinct()
+    )
+    return LiveCombinations(rows.iterator())
+
+
+def _split(items, selected):
+    """Slugs of the ``(id, slug)`` items in ``selected``, and of the rest."""
+    matched = [slug for pk, slug in items if pk in selected]
+    others = [slug for pk, slug in items if pk not in selected]
+    return matched, others
+
+
+def _formatted(pattern, slugs):
+    return (pattern % slug for slug in slugs)
+
+
+def _pair_paths(pattern, skills, cities, pairs, with_jobs):
+    for city_id, city_slug in cities:
+        for skill_id, skill_slug in skills:
+            if ((skill_id, city_id) in pairs) == with_jobs:
+                yield pattern % (skill_slug, city_slug)
+
+
+def _page_paths():
+    jobs = JobPost.objects.filter(
+        status="Live", job_type__in=["full-time", "internship", "walk-in", "government"]
+    ).count()
+    yield "/sitemap/"
+    for page in range(1, int(math.ceil(float(jobs) / LISTING_PAGE_SIZE))):
+        yield "/sitemap/%s/" % page
+    yield from STATIC_PAGES
+    now = datetime.now()
+    yield "/calendar/%s/" % now.year
+    yield "/calendar/%s/month/%s/" % (now.year, now.month)
+
+
+def sections():
+    """
+    ``(name, paths)`` of every sitemap section. ``paths`` are generated
+    lazily, so the skill-in-city sections are never held in memory.
+    """
+    live = live_combinations()
+    skills = list(
+        Skill.objects.filter(status="Active")
+        .exclude(name__iexact="Fresher")
+        .values_list("id", "slug")
+    )
+    cities = list(City.objects.filter(status="Enabled").values_list("id", "slug"))
+    states = list(State.objects.filter(status="Enabled").values_list("slug", flat=True))
+
+    yield "pages", _page_paths()
+    yield "jobs", (
+        JobPost.objects.filter(status="Live").values_list("slug", flat=True).iterator()
+    )
+
+    for kind, name, without_name, pattern in (
+        ("jobs", "skills", "skills-without-jobs", "/%s-jobs/"),
+        ("walk-in", "skill-walkins", "skill-without-walkins", "/%s-walkins/"),
+        (
+            "fresher",
+            "skill-fresher-jobs",
+            "skill-without-fresher-jobs",
+            "/%s-fresher-jobs/",
+        ),
+    ):
+        with_jobs, without_jobs = _split(skills, live.skills[kind])
+        yield name, _formatted(pattern, with_jobs)
+        yield without_name, _formatted(pattern, without_jobs)
+
+    for kind, name, without_name, pattern in (
+        ("jobs", "locations", "locations-without-jobs", "/jobs-in-%s/"),
+        ("walk-in", "location-walkins", "location-without-walkins", "/walkins-in-%s/"),
+        (
+            "fresher",
+            "location-fresher-jobs",
+            "location-without-fresher-jobs",
+            "/fresher-jobs-in-%s/",
+        ),
+    ):
+        with_jobs, without_jobs = _split(cities, live.cities[kind])
+        yield name, _formatted(pattern, with_jobs)
+        yield without_name, _formatted(pattern, without_jobs)
+
+    internships, _ = _split(cities, live.cities["internship"])
+    yield "internships", _formatted("/internship-jobs-in-%s/", internships)
+
+    for kind, name, without_name, pattern in (
+        ("jobs", "skill-locations", "skill-locations-without-jobs", "/%s-jobs-in-%s/"),
+        (
+            "walk-in",
+            "skill-location-walkins",
+            "skill-location-without-walkins",
+            "/%s-walkins-in-%s/",
+        ),
+        (
+            "fresher",
+            "skill-location-fresher-jobs",
+            "skill-location-without-fresher-jobs",
+            "/%s-fresher-jobs-in-%s/",
+        ),
+    ):
+        pairs = live.pairs[kind]
+        yield name, _pair_paths(pattern, skills, cities, pairs, True)
+        yield without_name, _pair_paths(pattern, skills, cities, pairs, False)
+
+    yield "state-jobs", _formatted("/jobs-in-%s/", states)
+    yield "state-walkins", _formatted("/walkins-in-%s/", states)
+    yield "state-fresher-jobs", _formatted("/fresher-jobs-in-%s/", states)
+
+    yield "industries", _formatted(
+        "/%s-industry-jobs/",
+        Industry.objects.filter(status="Active").values_list("slug", flat=True),
+    )
+    yield "education-jobs", _formatted(
+        "/%s-jobs/",
+        Qualification.objects.filter(status="Active").values_list("slug", flat=True),
+    )
+    yield "recruiters", _formatted(
+        "/recruiters/%s/",
+        User.objects.filter(
+            Q(user_type="RR")
+            | Q(user_type="AR")
+            | Q(user_type="AA") & Q(is_active=True)
+        ).values_list("username", flat=True),
+    )
+    yield "companies", _formatted(
+        "/%s-job-openings/",
+        Company.objects.filter(is_active=True).values_list("slug", flat=True),
+    )
+
+
+def build_sitemaps(directory=None):
+    """
+    Write every section and the index into ``directory`` (``sitemap/`` under
+    ``BASE_DIR`` by default) and return the names of the section files.
+    """
+    if directory is None:
+        directory = os.path.join(settings.BASE_DIR, "sitemap")
+    os.makedirs(directory, exist_ok=True)
+    filenames = []
+    for name, paths in sections():
+        with SitemapWriter(directory, name) as writer:
+            if name == "pages":
+                writer.add("/", changefreq="always", priority="1.0")
+            writer.extend(paths)
+        filenames.extend(writer.files)
+    write_index(directory, filenames)
+
+    written = set(filenames)
+    for filename in os.listdir(directory):
+        if (
+            filename.startswith("sitemap-")
+            and filename.endswith(".xml")
+            and filename not in written
+        ):
+            os.remove(os.path.join(directory, filename))
+    return filenames
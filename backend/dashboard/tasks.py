@@ -1,6 +1,4 @@
-import math
 from datetime import datetime, timedelta
-from itertools import chain
 
 from django.conf import settings
 from django.core.mail import EmailMessage
@@ -11,21 +9,17 @@ from django.template import loader
 
 # from jobsp.celery import app
 from jobsp.celery import app
+from mpcomp import mailer
 from mpcomp.views import get_absolute_url
 from peeldb.models import (
     AppliedJobs,
     City,
-    Company,
-    Industry,
     JobAlert,
     JobPost,
-    Qualification,
     SearchResult,
     SentMail,
     Skill,
-    State,
     Subscriber,
-    Ticket,
     User,
 )
 
@@ -83,11 +77,78 @@ def send_email(mto, msubject, mbody, reply_to=None):
         raise
 
 
+@app.task(bind=True, max_retries=None)
+def send_email_batch(self, messages, category=""):
+    """
+    Send ``(recipients, subject, html_body)`` mails over a single connection,
+    retrying the failed ones with backoff (see mpcomp/mailer.py)
+    """
+    retries = self.request.retries
+    final = retries >= getattr(settings, "MAIL_MAX_RETRIES", 3)
+    failed = mailer.dispatch(messages, category, attempt=retries + 1, final=final)
+    if failed and not final:
+        raise self.retry(args=(failed, category), countdown=mailer.backoff(retries))
+    return len(messages) - len(failed)
+
+
 @app.task
 def rebuilding_index():
-    from haystack.management.commands import rebuild_index
+    from peeldb import search_queue
+
+    return search_queue.reindex()
+
+
+@app.task
+def drain_search_index_queue():
+    from peeldb import search_queue
+
+    return search_queue.drain()
+
+
+@app.task
+def flush_job_views():
+    from mpcomp import view_counter
+
+    return view_counter.flush()
+
+
+@app.task
+def recount_live_job_counts():
+    from peeldb import job_counts
+
+    job_counts.recount_all()
+
+
+@app.task
+def refresh_daily_rollups(full=False):
+    from peeldb import report_rollups
+
+    if full:
+        return report_rollups.refresh()
+    return report_rollups.refresh_recent()
+
+
+@app.task
+def export_data(export_id):
+    from peeldb import exports
+    from peeldb.models import DataExport
+
+    return exports.run(DataExport.objects.get(id=export_id))
+
+
+@app.task
+def delete_expired_exports():
+    from peeldb import exports
 
-    rebuild_index.Command().handle(interactive=False)
+    return exports.delete_expired()
+
+
+@app.task
+def parse_resume(user_id):
+    from mpcomp import resume_parser
+
+    parsed = resume_parser.parse_user_resume(user_id)
+    return parsed is not None
 
 
 @app.task
@@ -100,37 +161,10 @@ def updating_jobposts():
 
 @app.task
 def job_alerts_to_users():
-    from_date = datetime.now() - timedelta(days=1)
-    job_posts = JobPost.objects.filter(
-        published_on__range=(from_date, datetime.now()), status="Live"
-    )
-    users = User.objects.filter(
-        email_notifications=True,
-        user_type="JS",
-        is_bounce=False,
-        is_unsubscribe=False,
-        skills__skill__id__in=job_posts.values_list("skills", flat=True),
-    ).distinct()
-    for user in users:
-        user_skills = user.skills.values_list("skill", flat=True)
-        user_posts = job_posts.filter(
-            skills__id__in=user_skills, location__in=[user.current_city]
-        )
-        if user_posts:
-            if user_posts.count() < 10:
-                job_order = Case(
-                    *[When(pk=pk.id, then=pos) for pos, pk in enumerate(user_posts)]
-                )
-                user_posts = user_posts | JobPost.objects.filter(
-                    skills__in=user_skills, status="Live"
-                )
-                user_posts = user_posts.order_by(job_order)
-            c = {"jobposts": user_posts.distinct()[:10], "user": user}
-            t = loader.get_template("email/job_alert.html")
-            subject = "Top Matching Jobs for your Profile - PeelJobs"
-            rendered = t.render(c)
-            mto = [user.email]
-            send_email.delay(mto, subject, rendered)
+    from dashboard.job_alerts import build_messages
+
+    for messages in build_messages():
+        mailer.queue(messages, "job_alert")
 
 
 @app.task
@@ -237,12 +271,12 @@ def sending_mail(emailtemplate, recruiters):
     subject = emailtemplate.subject
     rendered = t.render(c)
     sent_mail = SentMail.objects.create(template=emailtemplate)
-    recruiters = User.objects.filter(id__in=recruiters)
-    for recruiter in recruiters:
-        recruiter = User.objects.get(id=recruiter)
-        sent_mail.recruiter.add(recruiter)
-        mto = recruiter.email
-        send_email.delay(mto, subject, rendered)
+    recruiters = list(User.objects.filter(id__in=recruiters))
+    sent_mail.recruiter.add(*recruiters)
+    mailer.queue(
+        [([recruiter.email], subject, rendered) for recruiter in recruiters],
+        "mail_template",
+    )
     return ""
 
 
@@ -326,356 +360,107 @@ def recruiter_jobpost_applicants():
     current_date = datetime.strptime(str(datetime.now().date()), "%Y-%m-%d").strftime(
         "%Y-%m-%d"
     )
-    for each in recruiters:
-        if each.get_jobposts_count() > 1:
-            job_posts = JobPost.objects.filter(
-                user=each, status="Live", send_email_notifications=True
-            )
-            for job in job_posts:
-                applicants = AppliedJobs.objects.filter(
-                    job_post=job, applied_on__date=current_date
+    with mailer.Outbox("recruiter_applicants") as outbox:
+        for each in recruiters:
+            if each.get_jobposts_count() > 1:
+                job_posts = JobPost.objects.filter(
+                    user=each, status="Live", send_email_notifications=True
                 )
-                if len(applicants) >= 10:
-                    c = {"jobposts": job, "user": each, "applicants": applicants[:10]}
-                    t = loader.get_template("email/job_applicants.html")
-                    subject = "No. Of Applicants Applied For Your Job"
-                    rendered = t.render(c)
-                    mto = [each.email]
-                    send_email.delay(mto, subject, rendered)
+                for job in job_posts:
+                    applicants = AppliedJobs.objects.filter(
+                        job_post=job, applied_on__date=current_date
+                    )
+                    if len(applicants) >= 10:
+                        c = {"jobposts": job, "user": each, "applicants": applicants[:10]}
+                        t = loader.get_template("email/job_applicants.html")
+                        subject = "No. Of Applicants Applied For Your Job"
+                        rendered = t.render(c)
+                        mto = [each.email]
+                        outbox.add(mto, subject, rendered)
 
 
 @app.task()
 def daily_report():
-    current_date = datetime.strptime(
-        str(datetime.now().date() - timedelta(days=1)), "%Y-%m-%d"
-    ).strftime("%Y-%m-%d")
-
-    today_jobs_count = JobPost.objects.filter(
-        published_on__icontains=current_date
-    ).exclude(user__is_superuser=True)
-
-    today_full_time_jobs_count = JobPost.objects.filter(
-        job_type="full-time", published_on__icontains=current_date
-    ).exclude(user__is_superuser=True)
-    today_govt_jobs_count = JobPost.objects.filter(
-        job_type="government", published_on__icontains=current_date
-    ).exclude(user__is_superuser=True)
-    today_internship_jobs_count = JobPost.objects.filter(
-        job_type="internship", published_on__icontains=current_date
-    ).exclude(user__is_superuser=True)
-    today_walkin_jobs_count = JobPost.objects.filter(
-        job_type="walk-in", published_on__icontains=current_date
-    ).exclude(user__is_superuser=True)
-
-    today_admin_jobs_count = JobPost.objects.filter(
-        published_on__icontains=current_date, user__is_superuser=True
-    )
+    from dashboard.metrics import day_metrics, status_keys
 
-    today_admin_full_time_jobs_count = JobPost.objects.filter(
-        job_type="full-time",
-        published_on__icontains=current_date,
-        user__is_superuser=True,
-    )
-    today_admin_govt_jobs_count = JobPost.objects.filter(
-        job_type="government",
-        published_on__icontains=current_date,
-        user__is_superuser=True,
-    )
-    today_admin_internship_jobs_count = JobPost.objects.filter(
-        job_type="internship",
-        published_on__icontains=current_date,
-        user__is_superuser=True,
-    )
-    today_admin_walkin_jobs_count = JobPost.objects.filter(
-        job_type="walk-in",
-        published_on__icontains=current_date,
-        user__is_superuser=True,
-    )
-
-    today_applicants_count = User.objects.filter(
-        date_joined__contains=current_date, user_type="JS", registered_from="Social"
-    )
-
-    today_register_applicants_count = User.objects.filter(
-        date_joined__contains=current_date, user_type="JS", registered_from="Email"
-    )
-
-    resume_applicants_count = User.objects.filter(
-        date_joined__contains=current_date, user_type="JS", registered_from="Resume"
-    )
-
-    resumepool_applicants = User.objects.filter(
-        date_joined__contains=current_date, user_type="JS", registered_from="ResumePool"
-    )
-
-    today_total_recruiters = User.objects.filter(
-        date_joined__contains=current_date
-    ).exclude(user_type="JS")
-
-    today_recruiters_count = User.objects.filter(
-        date_joined__contains=current_date, user_type="RR"
-    )
-
-    today_agency_recruiters_count = User.objects.filter(
-        date_joined__contains=current_date, user_type="AA"
-    )
-
-    today_total_recruiters = (
-        today_recruiters_count.count() + today_agency_recruiters_count.count()
-    )
-
-    today_active_recruiters = today_recruiters_count.filter(is_active=True)
-    today_inactive_recruiters = today_recruiters_count.filter(is_active=False)
-
-    today_agency_recruiters_count = User.objects.filter(
-        date_joined__contains=current_date, user_type="AA"
-    )
-
-    today_agency_active_recruiters = today_agency_recruiters_count.filter(
-        is_active=True
-    )
-    today_agency_inactive_recruiters = today_agency_recruiters_count.filter(
-        is_active=False
-    )
-
-    today_job_applications = AppliedJobs.objects.filter(
-        applied_on__contains=current_date
-    )
-
-    job_applied_users = User.objects.filter(
-        id__in=today_job_applications.values("user")
-    )
-    today_tickets = Ticket.objects.filter(created_on__contains=current_date)
-
-    formatted_date = datetime.strptime(str(current_date), "%Y-%m-%d").strftime(
-        "%d-%m-%Y"
-    )
+    report_date = datetime.now().date() - timedelta(days=1)
+    current_date = report_date.strftime("%Y-%m-%d")
+    formatted_date = report_date.strftime("%d-%m-%Y")
+    metrics = day_metrics(report_date)
+    applicants = metrics["applicants"]
+    applied = metrics["applied_by_source"]
+    recruiters = metrics["recruiters"]
 
     data = {
         "current_date": current_date,
-        "today_active_tickets": today_tickets.filter(status="Open").count(),
-        "today_closed_tickets": today_tickets.filter(status="Closed").count(),
-        "today_job_applications": today_job_applications.count(),
-        "today_jobs_count": today_jobs_count.count(),
-        "today_jobs_draft_count": today_jobs_count.filter(status="Draft").count(),
-        "today_jobs_pending_count": today_jobs_count.filter(status="Pending").count(),
-        "today_jobs_published_count": today_jobs_count.filter(
-            status="Published"
-        ).count(),
-        "today_jobs_live_count": today_jobs_count.filter(status="Live").count(),
-        "today_jobs_disabled_count": today_jobs_count.filter(status="Disabled").count(),
-        "today_all_applicants_count": User.objects.filter(
-            date_joined__contains=current_date, user_type="JS"
-        ).count(),
-        "today_full_time_jobs_count": today_full_time_jobs_count.count(),
-        "today_full_time_draft_jobs_count": today_full_time_jobs_count.filter(
-            status="Draft"
-        ).count(),
-        "today_full_time_pending_jobs_count": today_full_time_jobs_count.filter(
-            status="Pending"
-        ).count(),
-        "today_full_time_published_jobs_count": today_full_time_jobs_count.filter(
-            status="Published"
-        ).count(),
-        "today_full_time_live_jobs_count": today_full_time_jobs_count.filter(
-            status="Live"
-        ).count(),
-        "today_full_time_disabled_jobs_count": today_full_time_jobs_count.filter(
-            status="Disabled"
-        ).count(),
-        "today_govt_jobs_count": today_govt_jobs_count.count(),
-        "today_govt_jobs_draft_count": today_govt_jobs_count.filter(
-            status="Draft"
-        ).count(),
-        "today_govt_jobs_pending_count": today_govt_jobs_count.filter(
-            status="Pending"
-        ).count(),
-        "today_govt_jobs_published_count": today_govt_jobs_count.filter(
-            status="Published"
-        ).count(),
-        "today_govt_jobs_live_count": today_govt_jobs_count.filter(
-            status="Live"
-        ).count(),
-        "today_govt_jobs_disabled_count": today_govt_jobs_count.filter(
-            status="Disabled"
-        ).count(),
-        "today_internship_jobs_count": today_internship_jobs_count.count(),
-        "today_internship_jobs_draft_count": today_internship_jobs_count.filter(
-            status="Draft"
-        ).count(),
-        "today_internship_jobs_pending_count": today_internship_jobs_count.filter(
-            status="Pending"
-        ).count(),
-        "today_internship_jobs_published_count": today_internship_jobs_count.filter(
-            status="Published"
-        ).count(),
-        "today_internship_jobs_live_count": today_internship_jobs_count.filter(
-            status="Live"
-        ).count(),
-        "today_internship_jobs_disabled_count": today_internship_jobs_count.filter(
-            status="Disabled"
-        ).count(),
-        "today_walkin_jobs_count": today_walkin_jobs_count.count(),
-        "today_walkin_jobs_draft_count": today_walkin_jobs_count.filter(
-            status="Draft"
-        ).count(),
-        "today_walkin_jobs_pending_count": today_walkin_jobs_count.filter(
-            status="Pending"
-        ).count(),
-        "today_walkin_jobs_published_count": today_walkin_jobs_count.filter(
-            status="Published"
-        ).count(),
-        "today_walkin_jobs_live_count": today_walkin_jobs_count.filter(
-            status="Live"
-        ).count(),
-        "today_walkin_jobs_disabled_count": today_walkin_jobs_count.filter(
-            status="Disabled"
-        ).count(),
-        "today_admin_jobs_count": today_admin_jobs_count.count(),
-        "today_admin_draft_jobs_count": today_admin_jobs_count.filter(
-            status="Draft"
-        ).count(),
-        "today_admin_pending_jobs_count": today_admin_jobs_count.filter(
-            status="Pending"
-        ).count(),
-        "today_admin_published_jobs_count": today_admin_jobs_count.filter(
-            status="Published"
-        ).count(),
-        "today_admin_live_jobs_count": today_admin_jobs_count.filter(
-            status="Live"
-        ).count(),
-        "today_admin_disabled_jobs_count": today_admin_jobs_count.filter(
-            status="Disabled"
-        ).count(),
-        "today_admin_full_time_draft_jobs_count": today_admin_full_time_jobs_count.filter(
-            status="Draft"
-        ).count(),
-        "today_admin_full_time_pending_jobs_count": today_admin_full_time_jobs_count.filter(
-            status="Pending"
-        ).count(),
-        "today_admin_full_time_published_jobs_count": today_admin_full_time_jobs_count.filter(
-            status="Published"
-        ).count(),
-        "today_admin_full_time_jobs_count": today_admin_full_time_jobs_count.count(),
-        "today_admin_full_time_live_jobs_count": today_admin_full_time_jobs_count.filter(
-            status="Live"
-        ).count(),
-        "today_admin_full_time_disabled_jobs_count": today_admin_full_time_jobs_count.filter(
-            status="Disabled"
-        ).count(),
-        "today_admin_govt_jobs_count": today_admin_govt_jobs_count.count(),
-        "today_admin_govt_draft_jobs_count": today_admin_govt_jobs_count.filter(
-            status="Draft"
-        ).count(),
-        "today_admin_govt_pending_jobs_count": today_admin_govt_jobs_count.filter(
-            status="Pending"
-        ).count(),
-        "today_admin_govt_published_jobs_count": today_admin_govt_jobs_count.filter(
-            status="Published"
-        ).count(),
-        "today_admin_govt_live_jobs_count": today_admin_govt_jobs_count.filter(
-            status="Live"
-        ).count(),
-        "today_admin_govt_disabled_jobs_count": today_admin_govt_jobs_count.filter(
-            status="Disabled"
-        ).count(),
-        "today_admin_internship_jobs_count": today_admin_internship_jobs_count.count(),
-        "today_admin_internship_draft_jobs_count": today_admin_internship_jobs_count.filter(
-            status="Draft"
-        ).count(),
-        "today_admin_internship_pending_jobs_count": today_admin_internship_jobs_count.filter(
-            status="Pending"
-        ).count(),
-        "today_admin_internship_published_jobs_count": today_admin_internship_jobs_count.filter(
-            status="Published"
-        ).count(),
-        "today_admin_internship_live_jobs_count": today_admin_internship_jobs_count.filter(
-            status="Live"
-        ).count(),
-        "today_admin_internship_disabled_jobs_count": today_admin_internship_jobs_count.filter(
-            status="Disabled"
-        ).count(),
-        "today_admin_walkin_jobs_count": today_admin_walkin_jobs_count.count(),
-        "today_admin_walkin_draft_jobs_count": today_admin_walkin_jobs_count.filter(
-            status="Draft"
-        ).count(),
-        "today_admin_walkin_pending_jobs_count": today_admin_walkin_jobs_count.filter(
-            status="Pending"
-        ).count(),
-        "today_admin_walkin_published_jobs_count": today_admin_walkin_jobs_count.filter(
-            status="Published"
-        ).count(),
-        "today_admin_walkin_live_jobs_count": today_admin_walkin_jobs_count.filter(
-            status="Live"
-        ).count(),
-        "today_admin_walkin_disabled_jobs_count": today_admin_walkin_jobs_count.filter(
-            status="Disabled"
-        ).count(),
-        "today_applicants_count": today_applicants_count.count(),
-        "today_login_only_once_applicants_count": today_applicants_count.filter(
-            is_login=False
-        ).count(),
-        "today_resume_applicants_count": today_applicants_count.exclude(
-            resume=""
-        ).count(),
-        "today_profile_applicants_count": today_applicants_count.filter(
-            profile_completeness__gte=50
-        ).count(),
-        "today_applied_applicants_count": job_applied_users.filter(
-            registered_from="Social"
-        ).count(),
-        "resume_applicants_count": resume_applicants_count.count(),
-        "resume_login_once_applicants_count": resume_applicants_count.filter(
-            is_login=False
-        ).count(),
-        "resume_uploaded_applicants_count": resume_applicants_count.exclude(
-            resume=""
-        ).count(),
-        "resume_profile_applicants_count": resume_applicants_count.filter(
-            profile_completeness__gte=50
-        ).count(),
-        "resume_applied_applicants_count": job_applied_users.filter(
-            registered_from="Resume"
-        ).count(),
-        "resumepool_applicants": resumepool_applicants.count(),
-        "resumepool_login_once_applicants": resumepool_applicants.filter(
-            is_login=False
-        ).count(),
-        "resumepool_profile_applicants": resumepool_applicants.filter(
-            profile_completeness__gte=50
-        ).count(),
-        "resumepool_applied_applicants": job_applied_users.filter(
-            registered_from="Resume"
-        ).count(),
-        "today_register_applicants_count": today_register_applicants_count.count(),
-        "today_register_login_only_once_applicants_count": today_register_applicants_count.filter(
-            is_login=False
-        ).count(),
-        "today_register_resume_applicants_count": today_register_applicants_count.filter()
-        .exclude(resume="")
-        .count(),
-        "today_register_profile_applicants_count": today_register_applicants_count.filter(
-            profile_completeness__gte=50
-        ).count(),
-        "today_register_applied_applicants_count": job_applied_users.filter(
-            registered_from="Email"
-        ).count(),
-        "today_total_recruiters": today_total_recruiters,
-        "today_recruiters_count": today_recruiters_count.count(),
-        "today_active_recruiters": today_active_recruiters.count(),
-        "today_inactive_recruiters": today_inactive_recruiters.count(),
-        "today_agency_recruiters_count": today_agency_recruiters_count.count(),
-        "today_agency_active_recruiters": today_agency_active_recruiters.count(),
-        "today_agency_inactive_recruiters": today_agency_inactive_recruiters.count(),
+        "today_active_tickets": metrics["tickets"]["Open"],
+        "today_closed_tickets": metrics["tickets"]["Closed"],
+        "today_job_applications": metrics["applications"],
+        "today_all_applicants_count": applicants["all"]["joined"],
+        "today_applicants_count": applicants["Social"]["joined"],
+        "today_login_only_once_applicants_count": applicants["Social"]["login_once"],
+        "today_resume_applicants_count": applicants["Social"]["resume"],
+        "today_profile_applicants_count": applicants["Social"]["profile"],
+        "today_applied_applicants_count": applied["Social"],
+        "resume_applicants_count": applicants["Resume"]["joined"],
+        "resume_login_once_applicants_count": applicants["Resume"]["login_once"],
+        "resume_uploaded_applicants_count": applicants["Resume"]["resume"],
+        "resume_profile_applicants_count": applicants["Resume"]["profile"],
+        "resume_applied_applicants_count": applied["Resume"],
+        "resumepool_applicants": applicants["ResumePool"]["joined"],
+        "resumepool_login_once_applicants": applicants["ResumePool"]["login_once"],
+        "resumepool_profile_applicants": applicants["ResumePool"]["profile"],
+        "resumepool_applied_applicants": applied["ResumePool"],
+        "today_register_applicants_count": applicants["Email"]["joined"],
+        "today_register_login_only_once_applicants_count": applicants["Email"][
+            "login_once"
+        ],
+        "today_register_resume_applicants_count": applicants["Email"]["resume"],
+        "today_register_profile_applicants_count": applicants["Email"]["profile"],
+        "today_register_applied_applicants_count": applied["Email"],
+        "today_total_recruiters": recruiters["RR"]["joined"]
+        + recruiters["AA"]["joined"],
+        "today_recruiters_count": recruiters["RR"]["joined"],
+        "today_active_recruiters": recruiters["RR"]["active"],
+        "today_inactive_recruiters": recruiters["RR"]["inactive"],
+        "today_agency_recruiters_count": recruiters["AA"]["joined"],
+        "today_agency_active_recruiters": recruiters["AA"]["active"],
+        "today_agency_inactive_recruiters": recruiters["AA"]["inactive"],
     }
+    data.update(
+        status_keys(
+            metrics["jobs"]["others"],
+            {
+                "all": "today_jobs_%s_count",
+                "full-time": "today_full_time_%s_jobs_count",
+                "government": "today_govt_jobs_%s_count",
+                "internship": "today_internship_jobs_%s_count",
+                "walk-in": "today_walkin_jobs_%s_count",
+            },
+        )
+    )
+    data.update(
+        status_keys(
+            metrics["jobs"]["admin"],
+            {
+                "all": "today_admin_%s_jobs_count",
+                "full-time": "today_admin_full_time_%s_jobs_count",
+                "government": "today_admin_govt_%s_jobs_count",
+                "internship": "today_admin_internship_%s_jobs_count",
+                "walk-in": "today_admin_walkin_%s_jobs_count",
+            },
+        )
+    )
+
     users = settings.DAILY_REPORT_USERS
 
-    for each in users:
-        temp = loader.get_template("email/daily_report.html")
-        subject = "Peeljobs Daily Report For " + formatted_date
-        mto = [each]
-        rendered = temp.render(data)
-        send_email.delay(mto, subject, rendered)
+    with mailer.Outbox("daily_report") as outbox:
+        for each in users:
+            temp = loader.get_template("email/daily_report.html")
+            subject = "Peeljobs Daily Report For " + formatted_date
+            mto = [each]
+            rendered = temp.render(data)
+            outbox.add(mto, subject, rendered)
 
 
 @app.task()
@@ -758,12 +543,13 @@ def recruiter_profile_update_notifications():
             profile_completeness__lt=50,
         )
     )
-    for recruiter in recruiters:
-        temp = loader.get_template("email/user_profile_alert.html")
-        subject = "Update Your Profile To Get More Applicants - Peeljobs"
-        mto = [recruiter.email]
-        rendered = temp.render({"user": recruiter, "recruiter": True})
-        send_email.delay(mto, subject, rendered)
+    with mailer.Outbox("profile_reminder") as outbox:
+        for recruiter in recruiters:
+            temp = loader.get_template("email/user_profile_alert.html")
+            subject = "Update Your Profile To Get More Applicants - Peeljobs"
+            mto = [recruiter.email]
+            rendered = temp.render({"user": recruiter, "recruiter": True})
+            outbox.add(mto, subject, rendered)
 
 
 @app.task()
@@ -863,662 +649,17 @@ def applicants_job_notifications():
 
 @app.task()
 def sitemap_generation():
-    print("Sitemap Generation started")
-    import os
-
-    try:
-        os.system("rm sitemap/*")
-    except Exception:
-        pass
-    xml_cont = """<?xml version="1.0" encoding="UTF-8"?>
-    <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">"""
-
-    xml_cont = (
-        xml_cont
-        + "<url><loc>https://peeljobs.com/</loc>"
-        + "<changefreq>always</changefreq><priority>1.0</priority></url>"
-    )
-
-    end_url = "</loc><changefreq>daily</changefreq><priority>0.5</priority></url>"
-
-    # jobs
-    jobs_xml_cont = xml_cont
-    jobs = JobPost.objects.filter(status="Live")
-    for job in jobs:
-        jobs_xml_cont = (
-            jobs_xml_cont + "<url><loc>https://peeljobs.com" + job.slug + end_url
-        )
-
-    jobs_xml_cont = jobs_xml_cont + "</urlset>"
-
-    try:
-        open("sitemap/")
-    except Exception:
-        os.makedirs("sitemap", exist_ok=True)
-    jobs_xml_file = open("sitemap/sitemap-jobs.xml", "w")
-    jobs_xml_file.write(jobs_xml_cont.encode("ascii", "ignore").decode("ascii"))
-
-    # skills
-    skills_xml_cont = xml_cont
-    no_job_skills_xml_cont = xml_cont
-    skills = Skill.objects.filter(status="Active").exclude(name__iexact="Fresher")
-
-    for skill in skills:
-        jobs = JobPost.objects.filter(status="Live", skills=skill).count()
-        if jobs > 0:
-            skills_xml_cont = (
-                skills_xml_cont
-                + "<url><loc>https://peeljobs.com"
-                + skill.get_job_url()
-                + end_url
-            )
-        else:
-            no_job_skills_xml_cont = (
-                no_job_skills_xml_cont
-                + "<url><loc>https://peeljobs.com"
-                + skill.get_job_url()
-                + end_url
-            )
-    skills_xml_cont = skills_xml_cont + "</urlset>"
-
-    skills_xml_file = open("sitemap/sitemap-skills.xml", "w")
-    skills_xml_file.write(skills_xml_cont)
-    if no_job_skills_xml_cont != xml_cont:
-        no_job_skills_xml_cont = no_job_skills_xml_cont + "</urlset>"
-        no_job_skills_xml_file = open("sitemap/sitemap-skills-without-jobs.xml", "w")
-        no_job_skills_xml_file.write(no_job_skills_xml_cont)
-
-    # locations
-    locations_xml_cont = xml_cont
-    no_job_locations_xml_cont = xml_cont
-    locations = City.objects.filter(status="Enabled")
-
-    for location in locations:
-        jobs = JobPost.objects.filter(status="Live", location=location).count()
-        if jobs > 0:
-            locations_xml_cont = (
-                locations_xml_cont
-                + "<url><loc>https://peeljobs.com"
-                + location.get_job_url()
-                + end_url
-            )
-        else:
-            no_job_locations_xml_cont = (
-                no_job_locations_xml_cont
-                + "<url><loc>https://peeljobs.com"
-                + location.get_job_url()
-                + end_url
-            )
-    locations_xml_cont = locations_xml_cont + "</urlset>"
-
-    locations_xml_file = open("sitemap/sitemap-locations.xml", "w")
-    locations_xml_file.write(locations_xml_cont)
-    if no_job_locations_xml_cont != xml_cont:
-        no_job_locations_xml_cont = no_job_locations_xml_cont + "</urlset>"
-        no_job_locations_xml_file = open(
-            "sitemap/sitemap-locations-without-jobs.xml", "w"
-        )
-        no_job_locations_xml_file.write(no_job_locations_xml_cont)
-
-    # industries
-    industries = Industry.objects.filter(status="Active")
-    industries_xml_cont = xml_cont
-
-    for industry in industries:
-        industries_xml_cont = (
-            industries_xml_cont
-            + "<url><loc>https://peeljobs.com"
-            + industry.get_job_url()
-            + end_url
-        )
-    industries_xml_cont = industries_xml_cont + "</urlset>"
-
-    indsutries_xml_file = open("sitemap/sitemap-industries.xml", "w")
-    indsutries_xml_file.write(industries_xml_cont)
-
-    # internship locations
-    internship_xml_cont = xml_cont
-
-    all_jobs = (
-        JobPost.objects.filter(job_type="internship", status="Live")
-        .values_list("location", flat=True)
-        .distinct()
-    )
-    internships = City.objects.filter(id__in=all_jobs, status="Enabled")
-
-    for internship in internships:
-        internship_xml_cont = (
-            internship_xml_cont
-            + "<url><loc>https://peeljobs.com/internship-jobs-in-"
-            + internship.slug
-            + "/"
-            + end_url
-        )
-    internship_xml_cont = internship_xml_cont + "</urlset>"
-
-    internship_xml_file = open("sitemap/sitemap-internships.xml", "w")
-    internship_xml_file.write(internship_xml_cont)
-
-    # skill walkins
-    skills_walkin_xml_cont = xml_cont
-    no_job_skills_walkin_xml_cont = xml_cont
-
-    for skill in skills:
-        jobs = JobPost.objects.filter(
-            status="Live", skills=skill, job_type="walk-in"
-        ).count()
-        if jobs > 0:
-            skills_walkin_xml_cont = (
-                skills_walkin_xml_cont
-                + "<url><loc>https://peeljobs.com/"
-                + str(skill.slug)
-                + "-walkins/"
-                + end_url
-            )
-        else:
-            no_job_skills_walkin_xml_cont = (
-                no_job_skills_walkin_xml_cont
-                + "<url><loc>https://peeljobs.com/"
-                + str(skill.slug)
-                + "-walkins/"
-                + end_url
-            )
-    skills_walkin_xml_cont = skills_walkin_xml_cont + "</urlset>"
-    no_job_skills_walkin_xml_cont = no_job_skills_walkin_xml_cont + "</urlset>"
-
-    skills_walkin_xml_file = open("sitemap/sitemap-skill-walkins.xml", "w")
-    skills_walkin_xml_file.write(skills_walkin_xml_cont)
-    no_job_skills_walkin_xml_file = open(
-        "sitemap/sitemap-skill-without-walkins.xml", "w"
-    )
-    no_job_skills_walkin_xml_file.write(no_job_skills_walkin_xml_cont)
-
-    # skill locations
-    def lol(lst, sz):
-        return [locations[i : i + sz] for i in range(0, len(locations), sz)]
-    locations = lol(locations, 40)
-    for index, each in enumerate(locations):
-        skills_locations_xml_cont = xml_cont
-        no_job_skills_locations_xml_cont = xml_cont
-        skills_locations_walkins_xml_cont = xml_cont
-        no_job_skills_locations_walkins_xml_cont = xml_cont
-        for location in each:
-            for skill in skills:
-                jobs = JobPost.objects.filter(
-                    status="Live", skills=skill, location=location
-                ).count()
-                walkins = JobPost.objects.filter(
-                    status="Live", skills=skill, job_type="walk-in", location=location
-                ).count()
-                if jobs > 0:
-                    skills_locations_xml_cont = (
-                        skills_locations_xml_cont
-                        + "<url><loc>https://peeljobs.com/"
-                        + str(skill.slug)
-                        + "-jobs-in-"
-                        + str(location.slug)
-                        + "/"
-                        + end_url
-                    )
-                else:
-                    no_job_skills_locations_xml_cont = (
-                        no_job_skills_locations_xml_cont
-                        + "<url><loc>https://peeljobs.com/"
-                        + str(skill.slug)
-                        + "-jobs-in-"
-                        + str(location.slug)
-                        + "/"
-                        + end_url
-                    )
-                if walkins > 0:
-                    skills_locations_walkins_xml_cont = (
-                        skills_locations_walkins_xml_cont
-                        + "<url><loc>https://peeljobs.com/"
-                        + str(skill.slug)
-                        + "-walkins-in-"
-                        + str(location.slug)
-                        + "/"
-                        + end_url
-                    )
-                else:
-                    no_job_skills_locations_walkins_xml_cont = (
-                        no_job_skills_locations_walkins_xml_cont
-                        + "<url><loc>https://peeljobs.com/"
-                        + str(skill.slug)
-                        + "-walkins-in-"
-                        + str(location.slug)
-                        + "/"
-                        + end_url
-                    )
-        skills_locations_xml_cont = skills_locations_xml_cont + "</urlset>"
-        no_job_skills_locations_xml_cont = (
-            no_job_skills_locations_xml_cont + "</urlset>"
-        )
-
-        skills_location_xml_file = open(
-            "sitemap/sitemap-skill-locations-" + str(index) + ".xml", "w"
-        )
-        skills_location_xml_file.write(skills_locations_xml_cont)
-        no_job_skills_location_xml_file = open(
-            "sitemap/sitemap-skill-locations-without-jobs-" + str(index) + ".xml",
-            "w",
-        )
-        no_job_skills_location_xml_file.write(no_job_skills_locations_xml_cont)
-
-        skills_locations_walkins_xml_cont = (
-            skills_locations_walkins_xml_cont + "</urlset>"
-        )
-        no_job_skills_locations_walkins_xml_cont = (
-            no_job_skills_locations_walkins_xml_cont + "</urlset>"
-        )
-
-        skills_location_walkins_xml_file = open(
-            "sitemap/sitemap-skill-location-walkins-" + str(index) + ".xml", "w"
-        )
-        skills_location_walkins_xml_file.write(skills_locations_walkins_xml_cont)
-        no_job_skills_location_walkins_xml_file = open(
-            "sitemap/sitemap-skill-location-without-walkins-" + str(index) + ".xml",
-            "w",
-        )
-        no_job_skills_location_walkins_xml_file.write(
-            no_job_skills_locations_walkins_xml_cont
-        )
-
-    for index, each in enumerate(locations):
-        skills_location_fresher_xml_cont = xml_cont
-        no_job_skills_location_fresher_xml_cont = xml_cont
-        for location in each:
-            for skill in skills:
-                jobs = JobPost.objects.filter(
-                    status="Live", skills=skill, location=location, min_year=0
-                ).count()
-                if jobs > 0:
-                    skills_location_fresher_xml_cont = (
-                        skills_location_fresher_xml_cont
-                        + "<url><loc>https://peeljobs.com/"
-                        + str(skill.slug)
-                        + "-fresher-jobs-in-"
-                        + str(location.slug)
-                        + "/"
-                        + end_url
-                    )
-                else:
-                    no_job_skills_location_fresher_xml_cont = (
-                        no_job_skills_location_fresher_xml_cont
-                        + "<url><loc>https://peeljobs.com/"
-                        + str(skill.slug)
-                        + "-fresher-jobs-in-"
-                        + str(location.slug)
-                        + "/"
-                        + end_url
-                    )
-        skills_location_fresher_xml_cont = (
-            skills_location_fresher_xml_cont + "</urlset>"
-        )
-        no_job_skills_location_fresher_xml_cont = (
-            no_job_skills_location_fresher_xml_cont + "</urlset>"
-        )
-
-        skills_location_fresher_xml_file = open(
-            "sitemap/sitemap-skill-location-fresher-jobs-" + str(index) + ".xml", "w"
-        )
-        skills_location_fresher_xml_file.write(skills_location_fresher_xml_cont)
-
-        no_job_skills_location_fresher_xml_file = open(
-            "sitemap/sitemap-skill-location-without-fresher-jobs-"
-            + str(index)
-            + ".xml",
-            "w",
-        )
-        no_job_skills_location_fresher_xml_file.write(
-            no_job_skills_location_fresher_xml_cont
-        )
-
-    locations_walkin_xml_cont = xml_cont
-    locations_fresher_jobs_xml_cont = xml_cont
-    no_job_locations_walkin_xml_cont = xml_cont
-    no_job_locations_fresher_jobs_xml_cont = xml_cont
-    locations = City.objects.filter(status="Enabled")
-    for each in locations:
-        walkins = JobPost.objects.filter(
-            status="Live", location=each, job_type="walk-in"
-        ).count()
-        fresher_jobs = JobPost.objects.filter(
-            status="Live", location=each, min_year=0
-        ).count()
-        if walkins > 0:
-            locations_walkin_xml_cont = (
-                locations_walkin_xml_cont
-                + "<url><loc>https://peeljobs.com/"
-                + "walkins-in-"
-                + str(each.slug)
-                + "/"
-                + end_url
-            )
-        else:
-            no_job_locations_walkin_xml_cont = (
-                no_job_locations_walkin_xml_cont
-                + "<url><loc>https://peeljobs.com/"
-                + "walkins-in-"
-                + str(each.slug)
-                + "/"
-                + end_url
-            )
-        if fresher_jobs > 0:
-            locations_fresher_jobs_xml_cont = (
-                locations_fresher_jobs_xml_cont
-                + "<url><loc>https://peeljobs.com/"
-                + "fresher-jobs-in-"
-                + str(each.slug)
-                + "/"
-                + end_url
-            )
-        else:
-            no_job_locations_fresher_jobs_xml_cont = (
-                no_job_locations_fresher_jobs_xml_cont
-                + "<url><loc>https://peeljobs.com/"
-                + "fresher-jobs-in-"
-                + str(each.slug)
-                + "/"
-                + end_url
-            )
-    locations_walkin_xml_cont = locations_walkin_xml_cont + "</urlset>"
-    locations_walkin_xml_file = open("sitemap/sitemap-location-walkins.xml", "w")
-    locations_walkin_xml_file.write(locations_walkin_xml_cont)
-
-    no_job_locations_walkin_xml_cont = no_job_locations_walkin_xml_cont + "</urlset>"
-    no_job_locations_walkin_xml_file = open(
-        "sitemap/sitemap-location-without-walkins.xml", "w"
-    )
-    no_job_locations_walkin_xml_file.write(no_job_locations_walkin_xml_cont)
+    from dashboard.sitemap_files import build_sitemaps
 
-    locations_fresher_jobs_xml_cont = locations_fresher_jobs_xml_cont + "</urlset>"
-    locations_fresher_jobs_xml_file = open(
-        "sitemap/sitemap-location-fresher-jobs.xml", "w"
-    )
-    locations_fresher_jobs_xml_file.write(locations_fresher_jobs_xml_cont)
-    no_job_locations_fresher_jobs_xml_cont = (
-        no_job_locations_fresher_jobs_xml_cont + "</urlset>"
-    )
-    no_job_locations_fresher_jobs_xml_file = open(
-        "sitemap/sitemap-location-without-fresher-jobs.xml", "w"
-    )
-    no_job_locations_fresher_jobs_xml_file.write(no_job_locations_fresher_jobs_xml_cont)
-
-    states = State.objects.filter(status="Enabled")
-    states_jobs_xml_count = xml_cont
-    states_walkins_xml_count = xml_cont
-    states_fresher_jobs_xml_count = xml_cont
-    for state in states:
-        states_jobs_xml_count = (
-            states_jobs_xml_count
-            + "<url><loc>https://peeljobs.com/"
-            + "jobs-in-"
-            + str(state.slug)
-            + "/"
-            + end_url
-        )
-        states_walkins_xml_count = (
-            states_walkins_xml_count
-            + "<url><loc>https://peeljobs.com/"
-            + "walkins-in-"
-            + str(state.slug)
-            + "/"
-            + end_url
-        )
-        states_fresher_jobs_xml_count = (
-            states_fresher_jobs_xml_count
-            + "<url><loc>https://peeljobs.com/"
-            + "fresher-jobs-in-"
-            + str(state.slug)
-            + "/"
-            + end_url
-        )
-    states_jobs_xml_count = states_jobs_xml_count + "</urlset>"
-    states_jobs_xml_file = open("sitemap/sitemap-state-jobs.xml", "w")
-    states_jobs_xml_file.write(states_jobs_xml_count)
-    states_walkins_xml_count = states_walkins_xml_count + "</urlset>"
-    states_walkins_xml_file = open("sitemap/sitemap-state-walkins.xml", "w")
-    states_walkins_xml_file.write(states_walkins_xml_count)
-    states_fresher_jobs_xml_count = states_fresher_jobs_xml_count + "</urlset>"
-    states_fresher_jobs_xml_file = open("sitemap/sitemap-state-fresher-jobs.xml", "w")
-    states_fresher_jobs_xml_file.write(states_fresher_jobs_xml_count)
-
-    # skill fresher jobs
-    skills_fresher_xml_cont = xml_cont
-    no_job_skills_fresher_xml_cont = xml_cont
-
-    for skill in skills:
-        jobs = JobPost.objects.filter(status="Live", skills=skill, min_year=0).count()
-        if jobs > 0:
-            skills_fresher_xml_cont = (
-                skills_fresher_xml_cont
-                + "<url><loc>https://peeljobs.com/"
-                + str(skill.slug)
-                + "-fresher-jobs/"
-                + end_url
-            )
-        else:
-            no_job_skills_fresher_xml_cont = (
-                no_job_skills_fresher_xml_cont
-                + "<url><loc>https://peeljobs.com/"
-                + str(skill.slug)
-                + "-fresher-jobs/"
-                + end_url
-            )
-    skills_fresher_xml_cont = skills_fresher_xml_cont + "</urlset>"
-    no_job_skills_fresher_xml_cont = no_job_skills_fresher_xml_cont + "</urlset>"
+    filenames = build_sitemaps()
+    print("Sitemap Generation ended: %s files" % len(filenames))
 
-    skills_fresher_xml_file = open("sitemap/sitemap-skill-fresher-jobs.xml", "w")
-    skills_fresher_xml_file.write(skills_fresher_xml_cont)
-    no_job_skills_fresher_xml_file = open(
-        "sitemap/sitemap-skill-without-fresher-jobs.xml", "w"
-    )
-    no_job_skills_fresher_xml_file.write(no_job_skills_fresher_xml_cont)
-
-    # Educations jobs
-    educations = Qualification.objects.filter(status="Active")
-    educations_xml_cont = xml_cont
-
-    for edu in educations:
-        educations_xml_cont = (
-            educations_xml_cont
-            + "<url><loc>https://peeljobs.com/"
-            + str(edu.slug)
-            + "-jobs/"
-            + end_url
-        )
-    educations_xml_cont = educations_xml_cont + "</urlset>"
 
-    educations_xml_file = open("sitemap/sitemap-education-jobs.xml", "w")
-    educations_xml_file.write(educations_xml_cont)
-
-    # recruiters
-    recruiters_xml_cont = xml_cont
-
-    recruiters = User.objects.filter(
-        Q(user_type="RR") | Q(user_type="AR") | Q(user_type="AA") & Q(is_active=True)
-    )
-    for recruiter in recruiters:
-        recruiters_xml_cont = (
-            recruiters_xml_cont
-            + "<url><loc>https://peeljobs.com/recruiters/"
-            + str(recruiter.username)
-            + "/"
-            + end_url
-        )
-
-    recruiters_xml_cont = recruiters_xml_cont + "</urlset>"
-
-    recruiter_xml_file = open("sitemap/sitemap-recruiters.xml", "w")
-    recruiter_xml_file.write(
-        recruiters_xml_cont.encode("ascii", "ignore").decode("ascii")
-    )
-
-    # companies
-    companies_xml_cont = xml_cont
-
-    companies = Company.objects.filter(is_active=True)
-    for company in companies:
-        companies_xml_cont = (
-            companies_xml_cont
-            + "<url><loc>https://peeljobs.com/"
-            + str(company.slug)
-            + "-job-openings/"
-            + end_url
-        )
-    companies_xml_cont = companies_xml_cont + "</urlset>"
-
-    companies_xml_file = open("sitemap/sitemap-companies.xml", "w")
-    companies_xml_file.write(companies_xml_cont)
-
-    # pages
-    pages_xml_cont = xml_cont
-    full_jobposts = JobPost.objects.filter(status="Live", job_type="full-time")
-    internships = JobPost.objects.filter(status="Live", job_type="internship")
-    walk_ins = JobPost.objects.filter(status="Live", job_type="walk-in")
-    government_jobs = JobPost.objects.filter(status="Live", job_type="government")
-    jobposts = list(chain(full_jobposts, internships, walk_ins, government_jobs))
-    items_per_page = 100
-    no_pages = int(math.ceil(float(len(jobposts)) / items_per_page))
-
-    pages_xml_cont = (
-        pages_xml_cont + "<url><loc>https://peeljobs.com/sitemap/" + end_url
-    )
-
-    for each in range(1, no_pages):
-        pages_xml_cont = (
-            pages_xml_cont
-            + "<url><loc>https://peeljobs.com/sitemap/"
-            + str(each)
-            + "/"
-            + end_url
-        )
-
-    pages_xml_cont = (
-        pages_xml_cont + "<url><loc>https://peeljobs.com/post-job/" + end_url
-    )
-
-    pages_xml_cont = (
-        pages_xml_cont + "<url><loc>https://peeljobs.com/internship-jobs/" + end_url
-    )
-    pages_xml_cont = (
-        pages_xml_cont + "<url><loc>https://peeljobs.com/government-jobs/" + end_url
-    )
-    pages_xml_cont = (
-        pages_xml_cont + "<url><loc>https://peeljobs.com/full-time-jobs/" + end_url
-    )
-    pages_xml_cont = (
-        pages_xml_cont + "<url><loc>https://peeljobs.com/walkin-jobs/" + end_url
-    )
-
-    pages_xml_cont = (
-        pages_xml_cont + "<url><loc>https://peeljobs.com/alert/list/" + end_url
-    )
-
-    pages_xml_cont = (
-        pages_xml_cont + "<url><loc>https://peeljobs.com/jobs-by-location/" + end_url
-    )
-    pages_xml_cont = (
-        pages_xml_cont + "<url><loc>https://peeljobs.com/jobs-by-skill/" + end_url
-    )
-    pages_xml_cont = (
-        pages_xml_cont + "<url><loc>https://peeljobs.com/jobs-by-industry/" + end_url
-    )
-
-    pages_xml_cont = (
-        pages_xml_cont
-        + "<url><loc>https://peeljobs.com/calendar/"
-        + str(datetime.now().year)
-        + "/"
-        + end_url
-    )
-    pages_xml_cont = (
-        pages_xml_cont
-        + "<url><loc>https://peeljobs.com/calendar/"
-        + str(datetime.now().year)
-        + "/month/"
-        + str(datetime.now().month)
-        + "/"
-        + end_url
-    )
-
-    pages_xml_cont = (
-        pages_xml_cont + "<url><loc>https://peeljobs.com/page/about-us/" + end_url
-    )
-    pages_xml_cont = (
-        pages_xml_cont
-        + "<url><loc>https://peeljobs.com/page/terms-conditions/"
-        + end_url
-    )
-    pages_xml_cont = (
-        pages_xml_cont + "<url><loc>https://peeljobs.com/page/privacy-policy/" + end_url
-    )
-    pages_xml_cont = (
-        pages_xml_cont + "<url><loc>https://peeljobs.com/page/contact-us/" + end_url
-    )
-    pages_xml_cont = (
-        pages_xml_cont + "<url><loc>https://peeljobs.com/page/faq/" + end_url
-    )
-    pages_xml_cont = (
-        pages_xml_cont + "<url><loc>https://peeljobs.com/page/recruiter-faq/" + end_url
-    )
-    pages_xml_cont = (
-        pages_xml_cont + "<url><loc>https://peeljobs.com/recruiters/" + end_url
-    )
-    pages_xml_cont = (
-        pages_xml_cont + "<url><loc>https://peeljobs.com/companies/" + end_url
-    )
-    pages_xml_cont = pages_xml_cont + "<url><loc>https://peeljobs.com/jobs/" + end_url
-    pages_xml_cont = (
-        pages_xml_cont
-        + "<url><loc>https://peeljobs.com/fresher-jobs-by-skills/"
-        + end_url
-    )
-    pages_xml_cont = (
-        pages_xml_cont
-        + "<url><loc>https://peeljobs.com/walkin-jobs-by-skills/"
-        + end_url
-    )
-    pages_xml_cont = (
-        pages_xml_cont + "<url><loc>https://peeljobs.com/walkins-by-location/" + end_url
-    )
-    pages_xml_cont = (
-        pages_xml_cont + "<url><loc>https://peeljobs.com/jobs-by-degree/" + end_url
-    )
-    pages_xml_cont = (
-        pages_xml_cont
-        + "<url><loc>https://peeljobs.com/fresher-jobs-by-location/"
-        + end_url
-    )
-
-    pages_xml_cont = pages_xml_cont + "</urlset>"
-
-    pages_xml_file = open("sitemap/sitemap-pages.xml", "w")
-    pages_xml_file.write(pages_xml_cont)
-
-    directory = settings.BASE_DIR + "/sitemap/"
-
-    xml_cont = """<?xml version="1.0" encoding="UTF-8"?>
-    <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">"""
-
-    end_url = "</loc><changefreq>daily</changefreq><priority>0.5</priority></url>"
-
-    xml_cont = (
-        xml_cont
-        + "<url><loc>https://peeljobs.com/</loc>"
-        + "<changefreq>always</changefreq><priority>1.0</priority></url>"
-    )
-    for d in os.listdir(directory):
-        if d.endswith(".xml") and not d.endswith("sitemap.xml"):
-            xml_cont = (
-                xml_cont + "<url><loc>https://peeljobs.com/sitemap/" + str(d) + end_url
-            )
+@app.task()
+def refresh_sitemaps():
+    from psite.sitemaps import materialize_sitemaps
 
-    xml_cont = xml_cont + "</urlset>"
-    sitemap_xml_file = open("sitemap/sitemap.xml", "w")
-    sitemap_xml_file.write(xml_cont)
-    print("Sitemap Generation ended")
+    materialize_sitemaps()
 
 
 @app.task()
@@ -1585,53 +726,54 @@ def check_expiring_jobs():
         published_on__date=expired_today_date
     ).select_related('user')
 
-    # Send expiring soon warnings
-    for job in jobs_expiring_soon:
-        if job.user and job.user.email:
-            # Calculate expiry date and days remaining
-            expiry_date = job.published_on + timedelta(days=max_age_days)
-            days_remaining = (expiry_date.date() - today).days
-
-            # Get applicant count
-            applicants_count = job.get_all_applied_users_count()
-
-            # Render email template
-            context = {
-                'user': job.user,
-                'job': job,
-                'days_remaining': days_remaining,
-                'expiry_date': expiry_date,
-                'applicants_count': applicants_count,
-            }
-            template = loader.get_template('email/job_expiring_soon.html')
-            rendered = template.render(context)
-
-            # Send email
-            subject = f'Job Posting Expires in {days_remaining} Days - {job.title}'
-            send_email.delay([job.user.email], subject, rendered)
-
-    # Send expired notifications
-    for job in jobs_expired_today:
-        if job.user and job.user.email:
-            # Calculate expiry date
-            expiry_date = job.published_on + timedelta(days=max_age_days)
-
-            # Get applicant count
-            applicants_count = job.get_all_applied_users_count()
-
-            # Render email template
-            context = {
-                'user': job.user,
-                'job': job,
-                'expiry_date': expiry_date,
-                'applicants_count': applicants_count,
-            }
-            template = loader.get_template('email/job_expired.html')
-            rendered = template.render(context)
-
-            # Send email
-            subject = f'Job Posting No Longer Accepting Applications - {job.title}'
-            send_email.delay([job.user.email], subject, rendered)
+    with mailer.Outbox("job_expiry") as outbox:
+        # Send expiring soon warnings
+        for job in jobs_expiring_soon:
+            if job.user and job.user.email:
+                # Calculate expiry date and days remaining
+                expiry_date = job.published_on + timedelta(days=max_age_days)
+                days_remaining = (expiry_date.date() - today).days
+
+                # Get applicant count
+                applicants_count = job.get_all_applied_users_count()
+
+                # Render email template
+                context = {
+                    'user': job.user,
+                    'job': job,
+                    'days_remaining': days_remaining,
+                    'expiry_date': expiry_date,
+                    'applicants_count': applicants_count,
+                }
+                template = loader.get_template('email/job_expiring_soon.html')
+                rendered = template.render(context)
+
+                # Send email
+                subject = f'Job Posting Expires in {days_remaining} Days - {job.title}'
+                outbox.add([job.user.email], subject, rendered)
+
+        # Send expired notifications
+        for job in jobs_expired_today:
+            if job.user and job.user.email:
+                # Calculate expiry date
+                expiry_date = job.published_on + timedelta(days=max_age_days)
+
+                # Get applicant count
+                applicants_count = job.get_all_applied_users_count()
+
+                # Render email template
+                context = {
+                    'user': job.user,
+                    'job': job,
+                    'expiry_date': expiry_date,
+                    'applicants_count': applicants_count,
+                }
+                template = loader.get_template('email/job_expired.html')
+                rendered = template.render(context)
+
+                # Send email
+                subject = f'Job Posting No Longer Accepting Applications - {job.title}'
+                outbox.add([job.user.email], subject, rendered)
 
     # Log results
     import logging
@@ -5,7 +5,11 @@ when you run "manage.py test".
 Replace this with more appropriate tests for your application.
 """
 
-from django.test import TestCase
+import os
+import tempfile
+from datetime import datetime
+
+from django.test import SimpleTestCase, TestCase
 
 # from django.test import Client
 from django.core.files.uploadedfile import SimpleUploadedFile
@@ -21,7 +25,10 @@ from .forms import (
     FunctionalAreaForm,
     UserForm,
 )
-from peeldb.models import Country, State
+from peeldb.models import AppliedJobs, Country, JobPost, State, User
+from . import metrics
+from .job_alerts import JobIndex, match_jobs
+from .sitemap_files import LiveCombinations, SitemapWriter, write_index
 
 
 class ChangePasswordForm_form_test(TestCase):
@@ -164,3 +171,135 @@ class user_form_test(TestCase):
             }
         )
         self.assertFalse(form.is_valid())
+
+
+class job_alert_matching_test(SimpleTestCase):
+    def setUp(self):
+        # jobs 1-3 are new, 4-6 older live jobs; ids listed newest first
+        self.new_jobs = JobIndex(
+            [(1, 10), (2, 10), (3, 20)], [(1, 100), (2, 200), (3, 100)], [3, 2, 1]
+        )
+        self.live_jobs = JobIndex(
+            [(1, 10), (2, 10), (3, 20), (4, 10), (5, 20), (6, 30)],
+            [],
+            [3, 2, 1, 6, 5, 4],
+        )
+
+    def test_no_new_job_in_user_city(self):
+        self.assertEqual(match_jobs({10}, 300, self.new_jobs, self.live_jobs), [])
+        self.assertEqual(match_jobs({30}, 100, self.new_jobs, self.live_jobs), [])
+
+    def test_matches_topped_up_with_live_jobs(self):
+        self.assertEqual(
+            match_jobs({10, 20}, 100, self.new_jobs, self.live_jobs), [3, 1, 2, 5, 4]
+        )
+
+    def test_limit(self):
+        self.assertEqual(
+            match_jobs({10, 20}, 100, self.new_jobs, self.live_jobs, limit=3), [3, 1, 2]
+        )
+
+
+class sitemap_files_test(SimpleTestCase):
+    def test_writer_splits_at_limit(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with SitemapWriter(directory, "skills", limit=2) as writer:
+                writer.extend(["/a-jobs/", "/b-jobs/", "/c&d-jobs/"])
+            write_index(directory, writer.files)
+
+            self.assertEqual(
+                writer.files, ["sitemap-skills.xml", "sitemap-skills-2.xml"]
+            )
+            self.assertEqual(
+                sorted(os.listdir(directory)),
+                ["sitemap-skills-2.xml", "sitemap-skills.xml", "sitemap.xml"],
+            )
+            with open(os.path.join(directory, "sitemap-skills-2.xml")) as second:
+                content = second.read()
+            self.assertEqual(content.count("<url>"), 1)
+            self.assertIn("https://peeljobs.com/c&amp;d-jobs/", content)
+            self.assertTrue(content.endswith("</urlset>\n"))
+            with open(os.path.join(directory, "sitemap.xml")) as index:
+                self.assertIn(
+                    "https://peeljobs.com/sitemap/sitemap-skills-2.xml", index.read()
+                )
+
+    def test_empty_or_failed_section_writes_nothing(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with SitemapWriter(directory, "skills") as writer:
+                writer.extend([])
+            with self.assertRaises(ValueError):
+                with SitemapWriter(directory, "cities") as failed:
+                    failed.add("/jobs-in-a/")
+                    raise ValueError
+            self.assertEqual(writer.files, [])
+            self.assertEqual(failed.files, [])
+            self.assertEqual(os.listdir(directory), [])
+
+    def test_live_combinations(self):
+        live = LiveCombinations(
+            [
+                (1, 10, "full-time", False),
+                (2, 10, "walk-in", True),
+                (3, None, "internship", False),
+                (None, 20, "internship", False),
+            ]
+        )
+        self.assertEqual(live.skills["jobs"], {1, 2, 3})
+        self.assertEqual(live.cities["internship"], {20})
+        self.assertEqual(live.pairs["jobs"], {(1, 10), (2, 10)})
+        self.assertEqual(live.pairs["walk-in"], {(2, 10)})
+        self.assertEqual(live.pairs["fresher"], {(2, 10)})
+
+
+class dashboard_metrics(TestCase):
+    def setUp(self):
+        recruiter = User.objects.create(
+            email="recruiter@mp.com", username="recruiter", user_type="RR"
+        )
+        self.user = User.objects.create(
+            email="test@mp.com", username="test", registered_from="Email"
+        )
+        for index in range(3):
+            JobPost.objects.create(
+                user=recruiter,
+                title="Python Developer %s" % index,
+                vacancies=1,
+                description="Python developer",
+                job_type="full-time",
+                status="Live",
+            )
+
+    def test_counts_match_filters(self):
+        now = datetime.now()
+        JobPost.objects.update(published_on=now)
+        JobPost.objects.filter(pk=JobPost.objects.first().pk).update(status="Disabled")
+        for job in JobPost.objects.all()[:2]:
+            AppliedJobs.objects.create(job_post=job, user=self.user, status="Pending")
+        start, end = metrics.day_range(now.date())
+        result = metrics.metrics(start, end)
+
+        jobs = result["jobs"]
+        others = JobPost.objects.exclude(user__is_superuser=True)
+        self.assertEqual(jobs["others"]["all"]["all"], others.count())
+        self.assertEqual(
+            jobs["others"]["full-time"]["Live"],
+            others.filter(job_type="full-time", status="Live").count(),
+        )
+        self.assertEqual(jobs["admin"]["all"]["all"], 0)
+        self.assertEqual(jobs["all"]["all"]["Disabled"], 1)
+        self.assertEqual(result["recruiters"]["RR"]["joined"], 1)
+        self.assertEqual(result["applied_by_source"]["Email"], 1)
+        self.assertEqual(result["applied_by_source"]["Social"], 0)
+
+        yesterday = metrics.metrics(start - (end - start), start)
+        self.assertEqual(yesterday["jobs"]["all"]["all"]["all"], 0)
+        self.assertEqual(metrics.metrics()["jobs"]["all"]["all"]["all"], 3)
+
+
+class dashboard_status_keys_test(SimpleTestCase):
+    def test_status_keys(self):
+        counts = {"walk-in": dict.fromkeys(metrics.JOB_STATUSES + ("all",), 2)}
+        context = metrics.status_keys(counts, {"walk-in": "today_walkin_%s_jobs"})
+        self.assertEqual(context["today_walkin_jobs"], 2)
+        self.assertEqual(context["today_walkin_live_jobs"], 2)
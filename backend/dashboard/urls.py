@@ -44,6 +44,7 @@ from .views import (
     preview_job,
     edit_job_title,
     applicants,
+    applicants_export,
     view_applicant,
     applicant_actions,
     emailtemplates,
@@ -209,6 +210,11 @@ urlpatterns = [
     # applicants
     url(r"^applicants/list/$", applicants, name="applicants"),
     url(r"^applicants/(?P<status>[-\w]+)/list/$", applicants, name="applicants"),
+    url(
+        r"^applicants/(?P<status>[-\w]+)/export/$",
+        applicants_export,
+        name="applicants_export",
+    ),
     url(
         r"^applicant/view/(?P<user_id>[a-zA-Z0-9_-]+)/$",
         view_applicant,
@@ -1,7 +1,6 @@
 import json
 import math
 import re
-from datetime import datetime
 
 from django.db.models import Q
 from django.urls import reverse
@@ -12,8 +11,8 @@ from mpcomp.views import (
     get_prev_after_pages_count,
     permission_required,
 )
+from peeldb import exports
 from peeldb.models import (
-    AppliedJobs,
     JobAlert,
     Subscriber,
     User,
@@ -23,55 +22,35 @@ from peeldb.models import (
 # Functions to move here from main views.py:
 
 
-@permission_required("activity_view", "activity_edit")
-def applicants(request, status="all"):
-    applicant = User.objects.filter(user_type="JS")
-    if status == "social":
-        applicant = User.objects.filter(user_type="JS", registered_from="Social")
-    if status == "email":
-        applicant = User.objects.filter(user_type="JS", registered_from="Email")
-    if status == "resume":
-        applicant = User.objects.filter(user_type="JS", registered_from="Resume")
-    if status == "resume-pool":
-        applicant = User.objects.filter(user_type="JS", registered_from="ResumePool")
-    if request.GET.get("profile_completed"):
-        applicant = applicant.filter(profile_completeness__gte=50)
-    if request.GET.get("resume_uploaded"):
-        applicant = applicant.filter().exclude(resume="")
-    if request.GET.get("login_once"):
-        applicant = applicant.filter(is_login=False)
-    if request.GET.get("appliedto_jobs"):
-        applicant = applicant.filter(
-            id__in=AppliedJobs.objects.filter().values_list("user", flat=True)
+def _applicant_params(request):
+    """Job seeker list filters of ``request``, for exports.filter_applicants"""
+    params = {
+        name: request.GET.get(name)
+        for name in (
+            "profile_completed",
+            "resume_uploaded",
+            "login_once",
+            "appliedto_jobs",
+            "active",
+            "inactive",
         )
-    if request.GET.get("active"):
-        applicant = applicant.filter(is_active=True)
+    }
+    params.update(
+        search=request.POST.get("search"),
+        location=request.POST.getlist("location"),
+        skills=request.POST.getlist("skills"),
+        profile_completion=request.POST.get("profile_completion"),
+        timestamp=request.POST.get("timestamp"),
+    )
+    return params
 
-    if request.GET.get("inactive"):
-        applicant = applicant.filter(is_active=False)
 
-    if request.POST.get("search"):
-        applicant = applicant.filter(
-            Q(email__icontains=request.POST.get("search"))
-            | Q(username__icontains=request.POST.get("search"))
-            | Q(referer__contains=request.POST.get("search"))
-        )
-    search_location = request.POST.getlist("location")
-    search_skills = request.POST.getlist("skills")
-    if search_location:
-        applicant = applicant.filter(current_city__id__in=search_location)
-    if search_skills:
-        applicant = applicant.filter(skills__skill__id__in=search_skills)
-    if request.POST.get("profile_completion"):
-        applicant = applicant.filter(
-            profile_completeness__gte=int(request.POST.get("profile_completion"))
-        )
-    if request.POST.get("timestamp"):
-        date = request.POST.get("timestamp").split(" - ")
-        start_date = datetime.strptime(date[0], "%b %d, %Y %H:%M")
-        end_date = datetime.strptime(date[1], "%b %d, %Y %H:%M")
-        applicant = applicant.filter(date_joined__range=(start_date, end_date))
-    applicant = applicant.order_by("-date_joined")
+@permission_required("activity_view", "activity_edit")
+def applicants(request, status="all"):
+    params = _applicant_params(request)
+    search_location = params["location"]
+    search_skills = params["skills"]
+    applicant = exports.filter_applicants(status, params)
     items_per_page = 50
     no_pages = int(math.ceil(float(applicant.count()) / items_per_page))
     if (
@@ -108,6 +87,27 @@ def applicants(request, status="all"):
     )
 
 
+@permission_required("activity_view", "activity_edit")
+def applicants_export(request, status="all"):
+    """Queue an export of the job seekers the list shows with these filters."""
+    if request.method != "POST":
+        return HttpResponse(json.dumps({"error": True, "response": "Invalid request"}))
+    file_format = request.POST.get("format", "csv")
+    if file_format not in exports.WRITERS:
+        return HttpResponse(
+            json.dumps({"error": True, "response": "Unknown export format"})
+        )
+    params = _applicant_params(request)
+    params["status"] = status
+    exports.start(request.user, "applicants", params, file_format)
+    data = {
+        "error": False,
+        "response": "The export will be mailed to %s when it is ready"
+        % request.user.email,
+    }
+    return HttpResponse(json.dumps(data))
+
+
 @permission_required("activity_view", "activity_edit")
 def view_applicant(request, user_id):
     applicants = User.objects.filter(id=user_id)
@@ -7,15 +7,16 @@ from django.shortcuts import render
 from django.urls import reverse
 from django.conf import settings
 
+from django.db.models import Count, Q
+
+from dashboard import metrics
 from mpcomp.views import permission_required
 from peeldb.models import (
-    AppliedJobs,
     City,
     Company,
     Google,
     JobPost,
     Skill,
-    Ticket,
     User,
     UserEmail,
 )
@@ -163,615 +164,184 @@ def index(request):
             and not request.user.is_agency_recruiter
         )
     ):
-        current_date = datetime.strptime(
-            str(datetime.now().date()), "%Y-%m-%d"
-        ).strftime("%Y-%m-%d")
-        today_admin_walkin_jobs = JobPost.objects.filter(
-            job_type="walk-in",
-            user__is_superuser=True,
-        )
-        today_tickets_open = Ticket.objects.filter(
-            created_on__contains=current_date, status="Open"
-        ).count()
-        today_tickets_closed = Ticket.objects.filter(
-            created_on__contains=current_date, status="Closed"
-        ).count()
+        today_date = datetime.now().date()
+        day = metrics.day_metrics(today_date)
         if request.POST.get("timestamp", ""):
             date = request.POST.get("timestamp").split(" - ")
             start_date = datetime.strptime(date[0], "%b %d, %Y %H:%M")
             end_date = datetime.strptime(date[1], "%b %d, %Y %H:%M")
-
-            today_jobs_count = JobPost.objects.filter(
-                published_on__range=(start_date, end_date)
-            ).exclude(user__is_superuser=True)
-            today_full_time_jobs_count = today_jobs_count.filter(
-                job_type="full-time"
-            )
-            today_govt_jobs_count = today_jobs_count.filter(job_type="government")
-            today_internship_jobs_count = today_jobs_count.filter(
-                job_type="internship"
-            )
-            today_walkin_jobs_count = today_jobs_count.filter(job_type="walk-in")
-            today_skills = Skill.objects.filter(
-                id__in=JobPost.objects.filter(
-                    published_on__range=(start_date, end_date)
-                ).values_list("skills", flat=True)
-            )
-            job_loc = JobPost.objects.filter(
-                published_on__range=(start_date, end_date)
-            ).values_list("location", flat=True)
-            user_loc = User.objects.filter(
-                date_joined__range=(start_date, end_date), user_type="JS"
-            ).values_list("current_city", flat=True)
-            today_locations = City.objects.filter(id__in=job_loc)
-            today_user_locations = City.objects.filter(id__in=user_loc)
-            today_companies_active = Company.objects.filter(
-                id__in=JobPost.objects.filter(
-                    published_on__range=(start_date, end_date)
-                ).values_list("company", flat=True),
-                is_active=True,
-            ).count()
-            today_companies_not_active = Company.objects.filter(
-                id__in=JobPost.objects.filter(
-                    published_on__range=(start_date, end_date)
-                ).values_list("company", flat=True),
-                is_active=False,
-            ).count()
-
-            today_admin_jobs_count = JobPost.objects.filter(
-                published_on__range=(start_date, end_date), user__is_superuser=True
-            )
-            today_admin_full_time_jobs_count = today_admin_jobs_count.filter(
-                job_type="full-time"
-            )
-            today_admin_internship_jobs_count = today_admin_jobs_count.filter(
-                job_type="internship"
-            )
-            today_job_applications = AppliedJobs.objects.filter(
-                applied_on__range=(start_date, end_date)
-            )
-            today_social_applicants = User.objects.filter(
-                date_joined__range=(start_date, end_date),
-                user_type="JS",
-                registered_from="Social",
-            )
-            today_register_applicants = User.objects.filter(
-                date_joined__range=(start_date, end_date),
-                user_type="JS",
-                registered_from="Email",
-            )
-            today_resume_applicants = User.objects.filter(
-                date_joined__range=(start_date, end_date),
-                user_type="JS",
-                registered_from="Resume",
-            )
-            today_recruiters = User.objects.filter(
-                date_joined__range=(start_date, end_date), user_type="RR"
-            )
-            today_agency_recruiters = User.objects.filter(
-                date_joined__range=(start_date, end_date), user_type="AA"
-            )
+            today = metrics.metrics(start_date, end_date)
         else:
-            today_jobs_count = JobPost.objects.filter(
-                published_on__icontains=current_date
-            ).exclude(user__is_superuser=True)
-
-            today_full_time_jobs_count = JobPost.objects.filter(
-                job_type="full-time", published_on__icontains=current_date
-            ).exclude(user__is_superuser=True)
-            today_govt_jobs_count = JobPost.objects.filter(
-                job_type="government", published_on__icontains=current_date
-            ).exclude(user__is_superuser=True)
-            today_internship_jobs_count = JobPost.objects.filter(
-                job_type="internship", published_on__icontains=current_date
-            ).exclude(user__is_superuser=True)
-            today_walkin_jobs_count = JobPost.objects.filter(
-                job_type="walk-in", published_on__icontains=current_date
-            ).exclude(user__is_superuser=True)
-            today_admin_jobs_count = JobPost.objects.filter(
-                published_on__icontains=current_date, user__is_superuser=True
-            )
-            today_admin_full_time_jobs_count = JobPost.objects.filter(
-                job_type="full-time",
-                published_on__icontains=current_date,
-                user__is_superuser=True,
-            )
-            today_admin_internship_jobs_count = JobPost.objects.filter(
-                job_type="internship",
-                published_on__icontains=current_date,
-                user__is_superuser=True,
-            )
-            today_admin_walkin_jobs = today_admin_walkin_jobs.filter(
-                published_on__icontains=current_date,
-            )
-            today_job_applications = AppliedJobs.objects.filter(
-                applied_on__contains=current_date
-            )
-            today_social_applicants = User.objects.filter(
-                date_joined__contains=current_date,
-                user_type="JS",
-                registered_from="Social",
-            )
-            today_register_applicants = User.objects.filter(
-                date_joined__contains=current_date,
-                user_type="JS",
-                registered_from="Email",
-            )
-            today_resume_applicants = User.objects.filter(
-                date_joined__contains=current_date,
-                user_type="JS",
-                registered_from="Resume",
-            )
-            today_recruiters = User.objects.filter(
-                date_joined__contains=current_date, user_type="RR"
-            )
-            today_agency_recruiters = User.objects.filter(
-                date_joined__contains=current_date, user_type="AA"
-            )
-            today_skills = Skill.objects.filter(
-                id__in=JobPost.objects.filter(
-                    published_on__icontains=current_date
-                ).values_list("skills", flat=True)
-            )
-            job_loc = JobPost.objects.filter(
-                published_on__icontains=current_date
-            ).values_list("location", flat=True)
-            user_loc = User.objects.filter(
-                date_joined__contains=current_date, user_type="JS"
-            ).values_list("current_city", flat=True)
-            today_locations = City.objects.filter(id__in=job_loc)
-            today_user_locations = City.objects.filter(id__in=user_loc)
-
-            today_companies_active = Company.objects.filter(
-                id__in=JobPost.objects.filter(
-                    published_on__icontains=current_date
-                ).values_list("company", flat=True),
-                is_active=True,
-            ).count()
-            today_companies_not_active = Company.objects.filter(
-                id__in=JobPost.objects.filter(
-                    published_on__icontains=current_date
-                ).values_list("company", flat=True),
-                is_active=False,
-            ).count()
-
-        total_jobs_list = JobPost.objects.all()
-        total_pending_jobs = total_jobs_list.filter(status="Pending").count()
-        total_published_jobs = total_jobs_list.filter(status="Published").count()
-        total_live_jobs = total_jobs_list.filter(status="Live").count()
-        total_disabled_jobs = total_jobs_list.filter(status="Disabled").count()
-        total_full_time_jobs = JobPost.objects.filter(job_type="full-time")
-        total_fulltime_pending_jobs = total_full_time_jobs.filter(
-            status="Pending"
-        ).count()
-        total_fulltime_published_jobs = total_full_time_jobs.filter(
-            status="Published"
-        ).count()
-        total_fulltime_live_jobs = total_full_time_jobs.filter(
-            status="Live"
-        ).count()
-        total_fulltime_disabled_jobs = total_full_time_jobs.filter(
-            status="Disabled"
-        ).count()
+            start_date, end_date = metrics.day_range(today_date)
+            today = day
+        total = metrics.total_metrics()
 
-        total_internship_jobs = JobPost.objects.filter(job_type="internship")
-        total_internship_pending_jobs = total_internship_jobs.filter(
-            status="Pending"
-        ).count()
-        total_internship_published_jobs = total_internship_jobs.filter(
-            status="Published"
-        ).count()
-        total_internship_live_jobs = total_internship_jobs.filter(
-            status="Live"
-        ).count()
-        total_internship_disabled_jobs = total_internship_jobs.filter(
-            status="Disabled"
-        ).count()
-
-        total_walkin_jobs = JobPost.objects.filter(job_type="walk-in")
-        total_walkin_pending_jobs = total_walkin_jobs.filter(
-            status="Pending"
-        ).count()
-        total_walkin_published_jobs = total_walkin_jobs.filter(
-            status="Published"
-        ).count()
-        total_walkin_live_jobs = total_walkin_jobs.filter(status="Live").count()
-        total_walkin_disabled_jobs = total_walkin_jobs.filter(
-            status="Disabled"
-        ).count()
-
-        total_govt_jobs = JobPost.objects.filter(job_type="government")
-        total_govt_pending_jobs = total_govt_jobs.filter(status="Pending").count()
-        total_govt_published_jobs = total_govt_jobs.filter(
-            status="Published"
-        ).count()
-        total_govt_live_jobs = total_govt_jobs.filter(status="Live").count()
-        total_govt_disabled_jobs = total_govt_jobs.filter(status="Disabled").count()
-        total_job_applications = AppliedJobs.objects.filter()
-
-        total_social_applicants = User.objects.filter(
-            user_type="JS", registered_from="Social"
+        today_jobs = JobPost.objects.filter(
+            published_on__gte=start_date, published_on__lt=end_date
         )
-        social_login_once_applicants = total_social_applicants.filter(
-            is_login=False
-        ).count()
-        social_resume_applicants = total_social_applicants.exclude(
-            resume=""
-        ).count()
-        social_applied_applicants = total_social_applicants.filter(
-            id__in=total_job_applications.values_list("user", flat=True)
-        ).count()
-        social_profile_applicants = total_social_applicants.filter(
-            profile_completeness__gte=50
-        ).count()
-
-        today_social_login_once_applicants = today_social_applicants.filter(
-            is_login=False
-        ).count()
-        today_social_resume_applicants = today_social_applicants.exclude(
-            resume=""
-        ).count()
-        today_social_profile_applicants = today_social_applicants.filter(
-            profile_completeness__gte=50
-        ).count()
-        today_social_applied_applicants = today_social_applicants.filter(
-            id__in=today_job_applications.values_list("user", flat=True)
-        ).count()
-
-        total_register_applicants = User.objects.filter(
-            user_type="JS", registered_from="Email"
+        today_users = User.objects.filter(
+            date_joined__gte=start_date, date_joined__lt=end_date, user_type="JS"
         )
-        register_login_once_applicants = total_register_applicants.filter(
-            is_login=False
-        ).count()
-        register_resume_applicants = total_register_applicants.exclude(
-            resume=""
-        ).count()
-        register_applied_applicants = total_register_applicants.filter(
-            id__in=total_job_applications.values_list("user", flat=True)
-        ).count()
-        register_profile_applicants = total_register_applicants.filter(
-            profile_completeness__gte=50
-        ).count()
-
-        today_register_login_once_applicants = today_register_applicants.filter(
-            is_login=False
-        ).count()
-        today_register_resume_applicants = today_register_applicants.exclude(
-            resume=""
-        ).count()
-        today_register_profile_applicants = today_register_applicants.filter(
-            profile_completeness__gte=50
-        ).count()
-        today_register_applied_applicants = today_register_applicants.filter(
-            id__in=today_job_applications.values_list("user", flat=True)
-        ).count()
-
-        resume_applicants = User.objects.filter(
-            user_type="JS", registered_from="Resume"
+        skills = Skill.objects.aggregate(
+            total=Count("id"),
+            active=Count("id", filter=Q(status="Active")),
+            inactive=Count("id", filter=Q(status="InActive")),
+            today_active=Count(
+                "id", filter=Q(status="Active", id__in=today_jobs.values("skills"))
+            ),
+            today_inactive=Count(
+                "id", filter=Q(status="InActive", id__in=today_jobs.values("skills"))
+            ),
         )
-        resume_login_once_applicants = resume_applicants.filter(
-            is_login=False
-        ).count()
-        resume_applied_applicants = resume_applicants.filter(
-            id__in=total_job_applications.values_list("user", flat=True)
-        ).count()
-        resume_profile_applicants = resume_applicants.filter(
-            profile_completeness__gte=50
-        ).count()
-
-        today_resume_applied_applicants = today_resume_applicants.filter(
-            id__in=today_job_applications.values_list("user", flat=True)
-        ).count()
-        today_resume_profile_applicants = today_resume_applicants.filter(
-            profile_completeness__gte=50
-        ).count()
-        today_resume_login_once_applicants = today_resume_applicants.filter(
-            is_login=False
-        ).count()
-
-        today_internship_pending_jobs = today_internship_jobs_count.filter(
-            status="Pending"
-        ).count()
-        today_internship_published_jobs = today_internship_jobs_count.filter(
-            status="Published"
-        ).count()
-        today_internship_live_jobs = today_internship_jobs_count.filter(
-            status="Live"
-        ).count()
-        today_internship_disabled_jobs = today_internship_jobs_count.filter(
-            status="Disabled"
-        ).count()
-
-        today_admin_internship_pending_jobs = (
-            today_admin_internship_jobs_count.filter(status="Pending").count()
+        user_cities = User.objects.filter(user_type="JS").values("current_city")
+        today_user_cities = today_users.values("current_city")
+        today_cities = today_jobs.values("location")
+        locations = City.objects.aggregate(
+            total=Count("id"),
+            active=Count("id", filter=Q(status="Enabled")),
+            inactive=Count("id", filter=Q(status="Disabled")),
+            users=Count("id", filter=Q(id__in=user_cities)),
+            users_active=Count("id", filter=Q(id__in=user_cities, status="Enabled")),
+            users_inactive=Count(
+                "id", filter=Q(id__in=user_cities, status="Disabled")
+            ),
+            today_active=Count("id", filter=Q(id__in=today_cities, status="Enabled")),
+            today_inactive=Count(
+                "id", filter=Q(id__in=today_cities, status="Disabled")
+            ),
+            today_users_active=Count(
+                "id", filter=Q(id__in=today_user_cities, status="Enabled")
+            ),
+            today_users_inactive=Count(
+                "id", filter=Q(id__in=today_user_cities, status="Disabled")
+            ),
         )
-        today_admin_internship_published_jobs = (
-            today_admin_internship_jobs_count.filter(status="Published").count()
+        today_companies = Q(id__in=today_jobs.values("company"))
+        companies = Company.objects.aggregate(
+            total=Count("id", filter=Q(company_type="Company")),
+            active=Count("id", filter=Q(company_type="Company", is_active=True)),
+            inactive=Count("id", filter=Q(company_type="Company", is_active=False)),
+            today_active=Count("id", filter=today_companies & Q(is_active=True)),
+            today_inactive=Count("id", filter=today_companies & Q(is_active=False)),
         )
-        today_admin_internship_live_jobs = today_admin_internship_jobs_count.filter(
-            status="Live"
-        ).count()
-        today_admin_internship_disabled_jobs = (
-            today_admin_internship_jobs_count.filter(status="Disabled").count()
-        )
-
-        today_walkin_pending_jobs = today_walkin_jobs_count.filter(
-            status="Pending"
-        ).count()
-        today_walkin_published_jobs = today_walkin_jobs_count.filter(
-            status="Published"
-        ).count()
-        today_walkin_live_jobs = today_walkin_jobs_count.filter(
-            status="Live"
-        ).count()
-        today_walkin_disabled_jobs = today_walkin_jobs_count.filter(
-            status="Disabled"
-        ).count()
-
-        today_govt_pending_jobs = today_govt_jobs_count.filter(
-            status="Pending"
-        ).count()
-        today_govt_published_jobs = today_govt_jobs_count.filter(
-            status="Published"
-        ).count()
-        today_govt_live_jobs = today_govt_jobs_count.filter(status="Live").count()
-        today_govt_disabled_jobs = today_govt_jobs_count.filter(
-            status="Disabled"
-        ).count()
-
-        today_pending_jobs = today_jobs_count.filter(status="Pending").count()
-        today_published_jobs = today_jobs_count.filter(status="Published").count()
-        today_live_jobs = today_jobs_count.filter(status="Live").count()
-        today_disabled_jobs = today_jobs_count.filter(status="Disabled").count()
-
-        today_fulltime_pending_jobs = today_full_time_jobs_count.filter(
-            status="Pending"
-        ).count()
-        today_fulltime_published_jobs = today_full_time_jobs_count.filter(
-            status="Published"
-        ).count()
-        today_fulltime_live_jobs = today_full_time_jobs_count.filter(
-            status="Live"
-        ).count()
-        today_fulltime_disabled_jobs = today_full_time_jobs_count.filter(
-            status="Disabled"
-        ).count()
 
-        today_admin_pending_jobs = today_admin_jobs_count.filter(
-            status="Pending"
-        ).count()
-        today_admin_published_jobs = today_admin_jobs_count.filter(
-            status="Published"
-        ).count()
-        today_admin_live_jobs = today_admin_jobs_count.filter(status="Live").count()
-        today_admin_disabled_jobs = today_admin_jobs_count.filter(
-            status="Disabled"
-        ).count()
-
-        today_admin_full_time_pending_jobs = (
-            today_admin_full_time_jobs_count.filter(status="Pending").count()
-        )
-        today_admin_full_time_published_jobs = (
-            today_admin_full_time_jobs_count.filter(status="Published").count()
+        context = {
+            "today_tickets_open": day["tickets"]["Open"],
+            "today_tickets_closed": day["tickets"]["Closed"],
+            "total_tickets_open": total["tickets"]["Open"],
+            "total_tickets_closed": total["tickets"]["Closed"],
+            "today_job_applications": today["applications"],
+            "total_job_applications": total["applications"],
+            "total_skills": skills["total"],
+            "total_active_skills": skills["active"],
+            "total_inactive_skills": skills["inactive"],
+            "today_active_skills": skills["today_active"],
+            "today_inactive_skills": skills["today_inactive"],
+            "total_locations": locations["total"],
+            "total_active_locations": locations["active"],
+            "total_inactive_locations": locations["inactive"],
+            "total_user_locations": locations["users"],
+            "total_active_user_locations": locations["users_active"],
+            "total_inactive_user_locations": locations["users_inactive"],
+            "today_active_locations": locations["today_active"],
+            "today_inactive_locations": locations["today_inactive"],
+            "today_active_user_locations": locations["today_users_active"],
+            "today_inactive_user_locations": locations["today_users_inactive"],
+            "total_companies": companies["total"],
+            "total_active_companies": companies["active"],
+            "total_inactive_companies": companies["inactive"],
+            "today_companies_active": companies["today_active"],
+            "today_companies_not_active": companies["today_inactive"],
+        }
+        context.update(
+            metrics.status_keys(
+                today["jobs"]["others"],
+                {
+                    "all": "today_%s_jobs",
+                    "full-time": "today_fulltime_%s_jobs",
+                    "government": "today_govt_%s_jobs",
+                    "internship": "today_internship_%s_jobs",
+                    "walk-in": "today_walkin_%s_jobs",
+                },
+            )
         )
-        today_admin_full_time_live_jobs = today_admin_full_time_jobs_count.filter(
-            status="Live"
-        ).count()
-        today_admin_full_time_disabled_jobs = (
-            today_admin_full_time_jobs_count.filter(status="Disabled").count()
+        context.update(
+            metrics.status_keys(
+                today["jobs"]["admin"],
+                {
+                    "all": "today_admin_%s_jobs",
+                    "full-time": "today_admin_full_time_%s_jobs",
+                    "internship": "today_admin_internship_%s_jobs",
+                    "walk-in": "today_admin_walkin_%s_jobs",
+                },
+            )
         )
-
-        total_skills = Skill.objects.filter()
-        total_active_skills = total_skills.filter(status="Active").count()
-        total_inactive_skills = total_skills.filter(status="InActive").count()
-
-        total_locations = City.objects.filter()
-        user_loc = User.objects.filter(user_type="JS").values_list(
-            "current_city", flat=True
+        context.update(
+            metrics.status_keys(
+                total["jobs"]["all"],
+                {
+                    "all": "total_%s_jobs",
+                    "full-time": "total_fulltime_%s_jobs",
+                    "government": "total_govt_%s_jobs",
+                    "internship": "total_internship_%s_jobs",
+                    "walk-in": "total_walkin_%s_jobs",
+                },
+            )
         )
-        total_user_locations = City.objects.filter(id__in=user_loc)
-        total_active_user_locations = total_user_locations.filter(
-            status="Enabled"
-        ).count()
-        total_inactive_user_locations = total_user_locations.filter(
-            status="Disabled"
-        ).count()
-        total_active_locations = total_locations.filter(status="Enabled").count()
-        total_inactive_locations = total_locations.filter(status="Disabled").count()
-
-        total_companies = Company.objects.filter(company_type="Company")
-        total_active_companies = total_companies.filter(is_active=True).count()
-        total_inactive_companies = total_companies.filter(is_active=False).count()
-        total_companies = total_companies.count()
-
-        total_recruiters = User.objects.filter(user_type="RR")
-        total_agency_recruiters = User.objects.filter(user_type="AA")
-
-        total_tickets_open = Ticket.objects.filter(status="Open").count()
-        total_tickets_closed = Ticket.objects.filter(status="Closed").count()
-
-        context = {
-            "today_tickets_open": today_tickets_open,
-            "today_tickets_closed": today_tickets_closed,
-            "today_fulltime_pending_jobs": today_fulltime_pending_jobs,
-            "today_fulltime_published_jobs": today_fulltime_published_jobs,
-            "today_fulltime_live_jobs": today_fulltime_live_jobs,
-            "today_fulltime_disabled_jobs": today_fulltime_disabled_jobs,
-            "today_social_login_once_applicants": today_social_login_once_applicants,
-            "today_job_applications": today_job_applications.count(),
-            "total_job_applications": total_job_applications.count(),
-            "today_social_resume_applicants": today_social_resume_applicants,
-            "today_social_applied_applicants": today_social_applied_applicants,
-            "today_social_profile_applicants": today_social_profile_applicants,
-            "total_social_applicants": total_social_applicants.count(),
-            "social_login_once_applicants": social_login_once_applicants,
-            "social_resume_applicants": social_resume_applicants,
-            "social_applied_applicants": social_applied_applicants,
-            "social_profile_applicants": social_profile_applicants,
-            "today_agency_recruiters_count": today_agency_recruiters.count(),
-            "today_agency_active_recruiters_count": today_agency_recruiters.filter(
-                is_active=True
-            ).count(),
-            "today_agency_inactive_recruiters_count": today_agency_recruiters.filter(
-                is_active=False
-            ).count(),
-            "today_agency_mobile_verified_recruiters_count": today_agency_recruiters.filter(
-                mobile_verified=True
-            ).count(),
-            "today_agency_mobile_not_verified_recruiters_count": today_agency_recruiters.filter(
-                mobile_verified=False
-            ).count(),
-            "total_agency_recruiters_count": total_agency_recruiters.count(),
-            "total_agency_active_recruiters_count": total_agency_recruiters.filter(
-                is_active=True
-            ).count(),
-            "total_agency_inactive_recruiters_count": total_agency_recruiters.filter(
-                is_active=False
-            ).count(),
-            "total_agency_mobile_verified_recruiters_count": total_agency_recruiters.filter(
-                mobile_verified=True
-            ).count(),
-            "total_agency_mobile_not_verified_recruiters_count": total_agency_recruiters.filter(
-                mobile_verified=False
-            ).count(),
-            "today_admin_full_time_pending_jobs": today_admin_full_time_pending_jobs,
-            "today_admin_full_time_published_jobs": today_admin_full_time_published_jobs,
-            "today_admin_full_time_live_jobs": today_admin_full_time_live_jobs,
-            "today_admin_full_time_disabled_jobs": today_admin_full_time_disabled_jobs,
-            "total_tickets_open": total_tickets_open,
-            "total_tickets_closed": total_tickets_closed,
-            "today_pending_jobs": today_pending_jobs,
-            "today_published_jobs": today_published_jobs,
-            "today_live_jobs": today_live_jobs,
-            "today_disabled_jobs": today_disabled_jobs,
-            "today_admin_pending_jobs": today_admin_pending_jobs,
-            "today_admin_published_jobs": today_admin_published_jobs,
-            "today_admin_live_jobs": today_admin_live_jobs,
-            "today_admin_disabled_jobs": today_admin_disabled_jobs,
-            "today_social_applicants": today_social_applicants.count(),
-            "today_recruiters_count": today_recruiters.count(),
-            "today_active_recruiters_count": today_recruiters.filter(
-                is_active=True
-            ).count(),
-            "today_inactive_recruiters_count": today_recruiters.filter(
-                is_active=False
-            ).count(),
-            "today_recruiters_mobile_verified_count": today_recruiters.filter(
-                mobile_verified=True
-            ).count(),
-            "today_recruiters_mobile_not_verified_count": today_recruiters.filter(
-                mobile_verified=False
-            ).count(),
-            "total_pending_jobs": total_pending_jobs,
-            "total_published_jobs": total_published_jobs,
-            "total_live_jobs": total_live_jobs,
-            "total_disabled_jobs": total_disabled_jobs,
-            "total_recruiters": total_recruiters.count(),
-            "total_active_recruiters_count": total_recruiters.filter(
-                is_active=True
-            ).count(),
-            "total_inactive_recruiters_count": total_recruiters.filter(
-                is_active=False
-            ).count(),
-            "total_recruiters_mobile_verified_count": total_recruiters.filter(
-                mobile_verified=True
-            ).count(),
-            "total_recruiters_mobile_not_verified_count": total_recruiters.filter(
-                mobile_verified=False
-            ).count(),
-            "total_walkin_pending_jobs": total_walkin_pending_jobs,
-            "total_walkin_published_jobs": total_walkin_published_jobs,
-            "total_walkin_live_jobs": total_walkin_live_jobs,
-            "total_walkin_disabled_jobs": total_walkin_disabled_jobs,
-            "total_fulltime_pending_jobs": total_fulltime_pending_jobs,
-            "total_fulltime_published_jobs": total_fulltime_published_jobs,
-            "total_fulltime_live_jobs": total_fulltime_live_jobs,
-            "total_fulltime_disabled_jobs": total_fulltime_disabled_jobs,
-            "total_internship_pending_jobs": total_internship_pending_jobs,
-            "total_internship_published_jobs": total_internship_published_jobs,
-            "total_internship_live_jobs": total_internship_live_jobs,
-            "total_internship_disabled_jobs": total_internship_disabled_jobs,
-            "today_internship_pending_jobs": today_internship_pending_jobs,
-            "today_internship_published_jobs": today_internship_published_jobs,
-            "today_internship_live_jobs": today_internship_live_jobs,
-            "today_internship_disabled_jobs": today_internship_disabled_jobs,
-            "today_walkin_pending_jobs": today_walkin_pending_jobs,
-            "today_walkin_published_jobs": today_walkin_published_jobs,
-            "today_walkin_live_jobs": today_walkin_live_jobs,
-            "today_walkin_disabled_jobs": today_walkin_disabled_jobs,
-            "today_govt_pending_jobs": today_govt_pending_jobs,
-            "today_govt_published_jobs": today_govt_published_jobs,
-            "today_govt_live_jobs": today_govt_live_jobs,
-            "today_govt_disabled_jobs": today_govt_disabled_jobs,
-            "today_admin_internship_pending_jobs": today_admin_internship_pending_jobs,
-            "today_admin_internship_published_jobs": today_admin_internship_published_jobs,
-            "today_admin_internship_live_jobs": today_admin_internship_live_jobs,
-            "today_admin_internship_disabled_jobs": today_admin_internship_disabled_jobs,
-            "today_admin_walkin_pending_jobs": today_admin_walkin_jobs.filter(
-                status="Pending"
-            ).count(),
-            "today_admin_walkin_published_jobs": today_admin_walkin_jobs.filter(
-                status="Published"
-            ).count(),
-            "today_admin_walkin_live_jobs": today_admin_walkin_jobs.filter(
-                status="Live"
-            ).count(),
-            "today_admin_walkin_disabled_jobs": today_admin_walkin_jobs.filter(
-                status="Disabled"
-            ).count(),
-            "total_skills": total_skills.count(),
-            "total_active_skills": total_active_skills,
-            "total_inactive_skills": total_inactive_skills,
-            "total_locations": total_locations.count(),
-            "total_active_locations": total_active_locations,
-            "total_inactive_locations": total_inactive_locations,
-            "total_user_locations": total_user_locations.count(),
-            "total_active_user_locations": total_active_user_locations,
-            "total_inactive_user_locations": total_inactive_user_locations,
-            "today_active_user_locations": today_user_locations.filter(
-                status="Enabled"
-            ).count(),
-            "today_inactive_user_locations": today_user_locations.filter(
-                status="Disabled"
-            ).count(),
-            "total_companies": total_companies,
-            "total_active_companies": total_active_companies,
-            "total_inactive_companies": total_inactive_companies,
-            "total_govt_pending_jobs": total_govt_pending_jobs,
-            "total_govt_published_jobs": total_govt_published_jobs,
-            "total_govt_live_jobs": total_govt_live_jobs,
-            "total_govt_disabled_jobs": total_govt_disabled_jobs,
-            "today_active_skills": today_skills.filter(status="Active").count(),
-            "today_inactive_skills": today_skills.filter(status="InActive").count(),
-            "today_active_locations": today_locations.filter(
-                status="Enabled"
-            ).count(),
-            "today_inactive_locations": today_locations.filter(
-                status="Disabled"
-            ).count(),
-            "today_companies_active": today_companies_active,
-            "today_companies_not_active": today_companies_not_active,
-            "today_register_applicants": today_register_applicants.count(),
-            "today_register_login_once_applicants": today_register_login_once_applicants,
-            "today_register_resume_applicants": today_register_resume_applicants,
-            "today_register_profile_applicants": today_register_profile_applicants,
-            "today_register_applied_applicants": today_register_applied_applicants,
-            "total_register_applicants": total_register_applicants.count(),
-            "register_login_once_applicants": register_login_once_applicants,
-            "register_resume_applicants": register_resume_applicants,
-            "register_applied_applicants": register_applied_applicants,
-            "register_profile_applicants": register_profile_applicants,
-            "resume_applicants": resume_applicants.count(),
-            "resume_login_once_applicants": resume_login_once_applicants,
-            "resume_applied_applicants": resume_applied_applicants,
-            "resume_profile_applicants": resume_profile_applicants,
-            "today_resume_applicants": today_resume_applicants.count(),
-            "today_resume_login_once_applicants": today_resume_login_once_applicants,
-            "today_resume_applied_applicants": today_resume_applied_applicants,
-            "today_resume_profile_applicants": today_resume_profile_applicants,
-            "months": months,
-        }
+        for source, today_name, total_name, total_joined in (
+            ("Social", "today_social", "social", "total_social_applicants"),
+            ("Email", "today_register", "register", "total_register_applicants"),
+            ("Resume", "today_resume", "resume", "resume_applicants"),
+        ):
+            today_applicants = today["applicants"][source]
+            total_applicants = total["applicants"][source]
+            context[today_name + "_applicants"] = today_applicants["joined"]
+            context[total_joined] = total_applicants["joined"]
+            for name in ("login_once", "resume", "profile", "applied"):
+                context["%s_%s_applicants" % (today_name, name)] = today_applicants[
+                    name
+                ]
+                context["%s_%s_applicants" % (total_name, name)] = total_applicants[
+                    name
+                ]
+        for user_type, today_keys, total_keys in (
+            (
+                "RR",
+                (
+                    "today_recruiters_count",
+                    "today_%s_recruiters_count",
+                    "today_recruiters_%s_count",
+                ),
+                (
+                    "total_recruiters",
+                    "total_%s_recruiters_count",
+                    "total_recruiters_%s_count",
+                ),
+            ),
+            (
+                "AA",
+                (
+                    "today_agency_recruiters_count",
+                    "today_agency_%s_recruiters_count",
+                    "today_agency_%s_recruiters_count",
+                ),
+                (
+                    "total_agency_recruiters_count",
+                    "total_agency_%s_recruiters_count",
+                    "total_agency_%s_recruiters_count",
+                ),
+            ),
+        ):
+            for counts, (joined, activity, mobile) in (
+                (today["recruiters"][user_type], today_keys),
+                (total["recruiters"][user_type], total_keys),
+            ):
+                context[joined] = counts["joined"]
+                for name in ("active", "inactive"):
+                    context[activity % name] = counts[name]
+                for name in ("mobile_verified", "mobile_not_verified"):
+                    context[mobile % name] = counts[name]
+        context["months"] = months
         return render(
             request,
             "dashboard/index.html",
@@ -107,7 +107,7 @@ def country(request):
                     + '">'
                     + s.name
                     + "</a>("
-                    + str(s.get_no_of_jobposts().count())
+                    + str(s.live_job_count)
                     + ')<div class="remove_ticket remove_states"><a class="delete" href="'
                     + str(s.id)
                     + ' " countryId="'
@@ -136,7 +136,7 @@ def country(request):
                     + '">'
                     + s.name
                     + "</a>("
-                    + str(s.get_no_of_jobposts().count())
+                    + str(s.live_job_count)
                     + ')<div class="remove_ticket remove_states"><a class="delete" href="'
                     + str(s.id)
                     + ' " countryId="'
@@ -214,7 +214,7 @@ def country(request):
                     + '">'
                     + c.name
                     + "</a>("
-                    + str(c.get_no_of_jobposts().count())
+                    + str(c.live_job_count)
                     + ')<div class="remove_ticket remove_city"><a class="delete" href="'
                     + str(c.id)
                     + ' " id="'
@@ -247,7 +247,7 @@ def country(request):
                     + '">'
                     + c.name
                     + "</a>("
-                    + str(c.get_no_of_jobposts().count())
+                    + str(c.live_job_count)
                     + ')<div class="remove_ticket remove_city"><a class="delete" href="'
                     + str(c.id)
                     + ' " id="'
@@ -4,7 +4,7 @@ import re
 from datetime import datetime
 
 from django.urls import reverse
-from django.db.models import Count, Q
+from django.db.models import Count, Q, Sum
 from django.http.response import HttpResponseRedirect
 from django.shortcuts import render
 
@@ -12,13 +12,12 @@ from mpcomp.views import (
     get_prev_after_pages_count,
     permission_required,
 )
+from peeldb import report_rollups
 from peeldb.models import (
     City,
-    JobPost,
     SearchResult,
     Skill,
     Subscriber,
-    User,
 )
 
 
@@ -48,56 +47,67 @@ def reports(request):
         "python",
     ]
     all_skills = Skill.objects.filter()
-    location = []
-    jobs_location = []
+    start_date = end_date = None
+    if request.method == "POST" and request.POST.get("timestamp"):
+        date = request.POST.get("timestamp").split(" - ")
+        start_date = datetime.strptime(date[0], "%b %d, %Y %H:%M").date()
+        end_date = datetime.strptime(date[1], "%b %d, %Y %H:%M").date()
 
-    job_posts = []
+    users = (
+        report_rollups.rollups("user", "city", start_date, end_date)
+        .filter(city__isnull=False)
+        .exclude(user_type="JS")
+        .values("city", "city__name")
+        .annotate(joined=Sum("total"), active=Sum("active"))
+        .order_by("city")
+    )
+    location = []
     active_recruiters = []
     inactive_recruiters = []
-    skills_names = []
-    skill_wise_jobs_count = []
-    for city in cities:
-        users = User.objects.filter(city=city).exclude(user_type="JS")
-        if request.method == "POST" and request.POST.get("timestamp"):
-            date = request.POST.get("timestamp").split(" - ")
-            start_date = datetime.strptime(date[0], "%b %d, %Y %H:%M")
-            end_date = datetime.strptime(date[1], "%b %d, %Y %H:%M")
-            users = users.filter(date_joined__range=(start_date, end_date))
-        if users:
-            location.append(str(city.name))
-            active_recruiters.append(int(users.filter(is_active=True).count()))
-            inactive_recruiters.append(int(users.filter(is_active=False).count()))
-        jobs = JobPost.objects.filter(location__in=[city], status="Live")
-        if request.method == "POST" and request.POST.get("timestamp"):
-
-            date = request.POST.get("timestamp").split(" - ")
-            start_date = datetime.strptime(date[0], "%b %d, %Y %H:%M")
-            end_date = datetime.strptime(date[1], "%b %d, %Y %H:%M")
+    for row in users:
+        location.append(str(row["city__name"]))
+        active_recruiters.append(row["active"])
+        inactive_recruiters.append(row["joined"] - row["active"])
 
-            jobs = jobs.filter(published_on__range=(start_date, end_date))
+    jobs = (
+        report_rollups.rollups("job", "city", start_date, end_date)
+        .filter(city__isnull=False)
+        .values("city", "city__name")
+        .annotate(live=Sum("active"))
+        .filter(live__gt=0)
+        .order_by("city")
+    )
+    jobs_location = []
+    job_posts = []
+    for row in jobs:
+        jobs_location.append(str(row["city__name"]))
+        job_posts.append(row["live"])
 
-        if jobs:
-            jobs_location.append(str(city.name))
-            job_posts.append(jobs.count())
     if request.POST.getlist("skills"):
-        skills = Skill.objects.filter(
-            id__in=request.POST.getlist("skills")
-        ).values_list("name", flat=True)
+        skills = list(
+            Skill.objects.filter(id__in=request.POST.getlist("skills")).values_list(
+                "name", flat=True
+            )
+        )
+    skills_filter = Q(pk__in=[])
     for skill in skills:
-        skill = Skill.objects.filter(name__iexact=skill)
-        jobs_skills = JobPost.objects.filter(skills__in=skill, status="Live")
-        if request.method == "POST" and request.POST.get("timestamp"):
-
-            date = request.POST.get("timestamp").split(" - ")
-            start_date = datetime.strptime(date[0], "%b %d, %Y %H:%M")
-            end_date = datetime.strptime(date[1], "%b %d, %Y %H:%M")
-
-           
-
-            jobs_skills = jobs_skills.filter(published_on__range=(start_date, end_date))
-        if jobs_skills:
-            skills_names.append(skill[0].name)
-            skill_wise_jobs_count.append(jobs_skills.count())
+        skills_filter |= Q(skill__name__iexact=skill)
+    skill_jobs = {}
+    for row in (
+        report_rollups.rollups("job", "skill", start_date, end_date)
+        .filter(skills_filter)
+        .values("skill__name")
+        .annotate(live=Sum("active"))
+    ):
+        name, live = skill_jobs.get(row["skill__name"].lower(), (row["skill__name"], 0))
+        skill_jobs[name.lower()] = (name, live + row["live"])
+    skills_names = []
+    skill_wise_jobs_count = []
+    for skill in skills:
+        name, live = skill_jobs.get(skill.lower(), (skill, 0))
+        if live:
+            skills_names.append(name)
+            skill_wise_jobs_count.append(live)
 
     return render(
         request,
@@ -5,6 +5,7 @@ from django.http.response import HttpResponse
 from django.shortcuts import get_object_or_404, render
 
 from mpcomp.views import permission_required
+from peeldb import search_queue
 from peeldb.models import (
     AgencyCompanyBranch,
     AgencyResume,
@@ -251,6 +252,8 @@ def moving_duplicates(request, value):
                 users = User.objects.filter(city__in=duplicates)
                 users.update(city=original)
                 current_users = User.objects.filter(current_city__in=duplicates)
+                # update() sends no signals: queue the candidates' documents
+                search_queue.enqueue(User, current_users.values_list("id", flat=True))
                 current_users.update(current_city=original)
                 preferred_users = User.objects.filter(preferred_city__in=duplicates)
                 for user in preferred_users:
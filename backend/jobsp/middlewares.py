@@ -7,6 +7,8 @@ except ImportError:
     resource = None
 from django.utils.deprecation import MiddlewareMixin
 
+from mpcomp import request_stats
+
 
 # class StatsMiddleware(MiddlewareMixin):
 
@@ -240,3 +242,18 @@ class LowerCased(MiddlewareMixin):
                 return redirect("/social/user/update/", permanent=False)
         # if request.path == "/recruiter/":
         #     return redirect("/post-job/", permanent=False)
+
+
+class RequestStatsMiddleware:
+    """
+    Collect the SQL, cache, search and template stats of every request, see
+    ``mpcomp.request_stats``; added to ``MIDDLEWARE`` by ``REQUEST_STATS``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with request_stats.collect() as stats:
+            response = self.get_response(request)
+        return request_stats.finish(request, response, stats)
@@ -1,8 +1,10 @@
 import os
+import pickle
 
 from celery.schedules import crontab
 from corsheaders.defaults import default_headers, default_methods
 from dotenv import load_dotenv
+from pymemcache.serde import PickleSerde
 
 load_dotenv()
 
@@ -128,6 +130,7 @@ INSTALLED_APPS = (
     "django.contrib.sitemaps",  # Django sitemap framework
     "django.contrib.staticfiles",
     "django.contrib.humanize",
+    "django.contrib.postgres",
     "django.contrib.messages",
     "sorl.thumbnail",
     "compressor",
@@ -261,10 +264,20 @@ HAYSTACK_CONNECTIONS = {
 }
 
 
-HAYSTACK_SIGNAL_PROCESSOR = "haystack.signals.RealtimeSignalProcessor"
+# Saves only queue objects for indexing, see peeldb/search_queue.py
+HAYSTACK_SIGNAL_PROCESSOR = "peeldb.search_queue.QueuedSignalProcessor"
 HAYSTACK_DEFAULT_OPERATOR = "OR"
 HAYSTACK_SEARCH_RESULTS_PER_PAGE = 1
 
+# Backend for free text job search in the API (see search/backends.py) and
+# the maximum number of ranked ids fetched from the index per search; when a
+# search matches more, the API flags its count with count_capped.
+# "search.backends.PostgresJobSearch" needs no Elasticsearch cluster.
+JOB_SEARCH_BACKEND = os.getenv(
+    "JOB_SEARCH_BACKEND", "search.backends.ElasticsearchJobSearch"
+)
+JOB_SEARCH_MAX_RESULTS = 500
+
 CELERY_TIMEZONE = "Asia/Calcutta"
 
 CELERY_BEAT_SCHEDULE = {
@@ -273,6 +286,10 @@ CELERY_BEAT_SCHEDULE = {
         "task": "dashboard.tasks.jobpost_published",
         "schedule": crontab(minute="*", day_of_week="mon,tue,wed,thu,fri,sat"),
     },
+    "flushing-buffered-job-views": {
+        "task": "dashboard.tasks.flush_job_views",
+        "schedule": crontab(minute="*"),
+    },
     "sending-today-applied-users-info-to-recruiters": {
         "task": "dashboard.tasks.recruiter_jobpost_applicants",
         "schedule": crontab(
@@ -317,6 +334,10 @@ CELERY_BEAT_SCHEDULE = {
     #     "task": "dashboard.tasks.applicants_walkin_job_notifications",
     #     "schedule": crontab(hour="09", minute="00", day_of_week="thu"),
     # },
+    "refreshing-stored-sitemap-pages": {
+        "task": "dashboard.tasks.refresh_sitemaps",
+        "schedule": crontab(minute="20"),
+    },
     # OLD SITEMAP GENERATION - Replaced with Django sitemap framework
     # "daily-sitemap-generation": {
     #     "task": "dashboard.tasks.sitemap_generation",
@@ -346,12 +367,33 @@ CELERY_BEAT_SCHEDULE = {
     #     "task": "dashboard.tasks.recruiter_profile_update_notifications",
     #     "schedule": crontab(hour="09", minute="30", day_of_week="mon"),
     # },
+    "reconciling-live-job-counts": {
+        "task": "dashboard.tasks.recount_live_job_counts",
+        "schedule": crontab(minute="40"),
+    },
+    "refreshing-recent-daily-rollups": {
+        "task": "dashboard.tasks.refresh_daily_rollups",
+        "schedule": crontab(minute="*/15"),
+    },
+    "refreshing-all-daily-rollups": {
+        "task": "dashboard.tasks.refresh_daily_rollups",
+        "schedule": crontab(hour="01", minute="30"),
+        "kwargs": {"full": True},
+    },
+    "haystack-indexing-queued-objects": {
+        "task": "dashboard.tasks.drain_search_index_queue",
+        "schedule": crontab(minute="*"),
+    },
     "haystack-rebuilding-indexes": {
         "task": "dashboard.tasks.rebuilding_index",
         "schedule": crontab(
             hour="00", minute="20", day_of_week="mon,tue,wed,thu,fri,sat,sun"
         ),
     },
+    "deleting-expired-data-exports": {
+        "task": "dashboard.tasks.delete_expired_exports",
+        "schedule": crontab(hour="02", minute="10"),
+    },
     "check-expiring-jobs-and-send-notifications": {
         "task": "dashboard.tasks.check_expiring_jobs",
         "schedule": crontab(
@@ -383,22 +425,44 @@ THUMBNAIL_FORCE_OVERWRITE = True
 # AWS_ENABLED = os.getenv("AWSENABLED")
 # DISQUS_SHORTNAME = ""
 
-# CACHES = {
-#     "default": {
-#         "BACKEND": "django.core.cache.backends.memcached.PyMemcacheCache",
-#         "LOCATION": "127.0.0.1:11211",
-#         "TIMEOUT": 48 * 60 * 60,
-#         "OPTIONS": {"server_max_value_length": 1024 * 1024 * 2,},
-#     }
-# }
+# "default" is a two-tier cache: a short-lived per-process copy ("local") in
+# front of the shared memcached pool ("shared"). Bump CACHE_VERSION to
+# invalidate every shared key after a deploy that changes cached shapes.
+CACHES = {
+    "default": {
+        "BACKEND": "mpcomp.cache.TieredCache",
+        "TIMEOUT": 48 * 60 * 60,
+        "OPTIONS": {"L1": "local", "L2": "shared", "L1_TIMEOUT": 60},
+    },
+    "shared": {
+        "BACKEND": "django.core.cache.backends.memcached.PyMemcacheCache",
+        "LOCATION": os.getenv("MEMCACHED_LOCATION", "127.0.0.1:11211"),
+        "TIMEOUT": 48 * 60 * 60,
+        "KEY_PREFIX": "peeljobs",
+        "VERSION": int(os.getenv("CACHE_VERSION", 1)),
+        "OPTIONS": {
+            "use_pooling": True,
+            "max_pool_size": 20,
+            "connect_timeout": 1,
+            "timeout": 1,
+            "ignore_exc": True,
+            "serde": PickleSerde(pickle_version=pickle.HIGHEST_PROTOCOL),
+        },
+    },
+    "local": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "peeljobs-l1",
+        "TIMEOUT": 60,
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    },
+}
 
-# Alternative Redis cache configuration (if you prefer Redis over Memcached)
-# CACHES = {
-#     "default": {
-#         "BACKEND": "django.core.cache.backends.redis.RedisCache",
-#         "LOCATION": "redis://127.0.0.1:6379/1",
-#         "TIMEOUT": 48 * 60 * 60,
-#     }
+# Alternative Redis shared tier (if you prefer Redis over Memcached)
+# CACHES["shared"] = {
+#     "BACKEND": "django.core.cache.backends.redis.RedisCache",
+#     "LOCATION": "redis://127.0.0.1:6379/1",
+#     "TIMEOUT": 48 * 60 * 60,
+#     "KEY_PREFIX": "peeljobs",
 # }
 
 FB_ACCESS_TOKEN = os.getenv("FBACCESSTOKEN")
@@ -514,6 +578,76 @@ EMAIL_BACKEND = "django_ses.SESBackend"
 MP_CELERY_MONITOR_KEY = os.getenv("MP_CELERY_MONITOR_KEY")
 CELERY_MONITOR_URL = os.getenv("CELERY_MONITOR_URL")
 
+# Seconds before the in-process skill/city/qualification slug index is rebuilt
+SLUG_INDEX_TTL = 15 * 60
+
+# Seconds before the in-process compiled MetaData (SEO) templates are reloaded
+META_REGISTRY_TTL = 15 * 60
+
+# Seconds the job listing totals and keyset page anchors stay cached
+LISTING_PAGINATION_TIMEOUT = 10 * 60
+
+# Seconds anonymous listing pages stay cached (see mpcomp.page_cache); pages
+# are invalidated earlier whenever their jobs change
+PAGE_CACHE_TIMEOUT = 60 * 60
+
+# Seconds the dashboard/daily report metrics of a past day stay cached, and of
+# today and all time (see dashboard.metrics)
+METRICS_CACHE_TIMEOUT = 24 * 60 * 60
+METRICS_TODAY_CACHE_TIMEOUT = 5 * 60
+
+# Seconds the recruiter dashboard/analytics API results stay cached; saving a
+# job or application of the recruiter invalidates them earlier
+RECRUITER_ANALYTICS_CACHE_TIMEOUT = 5 * 60
+
+# Job detail views are counted in the shared cache in slots of this many
+# seconds and written to JobPost.views_count by dashboard.tasks.flush_job_views
+VIEW_COUNTER_CACHE = "shared"
+VIEW_COUNTER_SLOT = 60
+
+# Rows read per query by applicant exports (see peeldb.exports), and seconds
+# the download links mailed for them stay valid
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_LINK_MAX_AGE = 7 * 24 * 60 * 60
+# Storage of the export files, which hold applicants' contact details: kept
+# out of MEDIA_ROOT and only served through the signed download link. Files
+# and their exports are deleted once the link has expired.
+EXPORT_STORAGE = {
+    "BACKEND": "django.core.files.storage.FileSystemStorage",
+    "OPTIONS": {"location": os.path.join(BASE_DIR, "private", "exports")},
+}
+
+# Resume parsing (see mpcomp.resume_parser): Celery queue of the parse tasks
+# (the default queue unless set), seconds pdftotext/antiword may run, and
+# seconds the skill names matched in resumes are kept per process
+RESUME_PARSE_QUEUE = os.getenv("RESUME_PARSE_QUEUE")
+RESUME_PARSE_TIMEOUT = 30
+RESUME_SKILLS_REFRESH = 60 * 60
+
+# Batched notification mail (see mpcomp.mailer): messages per send task, most
+# messages sent a second per worker (the SES sending rate), and retries of
+# failed messages, the first after MAIL_RETRY_DELAY seconds, doubling each time
+MAIL_BATCH_SIZE = 100
+MAIL_SEND_RATE = int(os.getenv("MAIL_SEND_RATE", 14))
+MAIL_MAX_RETRIES = 3
+MAIL_RETRY_DELAY = 60
+
+# Per request SQL/cache/search/template stats (see mpcomp.request_stats): off
+# unless REQUEST_STATS is set. Exceeding a view's query budget raises instead
+# of logging with QUERY_BUDGET_STRICT, e.g. in CI test runs.
+REQUEST_STATS = os.getenv("REQUEST_STATS", False)
+QUERY_BUDGET_STRICT = os.getenv("QUERY_BUDGET_STRICT", False)
+REQUEST_STATS_CACHE = "shared"
+REQUEST_STATS_FLUSH_INTERVAL = 10
+# Bearer token for scraping /metrics/ (staff users can always read it)
+REQUEST_STATS_TOKEN = os.getenv("REQUEST_STATS_TOKEN")
+if REQUEST_STATS:
+    MIDDLEWARE = ["jobsp.middlewares.RequestStatsMiddleware"] + MIDDLEWARE
+    TEMPLATES[0]["BACKEND"] = "mpcomp.request_stats.TimedDjangoTemplates"
+    HAYSTACK_CONNECTIONS["default"][
+        "ENGINE"
+    ] = "mpcomp.request_stats.TimedElasticsearchEngine"
+
 # Tailwind CSS Configuration
 TAILWIND_CSS_FILE = "css/tailwind-output.css"
 
@@ -90,6 +90,11 @@ DEFAULT_S3_PATH = "media"
 STATICFILES_STORAGE = "storages.backends.s3boto3.S3Boto3Storage"
 STATIC_S3_PATH = "static"
 COMPRESS_STORAGE = "storages.backends.s3boto3.S3Boto3Storage"
+# applicant exports stay private, downloaded through psite.views.export_download
+EXPORT_STORAGE = {
+    "BACKEND": "storages.backends.s3boto3.S3Boto3Storage",
+    "OPTIONS": {"location": "private/exports", "default_acl": "private"},
+}
 
 AWS_HEADERS = {
     "Expires": "Sun, 15 June 2020 20:00:00 GMT",
@@ -63,6 +63,10 @@ from psite.views import (
     custom_500,
     custom_404,
     auth_return,
+    sitemap_index_xml,
+    sitemap_section_xml,
+    request_metrics,
+    export_download,
 )
 from pjob.views import index as job_list
 
@@ -71,6 +75,8 @@ from .views import user_login, user_register, forgot_password, set_password
 
 
 urlpatterns = [
+    path("metrics/", request_metrics, name="request_metrics"),
+    path("exports/<str:token>/", export_download, name="export_download"),
     path("login/", user_login, name="login"), # convert to tailwind
     path("register/", user_register, name="register"),
     path("forgot-password/", forgot_password, name="forgot_password"),
@@ -325,33 +331,13 @@ urlpatterns += [
 ]
 
 # Add Django Sitemap URLs (Modern replacement for old sitemap generation)
-from django.contrib.sitemaps.views import sitemap as sitemap_view, index as sitemap_index
-from psite.sitemaps import (
-    JobPostSitemap,
-    SkillLocationSitemap,
-    FresherSkillLocationSitemap,
-    SkillSitemap,
-    LocationSitemap,
-    CompanySitemap,
-    StaticPagesSitemap,
-)
-
-sitemaps = {
-    'jobs': JobPostSitemap,
-    'skill-locations': SkillLocationSitemap,
-    'fresher-skill-locations': FresherSkillLocationSitemap,
-    'skills': SkillSitemap,
-    'locations': LocationSitemap,
-    'companies': CompanySitemap,
-    'static': StaticPagesSitemap,
-}
-
+# Sections are rendered by the refresh_sitemaps task and served from SitemapPage
 urlpatterns += [
     # Sitemap index - automatically splits into multiple files if needed
     # Domain (peeljobs.com) configured via Django Site framework (SITE_ID=1)
-    path('sitemap.xml', sitemap_index, {'sitemaps': sitemaps}, name='django.contrib.sitemaps.views.index'),
+    path('sitemap.xml', sitemap_index_xml, name='django.contrib.sitemaps.views.index'),
     # Individual sitemap sections
-    path('sitemap-<section>.xml', sitemap_view, {'sitemaps': sitemaps}, name='django.contrib.sitemaps.views.sitemap'),
+    path('sitemap-<section>.xml', sitemap_section_xml, name='django.contrib.sitemaps.views.sitemap'),
 ]
 
 handler404 = custom_404
@@ -0,0 +1,124 @@
+"""
+Two-tier cache backend and small helpers shared by views and template tags.
+
+``TieredCache`` keeps a short-lived copy of every value in a process-local
+cache (L1) in front of the shared, pooled memcached backend (L2), so hot keys
+such as resolved listing slugs are served without a network round trip. L1
+entries live for at most ``L1_TIMEOUT`` seconds, which bounds how stale a
+process can be after another process deletes or overwrites a key.
+"""
+import hashlib
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+from mpcomp import request_stats
+
+_MISSING = object()
+
+
+class TieredCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self._l1_alias = options.get("L1", "local")
+        self._l2_alias = options.get("L2", "shared")
+        self.l1_timeout = options.get("L1_TIMEOUT", 60)
+
+    @property
+    def l1(self):
+        return caches[self._l1_alias]
+
+    @property
+    def l2(self):
+        return caches[self._l2_alias]
+
+    def _l1_timeout(self, timeout):
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        if timeout is None:
+            return self.l1_timeout
+        return min(timeout, self.l1_timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.l2.add(key, value, timeout, version)
+        if added:
+            self.l1.set(key, value, self._l1_timeout(timeout), version)
+        return added
+
+    def get(self, key, default=None, version=None):
+        value = self.l1.get(key, _MISSING, version)
+        if value is not _MISSING:
+            request_stats.record_cache(1)
+            return value
+        value = self.l2.get(key, _MISSING, version)
+        if value is _MISSING:
+            request_stats.record_cache(0, 1)
+            return default
+        request_stats.record_cache(1)
+        self.l1.set(key, value, self.l1_timeout, version)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.l2.set(key, value, timeout, version)
+        self.l1.set(key, value, self._l1_timeout(timeout), version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self.l1.touch(key, self._l1_timeout(timeout), version)
+        return self.l2.touch(key, timeout, version)
+
+    def delete(self, key, version=None):
+        self.l1.delete(key, version)
+        return self.l2.delete(key, version)
+
+    def get_many(self, keys, version=None):
+        found = self.l1.get_many(keys, version)
+        missing = [key for key in keys if key not in found]
+        if missing:
+            shared = self.l2.get_many(missing, version)
+            if shared:
+                self.l1.set_many(shared, self.l1_timeout, version)
+            found.update(shared)
+        request_stats.record_cache(len(found), len(keys) - len(found))
+        return found
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.l2.set_many(data, timeout, version)
+        self.l1.set_many(data, self._l1_timeout(timeout), version)
+        return failed
+
+    def delete_many(self, keys, version=None):
+        self.l1.delete_many(keys, version)
+        self.l2.delete_many(keys, version)
+
+    def has_key(self, key, version=None):
+        return self.l1.has_key(key, version) or self.l2.has_key(key, version)
+
+    def incr(self, key, delta=1, version=None):
+        value = self.l2.incr(key, delta, version)
+        self.l1.delete(key, version)
+        return value
+
+    def decr(self, key, delta=1, version=None):
+        value = self.l2.decr(key, delta, version)
+        self.l1.delete(key, version)
+        return value
+
+    def clear(self):
+        self.l1.clear()
+        self.l2.clear()
+
+    def close(self, **kwargs):
+        self.l2.close(**kwargs)
+
+
+def cache_key(prefix, *parts):
+    """
+    Build a memcached-safe key from a prefix and user supplied URL parts,
+    hashing the parts when they would push the key past memcached's limit.
+    """
+    key = ":".join([prefix] + [str(part) for part in parts])
+    if len(key) > 200 or any(ord(char) < 33 or ord(char) > 126 for char in key):
+        digest = hashlib.md5(key.encode("utf-8")).hexdigest()
+        key = prefix + ":" + digest
+    return key
@@ -0,0 +1,122 @@
+"""
+Facet counts (jobs per location, skill, industry, qualification and job type)
+for the job filter options.
+
+All facets are computed in a single ``UNION ALL`` query: one grouped count
+over each many-to-many through table plus one over ``JobPost.job_type``, all
+restricted to the same set of job ids. Results are cached under a generation
+number that ``invalidate()`` bumps whenever a job or its relations change
+(see ``peeldb.signals``), so stale entries are simply never read again.
+"""
+import time
+
+from django.core.cache import cache
+from django.db.models import CharField, Count, F, IntegerField, Value
+
+from mpcomp.cache import cache_key
+from peeldb.models import JOB_TYPE, JobPost
+
+# response key -> JobPost many-to-many field
+M2M_FACETS = (
+    ("locations", "location"),
+    ("skills", "skills"),
+    ("industries", "industry"),
+    ("education", "edu_qualification"),
+)
+FACET_LIMITS = {"locations": 50, "skills": 50}
+GENERATION_KEY = "job_facets:generation"
+FACETS_TIMEOUT = 60 * 60
+FILTERED_FACETS_TIMEOUT = 5 * 60
+
+
+def _m2m_rows(facet, field_name, job_ids):
+    field = JobPost._meta.get_field(field_name)
+    source = field.m2m_field_name()
+    target = field.m2m_reverse_field_name()
+    return (
+        field.remote_field.through.objects.filter(**{source + "__in": job_ids})
+        .values(
+            facet=Value(facet, output_field=CharField()),
+            value=F(target),
+            term=F(target + "__name"),
+            term_slug=F(target + "__slug"),
+        )
+        .annotate(count=Count(source))
+        .order_by()
+    )
+
+
+def _job_type_rows(job_ids):
+    return (
+        JobPost.objects.filter(id__in=job_ids)
+        .values(
+            facet=Value("job_types", output_field=CharField()),
+            value=Value(0, output_field=IntegerField()),
+            term=F("job_type"),
+            term_slug=F("job_type"),
+        )
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+
+
+def compute_facets(jobs):
+    """Facet counts for the ``jobs`` queryset, in one database query."""
+    job_ids = jobs.order_by().values("id")
+    parts = [_m2m_rows(facet, field_name, job_ids) for facet, field_name in M2M_FACETS]
+    rows = parts[0].union(*parts[1:], _job_type_rows(job_ids), all=True)
+
+    grouped = {facet: [] for facet, _ in M2M_FACETS}
+    job_type_counts = {}
+    for row in rows:
+        if row["facet"] == "job_types":
+            job_type_counts[row["term"]] = row["count"]
+        else:
+            grouped[row["facet"]].append(
+                {
+                    "id": row["value"],
+                    "name": row["term"],
+                    "slug": row["term_slug"],
+                    "count": row["count"],
+                }
+            )
+
+    facets = {}
+    for facet, items in grouped.items():
+        items.sort(key=lambda item: (-item["count"], item["name"]))
+        facets[facet] = items[: FACET_LIMITS.get(facet)]
+    facets["job_types"] = [
+        {"value": value, "label": label, "count": job_type_counts[value]}
+        for value, label in JOB_TYPE
+        if job_type_counts.get(value)
+    ]
+    return facets
+
+
+def _generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        generation = time.time_ns()
+        cache.set(GENERATION_KEY, generation, None)
+    return generation
+
+
+def get_facets(jobs=None, filters=""):
+    """
+    Cached facet counts for live jobs, or for ``jobs`` (the live jobs
+    narrowed by the current filters, identified by the ``filters`` string).
+    """
+    if jobs is None:
+        jobs = JobPost.objects.filter(status="Live")
+    key = cache_key("job_facets", _generation(), filters)
+    timeout = FILTERED_FACETS_TIMEOUT if filters else FACETS_TIMEOUT
+    return cache.get_or_set(key, lambda: compute_facets(jobs), timeout)
+
+
+def invalidate():
+    """Make every cached facet count stale."""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        # in nanoseconds, so invalidations within a second still differ
+        cache.set(GENERATION_KEY, time.time_ns(), None)
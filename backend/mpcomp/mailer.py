@@ -0,0 +1,161 @@
+"""
+Batched dispatch of rendered mails.
+
+Tasks that mail many users collect ``(recipients, subject, html_body)``
+messages in an ``Outbox``, which queues them ``MAIL_BATCH_SIZE`` at a time
+to ``dashboard.tasks.send_email_batch``:
+
+    with mailer.Outbox("job_expiry") as outbox:
+        for job in jobs:
+            outbox.add([job.user.email], subject, rendered)
+
+A batch is sent over one connection of the configured email backend, at no
+more than ``MAIL_SEND_RATE`` messages a second per worker (the SES sending
+rate). Messages that fail are retried in a new task after
+``MAIL_RETRY_DELAY`` seconds, doubling on every retry, up to
+``MAIL_MAX_RETRIES`` times. The outcome of every message is stored as a
+``MailDelivery`` row, in one insert per batch.
+"""
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+
+from peeldb.models import MailDelivery
+
+logger = logging.getLogger(__name__)
+
+MAX_ERROR_LENGTH = 1000
+
+
+def build(recipients, subject, body):
+    """The html ``EmailMessage`` of a message."""
+    if not isinstance(recipients, (list, tuple)):
+        recipients = [recipients]
+    msg = EmailMessage(subject, body, settings.DEFAULT_FROM_EMAIL, list(recipients))
+    msg.content_subtype = "html"
+    return msg
+
+
+def queue(messages, category):
+    """Queue ``messages`` for sending, in tasks of ``MAIL_BATCH_SIZE`` messages."""
+    from dashboard.tasks import send_email_batch
+
+    size = getattr(settings, "MAIL_BATCH_SIZE", 100)
+    messages = list(messages)
+    for start in range(0, len(messages), size):
+        send_email_batch.delay(messages[start : start + size], category)
+
+
+class Outbox:
+    """Collects messages and queues them a batch at a time."""
+
+    def __init__(self, category):
+        self.category = category
+        self.size = getattr(settings, "MAIL_BATCH_SIZE", 100)
+        self.messages = []
+
+    def add(self, recipients, subject, body):
+        if not isinstance(recipients, (list, tuple)):
+            recipients = [recipients]
+        self.messages.append((list(recipients), subject, body))
+        if len(self.messages) >= self.size:
+            self.flush()
+
+    def flush(self):
+        if self.messages:
+            queue(self.messages, self.category)
+            self.messages = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # mails rendered before an error still go out
+        self.flush()
+
+
+def backoff(retries):
+    """Seconds to wait before retry number ``retries`` + 1, with jitter."""
+    delay = getattr(settings, "MAIL_RETRY_DELAY", 60)
+    return delay * 2**retries + random.uniform(0, delay)
+
+
+def send(messages, connection=None):
+    """
+    Send ``messages`` over one connection, paced to ``MAIL_SEND_RATE``;
+    returns ``{position: error}`` of the messages that failed.
+    """
+    rate = getattr(settings, "MAIL_SEND_RATE", 14)
+    interval = 1.0 / rate if rate else 0
+    connection = connection or get_connection(fail_silently=False)
+    errors = {}
+    try:
+        connection.open()
+    except Exception as error:
+        logger.warning("Could not connect to the mail server: %s", error)
+        return {position: str(error) for position in range(len(messages))}
+    try:
+        next_send = time.monotonic()
+        for position, (recipients, subject, body) in enumerate(messages):
+            wait = next_send - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            next_send = max(next_send, time.monotonic()) + interval
+            try:
+                if not connection.send_messages([build(recipients, subject, body)]):
+                    errors[position] = "Not sent"
+            except Exception as error:
+                errors[position] = str(error) or error.__class__.__name__
+    finally:
+        connection.close()
+    return errors
+
+
+def record(messages, category, status, attempts, errors=None):
+    """Store the outcome of ``messages`` in one insert."""
+    errors = errors or {}
+    MailDelivery.objects.bulk_create(
+        [
+            MailDelivery(
+                category=category,
+                recipients=list(recipients),
+                subject=subject[:500],
+                status=status,
+                attempts=attempts,
+                error=errors.get(position, "")[:MAX_ERROR_LENGTH],
+            )
+            for position, (recipients, subject, body) in enumerate(messages)
+        ]
+    )
+
+
+def dispatch(messages, category, attempt=1, final=True):
+    """
+    Send a batch and record it. Failures are recorded only on the ``final``
+    attempt; returns the failed messages, for the caller to retry.
+    """
+    errors = send(messages)
+    sent = [message for position, message in enumerate(messages) if position not in errors]
+    failed = [messages[position] for position in sorted(errors)]
+    if sent:
+        record(sent, category, "Sent", attempt)
+    if errors:
+        logger.warning(
+            "%s of %s %s mails failed on attempt %s",
+            len(errors),
+            len(messages),
+            category,
+            attempt,
+        )
+        if final:
+            record(
+                failed,
+                category,
+                "Failed",
+                attempt,
+                {index: errors[position] for index, position in enumerate(sorted(errors))},
+            )
+    return failed
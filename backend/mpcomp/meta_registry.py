@@ -0,0 +1,84 @@
+"""
+Process-local registry of the ``MetaData`` SEO templates.
+
+Listing and detail pages render their meta title, description and h1 from
+the Django template strings stored in ``MetaData`` rows. Querying the row and
+compiling three ``Template`` objects on every request is wasted work, so all
+rows are loaded once and compiled up front; ``render_meta()`` then only
+renders.
+
+The registry is built lazily on first use, dropped by ``invalidate()`` (wired
+to ``post_save``/``post_delete`` in ``peeldb.signals``) and rebuilt after
+``META_REGISTRY_TTL`` seconds so that edits made in other processes show up
+too.
+"""
+import logging
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.template import Context, Template, TemplateSyntaxError
+
+from peeldb.models import MetaData
+
+logger = logging.getLogger(__name__)
+
+META_FIELDS = ("meta_title", "meta_description", "h1_tag")
+
+RenderedMeta = namedtuple("RenderedMeta", ["title", "description", "h1_tag"])
+EMPTY_META = RenderedMeta("", "", "")
+
+
+def _compile(row, field):
+    try:
+        return Template(getattr(row, field))
+    except TemplateSyntaxError:
+        logger.exception("Invalid %s template in MetaData %r", field, row.name)
+        return Template("")
+
+
+def _build():
+    registry = {}
+    for row in MetaData.objects.order_by("id"):
+        # pages used the first row when a name was duplicated
+        if row.name not in registry:
+            registry[row.name] = tuple(_compile(row, field) for field in META_FIELDS)
+    return registry
+
+
+_lock = threading.Lock()
+_registry = None
+_built_at = 0
+
+
+def get_registry():
+    """``{name: (title, description, h1_tag) templates}``, built if needed."""
+    global _registry, _built_at
+    ttl = getattr(settings, "META_REGISTRY_TTL", 15 * 60)
+    registry = _registry
+    if registry is not None and time.monotonic() - _built_at < ttl:
+        return registry
+    with _lock:
+        if _registry is None or time.monotonic() - _built_at >= ttl:
+            _registry = _build()
+            _built_at = time.monotonic()
+        return _registry
+
+
+def invalidate():
+    global _registry
+    with _lock:
+        _registry = None
+
+
+def render_meta(name, context=None):
+    """
+    Render the title, description and h1 of the ``MetaData`` row ``name``
+    with ``context``; all three are empty strings when there is no such row.
+    """
+    templates = get_registry().get(name)
+    if templates is None:
+        return EMPTY_META
+    context = Context(context or {})
+    return RenderedMeta(*(template.render(context) for template in templates))
@@ -0,0 +1,181 @@
+"""
+Response cache for the public job listing pages, for anonymous visitors.
+
+Anonymous ``GET`` responses of views decorated with ``cache_anonymous_page``
+are cached by full path (the SEO URLs carry the page number) and by social
+referer, which toggles the share pop-up. While rendering, a view tags its
+page with the taxonomy rows and company it lists (``tag_page``); pages
+without tags get ``ALL_JOBS_TAG``.
+
+Invalidation is by tag: ``invalidate_tags()`` stamps each tag with the
+current time, and a cached page is only served when it was rendered after
+every one of its tags was last stamped. ``peeldb.signals`` invalidates the
+tags of a job whenever it goes live or stops being live, and
+``peeldb.search_queue.drain`` does so again once its changes are in the
+search index that the listings are built from.
+
+Pages are stored with their headers. The CSRF token of a page's forms is
+stored as a placeholder, replaced on every hit with the visitor's own token,
+which also has ``CsrfViewMiddleware`` set their CSRF cookie.
+"""
+import re
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db.models import Model, QuerySet
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+
+from mpcomp.cache import cache_key
+from mpcomp.views import get_social_referer
+
+ALL_JOBS_TAG = "jobs"
+# job card fragments cached by templates/job_list.html and company_job_list.html
+JOB_CARD_FRAGMENTS = ("job_card", "job_card_details", "company_job_card")
+# the hidden input rendered by {% csrf_token %}
+CSRF_INPUT = re.compile(rb'name="csrfmiddlewaretoken" value="([^"]*)"')
+CSRF_PLACEHOLDER = b"page-cache-csrf-token"
+
+
+def _timeout():
+    return getattr(settings, "PAGE_CACHE_TIMEOUT", 60 * 60)
+
+
+def _tag_key(tag):
+    return "page_tag:" + tag
+
+
+def object_tags(*objects):
+    """
+    Tags (``"<model>:<pk>"``) of model instances and querysets; empty values,
+    such as the ``""`` some views use for "no filter", are skipped.
+    """
+    tags = set()
+    for value in objects:
+        if isinstance(value, QuerySet):
+            model_name = value.model._meta.model_name
+            tags.update(
+                "%s:%s" % (model_name, pk) for pk in value.values_list("pk", flat=True)
+            )
+        elif isinstance(value, Model):
+            tags.add("%s:%s" % (value._meta.model_name, value.pk))
+    return tags
+
+
+def tag_page(request, *objects):
+    """Tag the page being rendered for ``request`` with ``objects``."""
+    if hasattr(request, "page_cache_tags"):
+        request.page_cache_tags.update(object_tags(*objects))
+
+
+def invalidate_tags(tags):
+    if tags:
+        now = time.time()
+        cache.set_many({_tag_key(tag): now for tag in tags}, _timeout())
+
+
+def taxonomy_tags(linked, company_ids=()):
+    """
+    Tags of ``{model: ids}`` (as returned by ``peeldb.job_counts.taxonomy_ids``)
+    and of companies, plus ``ALL_JOBS_TAG``.
+    """
+    tags = {ALL_JOBS_TAG}
+    for model, ids in linked.items():
+        tags.update("%s:%s" % (model._meta.model_name, pk) for pk in ids)
+    tags.update("company:%s" % pk for pk in company_ids if pk)
+    return tags
+
+
+def invalidate_jobs(job_ids):
+    """Invalidate the pages listing any of the given jobs, and their cards."""
+    from peeldb.job_counts import taxonomy_ids
+    from peeldb.models import JobPost
+
+    companies = JobPost.objects.filter(pk__in=job_ids).values_list("company_id", flat=True)
+    invalidate_tags(taxonomy_tags(taxonomy_ids(job_ids), set(companies)))
+    invalidate_job_cards(job_ids)
+
+
+def invalidate_job_cards(job_ids):
+    cache.delete_many(
+        [
+            make_template_fragment_key(fragment, [job_id])
+            for job_id in job_ids
+            for fragment in JOB_CARD_FRAGMENTS
+        ]
+    )
+
+
+def _is_fresh(entry):
+    stamps = cache.get_many([_tag_key(tag) for tag in entry["tags"]])
+    return all(stamp < entry["rendered_at"] for stamp in stamps.values())
+
+
+def _shared_content(request, response):
+    """
+    Content of ``response`` with its CSRF token replaced by the placeholder,
+    or ``None`` when the page used a token that is not in a form's input.
+    """
+    content = response.content
+    if not request.META.get("CSRF_COOKIE_NEEDS_UPDATE"):
+        return content
+    match = CSRF_INPUT.search(content)
+    if match is None:
+        return None
+    content = content.replace(match.group(1), CSRF_PLACEHOLDER)
+    if any(token != CSRF_PLACEHOLDER for token in CSRF_INPUT.findall(content)):
+        return None
+    return content
+
+
+def _cached_response(request, entry):
+    content = entry["content"]
+    if CSRF_PLACEHOLDER in content:
+        content = content.replace(CSRF_PLACEHOLDER, get_token(request).encode())
+    return HttpResponse(content, headers=entry["headers"])
+
+
+def cache_anonymous_page(view):
+    """Serve anonymous GETs of ``view`` from the tag-invalidated page cache."""
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method != "GET" or request.user.is_authenticated:
+            return view(request, *args, **kwargs)
+        key = cache_key(
+            "anonymous_page", request.get_full_path(), get_social_referer(request)
+        )
+        entry = cache.get(key)
+        if entry is not None and _is_fresh(entry):
+            return _cached_response(request, entry)
+
+        rendered_at = time.time()
+        request.page_cache_tags = set()
+        response = view(request, *args, **kwargs)
+        if (
+            response.status_code == 200
+            and not response.streaming
+            and not response.cookies
+        ):
+            content = _shared_content(request, response)
+            if content is not None:
+                cache.set(
+                    key,
+                    {
+                        "content": content,
+                        "headers": {
+                            header: value
+                            for header, value in response.items()
+                            if header.lower() != "content-length"
+                        },
+                        "tags": request.page_cache_tags or {ALL_JOBS_TAG},
+                        "rendered_at": rendered_at,
+                    },
+                    _timeout(),
+                )
+        return response
+
+    return wrapper
@@ -0,0 +1,266 @@
+"""
+Keyset ("seek") pagination for the public listing pages.
+
+``LIMIT n OFFSET m`` makes the database (or Elasticsearch) walk past every
+row before the requested page, and the page-number SEO URLs (``/page/N/``)
+are crawled all the way down. ``KeysetPaginator`` instead orders the results
+by a unique key — ``(published_on, id)`` for jobs — and fetches a page with
+``WHERE key < last key of the previous page``, so page 200 costs the same as
+page 1.
+
+Page numbers are mapped to keys through *anchors*: the key of the last row
+before each page. Anchors are cached per listing, and every served page
+records the anchor of the next one, so walking the pages in order never
+scans more than a page. Jumping ahead scans just the key columns from the
+nearest known anchor. The total is cached as well; both expire after
+``LISTING_PAGINATION_TIMEOUT`` seconds, so they are approximate while jobs
+come and go.
+"""
+import base64
+import binascii
+import json
+import math
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, FieldDoesNotExist, ValidationError
+from django.db.models import F, Q
+from django.utils.functional import cached_property
+from haystack.query import SQ, SearchQuerySet
+
+from mpcomp.cache import cache_key
+
+JOB_ORDERING = ("-published_on", "-id")
+# django_id is a keyword in the index: it sorts as text, which is still a
+# unique tie-breaker, and it needs no extra indexed field
+SEARCH_JOB_ORDERING = ("-published_on", "-django_id")
+
+
+class _Source:
+    """Ordering, seek conditions and key extraction for one kind of results."""
+
+    def __init__(self, results, ordering):
+        self.fields = [name.lstrip("-") for name in ordering]
+        self.descending = [name.startswith("-") for name in ordering]
+
+    def seek(self, key, offset):
+        """
+        ``(results, skip)``: the results following ``key``, or all results
+        and ``offset`` to skip when no seek condition can express the key.
+        """
+        if key is None:
+            return self.results, offset
+        condition = self.after(key)
+        if condition is None:
+            return self.results, offset
+        return self.narrow(condition), 0
+
+    def rows(self, start, offset, limit):
+        results, skip = self.seek(start, offset)
+        return list(results[skip : skip + limit])
+
+    def keys(self, start, offset, limit):
+        results, skip = self.seek(start, offset)
+        return [tuple(key) for key in self.key_values(results)[skip : skip + limit]]
+
+
+class _QuerySetSource(_Source):
+    def __init__(self, queryset, ordering):
+        super().__init__(queryset, ordering)
+        self.nullable = []
+        for name in self.fields:
+            try:
+                self.nullable.append(queryset.model._meta.get_field(name).null)
+            except FieldDoesNotExist:
+                # an annotation such as a count
+                self.nullable.append(False)
+        self.results = queryset.order_by(
+            *[
+                F(name).desc(nulls_last=True) if descending else F(name).asc(nulls_last=True)
+                for name, descending in zip(self.fields, self.descending)
+            ]
+        )
+
+    def signature(self):
+        sql, params = self.results.query.sql_with_params()
+        return "%s|%r" % (sql, params)
+
+    def count(self):
+        return self.results.count()
+
+    def narrow(self, condition):
+        return self.results.filter(condition)
+
+    def after(self, key):
+        condition = None
+        equal = Q()
+        for name, descending, nullable, value in zip(
+            self.fields, self.descending, self.nullable, key
+        ):
+            if value is None:
+                # nulls sort last, so only other nulls can follow a null
+                equal &= Q(**{name + "__isnull": True})
+                continue
+            term = Q(**{name + ("__lt" if descending else "__gt"): value})
+            if nullable:
+                term |= Q(**{name + "__isnull": True})
+            term = equal & term
+            condition = term if condition is None else condition | term
+            equal &= Q(**{name: value})
+        return condition if condition is not None else Q(pk__in=[])
+
+    def key_values(self, results):
+        return results.values_list(*self.fields)
+
+    def key(self, row):
+        return tuple(getattr(row, name) for name in self.fields)
+
+
+class _SearchQuerySetSource(_Source):
+    # search result attribute holding each sort field
+    RESULT_ATTRIBUTES = {"django_id": "pk"}
+
+    def __init__(self, sqs, ordering):
+        super().__init__(sqs, ordering)
+        self.attributes = [self.RESULT_ATTRIBUTES.get(name, name) for name in self.fields]
+        results = sqs._clone()
+        results.query.clear_order_by()
+        self.results = results.order_by(*ordering)
+
+    def signature(self):
+        query = self.results.query
+        return "%s|%s|%s" % (
+            query.build_query(),
+            query.order_by,
+            sorted(model._meta.label for model in query.models),
+        )
+
+    def count(self):
+        return self.results.count()
+
+    def narrow(self, condition):
+        # filter() would OR an OR-ed condition with the existing filters
+        return self.results.filter_and(condition)
+
+    def after(self, key):
+        if None in key:
+            # documents without the field sort last and can't be range queried
+            return None
+        condition = None
+        equal = None
+        for name, descending, value in zip(self.fields, self.descending, key):
+            term = SQ(**{name + ("__lt" if descending else "__gt"): value})
+            if equal is not None:
+                term = equal & term
+            condition = term if condition is None else condition | term
+            exact = SQ(**{name + "__exact": value})
+            equal = exact if equal is None else equal & exact
+        return condition
+
+    def key_values(self, results):
+        return results.values_list(*self.attributes)
+
+    def key(self, row):
+        return tuple(getattr(row, name) for name in self.attributes)
+
+
+class KeysetPaginator:
+    """
+    Paginate a job ``QuerySet`` or ``SearchQuerySet`` by a unique ordering
+    (``JOB_ORDERING`` / ``SEARCH_JOB_ORDERING`` unless given).
+    """
+
+    def __init__(self, results, per_page, ordering=None, timeout=None):
+        if isinstance(results, SearchQuerySet):
+            self.source = _SearchQuerySetSource(results, ordering or SEARCH_JOB_ORDERING)
+        else:
+            self.source = _QuerySetSource(results, ordering or JOB_ORDERING)
+        self.per_page = per_page
+        self.timeout = timeout or getattr(settings, "LISTING_PAGINATION_TIMEOUT", 10 * 60)
+        try:
+            self.key = cache_key("listing", self.source.signature())
+        except EmptyResultSet:
+            self.key = None
+
+    @cached_property
+    def count(self):
+        """Cached total of the results; may lag behind for ``timeout`` seconds."""
+        if self.key is None:
+            return 0
+        return cache.get_or_set(self.key + ":count", self.source.count, self.timeout)
+
+    @cached_property
+    def num_pages(self):
+        return int(math.ceil(float(self.count) / self.per_page))
+
+    def page(self, number):
+        """The results on page ``number`` (1-based), as a list."""
+        if self.key is None:
+            return []
+        per_page = self.per_page
+        anchors_key = self.key + ":anchors"
+        anchors = cache.get(anchors_key) or {}
+        if number > 1 and number not in anchors:
+            known = max((page for page in anchors if page < number), default=1)
+            keys = self.source.keys(
+                anchors.get(known), (known - 1) * per_page, (number - known) * per_page
+            )
+            for page in range(known + 1, number + 1):
+                position = (page - known) * per_page - 1
+                if position >= len(keys):
+                    break
+                anchors[page] = keys[position]
+            if number not in anchors:
+                cache.set(anchors_key, anchors, self.timeout)
+                return []
+        rows = self.source.rows(anchors.get(number), (number - 1) * per_page, per_page)
+        if len(rows) == per_page:
+            anchors[number + 1] = self.source.key(rows[-1])
+        cache.set(anchors_key, anchors, self.timeout)
+        return rows
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class CursorPaginator:
+    """
+    Cursor pagination of a ``QuerySet`` for the API: ``page(cursor)`` returns
+    the rows after the opaque ``cursor`` (from the start without one) and the
+    cursor of the next page, ``None`` on the last page. A page is one seek
+    query on the unique ``ordering``, however deep it is.
+    """
+
+    def __init__(self, queryset, per_page, ordering):
+        self.source = _QuerySetSource(queryset, ordering)
+        self.model = queryset.model
+        self.per_page = per_page
+
+    def encode(self, key):
+        values = [
+            value.isoformat() if isinstance(value, date) else value for value in key
+        ]
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def decode(self, cursor):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if len(values) != len(self.source.fields):
+                raise InvalidCursor(cursor)
+            fields = [self.model._meta.get_field(name) for name in self.source.fields]
+            return tuple(
+                None if value is None else field.to_python(value)
+                for field, value in zip(fields, values)
+            )
+        except (binascii.Error, ValueError, TypeError, ValidationError):
+            raise InvalidCursor(cursor)
+
+    def page(self, cursor=None):
+        key = self.decode(cursor) if cursor else None
+        rows = self.source.rows(key, 0, self.per_page + 1)
+        if len(rows) <= self.per_page:
+            return rows, None
+        rows = rows[: self.per_page]
+        return rows, self.encode(self.source.key(rows[-1]))
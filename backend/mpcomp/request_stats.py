@@ -0,0 +1,363 @@
+"""
+Per-request instrumentation: SQL queries and their time, cache hits and
+misses, Elasticsearch requests and template rendering time.
+
+Nothing is collected unless ``REQUEST_STATS`` is on, which adds
+``jobsp.middlewares.RequestStatsMiddleware`` and switches the template and
+search engines to the timed ones below. DRF views can also mix in
+``RequestStatsMixin``, which collects their stats without the middleware.
+Each instrumented response gets a ``Server-Timing`` header, readable in the
+browser's network panel, and the stats are added up per URL name and
+exported for Prometheus by ``psite.views.request_metrics``.
+
+Views can declare a query budget, ``query_budget`` on a DRF view class or
+the ``@query_budget(n)`` decorator on a function view. A request that runs
+more SQL queries than its view's budget logs a warning, or raises
+``QueryBudgetExceeded`` with ``QUERY_BUDGET_STRICT`` on, which fails the test
+that made the request. Strict budgets are checked also without the
+middleware, so tests can call the views directly.
+
+The totals are counted in the process and added to the shared cache every
+``REQUEST_STATS_FLUSH_INTERVAL`` seconds, so that every worker's requests
+are exported whichever worker is scraped.
+"""
+import functools
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template
+from elasticsearch import Urllib3HttpConnection
+from haystack.backends.elasticsearch7_backend import (
+    Elasticsearch7SearchBackend,
+    Elasticsearch7SearchEngine,
+)
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar("request_stats", default=None)
+
+# counter name and help text of each exported metric, in export order
+METRICS = {
+    "requests": "Requests served",
+    "db_queries": "SQL queries run",
+    "db_seconds": "Time spent in SQL queries",
+    "cache_hits": "Cache lookups that found a value",
+    "cache_misses": "Cache lookups that found nothing",
+    "search_requests": "Elasticsearch requests",
+    "search_seconds": "Time spent in Elasticsearch requests",
+    "template_seconds": "Time spent rendering templates",
+    "seconds": "Time spent serving requests",
+    "query_budget_exceeded": "Requests over their view's query budget",
+}
+NAMES_KEY = "request_stats:views"
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class RequestStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.search_requests = 0
+        self.search_time = 0.0
+        self.template_time = 0.0
+        self._rendering = False
+
+    @property
+    def duration(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self):
+        """``Server-Timing`` header value, durations in milliseconds."""
+        return ", ".join(
+            [
+                'db;dur=%.1f;desc="%s queries"'
+                % (self.db_time * 1000, self.db_queries),
+                'cache;desc="%s hits, %s misses"'
+                % (self.cache_hits, self.cache_misses),
+                'search;dur=%.1f;desc="%s requests"'
+                % (self.search_time * 1000, self.search_requests),
+                "templates;dur=%.1f" % (self.template_time * 1000),
+                "total;dur=%.1f" % (self.duration * 1000),
+            ]
+        )
+
+
+def current():
+    """Stats of the request being served, or ``None`` when not collecting."""
+    return _current.get()
+
+
+def record_cache(hits, misses=0):
+    stats = _current.get()
+    if stats is not None:
+        stats.cache_hits += hits
+        stats.cache_misses += misses
+
+
+def _time_query(execute, sql, params, many, context):
+    stats = _current.get()
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        if stats is not None:
+            stats.db_queries += 1
+            stats.db_time += time.perf_counter() - started
+
+
+@contextmanager
+def collect():
+    """
+    Collect the stats of the block into the ``RequestStats`` it yields; a
+    block inside another one adds to the outer stats.
+    """
+    stats = _current.get()
+    if stats is not None:
+        yield stats
+        return
+    stats = RequestStats()
+    token = _current.set(stats)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(_time_query))
+            yield stats
+    finally:
+        _current.reset(token)
+
+
+def query_budget(queries):
+    """
+    Declare the most SQL queries a function view may run per request. With
+    ``QUERY_BUDGET_STRICT`` on, the view checks it also without the
+    middleware, so tests calling the view fail when it is exceeded.
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        def budgeted(request, *args, **kwargs):
+            if current() is not None or not getattr(
+                settings, "QUERY_BUDGET_STRICT", False
+            ):
+                return view(request, *args, **kwargs)
+            with collect() as stats:
+                response = view(request, *args, **kwargs)
+            return finish(request, response, stats, queries)
+
+        budgeted.query_budget = queries
+        return budgeted
+
+    return decorator
+
+
+def view_budget(request):
+    """Query budget of the view resolved for ``request``, if it declares one."""
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return None
+    view = match.func
+    budget = getattr(view, "query_budget", None)
+    if budget is None:
+        # class based views: DRF's as_view() sets .cls, Django's .view_class
+        view_class = getattr(view, "cls", None) or getattr(view, "view_class", None)
+        budget = getattr(view_class, "query_budget", None)
+    return budget
+
+
+def _view_name(request):
+    match = getattr(request, "resolver_match", None)
+    return match.view_name if match is not None else "unresolved"
+
+
+def finish(request, response, stats, budget=None):
+    """
+    Check the request against its view's query budget, set the
+    ``Server-Timing`` header and count the stats.
+    """
+    name = _view_name(request)
+    if budget is None:
+        budget = view_budget(request)
+    exceeded = budget is not None and stats.db_queries > budget
+    response["Server-Timing"] = stats.server_timing()
+    record(name, stats, exceeded)
+    if exceeded:
+        message = "%s ran %s SQL queries, over its budget of %s" % (
+            name,
+            stats.db_queries,
+            budget,
+        )
+        if getattr(settings, "QUERY_BUDGET_STRICT", False):
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+    return response
+
+
+class RequestStatsMixin:
+    """
+    Collect the stats of a DRF view's requests, also without the middleware,
+    and hold them to the view's ``query_budget``.
+    """
+
+    query_budget = None
+
+    def dispatch(self, request, *args, **kwargs):
+        if current() is not None:
+            # the middleware collects and checks the request
+            return super().dispatch(request, *args, **kwargs)
+        with collect() as stats:
+            response = super().dispatch(request, *args, **kwargs)
+        return finish(request, response, stats, self.query_budget)
+
+
+# Per process totals, ``{view name: Counter(metric: value)}``, with seconds
+# counted in microseconds so the shared cache can add them up with incr().
+_totals = defaultdict(Counter)
+_totals_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def _cache():
+    return caches[getattr(settings, "REQUEST_STATS_CACHE", "shared")]
+
+
+def record(name, stats, exceeded=False):
+    global _last_flush
+    counts = {
+        "requests": 1,
+        "db_queries": stats.db_queries,
+        "db_seconds": int(stats.db_time * 1e6),
+        "cache_hits": stats.cache_hits,
+        "cache_misses": stats.cache_misses,
+        "search_requests": stats.search_requests,
+        "search_seconds": int(stats.search_time * 1e6),
+        "template_seconds": int(stats.template_time * 1e6),
+        "seconds": int(stats.duration * 1e6),
+        "query_budget_exceeded": int(exceeded),
+    }
+    with _totals_lock:
+        _totals[name].update(counts)
+        interval = getattr(settings, "REQUEST_STATS_FLUSH_INTERVAL", 10)
+        if time.monotonic() - _last_flush < interval:
+            return
+        totals = dict(_totals)
+        _totals.clear()
+        _last_flush = time.monotonic()
+    flush(totals)
+
+
+def _key(name, metric):
+    return "request_stats:%s:%s" % (name, metric)
+
+
+def flush(totals):
+    """Add ``{view name: Counter}`` totals to the shared cache."""
+    cache = _cache()
+    try:
+        names = cache.get(NAMES_KEY) or set()
+        if not names.issuperset(totals):
+            cache.set(NAMES_KEY, names | set(totals), None)
+        for name, counts in totals.items():
+            for metric, value in counts.items():
+                if value and not cache.add(_key(name, metric), value, None):
+                    cache.incr(_key(name, metric), value)
+    except ValueError:
+        # a counter was evicted between add() and incr()
+        logger.warning("Lost request stats while flushing them to the cache")
+
+
+def _label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def export():
+    """The per view totals in the Prometheus text format."""
+    cache = _cache()
+    names = sorted(cache.get(NAMES_KEY) or ())
+    values = cache.get_many(
+        [_key(name, metric) for name in names for metric in METRICS]
+    )
+    lines = []
+    for metric, description in METRICS.items():
+        full_name = "view_%s_total" % metric
+        lines.append("# HELP %s %s" % (full_name, description))
+        lines.append("# TYPE %s counter" % full_name)
+        for name in names:
+            value = values.get(_key(name, metric), 0)
+            if metric.endswith("seconds"):
+                value = "%.6f" % (value / 1e6)
+            lines.append('%s{view="%s"} %s' % (full_name, _label(name), value))
+    return "\n".join(lines) + "\n"
+
+
+class _TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        stats = _current.get()
+        if stats is None or stats._rendering:
+            return super().render(context, request)
+        # templates rendered while rendering (render_to_string in tags) are
+        # part of the outer template's time
+        stats._rendering = True
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats.template_time += time.perf_counter() - started
+            stats._rendering = False
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Django template engine that times rendering into the request stats."""
+
+    def from_string(self, template_code):
+        return _TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        return _TimedTemplate(super().get_template(template_name).template, self)
+
+
+def _record_search(duration):
+    stats = _current.get()
+    if stats is not None:
+        stats.search_requests += 1
+        stats.search_time += duration
+
+
+class _TimedConnection(Urllib3HttpConnection):
+    def log_request_success(
+        self, method, full_url, path, body, status_code, response, duration
+    ):
+        _record_search(duration)
+        super().log_request_success(
+            method, full_url, path, body, status_code, response, duration
+        )
+
+    def log_request_fail(self, method, full_url, path, body, duration, **kwargs):
+        _record_search(duration)
+        super().log_request_fail(method, full_url, path, body, duration, **kwargs)
+
+
+class _TimedSearchBackend(Elasticsearch7SearchBackend):
+    def __init__(self, connection_alias, **connection_options):
+        kwargs = dict(connection_options.get("KWARGS", {}))
+        kwargs.setdefault("connection_class", _TimedConnection)
+        connection_options["KWARGS"] = kwargs
+        super().__init__(connection_alias, **connection_options)
+
+
+class TimedElasticsearchEngine(Elasticsearch7SearchEngine):
+    """Haystack Elasticsearch 7 engine that times requests into the request stats."""
+
+    backend = _TimedSearchBackend
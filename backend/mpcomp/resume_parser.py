@@ -0,0 +1,253 @@
+"""
+Resume parsing: the text of an uploaded resume, and the email, mobile number
+and skills found in it.
+
+Uploads don't wait for it: ``queue(user)`` marks the user's resume
+``Pending`` and queues ``dashboard.tasks.parse_resume``, on the
+``RESUME_PARSE_QUEUE`` Celery queue when it is set, so a separate worker pool
+can take them. The task reads the resume from storage and stores its text,
+``resume_data`` (``{"email", "mobile", "skills"}``, skill ids) and the
+``resume_parse_status`` on the user, and fills in the user's mobile number if
+they have none.
+
+DOCX, ODT and RTF files are parsed in memory. PDF and DOC files go through
+``pdftotext`` and ``antiword``, run on a temporary copy (never the uploaded
+name) and killed after ``RESUME_PARSE_TIMEOUT`` seconds.
+
+Skills are matched by looking the text's words, and runs of up to
+``MAX_SKILL_WORDS`` words, up in the active skill names, which are loaded once
+per process every ``RESUME_SKILLS_REFRESH`` seconds.
+"""
+import io
+import logging
+import re
+import subprocess
+import tempfile
+import time
+import zipfile
+from collections import namedtuple
+from datetime import datetime
+
+from django.conf import settings
+from django.db import transaction
+from lxml import etree
+
+from peeldb import search_queue
+from peeldb.models import Skill, User
+
+logger = logging.getLogger(__name__)
+
+ParsedResume = namedtuple("ParsedResume", "text email mobile skills")
+
+EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+# 10 digits, optionally after a +91/91/0 prefix and with one space or dash
+# in the middle, as Indian mobile numbers are written; not part of a longer
+# run of digit groups, such as an id or account number
+MOBILE = re.compile(
+    r"(?<![\d+])(?<!\d[ -])(?:\+?91[\s-]?|0)?(\d{5})[\s-]?(\d{5})(?![ -]?\d)"
+)
+WORD = re.compile(r"[\w+#]+(?:\.[\w+#]+)*")
+# font, colour and style tables, and "{\\*..." destinations, with one level of
+# nested groups
+RTF_IGNORED = re.compile(
+    r"\{\\(?:\*|fonttbl|colortbl|stylesheet|info)[^{}]*(?:\{[^{}]*\}[^{}]*)*\}"
+)
+RTF_CONTROL = re.compile(r"\\(?:[a-z]+-?\d* ?|'[0-9a-f]{2}|.)|[{}]", re.I)
+RTF_PARAGRAPH = re.compile(r"\\(?:par|line)\b", re.I)
+MAX_SKILL_WORDS = 4
+# the most bytes a document's XML may inflate to
+MAX_XML_SIZE = 20 * 1024 * 1024
+
+WORD_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+ODT_NAMESPACE = "{urn:oasis:names:tc:opendocument:xmlns:text:1.0}"
+XML_PARSER = etree.XMLParser(resolve_entities=False, no_network=True, huge_tree=False)
+
+
+class ResumeParseError(ValueError):
+    pass
+
+
+def _zipped_xml(data, name):
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(data))
+        if archive.getinfo(name).file_size > MAX_XML_SIZE:
+            raise ResumeParseError("%s is too large" % name)
+        return etree.fromstring(archive.read(name), XML_PARSER)
+    except (zipfile.BadZipFile, KeyError, etree.XMLSyntaxError) as error:
+        raise ResumeParseError(error)
+
+
+def _docx_text(data):
+    document = _zipped_xml(data, "word/document.xml")
+    paragraphs = []
+    for paragraph in document.iter(WORD_NAMESPACE + "p"):
+        text = "".join(
+            "\t" if element.tag == WORD_NAMESPACE + "tab" else element.text or ""
+            for element in paragraph.iter(WORD_NAMESPACE + "t", WORD_NAMESPACE + "tab")
+        )
+        if text:
+            paragraphs.append(text)
+    return "\n\n".join(paragraphs)
+
+
+def _odt_text(data):
+    document = _zipped_xml(data, "content.xml")
+    paragraphs = [
+        "".join(element.itertext())
+        for element in document.iter(ODT_NAMESPACE + "p", ODT_NAMESPACE + "h")
+    ]
+    return "\n\n".join(paragraph for paragraph in paragraphs if paragraph)
+
+
+def _rtf_text(data):
+    text = RTF_IGNORED.sub("", data.decode("latin-1"))
+    text = RTF_PARAGRAPH.sub("\n", text)
+    return RTF_CONTROL.sub("", text).strip()
+
+
+def _run(command, data, suffix):
+    """stdout of ``command``, with ``{path}`` replaced by a copy of ``data``."""
+    timeout = getattr(settings, "RESUME_PARSE_TIMEOUT", 30)
+    with tempfile.NamedTemporaryFile(suffix=suffix) as file:
+        file.write(data)
+        file.flush()
+        try:
+            result = subprocess.run(
+                [argument.format(path=file.name) for argument in command],
+                capture_output=True,
+                timeout=timeout,
+            )
+        except (OSError, subprocess.TimeoutExpired) as error:
+            raise ResumeParseError(error)
+    if result.returncode != 0:
+        raise ResumeParseError(result.stderr.decode("utf-8", "ignore")[:500])
+    return result.stdout.decode("utf-8", "ignore")
+
+
+def _pdf_text(data):
+    # text file "-" is stdout
+    return _run(["pdftotext", "-q", "-enc", "UTF-8", "{path}", "-"], data, ".pdf")
+
+
+def _doc_text(data):
+    return _run(["antiword", "{path}"], data, ".doc")
+
+
+EXTRACTORS = {
+    "pdf": _pdf_text,
+    "doc": _doc_text,
+    "docx": _docx_text,
+    "odt": _odt_text,
+    "rtf": _rtf_text,
+}
+
+
+def extract_text(data, name):
+    """Text of resume file contents ``data``, of the format ``name`` ends in."""
+    extension = name.rsplit(".", 1)[-1].lower()
+    if extension not in EXTRACTORS:
+        raise ResumeParseError("Unsupported resume format: %s" % extension)
+    return EXTRACTORS[extension](data)
+
+
+def find_email(text):
+    match = EMAIL.search(text)
+    return match.group(0) if match else ""
+
+
+def find_mobile(text):
+    match = MOBILE.search(text)
+    return match.group(1) + match.group(2) if match else ""
+
+
+def _words(text):
+    return [word.lower() for word in WORD.findall(text)]
+
+
+_skills = {"names": None, "loaded": 0}
+
+
+def skill_names():
+    """``{lower-cased words of the name: skill id}`` of the active skills."""
+    refresh = getattr(settings, "RESUME_SKILLS_REFRESH", 60 * 60)
+    if _skills["names"] is None or time.monotonic() - _skills["loaded"] > refresh:
+        names = {}
+        for skill_id, name in Skill.objects.filter(status="Active").values_list(
+            "id", "name"
+        ):
+            words = tuple(_words(name))
+            # single letters (C, R) match initials and list markers
+            if words and len(words) <= MAX_SKILL_WORDS and len(" ".join(words)) > 1:
+                names.setdefault(words, skill_id)
+        _skills.update(names=names, loaded=time.monotonic())
+    return _skills["names"]
+
+
+def find_skills(text, names=None):
+    """Ids of the skills named in ``text``, in order of first mention."""
+    names = skill_names() if names is None else names
+    words = _words(text)
+    found = {}
+    for start in range(len(words)):
+        for length in range(MAX_SKILL_WORDS, 0, -1):
+            skill_id = names.get(tuple(words[start : start + length]))
+            if skill_id is not None:
+                found.setdefault(skill_id, None)
+                break
+    return list(found)
+
+
+def parse(data, name, skills=True):
+    """``ParsedResume`` of resume file contents ``data`` named ``name``."""
+    text = extract_text(data, name)
+    return ParsedResume(
+        text=text,
+        email=find_email(text),
+        mobile=find_mobile(text),
+        skills=find_skills(text) if skills else [],
+    )
+
+
+def queue(user):
+    """Mark the user's resume pending and parse it once the upload is committed."""
+    from dashboard.tasks import parse_resume
+
+    user.resume_parse_status = "Pending"
+    User.objects.filter(id=user.id).update(resume_parse_status="Pending")
+    transaction.on_commit(
+        lambda: parse_resume.apply_async(
+            (user.id,), queue=getattr(settings, "RESUME_PARSE_QUEUE", None)
+        )
+    )
+
+
+def parse_user_resume(user_id):
+    """Parse the user's resume into their profile; returns the ``ParsedResume``."""
+    user = User.objects.filter(id=user_id).first()
+    if user is None or not user.resume:
+        return None
+    # a resume uploaded while this one was parsed is parsed by its own task
+    current = User.objects.filter(id=user_id, resume=user.resume.name)
+    current.update(resume_parse_status="Parsing")
+    try:
+        with user.resume.open("rb") as file:
+            parsed = parse(file.read(), user.resume.name)
+    except (ResumeParseError, OSError) as error:
+        logger.warning("Could not parse resume of user %s: %s", user_id, error)
+        current.update(resume_parse_status="Failed", resume_parsed_on=datetime.now())
+        return None
+    current.update(
+        resume_text=parsed.text,
+        resume_data={
+            "email": parsed.email,
+            "mobile": parsed.mobile,
+            "skills": parsed.skills,
+        },
+        resume_parse_status="Done",
+        resume_parsed_on=datetime.now(),
+    )
+    if parsed.mobile and not user.mobile:
+        current.update(mobile=parsed.mobile)
+    # the resume text is in the candidate's search document
+    search_queue.enqueue(User, [user_id])
+    return parsed
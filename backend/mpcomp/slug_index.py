@@ -0,0 +1,164 @@
+"""
+Process-local slug index for Skill, City, Qualification and State.
+
+URL slugs such as ``python-django-jobs`` or ``jobs-in-new-delhi`` are resolved
+by trying every hyphen-joined run of segments against the taxonomy tables.
+Doing that with one ``slug__iexact`` query per candidate costs dozens of round
+trips per request, so every row is loaded once into in-memory dicts keyed by
+lower-cased slug and name, and candidates are resolved with plain lookups.
+
+The index is built lazily on first use, dropped by ``invalidate()`` (wired to
+``post_save``/``post_delete`` in ``peeldb.signals``) and rebuilt after
+``SLUG_INDEX_TTL`` seconds so that edits made in other processes show up too.
+"""
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+
+from peeldb.models import City, Qualification, Skill, State
+
+SlugEntry = namedtuple("SlugEntry", ["id", "name", "slug", "active", "state_name"])
+
+
+class SlugIndex:
+    """Lookup tables for a single taxonomy model."""
+
+    def __init__(self, entries):
+        self.by_slug = {}
+        self.by_name = {}
+        for entry in entries:
+            self.by_slug.setdefault(entry.slug.lower(), []).append(entry)
+            self.by_name.setdefault(entry.name.lower(), []).append(entry)
+
+    def get(self, slug, active_only=True):
+        """First entry (lowest id) whose slug matches case-insensitively."""
+        for entry in self.by_slug.get(slug.lower(), ()):
+            if entry.active or not active_only:
+                return entry
+        return None
+
+    def match(self, term):
+        """All entries whose slug or name matches ``term`` case-insensitively."""
+        term = term.lower()
+        found = {entry.id: entry for entry in self.by_slug.get(term, ())}
+        for entry in self.by_name.get(term, ()):
+            found.setdefault(entry.id, entry)
+        return sorted(found.values(), key=lambda entry: entry.id)
+
+
+def _skill_entries():
+    for pk, name, slug, status in Skill.objects.order_by("id").values_list(
+        "id", "name", "slug", "status"
+    ):
+        yield SlugEntry(pk, name, slug or "", status == "Active", "")
+
+
+def _qualification_entries():
+    for pk, name, slug, status in Qualification.objects.order_by("id").values_list(
+        "id", "name", "slug", "status"
+    ):
+        yield SlugEntry(pk, name, slug or "", status == "Active", "")
+
+
+def _city_entries():
+    for pk, name, slug, status, state_name in City.objects.order_by("id").values_list(
+        "id", "name", "slug", "status", "state__name"
+    ):
+        yield SlugEntry(pk, name, slug or "", status == "Enabled", state_name or "")
+
+
+def _state_entries():
+    for pk, name, slug, status in State.objects.order_by("id").values_list(
+        "id", "name", "slug", "status"
+    ):
+        yield SlugEntry(pk, name, slug or "", status == "Enabled", "")
+
+
+_BUILDERS = {
+    "skills": _skill_entries,
+    "qualifications": _qualification_entries,
+    "cities": _city_entries,
+    "states": _state_entries,
+}
+
+_lock = threading.Lock()
+_indexes = {}
+_built_at = {}
+
+
+def get_index(name):
+    """Return the ``SlugIndex`` called ``name``, building it if needed."""
+    ttl = getattr(settings, "SLUG_INDEX_TTL", 15 * 60)
+    index = _indexes.get(name)
+    if index is not None and time.monotonic() - _built_at[name] < ttl:
+        return index
+    with _lock:
+        index = _indexes.get(name)
+        if index is None or time.monotonic() - _built_at[name] >= ttl:
+            index = SlugIndex(_BUILDERS[name]())
+            _indexes[name] = index
+            _built_at[name] = time.monotonic()
+    return index
+
+
+def invalidate(*names):
+    """Drop the given indexes (all of them when called without arguments)."""
+    with _lock:
+        for name in names or list(_indexes):
+            _indexes.pop(name, None)
+            _built_at.pop(name, None)
+
+
+def resolve_segments(slug, index, greedy=False, unique=True):
+    """
+    Split ``slug`` on hyphens and return the names of every active entry whose
+    slug equals a run of consecutive segments, in order of appearance.
+
+    ``greedy`` stops at the shortest match starting at each position and skips
+    the segments it consumed (location behaviour); otherwise every run is
+    tried from every position (skill/qualification behaviour).
+    """
+    segments = slug.split("-")
+    names = []
+    start = 0
+    while start < len(segments):
+        next_start = start + 1
+        candidate = ""
+        for end in range(start, len(segments)):
+            candidate = segments[end] if end == start else candidate + "-" + segments[end]
+            if not greedy and candidate == "":
+                break
+            entry = index.get(candidate)
+            if entry:
+                if not unique or entry.name not in names:
+                    names.append(entry.name)
+                if greedy:
+                    next_start = end + 1
+                    break
+        start = next_start
+    return names
+
+
+def resolve_skills(slug):
+    skills = get_index("skills")
+    entry = skills.get(slug)
+    if entry:
+        return [entry.name]
+    return resolve_segments(slug, skills)
+
+
+def resolve_qualifications(slug):
+    qualifications = get_index("qualifications")
+    entry = qualifications.get(slug)
+    if entry:
+        return [entry.name]
+    return resolve_segments(slug, qualifications)
+
+
+def resolve_locations(slug):
+    slug = slug.lower()
+    if slug == "":
+        return []
+    return resolve_segments(slug, get_index("cities"), greedy=True, unique=False)
@@ -0,0 +1,437 @@
+import re
+import tempfile
+import time
+import zipfile
+from datetime import datetime
+from io import BytesIO
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core import mail
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.db.models import F
+from django.http import HttpResponse
+from django.middleware.csrf import CsrfViewMiddleware
+from django.template import engines
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+from mpcomp import (
+    mailer,
+    meta_registry,
+    request_stats,
+    resume_parser,
+    slug_index,
+    view_counter,
+)
+from mpcomp.page_cache import cache_anonymous_page, tag_page
+from mpcomp.pagination import CursorPaginator, InvalidCursor, KeysetPaginator
+from peeldb.models import (
+    AppliedJobs,
+    JobPost,
+    MailDelivery,
+    MetaData,
+    Skill,
+    User,
+    VisitedJobs,
+)
+
+
+def create_jobs(user, count):
+    return [
+        JobPost.objects.create(
+            user=user,
+            title="Python Developer %s" % index,
+            vacancies=1,
+            description="Python developer",
+            job_type="full-time",
+            status="Live",
+        )
+        for index in range(count)
+    ]
+
+
+class slug_index_test(TestCase):
+    def setUp(self):
+        Skill.objects.create(name="Python", slug="python", status="Active")
+        Skill.objects.create(name="Django", slug="django", status="Active")
+        Skill.objects.create(name="Cobol", slug="cobol", status="InActive")
+        slug_index.invalidate()
+
+    def test_slugs_resolve_from_the_index(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(slug_index.resolve_skills("python"), ["Python"])
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                slug_index.resolve_skills("python-django"), ["Python", "Django"]
+            )
+            self.assertEqual(slug_index.resolve_skills("PYTHON"), ["Python"])
+            self.assertEqual(slug_index.resolve_skills("cobol"), [])
+
+        Skill.objects.create(name="Go", slug="go", status="Active")
+        self.assertEqual(slug_index.resolve_skills("go"), ["Go"])
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "mpcomp.cache.TieredCache",
+            "OPTIONS": {"L1": "local", "L2": "shared", "L1_TIMEOUT": 60},
+        },
+        "shared": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "tiered-cache-test-l2",
+        },
+        "local": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "tiered-cache-test-l1",
+        },
+    }
+)
+class tiered_cache_test(SimpleTestCase):
+    def test_reads_through_to_the_shared_tier(self):
+        cache, local, shared = caches["default"], caches["local"], caches["shared"]
+        cache.clear()
+
+        self.assertIsNone(cache.get("jobs"))
+        self.assertEqual(cache.get("jobs", "missing"), "missing")
+
+        shared.set("jobs", [1, 2])
+        self.assertEqual(cache.get("jobs"), [1, 2])
+        self.assertEqual(local.get("jobs"), [1, 2])
+
+        # served from the process-local tier until it expires there
+        shared.delete("jobs")
+        self.assertEqual(cache.get("jobs"), [1, 2])
+        cache.delete("jobs")
+        self.assertIsNone(cache.get("jobs"))
+
+
+@override_settings(VIEW_COUNTER_CACHE="local", VIEW_COUNTER_SLOT=1)
+class job_view_counter(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="test@mp.com", username="test")
+        (self.job,) = create_jobs(self.user, 1)
+
+    def test_views_are_buffered_until_flushed(self):
+        caches["local"].clear()
+        for _ in range(3):
+            view_counter.record_view(self.job.id, self.user.id)
+        view_counter.record_view(self.job.id)
+
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.views_count, 0)
+        self.assertFalse(VisitedJobs.objects.filter(job_post=self.job).exists())
+
+        with patch("mpcomp.view_counter.time.time", return_value=time.time() + 3):
+            self.assertEqual(view_counter.flush(), 4)
+
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.views_count, 4)
+        self.assertEqual(
+            VisitedJobs.objects.filter(job_post=self.job, user=self.user).count(), 1
+        )
+
+
+class meta_registry_render(TestCase):
+    def test_templates_are_compiled_once_and_reloaded_on_save(self):
+        meta = MetaData.objects.create(
+            name="company_jobs",
+            meta_title="{{ company }} Jobs - Page {{ current_page }}",
+            meta_description="Openings at {{ company }}",
+            h1_tag="{{ company }}",
+        )
+        context = {"company": "Micropyramid", "current_page": 2}
+        self.assertEqual(
+            meta_registry.render_meta("company_jobs", context),
+            ("Micropyramid Jobs - Page 2", "Openings at Micropyramid", "Micropyramid"),
+        )
+        with self.assertNumQueries(0):
+            meta_registry.render_meta("company_jobs", context)
+            self.assertEqual(meta_registry.render_meta("missing"), ("", "", ""))
+
+        meta.h1_tag = "Jobs at {{ company }}"
+        meta.save()
+        self.assertEqual(
+            meta_registry.render_meta("company_jobs", context).h1_tag,
+            "Jobs at Micropyramid",
+        )
+
+
+class keyset_pagination(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="test@mp.com", username="test")
+        self.jobs = create_jobs(self.user, 14)
+
+    def test_pages_match_offset_pagination(self):
+        # half of the jobs share a publish time, the rest were never published
+        JobPost.objects.filter(id__in=[job.id for job in self.jobs[:7]]).update(
+            published_on=datetime(2024, 5, 1, 10, 0)
+        )
+        jobs = JobPost.objects.filter(status="Live")
+        expected = list(
+            jobs.order_by(F("published_on").desc(nulls_last=True), "-id").values_list(
+                "id", flat=True
+            )
+        )
+        caches["local"].clear()
+        with patch("mpcomp.pagination.cache", caches["local"]):
+            paginator = KeysetPaginator(jobs, 3)
+            self.assertEqual(paginator.count, len(expected))
+            self.assertEqual(paginator.num_pages, 5)
+            # jump ahead first, then walk the pages in order
+            self.assertEqual([job.id for job in paginator.page(4)], expected[9:12])
+            for number in range(1, paginator.num_pages + 1):
+                self.assertEqual(
+                    [job.id for job in KeysetPaginator(jobs, 3).page(number)],
+                    expected[(number - 1) * 3 : number * 3],
+                )
+            self.assertEqual(KeysetPaginator(jobs, 3).page(6), [])
+
+
+class cursor_paginator_test(TestCase):
+    def setUp(self):
+        user = User.objects.create(email="test@mp.com", username="test")
+        for job in create_jobs(user, 5):
+            AppliedJobs.objects.create(job_post=job, user=user, status="Pending")
+
+    def test_walks_every_row_once(self):
+        # two applications at the same time, told apart by id
+        AppliedJobs.objects.filter(
+            id__in=AppliedJobs.objects.order_by("id").values("id")[:2]
+        ).update(applied_on=datetime(2026, 1, 1, 10, 30, 15, 123456))
+
+        paginator = CursorPaginator(
+            AppliedJobs.objects.all(), 2, ("-applied_on", "-id")
+        )
+        seen = []
+        rows, cursor = paginator.page()
+        while True:
+            seen.extend(row.id for row in rows)
+            if cursor is None:
+                break
+            rows, cursor = paginator.page(cursor)
+        expected = list(
+            AppliedJobs.objects.order_by("-applied_on", "-id").values_list(
+                "id", flat=True
+            )
+        )
+        self.assertEqual(seen, expected)
+
+        with self.assertRaises(InvalidCursor):
+            paginator.page("not-a-cursor")
+
+
+class anonymous_page_cache(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="test@mp.com", username="test")
+        self.skill = Skill.objects.create(name="Python", slug="python")
+        (self.job,) = create_jobs(self.user, 1)
+        self.job.skills.add(self.skill)
+
+    def test_pages_are_served_until_their_jobs_change(self):
+        rendered = []
+
+        @cache_anonymous_page
+        def listing(request):
+            rendered.append(request.path)
+            tag_page(request, Skill.objects.filter(pk=self.skill.pk))
+            return HttpResponse("python jobs")
+
+        request = RequestFactory().get("/python-jobs/")
+        request.user = AnonymousUser()
+        caches["local"].clear()
+        with patch("mpcomp.page_cache.cache", caches["local"]):
+            listing(request)
+            self.assertEqual(listing(request).content, b"python jobs")
+            self.assertEqual(len(rendered), 1)
+
+            self.job.status = "Disabled"
+            self.job.save()
+            listing(request)
+            self.assertEqual(len(rendered), 2)
+
+            request.user = self.user
+            listing(request)
+            self.assertEqual(len(rendered), 3)
+
+
+class anonymous_page_csrf_test(SimpleTestCase):
+    def test_cached_page_form_posts_with_the_visitors_token(self):
+        rendered = []
+
+        @cache_anonymous_page
+        def listing(request):
+            rendered.append(request.path)
+            form = engines["django"].from_string(
+                '<form method="post">{% csrf_token %}</form>'
+            )
+            response = HttpResponse(form.render({}, request))
+            response["Vary"] = "Accept-Language"
+            return response
+
+        middleware = CsrfViewMiddleware(listing)
+
+        def visit():
+            request = RequestFactory().get("/python-jobs/")
+            request.user = AnonymousUser()
+            response = middleware(request)
+            token = re.search(rb'value="([^"]+)"', response.content).group(1)
+            return response, token.decode()
+
+        caches["local"].clear()
+        with patch("mpcomp.page_cache.cache", caches["local"]):
+            first_token = visit()[1]
+            response, token = visit()
+        self.assertEqual(len(rendered), 1)
+        self.assertNotEqual(token, first_token)
+        self.assertIn("Accept-Language", response["Vary"])
+
+        request = RequestFactory().post("/python-jobs/", {"csrfmiddlewaretoken": token})
+        request.COOKIES[settings.CSRF_COOKIE_NAME] = response.cookies[
+            settings.CSRF_COOKIE_NAME
+        ].value
+        self.assertIsNone(middleware.process_view(request, listing, (), {}))
+
+
+class budgeted_view(request_stats.RequestStatsMixin, APIView):
+    query_budget = 1
+
+    def get(self, request):
+        return Response(
+            {
+                "jobs": JobPost.objects.count(),
+                "live": JobPost.objects.filter(status="Live").count(),
+            }
+        )
+
+
+@override_settings(REQUEST_STATS_CACHE="local", REQUEST_STATS_FLUSH_INTERVAL=0)
+class request_stats_test(TestCase):
+    def test_collect_counts_queries_and_cache(self):
+        with request_stats.collect() as stats:
+            JobPost.objects.count()
+            caches["default"].get("request-stats-test-missing")
+            with request_stats.collect() as inner:
+                list(Skill.objects.all())
+        self.assertIs(inner, stats)
+        self.assertEqual(stats.db_queries, 2)
+        self.assertEqual(stats.cache_misses, 1)
+        self.assertIsNone(request_stats.current())
+
+    def test_query_budget(self):
+        request = APIRequestFactory().get("/budgeted/")
+        with self.assertLogs("mpcomp.request_stats", "WARNING"):
+            response = budgeted_view.as_view()(request)
+        self.assertIn("db;dur=", response["Server-Timing"])
+        self.assertIn('"2 queries"', response["Server-Timing"])
+        self.assertIn(
+            'view_query_budget_exceeded_total{view="unresolved"} 1',
+            request_stats.export(),
+        )
+
+        with override_settings(QUERY_BUDGET_STRICT=True):
+            with self.assertRaises(request_stats.QueryBudgetExceeded):
+                budgeted_view.as_view()(APIRequestFactory().get("/budgeted/"))
+
+
+class resume_parser_test(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="test@mp.com", username="test")
+        self.skill = Skill.objects.create(name="Python", slug="python", status="Active")
+        resume_parser._skills["names"] = None
+
+    def docx(self, *paragraphs):
+        data = BytesIO()
+        with zipfile.ZipFile(data, "w") as document:
+            document.writestr(
+                "word/document.xml",
+                '<w:document xmlns:w="%s"><w:body>%s</w:body></w:document>'
+                % (
+                    resume_parser.WORD_NAMESPACE[1:-1],
+                    "".join(
+                        "<w:p><w:r><w:t>%s</w:t></w:r></w:p>" % paragraph
+                        for paragraph in paragraphs
+                    ),
+                ),
+            )
+        return data.getvalue()
+
+    def test_parses_uploaded_resume(self):
+        storages = {
+            "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+            "staticfiles": {
+                "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+            },
+        }
+        with override_settings(STORAGES=storages, MEDIA_ROOT=tempfile.mkdtemp()):
+            self.user.resume.save(
+                "resume.docx",
+                ContentFile(
+                    self.docx("Jane", "jane@example.com, +91 98765 43210", "Python")
+                ),
+            )
+            resume_parser.queue(self.user)
+            self.assertEqual(self.user.resume_parse_status, "Pending")
+            resume_parser.parse_user_resume(self.user.id)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.resume_parse_status, "Done")
+        self.assertIn("jane@example.com", self.user.resume_text)
+        self.assertEqual(
+            self.user.resume_data,
+            {
+                "email": "jane@example.com",
+                "mobile": "9876543210",
+                "skills": [self.skill.id],
+            },
+        )
+        self.assertEqual(self.user.mobile, "9876543210")
+
+        with self.assertRaises(resume_parser.ResumeParseError):
+            resume_parser.parse(b"not a zip", "resume.docx")
+
+
+class resume_mobile_test(SimpleTestCase):
+    def test_mobile_is_not_read_from_longer_numbers(self):
+        self.assertEqual(
+            resume_parser.find_mobile("Mobile: 098765-43210."), "9876543210"
+        )
+        for text in ("A/c 12345 67890 12345", "ID 1234-12345-67890", "9876543210123"):
+            self.assertEqual(resume_parser.find_mobile(text), "")
+
+
+@override_settings(MAIL_SEND_RATE=0)
+class mail_dispatch_test(TestCase):
+    def test_batches_are_sent_and_recorded(self):
+        messages = [
+            (["one@example.com"], "First", "<p>1</p>"),
+            (["two@example.com"], "Second", "<p>2</p>"),
+        ]
+        self.assertEqual(mailer.dispatch(messages, "test"), [])
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(
+            MailDelivery.objects.filter(category="test", status="Sent").count(), 2
+        )
+
+        with patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=[1, OSError("refused")],
+        ):
+            failed = mailer.dispatch(messages, "retry", final=False)
+        self.assertEqual(failed, [messages[1]])
+        self.assertFalse(MailDelivery.objects.filter(status="Failed").exists())
+
+        with patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=OSError("refused"),
+        ):
+            mailer.dispatch(failed, "retry", attempt=4)
+        delivery = MailDelivery.objects.get(status="Failed")
+        self.assertEqual(
+            (delivery.recipients, delivery.attempts, delivery.error),
+            (["two@example.com"], 4, "refused"),
+        )
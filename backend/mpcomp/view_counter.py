@@ -0,0 +1,147 @@
+"""
+Buffered job view counting.
+
+``job_detail`` is the most visited page, so it must not write to ``JobPost``
+or ``VisitedJobs`` on every hit. ``record_view()`` only touches the shared
+cache: views are accumulated per job in time slots of ``VIEW_COUNTER_SLOT``
+seconds, and each slot keeps a numbered list of the jobs and (user, job)
+visits it has seen, using ``add``/``incr`` so that concurrent processes do
+not lose updates.
+
+``flush()`` (run every minute by ``dashboard.tasks.flush_job_views``) reads
+the closed slots back, applies one ``F()`` update per distinct count and
+records visits with a single bulk insert. When the cache is unavailable the
+view is written straight to the database instead.
+"""
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F, Q
+from django.utils import timezone
+
+from peeldb.models import JobPost, VisitedJobs
+
+# slots left in the cache for the flush task before they expire
+MAX_PENDING_SLOTS = 60
+
+
+def _cache():
+    return caches[getattr(settings, "VIEW_COUNTER_CACHE", "shared")]
+
+
+def _slot_length():
+    return getattr(settings, "VIEW_COUNTER_SLOT", 60)
+
+
+def _current_slot():
+    return int(time.time() // _slot_length())
+
+
+def _append(cache, slot, name, value, timeout):
+    """Store ``value`` as the next entry of the slot's ``name`` list."""
+    if cache.add("%s:%s:seq" % (name, slot), 1, timeout):
+        position = 1
+    else:
+        position = cache.incr("%s:%s:seq" % (name, slot))
+    cache.set("%s:%s:%s" % (name, slot, position), value, timeout)
+
+
+def _read(cache, slot, name):
+    size = cache.get("%s:%s:seq" % (name, slot)) or 0
+    keys = ["%s:%s:%s" % (name, slot, position) for position in range(1, size + 1)]
+    values = cache.get_many(keys)
+    return [values[key] for key in keys if key in values], keys
+
+
+def record_view(job_id, user_id=None):
+    """Count one view of ``job_id`` (and a visit by ``user_id`` if given)."""
+    cache = _cache()
+    slot = _current_slot()
+    timeout = _slot_length() * MAX_PENDING_SLOTS
+    try:
+        count_key = "job_views:%s:count:%s" % (slot, job_id)
+        if cache.add(count_key, 1, timeout):
+            _append(cache, slot, "job_views", job_id, timeout)
+        else:
+            cache.incr(count_key)
+        if user_id and cache.add("job_visits:%s:%s:%s" % (slot, user_id, job_id), 1, timeout):
+            _append(cache, slot, "job_visits", (user_id, job_id), timeout)
+    except ValueError:
+        # the backend lost or never stored the key (memcached down or evicted)
+        JobPost.objects.filter(id=job_id).update(views_count=F("views_count") + 1)
+        if user_id:
+            save_visits([(user_id, job_id)])
+
+
+def save_visits(visits):
+    """
+    Record (user_id, job_id) visits: existing rows get a fresh ``visited_on``
+    and the rest are inserted with one ``bulk_create``.
+    """
+    visits = set(visits)
+    if not visits:
+        return 0
+    lookup = Q()
+    for user_id, job_id in visits:
+        lookup |= Q(user_id=user_id, job_post_id=job_id)
+    existing = VisitedJobs.objects.filter(lookup)
+    seen = set(existing.values_list("user_id", "job_post_id"))
+    if seen:
+        existing.update(visited_on=timezone.now())
+    VisitedJobs.objects.bulk_create(
+        [
+            VisitedJobs(user_id=user_id, job_post_id=job_id)
+            for user_id, job_id in visits - seen
+        ]
+    )
+    return len(visits - seen)
+
+
+def save_views(counts):
+    """Add ``{job_id: views}`` to ``JobPost.views_count``, one UPDATE per count."""
+    job_ids_by_count = {}
+    for job_id, views in counts.items():
+        job_ids_by_count.setdefault(views, []).append(job_id)
+    for views, job_ids in job_ids_by_count.items():
+        JobPost.objects.filter(id__in=job_ids).update(
+            views_count=F("views_count") + views
+        )
+
+
+def flush():
+    """
+    Move counts and visits of every closed slot from the cache to the database.
+    The slot in progress and the one before it are left alone so that writers
+    that read the clock just before a boundary can still finish.
+    """
+    cache = _cache()
+    lock_timeout = _slot_length() * 5
+    if not cache.add("job_views:flush_lock", 1, lock_timeout):
+        return 0
+    try:
+        last_slot = _current_slot() - 2
+        flushed = cache.get("job_views:flushed")
+        first_slot = max(flushed + 1 if flushed else 0, last_slot - MAX_PENDING_SLOTS)
+        counts = Counter()
+        visits = []
+        for slot in range(first_slot, last_slot + 1):
+            job_ids, keys = _read(cache, slot, "job_views")
+            count_keys = ["job_views:%s:count:%s" % (slot, job_id) for job_id in job_ids]
+            for key, views in cache.get_many(count_keys).items():
+                counts[int(key.rsplit(":", 1)[1])] += views
+            slot_visits, visit_keys = _read(cache, slot, "job_visits")
+            visits.extend(slot_visits)
+            cache.delete_many(
+                keys
+                + count_keys
+                + visit_keys
+                + ["job_views:%s:seq" % slot, "job_visits:%s:seq" % slot]
+            )
+        save_views(counts)
+        save_visits(visits)
+        cache.set("job_views:flushed", last_slot, None)
+        return sum(counts.values())
+    finally:
+        cache.delete("job_views:flush_lock")
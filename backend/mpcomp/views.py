@@ -10,13 +10,10 @@ import re
 from PIL import Image
 import os
 from .aws import AWS
-import zipfile
-from lxml import etree
-from subprocess import Popen, PIPE
+from . import resume_parser, slug_index
 
 from django.contrib.auth.decorators import user_passes_test, login_required
-from django.template import Template, Context
-from peeldb.models import MetaData, Skill, City, Qualification
+from .meta_registry import render_meta
 from django.core.mail import EmailMessage
 from django.conf import settings
 
@@ -100,164 +97,15 @@ def get_prev_after_pages_count(page, no_pages):
     return prev_page, previous_page, aft_page, after_page
 
 
-def opendocx(file):
-    """Open a docx file, return a document XML tree"""
-    mydoc = zipfile.ZipFile(file)
-    xmlcontent = mydoc.read("word/document.xml")
-    document = etree.fromstring(xmlcontent)
-    return document
-
-
-nsprefixes = {
-    "mo": "http://schemas.microsoft.com/office/mac/office/2008/main",
-    "o": "urn:schemas-microsoft-com:office:office",
-    "ve": "http://schemas.openxmlformats.org/markup-compatibility/2006",
-    # Text Content
-    "w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main",
-    "w10": "urn:schemas-microsoft-com:office:word",
-    "wne": "http://schemas.microsoft.com/office/word/2006/wordml",
-    # Drawing
-    "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
-    "m": "http://schemas.openxmlformats.org/officeDocument/2006/math",
-    "mv": "urn:schemas-microsoft-com:mac:vml",
-    "pic": "http://schemas.openxmlformats.org/drawingml/2006/picture",
-    "v": "urn:schemas-microsoft-com:vml",
-    "wp": ("http://schemas.openxmlformats.org/drawingml/2006/wordprocessing" "Drawing"),
-    # Properties (core and extended)
-    "cp": (
-        "http://schemas.openxmlformats.org/package/2006/metadata/core-pr" "operties"
-    ),
-    "dc": "http://purl.org/dc/elements/1.1/",
-    "ep": (
-        "http://schemas.openxmlformats.org/officeDocument/2006/extended-" "properties"
-    ),
-    "xsi": "http://www.w3.org/2001/XMLSchema-instance",
-    # Content Types
-    "ct": "http://schemas.openxmlformats.org/package/2006/content-types",
-    # Package Relationships
-    "r": ("http://schemas.openxmlformats.org/officeDocument/2006/relationsh" "ips"),
-    "pr": "http://schemas.openxmlformats.org/package/2006/relationships",
-    # Dublin Core document properties
-    "dcmitype": "http://purl.org/dc/dcmitype/",
-    "dcterms": "http://purl.org/dc/terms/",
-}
-
-
-def getdocumenttext(document):
-    """Return the raw text of a document, as a list of paragraphs."""
-    paratextlist = []
-    # Compile a list of all paragraph (p) elements
-    paralist = []
-    for element in document.iter():
-        # Find p (paragraph) elements
-        if element.tag == "{" + nsprefixes["w"] + "}p":
-            paralist.append(element)
-    # Since a single sentence might be spread over multiple text elements,
-    # iterate through each paragraph, appending all text (t) children to that
-    # paragraphs text.
-    for para in paralist:
-        paratext = ""
-        # Loop through each paragraph
-        for element in para.iter():
-            # Find t (text) elements
-            if element.tag == "{" + nsprefixes["w"] + "}t":
-                if element.text:
-                    paratext = paratext + element.text
-            elif element.tag == "{" + nsprefixes["w"] + "}tab":
-                paratext = paratext + "\t"
-        # Add our completed paragraph text to the list of paragraph text
-        if paratext:
-            paratextlist.append(paratext)
-    return paratextlist
-
-
-def document_to_text(filename, file_path):
-    if filename[-4:] == ".doc":
-        cmd = ["antiword", file_path]
-        p = Popen(cmd, stdout=PIPE)
-        stdout, stderr = p.communicate()
-        return stdout.decode("ascii", "ignore")
-    elif filename[-4:] == ".odt":
-        cmd = ["odt2txt", file_path]
-        p = Popen(cmd, stdout=PIPE)
-        stdout, stderr = p.communicate()
-        return stdout.decode("ascii", "ignore")
-
-
-def remove_file(path):
-    if os.path.exists(path):
-        os.remove(path)
-
-
-def handle_uploaded_file(file, filename):
-    if not os.path.exists("resume/"):
-        os.mkdir("resume/")
-
-    with open("resume/" + filename, "wb+") as destination:
-        for chunk in file.chunks():
-            destination.write(chunk)
-
-
-def get_email_resume(text):
-    email = mobile = ""
-    if re.search(r"[0-9]{10}", text):
-        mobile = re.search(r"[0-9]{10}", text).group(0)
-    m = re.search(r"[\w\.-]+@[\w\.-]+", text)
-    if m:
-        email = m.group(0)
-    return email, mobile
-
-
 def get_resume_data(file):
-    file_name = file.name
-    file_format = file.name.split(".")[-1]
-    f_name = file.name.split(".")[0]
-    email = mobile = text = ""
-    if file_format == "pdf":
-        try:
-            os.system(
-                "pdftotext '%s' '%s'"
-                % (
-                    settings.BASE_DIR + "/resume/" + file_name,
-                    settings.BASE_DIR + "/resume/" + f_name + ".txt",
-                )
-            )
-            each = open(
-                settings.BASE_DIR + "/resume/" + f_name + ".txt", "r"
-            ).readlines()
-            text = []
-            for pdf_content in each:
-                text.append(pdf_content)
-                if re.search(r"[0-9]{10}", pdf_content):
-                    mobile = re.search(r"[0-9]{10}", pdf_content).group(0)
-                m = re.search(r"[\w\.-]+@[\w\.-]+", pdf_content)
-                if m:
-                    email = m.group(0)
-            text = "\n\n".join(text)
-        except Exception:
-            text = ""
-    elif file_format == "doc":
-        text = document_to_text(file_name, settings.BASE_DIR + "/resume/" + file_name)
-        email, mobile = get_email_resume(text)
-    elif file_format == "odt":
-        text = document_to_text(file_name, settings.BASE_DIR + "/resume/" + file_name)
-        email, mobile = get_email_resume(text)
-    elif file_format == "docx":
-        document = opendocx(settings.BASE_DIR + "/resume/" + file_name)
-        paratextlist = getdocumenttext(document)
-        text = []
-        for paratext in paratextlist:
-            text.append(paratext)
-        for paratext in paratextlist:
-            if re.search(r"[0-9]{10}", (paratext)):
-                mobile = re.search(r"[0-9]{10}", (paratext)).group(0)
-            m = re.search(r"[\w\.-]+@[\w\.-]+", str(paratext.encode("utf-8")))
-            if m:
-                email = m.group(0)
-        text = "\n\n".join(text)
-    remove_file(settings.BASE_DIR + "/resume/" + f_name + ".txt")
-    remove_file(settings.BASE_DIR + "/resume/" + file_name)
-    return email, mobile, text
+    """``(email, mobile, text)`` of an uploaded resume, parsed in memory"""
+    try:
+        parsed = resume_parser.parse(file.read(), file.name, skills=False)
+    except resume_parser.ResumeParseError:
+        return "", "", ""
+    finally:
+        file.seek(0)
+    return parsed.email, parsed.mobile, parsed.text
 
 
 def float_round(num, places=0, direction=floor):
@@ -312,87 +160,15 @@ def custom_password_check(value):
 
 
 def get_valid_skills_list(skill):
-    final_skill = []
-    s_list = Skill.objects.filter(slug__iexact=skill, status="Active")
-    if s_list:
-        final_skill.append(s_list[0].name)
-    else:
-        skill = skill.split("-")
-        k = -1
-        # final_skill = skill
-        for i, j in enumerate(skill):
-            # dupes = [j]
-            if i <= k:
-                continue
-            while True:
-                if j == "":
-                    break
-                sk = Skill.objects.filter(slug__iexact=j, status="Active")
-                if sk.exists():
-                    # skill = [l for l in skill if l not in j]
-                    # final_skill = [x for x in final_skill if x not in dupes]
-                    if sk[0].name not in final_skill:
-                        final_skill.append(sk[0].name)
-                i = i + 1
-                if i < len(skill):
-                    # dupes.append(skill[i])
-                    j = j + "-" + skill[i]
-                else:
-                    break
-    return final_skill
+    return slug_index.resolve_skills(skill)
 
 
 def get_valid_locations_list(location):
-    final_location = []
-    location = location.lower().split("-")
-    k = -1
-    if location != [""]:
-        # final_location = location
-        for i, j in enumerate(location):
-            # dupes = [j]
-            if i <= k:
-                continue
-            while True:
-                if City.objects.filter(slug__iexact=j, status="Enabled"):
-                    # location = [l for l in location if l not in j]
-                    # final_location = [x for x in final_location if x not in dupes]
-                    final_location.append(
-                        City.objects.filter(slug__iexact=j, status="Enabled")[0].name
-                    )
-                    k = i
-                    break
-                i = i + 1
-                if i < len(location):
-                    # dupes.append(location[i])
-                    j = j + "-" + location[i]
-                else:
-                    break
-    return final_location
+    return slug_index.resolve_locations(location)
 
 
 def get_valid_qualifications(skill):
-    final_edu = []
-    s_list = Qualification.objects.filter(slug__iexact=skill, status="Active")
-    if s_list:
-        final_edu.append(s_list[0].name)
-    else:
-        search_keywords = skill.split("-")
-        skill = search_keywords
-        for i, j in enumerate(skill):
-            while True:
-                if j == "":
-                    break
-                edu = Qualification.objects.filter(slug__iexact=j, status="Active")
-                if edu.exists():
-                    # skill = [l for l in skill if l not in j]
-                    if edu[0].name not in final_edu:
-                        final_edu.append(edu[0].name)
-                i = i + 1
-                if i < len(skill):
-                    j = j + "-" + skill[i]
-                else:
-                    break
-    return final_edu
+    return slug_index.resolve_qualifications(skill)
 
 
 def get_ordered_skill_degrees(text, skills, degrees):
@@ -405,13 +181,15 @@ def get_ordered_skill_degrees(text, skills, degrees):
         indexes = [w.start() for w in re.finditer(word, text)]
         order.update({word: indexes[0]})
     order_list = sorted(order.items(), key=operator.itemgetter(1))
+    skill_index = slug_index.get_index("skills")
+    degree_index = slug_index.get_index("qualifications")
     for search in order_list:
-        skill = Skill.objects.filter(slug__iexact=search[0])
+        skill = skill_index.get(search[0], active_only=False)
         if skill:
-            final.append(skill[0].name)
-        degree = Qualification.objects.filter(slug__iexact=search[0])
+            final.append(skill.name)
+        degree = degree_index.get(search[0], active_only=False)
         if degree:
-            final.append(degree[0].name)
+            final.append(degree.name)
     return final
 
 
@@ -520,27 +298,12 @@ def get_absolute_url(job):
 def get_404_meta(name, data):
     data["skill"] = ", ".join(data.get("skill")) if data.get("skill") else ""
     data["city"] = ", ".join(data.get("city")) if data.get("city") else ""
-    meta_title = meta_description = ""
-    meta = MetaData.objects.filter(name=name)
-    if meta:
-        meta_title = Template(meta[0].meta_title).render(Context(data))
-        meta_description = Template(meta[0].meta_description).render(Context(data))
-    return meta_title, meta_description
+    meta = render_meta(name, data)
+    return meta.title, meta.description
 
 
 def get_meta(name, data):
-    page = data.get("page")
-    meta_title = meta_description = h1_tag = ""
-    meta = MetaData.objects.filter(name=name)
-    if meta:
-        meta_title = Template(meta[0].meta_title).render(
-            Context({"current_page": page})
-        )
-        meta_description = Template(meta[0].meta_description).render(
-            Context({"current_page": page})
-        )
-        h1_tag = Template(meta[0].h1_tag).render(Context({"current_page": page}))
-    return meta_title, meta_description, h1_tag
+    return render_meta(name, {"current_page": data.get("page")})
 
 
 def get_given_meta(value, data):
@@ -585,23 +348,11 @@ def get_meta_data(name, data):
         value = skills[0]
     if value:
         meta_title, meta_description, h1_tag = get_given_meta(value, data)
-    meta = MetaData.objects.filter(name=name)
-    if not meta_title and meta:
-        meta_title = Template(meta[0].meta_title).render(
-            Context(
-                {"city": final_location, "skill": final_skill, "current_page": page}
-            )
-        )
-    if not meta_description and meta:
-        meta_description = Template(meta[0].meta_description).render(
-            Context(
-                {"city": final_location, "skill": final_skill, "current_page": page}
-            )
-        )
-    if not h1_tag and meta:
-        h1_tag = Template(meta[0].h1_tag).render(
-            Context(
-                {"city": final_location, "skill": final_skill, "current_page": page}
-            )
+    if not (meta_title and meta_description and h1_tag):
+        meta = render_meta(
+            name, {"city": final_location, "skill": final_skill, "current_page": page}
         )
+        meta_title = meta_title or meta.title
+        meta_description = meta_description or meta.description
+        h1_tag = h1_tag or meta.h1_tag
     return meta_title, meta_description, h1_tag
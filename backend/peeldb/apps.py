@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class PeeldbConfig(AppConfig):
+    name = "peeldb"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,393 @@
+"""
+CSV and XLSX exports of applicants, for the dashboard job seeker list
+(``dashboard.views.applicant_management.applicants_export``) and the
+recruiter applicants API (``api.v1.recruiter.job_views.export_job_applicants``).
+
+``start()`` records a ``DataExport``, which rows (``kind`` and its
+``params``) in which format, and queues ``dashboard.tasks.export_data``.
+That runs ``run(export)``: the rows are read as ``values_list`` projections
+with ``.iterator(chunk_size=EXPORT_CHUNK_SIZE)``, so no model instances are
+built and only one chunk is held at a time, and written into a temporary file
+as they come. The finished file is saved to the private ``EXPORT_STORAGE``
+and the requester is mailed a signed link to it, valid for
+``EXPORT_LINK_MAX_AGE`` seconds, through which ``psite.views.export_download``
+streams the file. ``delete_expired()``, run daily by
+``dashboard.tasks.delete_expired_exports``, then deletes the file and export.
+
+XLSX files are written by ``XlsxWriter``, which streams the one sheet into
+the zip archive rather than building the workbook in memory.
+"""
+import csv
+import io
+import re
+import tempfile
+import uuid
+import zipfile
+from datetime import date, datetime, timedelta
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core import signing
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
+from django.template import loader
+from django.urls import reverse
+
+from peeldb.models import AppliedJobs, DataExport, User
+
+SIGNING_SALT = "peeldb.exports"
+# (header, field) of the exported columns of each kind
+APPLICANT_COLUMNS = (
+    ("Id", "id"),
+    ("First name", "first_name"),
+    ("Last name", "last_name"),
+    ("Email", "email"),
+    ("Mobile", "mobile"),
+    ("Registered from", "registered_from"),
+    ("Joined on", "date_joined"),
+    ("Active", "is_active"),
+    ("Profile completeness", "profile_completeness"),
+    ("Current city", "current_city__name"),
+    ("Experience (years)", "year"),
+    ("Experience (months)", "month"),
+    ("Resume", "resume"),
+)
+JOB_APPLICANT_COLUMNS = (
+    ("Applied on", "applied_on"),
+    ("Status", "status"),
+    ("First name", "user__first_name"),
+    ("Last name", "user__last_name"),
+    ("Email", "user__email"),
+    ("Mobile", "user__mobile"),
+    ("Experience (years)", "user__year"),
+    ("Experience (months)", "user__month"),
+    ("Current city", "user__current_city__name"),
+    ("Resume", "user__resume"),
+    ("Remarks", "remarks"),
+)
+# storage paths, exported as their URLs
+FILE_FIELDS = {"resume", "user__resume"}
+REGISTRATION_SOURCES = {
+    "social": "Social",
+    "email": "Email",
+    "resume": "Resume",
+    "resume-pool": "ResumePool",
+}
+
+
+def filter_applicants(status="all", params=None):
+    """
+    Job seekers of the dashboard list: ``status`` is the registration
+    source, ``params`` the list's filters (its query string flags and search
+    form fields).
+    """
+    params = params or {}
+    applicants = User.objects.filter(user_type="JS")
+    if status in REGISTRATION_SOURCES:
+        applicants = applicants.filter(registered_from=REGISTRATION_SOURCES[status])
+    if params.get("profile_completed"):
+        applicants = applicants.filter(profile_completeness__gte=50)
+    if params.get("resume_uploaded"):
+        applicants = applicants.exclude(resume="")
+    if params.get("login_once"):
+        applicants = applicants.filter(is_login=False)
+    if params.get("appliedto_jobs"):
+        applicants = applicants.filter(
+            id__in=AppliedJobs.objects.values_list("user", flat=True)
+        )
+    if params.get("active"):
+        applicants = applicants.filter(is_active=True)
+    if params.get("inactive"):
+        applicants = applicants.filter(is_active=False)
+    search = params.get("search")
+    if search:
+        applicants = applicants.filter(
+            Q(email__icontains=search)
+            | Q(username__icontains=search)
+            | Q(referer__contains=search)
+        )
+    if params.get("location"):
+        applicants = applicants.filter(current_city__id__in=params["location"])
+    if params.get("skills"):
+        # one row per matching skill otherwise
+        applicants = applicants.filter(
+            skills__skill__id__in=params["skills"]
+        ).distinct()
+    if params.get("profile_completion"):
+        applicants = applicants.filter(
+            profile_completeness__gte=int(params["profile_completion"])
+        )
+    if params.get("timestamp"):
+        start, end = params["timestamp"].split(" - ")
+        applicants = applicants.filter(
+            date_joined__range=(
+                datetime.strptime(start, "%b %d, %Y %H:%M"),
+                datetime.strptime(end, "%b %d, %Y %H:%M"),
+            )
+        )
+    return applicants.order_by("-date_joined")
+
+
+def filter_job_applicants(params):
+    """Applications of job ``params["job_id"]``, of ``params["status"]`` if given."""
+    applications = AppliedJobs.objects.filter(job_post_id=params["job_id"])
+    if params.get("status"):
+        applications = applications.filter(status=params["status"])
+    if params.get("ordering") == "applied_on":
+        return applications.order_by("applied_on", "id")
+    return applications.order_by("-applied_on", "-id")
+
+
+KINDS = {
+    "applicants": (
+        lambda params: filter_applicants(params.get("status", "all"), params),
+        APPLICANT_COLUMNS,
+    ),
+    "job_applicants": (filter_job_applicants, JOB_APPLICANT_COLUMNS),
+}
+
+
+def _text(value):
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+class CsvWriter:
+    extension = "csv"
+    # cells Excel would evaluate as a formula when opening the file
+    FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+    def __init__(self, file):
+        self._text = io.TextIOWrapper(file, encoding="utf-8", newline="")
+        self._writer = csv.writer(self._text)
+
+    def _cell(self, value):
+        if isinstance(value, str) and value.startswith(self.FORMULA_PREFIXES):
+            return "'" + value
+        return value
+
+    def writerow(self, row):
+        self._writer.writerow([self._cell(_text(value)) for value in row])
+
+    def close(self):
+        self._text.flush()
+        # leave the underlying file open for saving
+        self._text.detach()
+
+
+XLSX_NAMESPACE = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+XLSX_RELATIONSHIPS = "http://schemas.openxmlformats.org/package/2006/relationships"
+XLSX_DOCUMENT = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+XLSX_CONTENT = "application/vnd.openxmlformats-officedocument.spreadsheetml"
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" '
+        'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="%(content)s.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="%(content)s.worksheet+xml"/>'
+        "</Types>"
+    ),
+    "_rels/.rels": (
+        '<Relationships xmlns="%(relationships)s">'
+        '<Relationship Id="rId1" Type="%(document)s/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        "</Relationships>"
+    ),
+    "xl/workbook.xml": (
+        '<workbook xmlns="%(namespace)s" xmlns:r="%(document)s">'
+        '<sheets><sheet name="Export" sheetId="1" r:id="rId1"/></sheets>'
+        "</workbook>"
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<Relationships xmlns="%(relationships)s">'
+        '<Relationship Id="rId1" Type="%(document)s/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        "</Relationships>"
+    ),
+}
+# characters XML 1.0 does not allow
+XML_INVALID = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+# the most characters Excel shows in a cell
+XLSX_CELL_LIMIT = 32767
+
+
+class XlsxWriter:
+    """Writes rows into the single sheet of an XLSX workbook, as they come."""
+
+    extension = "xlsx"
+
+    def __init__(self, file):
+        names = {
+            "namespace": XLSX_NAMESPACE,
+            "relationships": XLSX_RELATIONSHIPS,
+            "document": XLSX_DOCUMENT,
+            "content": XLSX_CONTENT,
+        }
+        self._zip = zipfile.ZipFile(file, "w", zipfile.ZIP_DEFLATED)
+        for name, content in XLSX_PARTS.items():
+            self._zip.writestr(name, XML_HEADER + content % names)
+        self._sheet = self._zip.open("xl/worksheets/sheet1.xml", "w", force_zip64=True)
+        self._write(XML_HEADER + '<worksheet xmlns="%s"><sheetData>' % XLSX_NAMESPACE)
+        self._rows = 0
+
+    def _write(self, text):
+        self._sheet.write(text.encode("utf-8"))
+
+    def _cell(self, value):
+        if value is None:
+            return "<c/>"
+        if isinstance(value, bool):
+            return '<c t="b"><v>%d</v></c>' % value
+        if isinstance(value, (int, float)):
+            return "<c><v>%r</v></c>" % value
+        text = XML_INVALID.sub("", str(value))[:XLSX_CELL_LIMIT]
+        return '<c t="inlineStr"><is><t xml:space="preserve">%s</t></is></c>' % (
+            escape(text)
+        )
+
+    def writerow(self, row):
+        self._rows += 1
+        cells = "".join(self._cell(_text(value)) for value in row)
+        self._write('<row r="%s">%s</row>' % (self._rows, cells))
+
+    def close(self):
+        self._write("</sheetData></worksheet>")
+        self._sheet.close()
+        self._zip.close()
+
+
+WRITERS = {"csv": CsvWriter, "xlsx": XlsxWriter}
+
+
+def write(rows, columns, writer):
+    """Write the header of ``columns`` and ``rows``; returns the row count."""
+    writer.writerow([header for header, field in columns])
+    files = [field in FILE_FIELDS for header, field in columns]
+    count = 0
+    for row in rows:
+        writer.writerow(
+            [
+                default_storage.url(value) if is_file and value else value
+                for value, is_file in zip(row, files)
+            ]
+        )
+        count += 1
+    writer.close()
+    return count
+
+
+def start(user, kind, params, file_format="csv"):
+    """Record an export of ``kind`` for ``user`` and queue it."""
+    from dashboard.tasks import export_data
+
+    export = DataExport.objects.create(
+        requested_by=user, kind=kind, params=params, file_format=file_format
+    )
+    transaction.on_commit(lambda: export_data.delay(export.id))
+    return export
+
+
+def run(export):
+    """Write the rows of ``export`` to its file and mail the requester."""
+    queryset, columns = KINDS[export.kind]
+    export.status = "Running"
+    export.save(update_fields=["status"])
+    rows = (
+        queryset(export.params)
+        .values_list(*[field for header, field in columns])
+        .iterator(chunk_size=getattr(settings, "EXPORT_CHUNK_SIZE", 2000))
+    )
+    try:
+        with tempfile.TemporaryFile() as file:
+            count = write(rows, columns, WRITERS[export.file_format](file))
+            file.seek(0)
+            name = export.file.storage.save(
+                "%s/%s-%s.%s"
+                % (
+                    export.requested_by_id,
+                    export.kind.replace("_", "-"),
+                    uuid.uuid4().hex,
+                    WRITERS[export.file_format].extension,
+                ),
+                File(file),
+            )
+    except Exception:
+        export.status = "Failed"
+        export.finished_on = datetime.now()
+        export.save(update_fields=["status", "finished_on"])
+        notify(export)
+        raise
+    export.file = name
+    export.rows = count
+    export.status = "Done"
+    export.finished_on = datetime.now()
+    export.save(update_fields=["file", "rows", "status", "finished_on"])
+    notify(export)
+    return count
+
+
+def _link_max_age():
+    return getattr(settings, "EXPORT_LINK_MAX_AGE", 7 * 24 * 60 * 60)
+
+
+def delete_expired():
+    """Delete the exports, and their files, older than their download links."""
+    # links are signed when the export finishes
+    cutoff = datetime.now() - timedelta(seconds=_link_max_age())
+    expired = DataExport.objects.filter(
+        Q(finished_on__lt=cutoff) | Q(finished_on=None, created_on__lt=cutoff)
+    )
+    count = 0
+    for export in expired.iterator():
+        if export.file:
+            export.file.delete(save=False)
+        export.delete()
+        count += 1
+    return count
+
+
+def download_token(export):
+    return signing.dumps(export.id, salt=SIGNING_SALT)
+
+
+def from_token(token):
+    """The finished export of a download token, or ``None``."""
+    try:
+        export_id = signing.loads(
+            token,
+            salt=SIGNING_SALT,
+            max_age=_link_max_age(),
+        )
+    except signing.BadSignature:
+        return None
+    return DataExport.objects.filter(id=export_id, status="Done").first()
+
+
+def download_url(export):
+    return settings.PEEL_URL.rstrip("/") + reverse(
+        "export_download", kwargs={"token": download_token(export)}
+    )
+
+
+def notify(export):
+    from dashboard.tasks import send_email
+
+    context = {"export": export, "user": export.requested_by}
+    if export.status == "Done":
+        context["download_url"] = download_url(export)
+        context["link_days"] = _link_max_age() // (24 * 60 * 60)
+        subject = "Your export is ready"
+    else:
+        subject = "Your export failed"
+    body = loader.get_template("email/data_export.html").render(context)
+    send_email.delay(export.requested_by.email, subject, body)
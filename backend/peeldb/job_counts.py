@@ -0,0 +1,87 @@
+"""
+Maintained ``live_job_count`` columns on the taxonomy models.
+
+Counts are never adjusted with +1/-1: whenever a job's status or taxonomy
+relations change, ``peeldb.signals`` recounts just the taxonomy rows that job
+touches with one ``UPDATE ... SET live_job_count = (SELECT COUNT ...)`` per
+model, so a missed or repeated signal cannot leave a count drifting.
+``recount()`` without ids reconciles every row and is run periodically by
+``dashboard.tasks.recount_live_job_counts``.
+"""
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from peeldb.models import City, Industry, JobPost, Qualification, Skill, State
+
+# taxonomy model -> JobPost many-to-many field
+JOB_FIELDS = {
+    Skill: "skills",
+    City: "location",
+    Industry: "industry",
+    Qualification: "edu_qualification",
+}
+
+
+def _through(model):
+    field = JobPost._meta.get_field(JOB_FIELDS[model])
+    return field.remote_field.through, field.m2m_field_name(), field.m2m_reverse_field_name()
+
+
+def _live_count(model):
+    """Subquery counting the live jobs of the outer ``model`` row."""
+    if model is State:
+        through, source, target = _through(City)
+        rows = through.objects.filter(**{target + "__state": OuterRef("pk")})
+        group_by = target + "__state"
+        count = Count(source, distinct=True)
+    else:
+        through, source, target = _through(model)
+        rows = through.objects.filter(**{target: OuterRef("pk")})
+        group_by = target
+        count = Count(source)
+    rows = rows.filter(**{source + "__status": "Live"}).order_by()
+    return Coalesce(
+        Subquery(rows.values(group_by).annotate(total=count).values("total")),
+        Value(0),
+    )
+
+
+def recount(model, ids=None):
+    """Recount ``live_job_count`` of ``model`` rows (all of them without ``ids``)."""
+    rows = model.objects.all() if ids is None else model.objects.filter(pk__in=ids)
+    return rows.update(live_job_count=_live_count(model))
+
+
+def recount_taxonomy(model, ids):
+    """Recount the given rows of ``model``, and the states of cities."""
+    recount(model, ids)
+    if model is City:
+        recount(State, City.objects.filter(pk__in=ids).values("state"))
+
+
+def recount_all():
+    for model in (Skill, City, Industry, Qualification, State):
+        recount(model)
+
+
+def taxonomy_ids(job_ids):
+    """``{model: [ids]}`` of every taxonomy row linked to the given jobs."""
+    linked = {}
+    for model in JOB_FIELDS:
+        through, source, target = _through(model)
+        linked[model] = list(
+            through.objects.filter(**{source + "__in": job_ids})
+            .values_list(target, flat=True)
+            .distinct()
+        )
+    linked[State] = list(
+        City.objects.filter(pk__in=linked[City]).values_list("state", flat=True).distinct()
+    )
+    return linked
+
+
+def recount_linked(linked):
+    """Recount the rows returned by ``taxonomy_ids()``."""
+    for model, ids in linked.items():
+        if ids:
+            recount(model, ids)
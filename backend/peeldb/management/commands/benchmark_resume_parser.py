@@ -0,0 +1,108 @@
+import multiprocessing
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from mpcomp import resume_parser
+
+
+def _time_parse(item):
+    name, data, skills = item
+    started = time.perf_counter()
+    try:
+        resume_parser.parse(data, name, skills=skills)
+        failed = False
+    except resume_parser.ResumeParseError:
+        failed = True
+    return name.rsplit(".", 1)[-1].lower(), time.perf_counter() - started, failed
+
+
+def _percentile(values, percent):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Parses a directory of sample resumes with mpcomp.resume_parser and "
+        "reports the parse time per format and the throughput"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "corpus", help="Directory of resumes (pdf, doc, docx, odt, rtf)"
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Parse in a pool of this many processes, like a worker pool",
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=1, help="Parse every resume this many times"
+        )
+        parser.add_argument(
+            "--no-skills", action="store_true", help="Don't match skills"
+        )
+
+    def handle(self, *args, **options):
+        corpus = []
+        for root, dirs, files in os.walk(options["corpus"]):
+            for name in sorted(files):
+                if name.rsplit(".", 1)[-1].lower() in resume_parser.EXTRACTORS:
+                    with open(os.path.join(root, name), "rb") as file:
+                        corpus.append((name, file.read()))
+        if not corpus:
+            raise CommandError("No resumes found in %s" % options["corpus"])
+
+        skills = not options["no_skills"]
+        if skills:
+            # loaded once here, and inherited by the pool's processes
+            resume_parser.skill_names()
+        items = [(name, data, skills) for name, data in corpus] * options["repeat"]
+
+        started = time.perf_counter()
+        if options["workers"] > 1:
+            connections.close_all()
+            with ProcessPoolExecutor(
+                options["workers"], mp_context=multiprocessing.get_context("fork")
+            ) as pool:
+                results = list(pool.map(_time_parse, items, chunksize=4))
+        else:
+            results = [_time_parse(item) for item in items]
+        elapsed = time.perf_counter() - started
+
+        durations = defaultdict(list)
+        failures = defaultdict(int)
+        for extension, duration, failed in results:
+            durations[extension].append(duration)
+            failures[extension] += failed
+        for extension, values in sorted(durations.items()):
+            self.stdout.write(
+                "%-5s %5s resumes  mean %7.1f ms  p95 %7.1f ms  %s failed"
+                % (
+                    extension,
+                    len(values),
+                    sum(values) / len(values) * 1000,
+                    _percentile(values, 95) * 1000,
+                    failures[extension],
+                )
+            )
+        size = sum(len(data) for name, data, skills in items)
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Parsed %s resumes (%.1f MB) in %.2f s with %s worker(s): "
+                "%.1f resumes/s"
+                % (
+                    len(items),
+                    size / 1024 / 1024,
+                    elapsed,
+                    options["workers"],
+                    len(items) / elapsed,
+                )
+            )
+        )
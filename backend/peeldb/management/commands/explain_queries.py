@@ -0,0 +1,146 @@
+import json
+import re
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connections, transaction
+
+# "(0.002) SELECT ...; args=(...); alias=default", from the django.db.backends
+# logger with DEBUG on
+DJANGO_LOG_LINE = re.compile(r"^\(\d+\.\d+\) (?P<sql>.*?); args=.*; alias=\w+$")
+# "... LOG:  duration: 1.234 ms  statement: SELECT ...", from Postgres with
+# log_min_duration_statement or log_statement
+POSTGRES_LOG_LINE = re.compile(r"(?:statement|execute [^:]*): (?P<sql>.*)$")
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def read_queries(lines):
+    """
+    SELECT statements of a query log: django.db.backends or Postgres log
+    lines, or plain SQL with one statement per line or ending in ``;``.
+    """
+    statement = []
+    for line in lines:
+        line = line.rstrip("\n")
+        match = DJANGO_LOG_LINE.match(line) or POSTGRES_LOG_LINE.search(line)
+        if match:
+            sql = match.group("sql").strip().rstrip(";")
+        else:
+            statement.append(line)
+            if not line.rstrip().endswith(";"):
+                continue
+            sql = " ".join(statement).strip().rstrip(";")
+            statement = []
+        if sql.upper().startswith("SELECT"):
+            yield sql
+    sql = " ".join(statement).strip()
+    if sql.upper().startswith("SELECT"):
+        yield sql
+
+
+def normalize(sql):
+    """``sql`` with literals replaced by ``?``, to group repeats of one query."""
+    return re.sub(r"\s+", " ", LITERALS.sub("?", sql))
+
+
+def sequential_scans(plan):
+    """Yield the ``Seq Scan`` nodes of an ``EXPLAIN (FORMAT JSON)`` plan."""
+    if plan.get("Node Type") == "Seq Scan":
+        yield plan
+    for child in plan.get("Plans", ()):
+        yield from sequential_scans(child)
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs EXPLAIN on the SELECTs of a captured query log and reports the "
+        "queries that scan large tables sequentially"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "log", help="Query log file (django.db.backends, Postgres or SQL)"
+        )
+        parser.add_argument(
+            "--min-rows",
+            type=int,
+            default=10000,
+            help="Only report scans of tables with at least this many rows",
+        )
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="Run EXPLAIN ANALYZE: executes the queries, in a transaction "
+            "that is rolled back",
+        )
+        parser.add_argument("--database", default="default")
+
+    def table_rows(self, cursor, table):
+        cursor.execute(
+            "SELECT reltuples FROM pg_class WHERE oid = to_regclass(%s)", [table]
+        )
+        row = cursor.fetchone()
+        # -1 for a table that was never vacuumed or analyzed
+        return max(int(row[0]), 0) if row and row[0] is not None else 0
+
+    def explain(self, cursor, sql, analyze):
+        options = "ANALYZE, FORMAT JSON" if analyze else "FORMAT JSON"
+        cursor.execute("EXPLAIN (%s) %s" % (options, sql))
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]["Plan"]
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["log"], encoding="utf-8") as log:
+                queries = list(read_queries(log))
+        except OSError as error:
+            raise CommandError(error)
+
+        counts = Counter()
+        samples = {}
+        for sql in queries:
+            key = normalize(sql)
+            counts[key] += 1
+            samples.setdefault(key, sql)
+
+        connection = connections[options["database"]]
+        sizes = {}
+        findings = []
+        failed = 0
+        with connection.cursor() as cursor:
+            for key, sql in samples.items():
+                try:
+                    with transaction.atomic(using=options["database"]):
+                        plan = self.explain(cursor, sql, options["analyze"])
+                        transaction.set_rollback(True, using=options["database"])
+                except DatabaseError as error:
+                    failed += 1
+                    self.stderr.write("Could not explain %s: %s" % (sql[:200], error))
+                    continue
+                for node in sequential_scans(plan):
+                    table = node["Relation Name"]
+                    if table not in sizes:
+                        sizes[table] = self.table_rows(cursor, table)
+                    if sizes[table] >= options["min_rows"]:
+                        findings.append(
+                            (counts[key], plan["Total Cost"], table, node, key)
+                        )
+
+        findings.sort(key=lambda finding: finding[0] * finding[1], reverse=True)
+        for count, cost, table, node, sql in findings:
+            self.stdout.write(
+                "Seq Scan on %s (%s rows) in %s queries, plan cost %.0f"
+                % (table, sizes[table], count, cost)
+            )
+            if node.get("Filter"):
+                self.stdout.write("  filter: %s" % node["Filter"])
+            self.stdout.write("  %s" % sql[:500])
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Explained %s distinct queries of %s, %s sequential scans on large "
+                "tables, %s failed"
+                % (len(samples) - failed, len(queries), len(findings), failed)
+            )
+        )
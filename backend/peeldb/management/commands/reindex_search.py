@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from peeldb import search_queue
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the search index into a new index and swaps the alias to it"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--using", default="default")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        new_index = search_queue.reindex(
+            using=options["using"], batch_size=options["batch_size"]
+        )
+        self.stdout.write(self.style.SUCCESS("Search index now served by %s" % new_index))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from peeldb.models import JobPost
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the full text search vector of job posts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--status", help="Only update job posts with this status (e.g. Live)"
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        job_ids = JobPost.objects.order_by("id").values_list("id", flat=True)
+        if options["status"]:
+            job_ids = job_ids.filter(status=options["status"])
+        job_ids = list(job_ids)
+        batch_size = options["batch_size"]
+        for start in range(0, len(job_ids), batch_size):
+            JobPost.update_search_vector(id__in=job_ids[start : start + batch_size])
+        self.stdout.write(
+            self.style.SUCCESS("Updated search vectors of %s job posts" % len(job_ids))
+        )
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.10 on 2026-10-18 21:47
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('peeldb', '0073_jobpost_views_count'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='jobpost',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='jobpost',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='jobpost_search_vector_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='jobpost',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['title'], name='jobpost_title_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.10 on 2026-10-18 21:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('peeldb', '0074_jobpost_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchIndexQueue',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=100)),
+                ('object_id', models.IntegerField()),
+                ('queued_on', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('model', 'object_id')},
+            },
+        ),
+    ]
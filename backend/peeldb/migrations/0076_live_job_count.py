@@ -0,0 +1,77 @@
+# Generated by Django 5.2.10 on 2026-10-18 21:50
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_live_jobs(apps, schema_editor):
+    JobPost = apps.get_model("peeldb", "JobPost")
+    fields = {
+        "Skill": "skills",
+        "City": "location",
+        "Industry": "industry",
+        "Qualification": "edu_qualification",
+    }
+    for model_name, field_name in fields.items():
+        field = JobPost._meta.get_field(field_name)
+        target = field.m2m_reverse_field_name()
+        rows = (
+            field.remote_field.through.objects.filter(
+                **{target: OuterRef("pk"), "jobpost__status": "Live"}
+            )
+            .order_by()
+            .values(target)
+            .annotate(total=Count("jobpost"))
+            .values("total")
+        )
+        apps.get_model("peeldb", model_name).objects.update(
+            live_job_count=Coalesce(Subquery(rows), Value(0))
+        )
+    locations = JobPost._meta.get_field("location").remote_field.through
+    rows = (
+        locations.objects.filter(city__state=OuterRef("pk"), jobpost__status="Live")
+        .order_by()
+        .values("city__state")
+        .annotate(total=Count("jobpost", distinct=True))
+        .values("total")
+    )
+    apps.get_model("peeldb", "State").objects.update(
+        live_job_count=Coalesce(Subquery(rows), Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('peeldb', '0075_searchindexqueue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='city',
+            name='live_job_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='industry',
+            name='live_job_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='qualification',
+            name='live_job_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='skill',
+            name='live_job_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='state',
+            name='live_job_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_live_jobs, migrations.RunPython.noop),
+    ]
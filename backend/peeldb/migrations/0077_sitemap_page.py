@@ -0,0 +1,28 @@
+# Generated by Django 5.2.10 on 2026-10-18 22:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('peeldb', '0076_live_job_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SitemapPage',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('section', models.CharField(max_length=100)),
+                ('page', models.PositiveIntegerField()),
+                ('content', models.TextField()),
+                ('url_count', models.PositiveIntegerField()),
+                ('etag', models.CharField(max_length=32)),
+                ('last_modified', models.DateTimeField()),
+            ],
+            options={
+                'unique_together': {('section', 'page')},
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.10 on 2026-10-18 22:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('peeldb', '0077_sitemap_page'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('subject', models.CharField(choices=[('job', 'Jobs'), ('user', 'Users')], max_length=10)),
+                ('group', models.CharField(choices=[('all', 'All'), ('city', 'City'), ('skill', 'Skill')], max_length=10)),
+                ('job_type', models.CharField(default='', max_length=50)),
+                ('user_type', models.CharField(default='', max_length=10)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('active', models.PositiveIntegerField(default=0)),
+                ('city', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='peeldb.city')),
+                ('skill', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='peeldb.skill')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['subject', 'group', 'date'], name='peeldb_dail_subject_ead0c9_idx')],
+            },
+        ),
+    ]
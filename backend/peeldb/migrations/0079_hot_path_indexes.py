@@ -0,0 +1,56 @@
+# Generated by Django 5.2.10 on 2026-10-18 22:13
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # the indexes are built concurrently, without locking the tables for writes
+    atomic = False
+
+    dependencies = [
+        ('peeldb', '0078_daily_rollup'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='appliedjobs',
+            index=models.Index(fields=['job_post', 'status', 'applied_on'], name='appliedjobs_job_status_date'),
+        ),
+        AddIndexConcurrently(
+            model_name='appliedjobs',
+            index=models.Index(fields=['user', 'job_post'], name='appliedjobs_user_job'),
+        ),
+        AddIndexConcurrently(
+            model_name='appliedjobs',
+            index=models.Index(fields=['applied_on'], name='appliedjobs_applied_on'),
+        ),
+        AddIndexConcurrently(
+            model_name='jobpost',
+            index=models.Index(condition=models.Q(('status', 'Live')), fields=['-published_on', '-id'], name='jobpost_live_published'),
+        ),
+        AddIndexConcurrently(
+            model_name='jobpost',
+            index=models.Index(condition=models.Q(('status', 'Live')), fields=['job_type', '-published_on', '-id'], name='jobpost_live_type_published'),
+        ),
+        AddIndexConcurrently(
+            model_name='jobpost',
+            index=models.Index(fields=['user', 'status'], name='jobpost_user_status'),
+        ),
+        AddIndexConcurrently(
+            model_name='jobpost',
+            index=models.Index(fields=['published_on'], name='jobpost_published_on'),
+        ),
+        # jobs of a skill or city straight from the m2m index, without
+        # visiting the table rows
+        migrations.RunSQL(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS "jobpost_skills_skill_job" '
+            'ON "peeldb_jobpost_skills" ("skill_id", "jobpost_id")',
+            'DROP INDEX CONCURRENTLY IF EXISTS "jobpost_skills_skill_job"',
+        ),
+        migrations.RunSQL(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS "jobpost_location_city_job" '
+            'ON "peeldb_jobpost_location" ("city_id", "jobpost_id")',
+            'DROP INDEX CONCURRENTLY IF EXISTS "jobpost_location_city_job"',
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.10 on 2026-10-18 22:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('peeldb', '0080_data_export'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='resume_data',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='resume_parse_status',
+            field=models.CharField(blank=True, choices=[('Pending', 'Pending'), ('Parsing', 'Parsing'), ('Done', 'Done'), ('Failed', 'Failed')], default='', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='resume_parsed_on',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
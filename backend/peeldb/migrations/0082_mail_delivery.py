@@ -0,0 +1,30 @@
+# Generated by Django 5.2.10 on 2026-10-18 22:31
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('peeldb', '0081_user_resume_parse_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MailDelivery',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(max_length=50)),
+                ('recipients', django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=255), size=None)),
+                ('subject', models.CharField(max_length=500)),
+                ('status', models.CharField(choices=[('Sent', 'Sent'), ('Failed', 'Failed')], max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=1)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_on', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['category', 'status', 'created_on'], name='maildelivery_category_status')],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.10 on 2026-10-18 22:43
+
+import peeldb.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('peeldb', '0082_mail_delivery'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='dataexport',
+            name='file',
+            field=models.FileField(blank=True, max_length=1000, storage=peeldb.models.export_storage, upload_to=''),
+        ),
+    ]
@@ -5,15 +5,21 @@ import os
 from datetime import datetime
 import re
 import arrow
+from django.conf import settings
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, UserManager
 
 # from oauth2client.contrib.django_util.models import CredentialsField
 
+from django.contrib.postgres.aggregates import StringAgg
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
-from django.db.models import Q, Count, F, JSONField
+from django.db.models import Q, Count, F, JSONField, Sum
+from django.db.models.functions import Coalesce
 from django.utils import timezone
+from django.utils.module_loading import import_string
 from django.utils.translation import gettext_lazy as _
 
 # from microurl import google_mini
@@ -43,6 +49,8 @@ class Industry(models.Model):
     meta_title = models.TextField(default="")
     meta_description = models.TextField(default="")
     page_content = models.TextField(default="")
+    # live jobs tagged with this row, maintained by peeldb.job_counts
+    live_job_count = models.PositiveIntegerField(default=0)
 
     def get_job_url(self):
         job_url = "/" + str(self.slug) + "-industry-jobs/"
@@ -103,6 +111,8 @@ class Qualification(models.Model):
     name = models.CharField(max_length=500)
     status = models.CharField(choices=STATUS, max_length=10)
     slug = models.SlugField(max_length=500)
+    # live jobs tagged with this row, maintained by peeldb.job_counts
+    live_job_count = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return self.name
@@ -128,6 +138,8 @@ class State(models.Model):
     name = models.CharField(max_length=500)
     status = models.CharField(choices=STATUS_TYPES, max_length=10, default="Enabled")
     slug = models.SlugField(max_length=500, default="")
+    # live jobs tagged with this row, maintained by peeldb.job_counts
+    live_job_count = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return self.name
@@ -160,6 +172,8 @@ class Skill(models.Model):
     page_content = models.TextField(default="")
     meta = models.JSONField(null=True)
     skill_type = models.CharField(choices=SKILL_TYPE, max_length=20, default="it")
+    # live jobs tagged with this row, maintained by peeldb.job_counts
+    live_job_count = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return self.name
@@ -225,6 +239,8 @@ class City(models.Model):
     internship_meta_description = models.TextField(default="")
     page_content = models.TextField(default="")
     internship_content = models.TextField(default="")
+    # live jobs tagged with this row, maintained by peeldb.job_counts
+    live_job_count = models.PositiveIntegerField(default=0)
     meta = JSONField(null=True)
 
     def __str__(self):
@@ -496,6 +512,14 @@ REGISTERED_FROM = (
 )
 
 
+RESUME_PARSE_STATUS = (
+    ("Pending", "Pending"),
+    ("Parsing", "Parsing"),
+    ("Done", "Done"),
+    ("Failed", "Failed"),
+)
+
+
 def resume_upload_path(instance, filename):
     """
     Generate a secure upload path for resume files using UUID for better randomness.
@@ -605,6 +629,13 @@ class User(AbstractBaseUser, PermissionsMixin):
     show_email = models.BooleanField(default=False)
     resume_title = models.TextField(max_length=2000, blank=True, null=True)
     resume_text = models.TextField(blank=True, null=True)
+    # set by mpcomp.resume_parser, "" until a resume is queued for parsing
+    resume_parse_status = models.CharField(
+        choices=RESUME_PARSE_STATUS, max_length=10, blank=True, default=""
+    )
+    resume_parsed_on = models.DateTimeField(null=True, blank=True)
+    # email, mobile and skill ids found in the resume
+    resume_data = models.JSONField(null=True, blank=True)
     mobile_verification_code = models.CharField(max_length=50, default="")
     last_mobile_code_verified_on = models.DateTimeField(auto_now_add=True)
     mobile_verified = models.BooleanField(default=False)
@@ -798,9 +829,10 @@ class User(AbstractBaseUser, PermissionsMixin):
         return len(JobPost.objects.filter(user=self))
 
     def get_total_job_post_views_count(self):
-        # TODO: Implement proper analytics tracking system
-        # Social media view fields have been removed from JobPost model
-        return 0
+        return (
+            JobPost.objects.filter(user=self).aggregate(total=Sum("views_count"))["total"]
+            or 0
+        )
 
     def get_total_jobposts(self):
         return JobPost.objects.filter(user=self)
@@ -1202,6 +1234,10 @@ class AgencyCompany(models.Model):
     )
 
 
+# text search configuration used for JobPost.search_vector and its queries
+SEARCH_CONFIG = "english"
+
+
 class JobPostManager(models.Manager):
     def get_queryset(self):
         return super(JobPostManager, self).get_queryset().order_by("-created_on")
@@ -1297,6 +1333,8 @@ class JobPost(models.Model):
     created_on = models.DateField(auto_now_add=True)
     status = models.CharField(choices=POST_STATUS, max_length=50)
     job_type = models.CharField(choices=JOB_TYPE, max_length=50)
+    # flushed periodically from the cache by mpcomp.view_counter
+    views_count = models.PositiveIntegerField(default=0)
     work_mode = models.CharField(choices=WORK_MODE, max_length=50, default="in-office")
 
     # Company details (needed for display and jobs without company FK)
@@ -1397,9 +1435,59 @@ class JobPost(models.Model):
         help_text="Urgency level for filling this position"
     )
 
+    # Weighted full text document for search.backends.PostgresJobSearch,
+    # refreshed by peeldb.signals through update_search_vector()
+    search_vector = SearchVectorField(null=True, editable=False)
+
     # objects = JobPostManager()
     class Meta:
         ordering = ["-created_on"]
+        indexes = [
+            GinIndex(fields=["search_vector"], name="jobpost_search_vector_gin"),
+            GinIndex(
+                fields=["title"], name="jobpost_title_trgm", opclasses=["gin_trgm_ops"]
+            ),
+            # listings: live jobs newest first (mpcomp.pagination.JOB_ORDERING),
+            # optionally of one job type
+            models.Index(
+                fields=["-published_on", "-id"],
+                name="jobpost_live_published",
+                condition=Q(status="Live"),
+            ),
+            models.Index(
+                fields=["job_type", "-published_on", "-id"],
+                name="jobpost_live_type_published",
+                condition=Q(status="Live"),
+            ),
+            # recruiter dashboards and profiles
+            models.Index(fields=["user", "status"], name="jobpost_user_status"),
+            # reports and metrics by publishing date
+            models.Index(fields=["published_on"], name="jobpost_published_on"),
+        ]
+
+    @classmethod
+    def update_search_vector(cls, **filters):
+        """
+        Rebuild ``search_vector`` for the job posts matching ``filters``:
+        title and job role weigh most, then skills, company name and description.
+        """
+        skill_names = (
+            Skill.objects.filter(jobpost=models.OuterRef("pk"))
+            .order_by()
+            .values("jobpost")
+            .annotate(names=StringAgg("name", " "))
+            .values("names")
+        )
+        return cls.objects.filter(**filters).update(
+            search_vector=SearchVector("title", "job_role", weight="A", config=SEARCH_CONFIG)
+            + SearchVector(
+                Coalesce(models.Subquery(skill_names), models.Value("")),
+                weight="B",
+                config=SEARCH_CONFIG,
+            )
+            + SearchVector("company_name", weight="C", config=SEARCH_CONFIG)
+            + SearchVector("description", weight="D", config=SEARCH_CONFIG)
+        )
 
     def __unicode__(self):
         return self.title
@@ -1433,9 +1521,7 @@ class JobPost(models.Model):
         return qs
 
     def get_total_views_count(self):
-        # TODO: Implement proper analytics tracking system
-        # Social media view fields have been removed
-        return 0
+        return self.views_count
 
     def get_similar_jobposts(self):
         # current_date = datetime.strptime(str(datetime.now().date()), "%Y-%m-%d").strftime("%Y-%m-%d")
@@ -1683,6 +1769,19 @@ class AppliedJobs(models.Model):
         AgencyResume, null=True, blank=True, on_delete=models.CASCADE
     )
 
+    class Meta:
+        indexes = [
+            # applicants of a job by status, newest first, and recruiter analytics
+            models.Index(
+                fields=["job_post", "status", "applied_on"],
+                name="appliedjobs_job_status_date",
+            ),
+            # "has this user applied for this job"
+            models.Index(fields=["user", "job_post"], name="appliedjobs_user_job"),
+            # reports and metrics by application date
+            models.Index(fields=["applied_on"], name="appliedjobs_applied_on"),
+        ]
+
 
 ENQUERY_TYPES = (
     ("general", "General Inquiry"),
@@ -1791,6 +1890,62 @@ class VisitedJobs(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
 
 
+class SearchIndexQueue(models.Model):
+    """Objects whose search index documents are waiting to be refreshed"""
+    model = models.CharField(max_length=100)
+    object_id = models.IntegerField()
+    queued_on = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('model', 'object_id')
+
+
+class DailyRollup(models.Model):
+    """
+    Jobs published and users joined on one day, counted per group of
+    city/skill/job type/user type; see peeldb/report_rollups.py
+    """
+    SUBJECTS = (
+        ("job", "Jobs"),
+        ("user", "Users"),
+    )
+    GROUPS = (
+        ("all", "All"),
+        ("city", "City"),
+        ("skill", "Skill"),
+    )
+    date = models.DateField()
+    subject = models.CharField(choices=SUBJECTS, max_length=10)
+    group = models.CharField(choices=GROUPS, max_length=10)
+    city = models.ForeignKey(
+        City, null=True, related_name="+", on_delete=models.CASCADE
+    )
+    skill = models.ForeignKey(
+        Skill, null=True, related_name="+", on_delete=models.CASCADE
+    )
+    job_type = models.CharField(max_length=50, default="")
+    user_type = models.CharField(max_length=10, default="")
+    # jobs: published, and still Live; users: joined, and still active
+    total = models.PositiveIntegerField(default=0)
+    active = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [models.Index(fields=["subject", "group", "date"])]
+
+
+class SitemapPage(models.Model):
+    """One rendered page of a psite.sitemaps section, served as is"""
+    section = models.CharField(max_length=100)
+    page = models.PositiveIntegerField()
+    content = models.TextField()
+    url_count = models.PositiveIntegerField()
+    etag = models.CharField(max_length=32)
+    last_modified = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('section', 'page')
+
+
 class SavedJobs(models.Model):
     """Model to track saved/bookmarked jobs by users"""
     job_post = models.ForeignKey(JobPost, on_delete=models.CASCADE, related_name='saved_by')
@@ -1973,3 +2128,62 @@ class TeamInvitation(models.Model):
             user.job_title = self.role_title
         user.save()
 
+
+def export_storage():
+    """Private storage of ``DataExport`` files, see ``EXPORT_STORAGE``."""
+    options = settings.EXPORT_STORAGE
+    return import_string(options["BACKEND"])(**options.get("OPTIONS", {}))
+
+
+class DataExport(models.Model):
+    """A CSV/XLSX export of applicants, written by peeldb.exports"""
+    KINDS = (
+        ("applicants", "Job seekers"),
+        ("job_applicants", "Applicants of a job"),
+    )
+    FORMATS = (
+        ("csv", "CSV"),
+        ("xlsx", "Excel"),
+    )
+    STATUSES = (
+        ("Pending", "Pending"),
+        ("Running", "Running"),
+        ("Done", "Done"),
+        ("Failed", "Failed"),
+    )
+    requested_by = models.ForeignKey(
+        User, related_name="data_exports", on_delete=models.CASCADE
+    )
+    kind = models.CharField(choices=KINDS, max_length=20)
+    file_format = models.CharField(choices=FORMATS, max_length=10, default="csv")
+    # filters of the exported rows, see peeldb.exports.KINDS
+    params = models.JSONField(default=dict)
+    status = models.CharField(choices=STATUSES, max_length=10, default="Pending")
+    file = models.FileField(max_length=1000, blank=True, storage=export_storage)
+    rows = models.PositiveIntegerField(default=0)
+    created_on = models.DateTimeField(auto_now_add=True)
+    finished_on = models.DateTimeField(null=True, blank=True)
+
+
+class MailDelivery(models.Model):
+    """Outcome of a mail sent by dashboard.tasks.send_email_batch"""
+    STATUSES = (
+        ("Sent", "Sent"),
+        ("Failed", "Failed"),
+    )
+    # the task or feature that sent the mail, e.g. "job_alert"
+    category = models.CharField(max_length=50)
+    recipients = ArrayField(models.CharField(max_length=255))
+    subject = models.CharField(max_length=500)
+    status = models.CharField(choices=STATUSES, max_length=10)
+    attempts = models.PositiveSmallIntegerField(default=1)
+    error = models.TextField(blank=True, default="")
+    created_on = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["category", "status", "created_on"],
+                name="maildelivery_category_status",
+            ),
+        ]
@@ -0,0 +1,293 @@
+"""
+Application analytics behind the recruiter dashboard and analytics APIs
+(``api.v1.recruiter.job_views.get_dashboard_stats`` and
+``api.v1.recruiter.analytics_views.get_application_analytics``).
+
+Every pipeline, trend and per-job number is a ``Count(filter=...)`` of one
+grouped query: the recruiter's jobs by status, their applications by status
+and window, and the per-job counts, instead of a ``count()`` per bucket and
+per job.
+
+Results are cached per recruiter and period for
+``RECRUITER_ANALYTICS_CACHE_TIMEOUT`` seconds. ``peeldb.signals`` calls
+``invalidate(recruiter_id)`` whenever one of the recruiter's jobs or
+applications is saved or deleted, which stamps the recruiter; a cached result
+is only served when it was computed after the recruiter was last stamped.
+"""
+import time
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from mpcomp.cache import cache_key
+from peeldb.models import AppliedJobs, JobPost
+
+PERIODS = {"7d": 7, "30d": 30, "90d": 90}
+DEFAULT_PERIOD = "30d"
+APPLICATION_STATUSES = ("Pending", "Shortlisted", "Hired", "Rejected")
+JOB_STATUSES = {
+    "live_jobs": "Live",
+    "draft_jobs": "Draft",
+    "closed_jobs": "Disabled",
+    "expired_jobs": "Expired",
+}
+RECENT_JOBS = 5
+TOP_JOBS = 10
+# applications of the last NEW_APPLICATION_DAYS count as new on a recent job
+NEW_APPLICATION_DAYS = 7
+WEEKDAYS = (
+    "monday",
+    "tuesday",
+    "wednesday",
+    "thursday",
+    "friday",
+    "saturday",
+    "sunday",
+)
+
+
+def _timeout():
+    return getattr(settings, "RECRUITER_ANALYTICS_CACHE_TIMEOUT", 5 * 60)
+
+
+def _stamp_key(recruiter_id):
+    return cache_key("recruiter_analytics_stamp", recruiter_id)
+
+
+def invalidate(recruiter_id):
+    if recruiter_id:
+        cache.set(_stamp_key(recruiter_id), time.time(), _timeout())
+
+
+def _cached(recruiter_id, key, compute):
+    stamp = cache.get(_stamp_key(recruiter_id))
+    entry = cache.get(key)
+    if entry is not None and (stamp is None or stamp < entry["computed_at"]):
+        return entry["data"]
+    computed_at = time.time()
+    data = compute()
+    cache.set(key, {"data": data, "computed_at": computed_at}, _timeout())
+    return data
+
+
+def period_days(period):
+    return PERIODS.get(period, PERIODS[DEFAULT_PERIOD])
+
+
+def trend(current, previous):
+    """Change from ``previous`` to ``current`` as ``"+12.5%"``, or ``"N/A"``."""
+    if previous <= 0:
+        return "N/A"
+    change = (current - previous) / previous * 100
+    return f"{'+' if change > 0 else ''}{change:.1f}%"
+
+
+def _pipeline(counts, total):
+    pipeline = {status.lower(): counts[status] for status in APPLICATION_STATUSES}
+    pipeline["conversion_rate"] = (
+        round(pipeline["hired"] / total * 100, 2) if total > 0 else 0
+    )
+    return pipeline
+
+
+def _status_counts(prefix="", condition=Q()):
+    """``Count`` aggregates per application status, within ``condition``."""
+    return {
+        status: Count(
+            prefix + "id", filter=condition & Q(**{prefix + "status": status})
+        )
+        for status in APPLICATION_STATUSES
+    }
+
+
+def pipeline(applications):
+    """
+    ``(total, pipeline)``: the number of ``applications`` and their status
+    counts and conversion rate, in one query.
+    """
+    counts = applications.aggregate(total=Count("id"), **_status_counts())
+    return counts["total"], _pipeline(counts, counts["total"])
+
+
+def dashboard_stats(recruiter_id, period=DEFAULT_PERIOD):
+    """
+    Job and application totals of the recruiter, the applications of the
+    period against the one before it, the pipeline of all applications, and
+    ``recent_jobs``: ``(job_id, {applicants_count, new_applicants,
+    pending_review})`` of the latest jobs.
+    """
+    days = period_days(period)
+    return _cached(
+        recruiter_id,
+        cache_key("recruiter_dashboard", recruiter_id, days),
+        lambda: _dashboard_stats(recruiter_id, days),
+    )
+
+
+def _dashboard_stats(recruiter_id, days):
+    now = timezone.now()
+    start = now - timedelta(days=days)
+    previous_start = start - timedelta(days=days)
+
+    jobs = JobPost.objects.filter(user_id=recruiter_id)
+    job_counts = jobs.aggregate(
+        total_jobs=Count("id"),
+        **{
+            name: Count("id", filter=Q(status=status))
+            for name, status in JOB_STATUSES.items()
+        },
+    )
+
+    counts = AppliedJobs.objects.filter(job_post__user_id=recruiter_id).aggregate(
+        total=Count("id"),
+        new=Count("id", filter=Q(applied_on__gte=start)),
+        previous=Count(
+            "id", filter=Q(applied_on__gte=previous_start, applied_on__lt=start)
+        ),
+        **_status_counts(),
+    )
+
+    new_since = now - timedelta(days=NEW_APPLICATION_DAYS)
+    recent_jobs = (
+        jobs.annotate(
+            applicants_count=Count("appliedjobs"),
+            new_applicants=Count(
+                "appliedjobs", filter=Q(appliedjobs__applied_on__gte=new_since)
+            ),
+            pending_review=Count(
+                "appliedjobs", filter=Q(appliedjobs__status="Pending")
+            ),
+        )
+        .order_by("-created_on")
+        .values("id", "applicants_count", "new_applicants", "pending_review")[
+            :RECENT_JOBS
+        ]
+    )
+
+    live_jobs = job_counts["live_jobs"]
+    stats = dict(job_counts)
+    stats.update(
+        total_applicants=counts["total"],
+        new_applicants=counts["new"],
+        applicants_trend=trend(counts["new"], counts["previous"]),
+        avg_applications_per_job=round(
+            counts["total"] / live_jobs if live_jobs > 0 else 0, 1
+        ),
+    )
+    return {
+        "stats": stats,
+        "pipeline": _pipeline(counts, counts["total"]),
+        "recent_jobs": [(job.pop("id"), job) for job in recent_jobs],
+    }
+
+
+def application_analytics(recruiter_id, start, end, days, period=None):
+    """
+    Applications of the recruiter's jobs from ``start`` to ``end``
+    (inclusive): totals against the ``days`` before ``start``, pipeline,
+    applications by day and weekday, and the ``TOP_JOBS`` live jobs by
+    applications. Pass the ``period`` the range was computed from, if any:
+    it is cached under that instead of the (moving) range.
+    """
+    if period is not None:
+        window = (period,)
+    else:
+        window = (start.isoformat(), end.isoformat())
+    return _cached(
+        recruiter_id,
+        cache_key("recruiter_analytics", recruiter_id, *window),
+        lambda: _application_analytics(recruiter_id, start, end, days),
+    )
+
+
+def _application_analytics(recruiter_id, start, end, days):
+    applications = AppliedJobs.objects.filter(job_post__user_id=recruiter_id)
+    in_period = Q(applied_on__gte=start, applied_on__lte=end)
+    previous_start = start - timedelta(days=days)
+    counts = applications.aggregate(
+        total=Count("id", filter=in_period),
+        previous=Count(
+            "id", filter=Q(applied_on__gte=previous_start, applied_on__lt=start)
+        ),
+        **_status_counts(condition=in_period),
+    )
+    total = counts["total"]
+
+    by_day = list(
+        applications.filter(in_period)
+        .annotate(day=TruncDate("applied_on"))
+        .values("day")
+        .annotate(count=Count("id"))
+        .order_by("day")
+    )
+    peak_days = dict.fromkeys(WEEKDAYS, 0)
+    for row in by_day:
+        peak_days[WEEKDAYS[row["day"].weekday()]] += row["count"]
+
+    job_in_period = Q(
+        appliedjobs__applied_on__gte=start, appliedjobs__applied_on__lte=end
+    )
+    live_jobs = (
+        JobPost.objects.filter(user_id=recruiter_id, status="Live")
+        .annotate(
+            total_applications=Count("appliedjobs", filter=job_in_period),
+            **{
+                status.lower(): count
+                for status, count in _status_counts(
+                    "appliedjobs__", job_in_period
+                ).items()
+            },
+        )
+        .values(
+            "id",
+            "title",
+            "status",
+            "created_on",
+            "total_applications",
+            *(status.lower() for status in APPLICATION_STATUSES),
+        )
+    )
+    today = datetime.now().date()
+    job_performance = []
+    for job in live_jobs:
+        job_total = job["total_applications"]
+        days_active = (today - job["created_on"]).days if job["created_on"] else 0
+        job_performance.append(
+            {
+                "job_id": job["id"],
+                "job_title": job["title"],
+                "total_applications": job_total,
+                "new_applications": job_total,
+                **{
+                    status.lower(): job[status.lower()]
+                    for status in APPLICATION_STATUSES
+                },
+                "conversion_rate": round(
+                    job["hired"] / job_total * 100 if job_total > 0 else 0, 2
+                ),
+                "days_active": days_active,
+                "avg_applications_per_day": round(
+                    job_total / days_active if days_active > 0 else 0, 1
+                ),
+                "status": job["status"],
+            }
+        )
+    job_performance.sort(key=lambda job: job["total_applications"], reverse=True)
+
+    return {
+        "overview": {
+            "total_applications": total,
+            "new_applications": total,
+            "trend": trend(total, counts["previous"]),
+            "avg_per_day": round(total / days if days > 0 else 0, 1),
+            "total_jobs": len(job_performance),
+        },
+        "pipeline": _pipeline(counts, total),
+        "applications_by_day": by_day,
+        "job_performance": job_performance[:TOP_JOBS],
+        "peak_days": peak_days,
+    }
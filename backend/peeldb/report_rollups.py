@@ -0,0 +1,115 @@
+"""
+Daily rollups behind the admin reports.
+
+``DailyRollup`` holds, per day, how many jobs were published and how many
+users joined, counted per city (``group="city"``), per skill
+(``group="skill"``) and overall (``group="all"``), each split by job type and
+user type (the poster's, for jobs). A job in two cities is in both city rows
+but only once in the ``"all"`` row, so only ever sum rows of one group.
+Users are counted in their current city when they are job seekers and in
+their (company) city otherwise.
+
+``refresh(dates)`` recomputes whole days with one grouped query per group and
+replaces their rows. ``dashboard.tasks.refresh_daily_rollups`` refreshes the
+last ``RECENT_DAYS`` days every 15 minutes, and every day once a night, which
+picks up later changes to older days (a job expiring, a user being
+deactivated).
+"""
+from datetime import datetime, timedelta
+from itertools import chain
+
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, When
+from django.db.models.functions import TruncDate
+
+from peeldb.models import DailyRollup, JobPost, User
+
+RECENT_DAYS = 2
+BATCH_SIZE = 1000
+
+# JobPost m2m field behind each job group
+JOB_GROUP_FIELDS = {"city": "location", "skill": "skills"}
+USER_CITY = Case(When(user_type="JS", then=F("current_city")), default=F("city"))
+
+
+def _job_rollups(jobs, group):
+    field = JOB_GROUP_FIELDS.get(group)
+    keys = ["day", "job_type", "user__user_type"] + ([field] if field else [])
+    rows = (
+        jobs.annotate(day=TruncDate("published_on"))
+        .values(*keys)
+        .annotate(total=Count("id"), active=Count("id", filter=Q(status="Live")))
+        .order_by()
+    )
+    for row in rows:
+        yield DailyRollup(
+            date=row["day"],
+            subject="job",
+            group=group,
+            city_id=row.get("location"),
+            skill_id=row.get("skills"),
+            job_type=row["job_type"],
+            user_type=row["user__user_type"],
+            total=row["total"],
+            active=row["active"],
+        )
+
+
+def _user_rollups(users, group):
+    keys = ["day", "user_type"] + (["user_city"] if group == "city" else [])
+    rows = (
+        users.annotate(day=TruncDate("date_joined"), user_city=USER_CITY)
+        .values(*keys)
+        .annotate(total=Count("id"), active=Count("id", filter=Q(is_active=True)))
+        .order_by()
+    )
+    for row in rows:
+        yield DailyRollup(
+            date=row["day"],
+            subject="user",
+            group=group,
+            city_id=row.get("user_city"),
+            user_type=row["user_type"],
+            total=row["total"],
+            active=row["active"],
+        )
+
+
+def refresh(dates=None):
+    """
+    Recompute the rollups of ``dates`` (of every day without ``dates``);
+    returns the number of rows written.
+    """
+    jobs = JobPost.objects.filter(published_on__isnull=False)
+    users = User.objects.all()
+    stale = DailyRollup.objects.all()
+    if dates is not None:
+        dates = list(dates)
+        jobs = jobs.filter(published_on__date__in=dates)
+        users = users.filter(date_joined__date__in=dates)
+        stale = stale.filter(date__in=dates)
+    rollups = chain(
+        _job_rollups(jobs, "all"),
+        _job_rollups(jobs, "city"),
+        _job_rollups(jobs, "skill"),
+        _user_rollups(users, "all"),
+        _user_rollups(users, "city"),
+    )
+    with transaction.atomic():
+        stale.delete()
+        return len(DailyRollup.objects.bulk_create(rollups, batch_size=BATCH_SIZE))
+
+
+def refresh_recent():
+    today = datetime.now().date()
+    return refresh(today - timedelta(days=days) for days in range(RECENT_DAYS))
+
+
+def rollups(subject, group, start=None, end=None):
+    """Rows of ``subject`` and ``group`` for the days ``start`` to ``end``, inclusive."""
+    rows = DailyRollup.objects.filter(subject=subject, group=group)
+    if start is not None:
+        rows = rows.filter(date__gte=start)
+    if end is not None:
+        rows = rows.filter(date__lte=end)
+    return rows
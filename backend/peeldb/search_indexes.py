@@ -6,6 +6,7 @@ from peeldb.models import (
     Industry,
     Qualification,
     State,
+    User,
 )
 from datetime import datetime
 from django.core import serializers
@@ -52,7 +53,8 @@ class jobIndex(indexes.SearchIndex, indexes.Indexable):
         return get_absolute_url(obj)
 
     def prepare_skills(self, obj):
-        return [str(s.name) for s in obj.skills.filter(status="Active")]
+        # filter in Python so the prefetched skills from index_queryset are used
+        return [str(s.name) for s in obj.skills.all() if s.status == "Active"]
 
     def prepare_location(self, obj):
         locations = serializers.serialize("json", obj.location.all())
@@ -90,7 +92,9 @@ class jobIndex(indexes.SearchIndex, indexes.Indexable):
         return None
 
     def prepare_edu_qualification(self, obj):
-        return [str(s.name) for s in obj.edu_qualification.filter(status="Active")]
+        return [
+            str(s.name) for s in obj.edu_qualification.all() if s.status == "Active"
+        ]
 
     # def prepare_walkin_from_date(self, obj):
     #     if obj.walkin_from_date:
@@ -117,6 +121,61 @@ class jobIndex(indexes.SearchIndex, indexes.Indexable):
         )
 
 
+class candidateIndex(indexes.SearchIndex, indexes.Indexable):
+    """
+    Index of active job seekers for the recruiter candidate search. The
+    document holds the profile, skills, cities and the parsed resume text
+    (its first 20,000 characters), which makes candidates the largest
+    documents in the index.
+    """
+
+    text = indexes.CharField(
+        document=True, use_template=True, template_name="index/candidate_text.txt"
+    )
+    candidate_role = indexes.CharField(model_attr="job_role")
+    candidate_skills = indexes.MultiValueField(faceted=True)
+    current_city = indexes.CharField(null=True, faceted=True)
+    preferred_cities = indexes.MultiValueField(faceted=True)
+    experience_months = indexes.IntegerField()
+    looking_for_job = indexes.BooleanField(model_attr="is_looking_for_job")
+    open_to_offers = indexes.BooleanField(model_attr="is_open_to_offers")
+    profile_updated = indexes.DateTimeField(model_attr="profile_updated")
+
+    def get_model(self):
+        return User
+
+    def should_update(self, instance, **kwargs):
+        # recruiter and admin accounts save often and are never indexed
+        return instance.user_type == "JS"
+
+    def prepare_candidate_skills(self, obj):
+        # lower-cased, so skill filters match any case like the ORM search
+        return [
+            str(s.skill.name).lower()
+            for s in obj.skills.all()
+            if s.skill.status == "Active"
+        ]
+
+    def prepare_current_city(self, obj):
+        return obj.current_city.name if obj.current_city else None
+
+    def prepare_preferred_cities(self, obj):
+        return [str(c.name) for c in obj.preferred_city.all()]
+
+    def prepare_experience_months(self, obj):
+        years = int(obj.year) if obj.year and obj.year.isdigit() else 0
+        months = int(obj.month) if obj.month and obj.month.isdigit() else 0
+        return years * 12 + months
+
+    def index_queryset(self, using=None):
+        return (
+            self.get_model()
+            .objects.filter(user_type="JS", is_active=True)
+            .select_related("current_city")
+            .prefetch_related("skills__skill", "preferred_city")
+        )
+
+
 class skillautoIndex(indexes.SearchIndex, indexes.Indexable):
     """
     Index for autocompleate for designation and skills
@@ -137,7 +196,7 @@ class skillautoIndex(indexes.SearchIndex, indexes.Indexable):
         return self.get_model().objects.filter(status="Active")
 
     def prepare_no_of_jobposts(self, obj):
-        return obj.get_no_of_jobposts().count()
+        return obj.live_job_count
 
 
 class locationIndex(indexes.SearchIndex, indexes.Indexable):
@@ -157,7 +216,7 @@ class locationIndex(indexes.SearchIndex, indexes.Indexable):
         return self.get_model().objects.filter(status="Enabled")
 
     def prepare_no_of_jobposts(self, obj):
-        return obj.get_no_of_jobposts().count()
+        return obj.live_job_count
 
 
 class industryIndex(indexes.SearchIndex, indexes.Indexable):
@@ -177,7 +236,7 @@ class industryIndex(indexes.SearchIndex, indexes.Indexable):
         return self.get_model().objects.all()
 
     def prepare_no_of_jobposts(self, obj):
-        return obj.get_no_of_jobposts().count()
+        return obj.live_job_count
 
 
 class qualificationIndex(indexes.SearchIndex, indexes.Indexable):
@@ -194,7 +253,7 @@ class qualificationIndex(indexes.SearchIndex, indexes.Indexable):
         return Qualification
 
     def prepare_no_of_jobposts(self, obj):
-        return obj.get_no_of_jobposts().count()
+        return obj.live_job_count
 
     def index_queryset(self, using=None):
         return self.get_model().objects.filter(status="Active")
@@ -222,7 +281,7 @@ class stateIndex(indexes.SearchIndex, indexes.Indexable):
         return obj.state.all().count()
 
     def prepare_no_of_jobposts(self, obj):
-        return obj.get_no_of_jobposts().count()
+        return obj.live_job_count
 
     def prepare_is_duplicate(self, obj):
         return obj.state.filter(name=obj.name).exists()
@@ -0,0 +1,218 @@
+"""
+Deferred, batched Haystack indexing.
+
+``QueuedSignalProcessor`` replaces ``RealtimeSignalProcessor``: instead of
+writing to Elasticsearch inside every ``save()``, it records the changed
+object in ``SearchIndexQueue`` (one upserted row per object, however often it
+changes), unless the model's index declines it in ``should_update()``.
+``drain()``, run every minute by ``dashboard.tasks.
+drain_search_index_queue``, refreshes the queued objects in batches through
+each index's prefetched ``index_queryset()`` and removes documents for
+objects that are gone from it (deleted, or no longer Live), then invalidates
+the cached listing pages of the refreshed jobs (``mpcomp.page_cache``).
+
+``reindex()`` rebuilds everything into a new physical index and then points
+the configured ``INDEX_NAME`` alias at it, so searches keep working for the
+whole rebuild. Draining is paused meanwhile; changes queued during the
+rebuild are applied to the new index afterwards.
+"""
+import logging
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models
+from django.utils import timezone
+from elasticsearch import ElasticsearchException
+from haystack import connection_router, connections
+from haystack.signals import BaseSignalProcessor
+from haystack.utils import get_model_ct
+
+from mpcomp import page_cache
+from peeldb.models import JobPost, SearchIndexQueue, User
+
+logger = logging.getLogger(__name__)
+
+REINDEX_LOCK = "search_index:reindexing"
+REINDEX_LOCK_TIMEOUT = 6 * 60 * 60
+
+# relations rendered into the job document
+JOB_M2M_FIELDS = ("location", "skills", "industry", "edu_qualification")
+# relations rendered into the candidate document
+CANDIDATE_M2M_FIELDS = ("skills", "preferred_city")
+
+
+def enqueue(model, pks):
+    """Queue the objects of ``model`` with the given primary keys for indexing."""
+    label = get_model_ct(model)
+    SearchIndexQueue.objects.bulk_create(
+        [SearchIndexQueue(model=label, object_id=pk) for pk in set(pks)],
+        update_conflicts=True,
+        unique_fields=["model", "object_id"],
+        update_fields=["queued_on"],
+    )
+
+
+class QueuedSignalProcessor(BaseSignalProcessor):
+    _indexed_models = None
+
+    def indexed_models(self):
+        if self._indexed_models is None:
+            indexed = set()
+            for using in self.connections.connections_info:
+                indexed.update(self.connections[using].get_unified_index().get_indexed_models())
+            self._indexed_models = indexed
+        return self._indexed_models
+
+    def setup(self):
+        models.signals.post_save.connect(self.handle_save)
+        models.signals.post_delete.connect(self.handle_delete)
+        models.signals.m2m_changed.connect(self.handle_m2m_changed)
+
+    def teardown(self):
+        models.signals.post_save.disconnect(self.handle_save)
+        models.signals.post_delete.disconnect(self.handle_delete)
+        models.signals.m2m_changed.disconnect(self.handle_m2m_changed)
+
+    def m2m_models(self):
+        """``{through model: indexed model}`` of the relations in the documents."""
+        return {
+            getattr(model, name).through: model
+            for model, names in ((JobPost, JOB_M2M_FIELDS), (User, CANDIDATE_M2M_FIELDS))
+            for name in names
+        }
+
+    def handle_save(self, sender, instance, **kwargs):
+        if sender not in self.indexed_models():
+            return
+        if any(
+            self.connections[using].get_unified_index().get_index(sender).should_update(instance)
+            for using in self.connection_router.for_write(instance=instance)
+        ):
+            enqueue(sender, [instance.pk])
+
+    def handle_delete(self, sender, instance, **kwargs):
+        if sender in self.indexed_models():
+            enqueue(sender, [instance.pk])
+
+    def handle_m2m_changed(self, sender, instance, action, reverse, pk_set, **kwargs):
+        if not action.startswith("post_"):
+            return
+        model = self.m2m_models().get(sender)
+        if model is None:
+            return
+        if not reverse:
+            enqueue(model, [instance.pk])
+        elif pk_set:
+            enqueue(model, pk_set)
+
+
+def get_backend(using, **options):
+    """
+    A fresh backend for connection ``using`` that raises instead of silently
+    failing, optionally with overridden connection options.
+    """
+    connection_options = dict(settings.HAYSTACK_CONNECTIONS[using])
+    connection_options.update(options, SILENTLY_FAIL=False)
+    backend_class = type(connections[using].get_backend())
+    return backend_class(using, **connection_options)
+
+
+def index_objects(backend, index, object_ids):
+    """Refresh the documents of ``object_ids`` and drop the ones not indexable."""
+    found = set()
+    objects = list(index.index_queryset(using=backend.connection_alias).filter(pk__in=object_ids))
+    if objects:
+        backend.update(index, objects, commit=False)
+        found = {obj.pk for obj in objects}
+    model_ct = get_model_ct(index.get_model())
+    for object_id in set(object_ids) - found:
+        backend.remove("%s.%s" % (model_ct, object_id), commit=False)
+
+
+def drain(batch_size=500):
+    """Index queued objects in batches; returns how many entries were handled."""
+    if cache.get(REINDEX_LOCK):
+        return 0
+    started = timezone.now()
+    handled = 0
+    last_id = 0
+    backends = [get_backend(using) for using in connection_router.for_write()]
+    while True:
+        entries = list(
+            SearchIndexQueue.objects.filter(id__gt=last_id, queued_on__lte=started)
+            .order_by("id")[:batch_size]
+        )
+        if not entries:
+            break
+        last_id = entries[-1].id
+        by_model = {}
+        for entry in entries:
+            by_model.setdefault(entry.model, []).append(entry.object_id)
+        try:
+            for backend in backends:
+                unified = connections[backend.connection_alias].get_unified_index()
+                for label, object_ids in by_model.items():
+                    index = unified.get_index(apps.get_model(label))
+                    index_objects(backend, index, object_ids)
+                backend.conn.indices.refresh(index=backend.index_name)
+        except ElasticsearchException:
+            logger.exception("Search index update failed, queue kept for the next run")
+            break
+        # the listing pages are built from the index: refresh them only now
+        job_ids = by_model.get(get_model_ct(JobPost))
+        if job_ids:
+            page_cache.invalidate_jobs(job_ids)
+        # entries queued again while this batch was indexed stay for the next run
+        SearchIndexQueue.objects.filter(
+            id__in=[entry.id for entry in entries], queued_on__lte=started
+        ).delete()
+        handled += len(entries)
+    return handled
+
+
+def reindex(using="default", batch_size=500):
+    """
+    Build a new physical index for ``using`` and swap the ``INDEX_NAME``
+    alias over to it, deleting the indices it pointed to before.
+    """
+    if not cache.add(REINDEX_LOCK, 1, REINDEX_LOCK_TIMEOUT):
+        raise RuntimeError("A search reindex is already running")
+    try:
+        alias = settings.HAYSTACK_CONNECTIONS[using]["INDEX_NAME"]
+        new_index = "%s_%s" % (alias, int(time.time()))
+        backend = get_backend(using, INDEX_NAME=new_index)
+        backend.setup()
+        unified = connections[using].get_unified_index()
+        for index in unified.get_indexes().values():
+            queryset = index.index_queryset(using=using).order_by("pk")
+            last_pk = None
+            while True:
+                batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+                batch = list(batch[:batch_size])
+                if not batch:
+                    break
+                backend.update(index, batch, commit=False)
+                last_pk = batch[-1].pk
+        backend.conn.indices.refresh(index=new_index)
+
+        conn = backend.conn
+        actions = [{"add": {"index": new_index, "alias": alias}}]
+        old_indices = []
+        if conn.indices.exists_alias(name=alias):
+            old_indices = list(conn.indices.get_alias(name=alias))
+            actions = [
+                {"remove": {"index": old_index, "alias": alias}} for old_index in old_indices
+            ] + actions
+        elif conn.indices.exists(index=alias):
+            # first run: a concrete index holds the alias name and has to go
+            logger.warning("Replacing concrete index %s with an alias", alias)
+            conn.indices.delete(index=alias)
+        conn.indices.update_aliases(body={"actions": actions})
+        for old_index in old_indices:
+            conn.indices.delete(index=old_index, ignore=404)
+        logger.info("Search index %s now served by %s", alias, new_index)
+        return new_index
+    finally:
+        cache.delete(REINDEX_LOCK)
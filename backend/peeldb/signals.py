@@ -0,0 +1,181 @@
+"""
+Model signal receivers that keep process-local and cached derived data in
+sync with the database.
+"""
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_init,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+
+from mpcomp import facets, meta_registry, page_cache, slug_index
+from peeldb import job_counts, recruiter_analytics
+from peeldb.models import (
+    AppliedJobs,
+    City,
+    JobPost,
+    MetaData,
+    Qualification,
+    Skill,
+    State,
+)
+
+SLUG_INDEX_MODELS = {
+    Skill: "skills",
+    Qualification: "qualifications",
+    City: "cities",
+    State: "states",
+}
+
+
+@receiver(post_save, sender=Skill)
+@receiver(post_save, sender=Qualification)
+@receiver(post_save, sender=City)
+@receiver(post_save, sender=State)
+@receiver(post_delete, sender=Skill)
+@receiver(post_delete, sender=Qualification)
+@receiver(post_delete, sender=City)
+@receiver(post_delete, sender=State)
+def refresh_slug_index(sender, **kwargs):
+    names = [SLUG_INDEX_MODELS[sender]]
+    if sender is State:
+        # city entries carry their state's name
+        names.append("cities")
+    slug_index.invalidate(*names)
+
+
+@receiver(post_save, sender=MetaData)
+@receiver(post_delete, sender=MetaData)
+def refresh_meta_registry(sender, **kwargs):
+    meta_registry.invalidate()
+
+
+@receiver(post_save, sender=JobPost)
+@receiver(post_delete, sender=JobPost)
+@receiver(m2m_changed, sender=JobPost.location.through)
+@receiver(m2m_changed, sender=JobPost.skills.through)
+@receiver(m2m_changed, sender=JobPost.industry.through)
+@receiver(m2m_changed, sender=JobPost.edu_qualification.through)
+def refresh_job_facets(sender, action=None, **kwargs):
+    if action is None or action.startswith("post_"):
+        facets.invalidate()
+
+
+@receiver(post_save, sender=JobPost)
+def refresh_job_search_vector(sender, instance, **kwargs):
+    JobPost.update_search_vector(pk=instance.pk)
+
+
+@receiver(m2m_changed, sender=JobPost.skills.through)
+def refresh_job_search_vector_skills(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action.startswith("post_"):
+            JobPost.update_search_vector(pk=instance.pk)
+    elif action == "pre_clear":
+        # skill.jobpost_set.clear() sends no pk_set, remember the jobs now
+        instance._cleared_job_ids = list(instance.jobpost_set.values_list("id", flat=True))
+    elif action == "post_clear":
+        JobPost.update_search_vector(pk__in=getattr(instance, "_cleared_job_ids", []))
+    elif action.startswith("post_"):
+        JobPost.update_search_vector(pk__in=pk_set)
+
+
+@receiver(post_save, sender=Skill)
+def refresh_skill_job_search_vectors(sender, instance, created, **kwargs):
+    if not created:
+        JobPost.update_search_vector(skills=instance)
+
+
+@receiver(post_init, sender=JobPost)
+def remember_job_status(sender, instance, **kwargs):
+    # read from __dict__ so a deferred status doesn't cost a query
+    instance._loaded_status = instance.__dict__.get("status")
+
+
+@receiver(post_save, sender=JobPost)
+def refresh_job_live_counts(sender, instance, **kwargs):
+    if (instance._loaded_status == "Live") != (instance.status == "Live"):
+        linked = job_counts.taxonomy_ids([instance.pk])
+        job_counts.recount_linked(linked)
+        page_cache.invalidate_tags(page_cache.taxonomy_tags(linked, [instance.company_id]))
+    instance._loaded_status = instance.status
+
+
+@receiver(pre_delete, sender=JobPost)
+def remember_deleted_job_taxonomy(sender, instance, **kwargs):
+    # the m2m rows are gone by post_delete
+    if instance.status == "Live":
+        instance._linked_taxonomy = job_counts.taxonomy_ids([instance.pk])
+
+
+@receiver(post_delete, sender=JobPost)
+def refresh_deleted_job_live_counts(sender, instance, **kwargs):
+    linked = getattr(instance, "_linked_taxonomy", None)
+    if linked is not None:
+        job_counts.recount_linked(linked)
+        page_cache.invalidate_tags(page_cache.taxonomy_tags(linked, [instance.company_id]))
+
+
+@receiver(m2m_changed, sender=JobPost.location.through)
+@receiver(m2m_changed, sender=JobPost.skills.through)
+@receiver(m2m_changed, sender=JobPost.industry.through)
+@receiver(m2m_changed, sender=JobPost.edu_qualification.through)
+def refresh_taxonomy_live_counts(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if reverse:
+        # taxonomy.jobpost_set changed: recount that row
+        if action.startswith("post_"):
+            job_counts.recount_taxonomy(type(instance), [instance.pk])
+            page_cache.invalidate_tags(page_cache.object_tags(instance))
+        return
+    if instance.status != "Live":
+        return
+    if action == "pre_clear":
+        relation = getattr(instance, job_counts.JOB_FIELDS[model])
+        instance._cleared_taxonomy = list(relation.values_list("pk", flat=True))
+        return
+    if action == "post_clear":
+        changed = getattr(instance, "_cleared_taxonomy", [])
+    elif action in ("post_add", "post_remove") and pk_set:
+        changed = pk_set
+    else:
+        return
+    job_counts.recount_taxonomy(model, changed)
+    page_cache.invalidate_tags(
+        page_cache.taxonomy_tags({model: changed}, [instance.company_id])
+    )
+
+
+@receiver(post_save, sender=JobPost)
+@receiver(post_delete, sender=JobPost)
+@receiver(m2m_changed, sender=JobPost.location.through)
+@receiver(m2m_changed, sender=JobPost.skills.through)
+@receiver(m2m_changed, sender=JobPost.industry.through)
+def refresh_job_cards(sender, instance, action=None, reverse=False, pk_set=None, **kwargs):
+    if action is not None and not action.startswith("post_"):
+        return
+    if reverse:
+        # cleared from the taxonomy side: the affected jobs aren't known
+        if pk_set:
+            page_cache.invalidate_job_cards(pk_set)
+    else:
+        page_cache.invalidate_job_cards([instance.pk])
+
+
+@receiver(post_save, sender=JobPost)
+@receiver(post_delete, sender=JobPost)
+def refresh_recruiter_analytics(sender, instance, **kwargs):
+    recruiter_analytics.invalidate(instance.user_id)
+
+
+@receiver(post_save, sender=AppliedJobs)
+@receiver(post_delete, sender=AppliedJobs)
+def refresh_recruiter_application_analytics(sender, instance, **kwargs):
+    recruiter_id = (
+        JobPost.objects.filter(pk=instance.job_post_id)
+        .values_list("user_id", flat=True)
+        .first()
+    )
+    recruiter_analytics.invalidate(recruiter_id)
@@ -7,7 +7,7 @@ from collections import Counter
 
 from django import template
 from django.conf import settings
-from django.db.models import Count, Q, Prefetch
+from django.db.models import Count, F, Q, Prefetch
 from django.core.cache import cache
 import boto3
 from peeldb.models import (
@@ -227,7 +227,7 @@ def get_industries():
     if not all_industries:
         all_industries = (
             Industry.objects.filter(status="Active")
-            .annotate(num_posts=Count("jobpost"))
+            .annotate(num_posts=F("live_job_count"))
             .order_by("-num_posts")[:17]
         )
         cache.set("list_all_industries", all_industries, 60 * 60 * 24)
@@ -237,7 +237,7 @@ def get_industries():
 @register.simple_tag
 def get_all_industries():
     all_industries = (
-        Industry.objects.annotate(num_posts=Count("jobpost"))
+        Industry.objects.annotate(num_posts=F("live_job_count"))
         .filter(status="Active")
         .order_by("-num_posts")
     )
@@ -249,7 +249,7 @@ def get_skills():
     all_skills = cache.get("list_all_skills")
     if not all_skills:
         all_skills = (
-            Skill.objects.annotate(num_posts=Count("jobpost"))
+            Skill.objects.annotate(num_posts=F("live_job_count"))
             .filter(status="Active")
             .exclude(name="Fresher")
             .order_by("-num_posts")
@@ -260,7 +260,7 @@ def get_skills():
 
 @register.simple_tag
 def get_all_skills():
-    all_skills = Skill.objects.annotate(num_posts=Count("jobpost"))
+    all_skills = Skill.objects.annotate(num_posts=F("live_job_count"))
     all_skills = (
         all_skills.filter(status="Active")
         .exclude(name="Fresher")
@@ -275,12 +275,12 @@ def get_refine_skills(skills):
     if not all_refine_skills:
         all_refine_skills = list(
             Skill.objects.filter(status="Active")
-            .annotate(num_posts=Count("jobpost"))
+            .annotate(num_posts=F("live_job_count"))
             .order_by("-num_posts")
         )
         cache.set("all_refine_skills", all_refine_skills, 10000)
     if skills:
-        each_skill = skills.annotate(num_posts=Count("jobpost")).order_by("num_posts")
+        each_skill = skills.annotate(num_posts=F("live_job_count")).order_by("num_posts")
         for each in each_skill.iterator():
             try:
                 all_refine_skills.remove(each)
@@ -295,13 +295,13 @@ def get_refine_locations(locations):
     all_refine_locations = cache.get("all_refine_locations")
     if not all_refine_locations:
         all_refine_locations = list(
-            City.objects.annotate(num_posts=Count("locations"))
+            City.objects.annotate(num_posts=F("live_job_count"))
             .filter(status="Enabled")
             .order_by("-num_posts")
         )
         cache.set("all_refine_locations", all_refine_locations, 10000)
     if locations:
-        each_location = locations.annotate(num_posts=Count("locations")).order_by(
+        each_location = locations.annotate(num_posts=F("live_job_count")).order_by(
             "num_posts"
         )
         for each in each_location.iterator():
@@ -318,13 +318,13 @@ def get_refine_states(states):
     all_refine_states = cache.get("all_refine_states")
     if not all_refine_states:
         all_refine_states = list(
-            State.objects.annotate(num_posts=Count("state__locations"))
+            State.objects.annotate(num_posts=F("live_job_count"))
             .filter(status="Enabled")
             .order_by("-num_posts")
         )
         cache.set("all_refine_states", all_refine_states, 10000)
     if states:
-        each_location = states.annotate(num_posts=Count("state__locations")).order_by(
+        each_location = states.annotate(num_posts=F("live_job_count")).order_by(
             "num_posts"
         )
         for each in each_location.iterator():
@@ -341,13 +341,13 @@ def get_refine_industries(industry):
     all_refine_industries = cache.get("all_refine_industries")
     if not all_refine_industries:
         all_refine_industries = list(
-            Industry.objects.annotate(num_posts=Count("jobpost"))
+            Industry.objects.annotate(num_posts=F("live_job_count"))
             .filter(status="Active")
             .order_by("-num_posts")
         )
         cache.set("all_refine_industries", all_refine_industries, 10000)
     if industry:
-        each_industry = industry.annotate(num_posts=Count("jobpost")).order_by(
+        each_industry = industry.annotate(num_posts=F("live_job_count")).order_by(
             "num_posts"
         )
         for each in each_industry.iterator():
@@ -364,13 +364,13 @@ def get_refine_educations(education):
     all_refine_educations = cache.get("all_refine_educations")
     if not all_refine_educations:
         all_refine_educations = list(
-            Qualification.objects.annotate(num_posts=Count("jobpost"))
+            Qualification.objects.annotate(num_posts=F("live_job_count"))
             .filter(status="Active")
             .order_by("-num_posts")
         )
         cache.set("all_refine_educations", all_refine_educations, 10000)
     if education:
-        each_edu = education.annotate(num_posts=Count("jobpost")).order_by("num_posts")
+        each_edu = education.annotate(num_posts=F("live_job_count")).order_by("num_posts")
         for each in each_edu.iterator():
             try:
                 all_refine_educations.remove(each)
@@ -385,7 +385,7 @@ def get_locations():
     all_locations = cache.get("list_all_locations")
     if not all_locations:
         all_locations = (
-            City.objects.annotate(num_posts=Count("locations"))
+            City.objects.annotate(num_posts=F("live_job_count"))
             .filter(status="Enabled")
             .order_by("-num_posts")
         )
@@ -596,7 +596,7 @@ def get_qualifications():
     latest_qualifications = cache.get("latest_qualifications")
     if not latest_qualifications:
         latest_qualifications = (
-            Qualification.objects.annotate(num_posts=Count("jobpost"))
+            Qualification.objects.annotate(num_posts=F("live_job_count"))
             .filter(status="Active")
             .order_by("-num_posts")
         )
@@ -691,7 +691,7 @@ def get_related_skills(search_skills):
             latest = (
                 Skill.objects.filter(status="Active")
                 .exclude(id__in=exclude)
-                .annotate(num_posts=Count("jobpost"))
+                .annotate(num_posts=F("live_job_count"))
                 .order_by("-num_posts")
             )
             cache.set("get_top_skills", latest, 60 * 60 * 24)
@@ -0,0 +1,278 @@
+import csv
+import tempfile
+import zipfile
+from datetime import datetime, timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.core import management
+from django.core.files.storage import FileSystemStorage
+from django.http import Http404
+from django.test import RequestFactory, TestCase
+
+from peeldb import exports, recruiter_analytics, report_rollups
+from peeldb.models import (
+    AppliedJobs,
+    City,
+    Country,
+    DataExport,
+    JobPost,
+    SearchIndexQueue,
+    Skill,
+    State,
+    User,
+)
+from psite.views import export_download
+
+
+def create_jobs(user, count, **fields):
+    return [
+        JobPost.objects.create(
+            user=user,
+            title="Python Developer %s" % index,
+            vacancies=1,
+            description="Python developer",
+            job_type="full-time",
+            status="Live",
+            **fields,
+        )
+        for index in range(count)
+    ]
+
+
+class LocatedJobsTest(TestCase):
+    """A few live jobs with a skill, in one city."""
+
+    def setUp(self):
+        country = Country.objects.create(name="India")
+        self.state = State.objects.create(
+            name="Telangana", country=country, slug="telangana"
+        )
+        self.city = City.objects.create(
+            name="Hyderabad", state=self.state, slug="hyderabad"
+        )
+        self.skill = Skill.objects.create(name="Python", slug="python")
+        self.user = User.objects.create(email="test@mp.com", username="test")
+        self.jobs = create_jobs(self.user, 3, country=country)
+        for job in self.jobs:
+            job.skills.add(self.skill)
+            job.location.add(self.city)
+
+
+class search_index_queue(TestCase):
+    def test_saves_are_queued_once_per_object(self):
+        user = User.objects.create(email="test@mp.com", username="test")
+        skill = Skill.objects.create(name="Python", slug="python")
+        (job,) = create_jobs(user, 1)
+        SearchIndexQueue.objects.all().delete()
+        job.title = "queued title"
+        job.save()
+        job.save()
+        skill.jobpost_set.add(job)
+
+        self.assertEqual(
+            SearchIndexQueue.objects.filter(
+                model="peeldb.jobpost", object_id=job.id
+            ).count(),
+            1,
+        )
+
+
+class live_job_counts(LocatedJobsTest):
+    def live_count(self, **kwargs):
+        return JobPost.objects.filter(status="Live", **kwargs).distinct().count()
+
+    def test_counts_follow_job_status_and_taxonomy(self):
+        self.skill.refresh_from_db()
+        self.city.refresh_from_db()
+        self.state.refresh_from_db()
+        self.assertEqual(self.skill.live_job_count, 3)
+        self.assertEqual(self.city.live_job_count, 3)
+        self.assertEqual(self.state.live_job_count, 3)
+
+        job = self.jobs[0]
+        job.status = "Disabled"
+        job.save()
+        self.skill.refresh_from_db()
+        self.assertEqual(self.skill.live_job_count, self.live_count(skills=self.skill))
+        self.assertEqual(self.skill.live_job_count, 2)
+
+        django = Skill.objects.create(name="Django", slug="django", status="Active")
+        live_job = self.jobs[1]
+        live_job.skills.add(django)
+        django.refresh_from_db()
+        self.assertEqual(django.live_job_count, 1)
+        live_job.skills.clear()
+        django.refresh_from_db()
+        self.assertEqual(django.live_job_count, 0)
+
+
+class daily_rollups(LocatedJobsTest):
+    def test_rollups_match_direct_counts(self):
+        today = datetime.now().date()
+        JobPost.objects.update(published_on=datetime.now())
+        JobPost.objects.filter(pk=self.jobs[0].pk).update(status="Disabled")
+        report_rollups.refresh([today])
+
+        live_jobs = JobPost.objects.filter(status="Live")
+        city_rows = report_rollups.rollups("job", "city", today, today).filter(
+            city=self.city
+        )
+        self.assertEqual(
+            sum(row.active for row in city_rows),
+            live_jobs.filter(location=self.city).count(),
+        )
+        skill_rows = report_rollups.rollups("job", "skill", today, today).filter(
+            skill=self.skill
+        )
+        self.assertEqual(
+            sum(row.total for row in skill_rows),
+            JobPost.objects.filter(skills=self.skill).count(),
+        )
+        self.assertEqual(
+            sum(row.active for row in report_rollups.rollups("job", "all")),
+            live_jobs.count(),
+        )
+        self.assertFalse(
+            report_rollups.rollups("job", "all", end=today.replace(year=2000))
+        )
+
+        # refreshing a day replaces its rows
+        rows = report_rollups.rollups("job", "all").count()
+        report_rollups.refresh([today])
+        self.assertEqual(report_rollups.rollups("job", "all").count(), rows)
+
+
+class recruiter_analytics_test(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="recruiter@mp.com", username="recruiter")
+        applicant = User.objects.create(email="test@mp.com", username="test")
+        # one more job than is listed in the job performance
+        jobs = create_jobs(self.user, recruiter_analytics.TOP_JOBS + 1)
+        for job, status in zip(jobs, ("Pending", "Hired")):
+            AppliedJobs.objects.create(job_post=job, user=applicant, status=status)
+        self.job = jobs[0]
+
+    def test_dashboard_stats_queries_and_invalidation(self):
+        recruiter_analytics.invalidate(self.user.id)
+        with self.assertNumQueries(3):
+            dashboard = recruiter_analytics.dashboard_stats(self.user.id, "7d")
+        self.assertEqual(
+            dashboard["stats"]["total_jobs"], recruiter_analytics.TOP_JOBS + 1
+        )
+        self.assertEqual(dashboard["stats"]["new_applicants"], 2)
+        self.assertEqual(dashboard["pipeline"]["hired"], 1)
+        self.assertEqual(dashboard["pipeline"]["conversion_rate"], 50)
+        self.assertEqual(len(dashboard["recent_jobs"]), recruiter_analytics.RECENT_JOBS)
+
+        with self.assertNumQueries(0):
+            recruiter_analytics.dashboard_stats(self.user.id, "7d")
+
+        application = AppliedJobs.objects.get(job_post=self.job)
+        application.status = "Hired"
+        application.save()
+        dashboard = recruiter_analytics.dashboard_stats(self.user.id, "7d")
+        self.assertEqual(dashboard["pipeline"]["hired"], 2)
+        self.assertEqual(dashboard["pipeline"]["pending"], 0)
+
+    def test_application_analytics_queries(self):
+        recruiter_analytics.invalidate(self.user.id)
+        end = datetime.now()
+        with self.assertNumQueries(3):
+            analytics = recruiter_analytics.application_analytics(
+                self.user.id, end - timedelta(days=30), end, 30, period="30d"
+            )
+        self.assertEqual(analytics["overview"]["total_applications"], 2)
+        self.assertEqual(
+            analytics["overview"]["total_jobs"], recruiter_analytics.TOP_JOBS + 1
+        )
+        self.assertEqual(analytics["applications_by_day"][0]["count"], 2)
+        self.assertEqual(sum(analytics["peak_days"].values()), 2)
+        top = analytics["job_performance"][0]
+        self.assertEqual(top["total_applications"], 1)
+        self.assertEqual(
+            len(analytics["job_performance"]), recruiter_analytics.TOP_JOBS
+        )
+
+
+class data_export_test(TestCase):
+    def setUp(self):
+        self.recruiter = User.objects.create(
+            email="recruiter@mp.com", username="recruiter"
+        )
+        self.applicant = User.objects.create(
+            email="test@mp.com", username="test", first_name="=cmd"
+        )
+        (self.job,) = create_jobs(self.recruiter, 1)
+        AppliedJobs.objects.create(
+            job_post=self.job, user=self.applicant, status="Pending"
+        )
+
+    def test_exports_job_applicants(self):
+        storage = FileSystemStorage(location=tempfile.mkdtemp())
+        params = {"job_id": self.job.id}
+        with patch.object(
+            DataExport._meta.get_field("file"), "storage", storage
+        ), patch.object(exports, "notify") as notify:
+            csv_export = DataExport.objects.create(
+                requested_by=self.recruiter, kind="job_applicants", params=params
+            )
+            self.assertEqual(exports.run(csv_export), 1)
+            with csv_export.file.open("r") as file:
+                rows = list(csv.reader(file))
+            xlsx_export = DataExport.objects.create(
+                requested_by=self.recruiter,
+                kind="job_applicants",
+                file_format="xlsx",
+                params=params,
+            )
+            exports.run(xlsx_export)
+            with zipfile.ZipFile(xlsx_export.file.path) as workbook:
+                sheet = workbook.read("xl/worksheets/sheet1.xml").decode()
+
+            request = RequestFactory().get("/")
+            request.user = self.recruiter
+            response = export_download(request, exports.download_token(csv_export))
+            content = b"".join(response.streaming_content)
+            response.close()
+            request.user = self.applicant
+            with self.assertRaises(Http404):
+                export_download(request, exports.download_token(csv_export))
+
+            DataExport.objects.filter(id=csv_export.id).update(
+                finished_on=datetime.now() - timedelta(days=30)
+            )
+            self.assertEqual(exports.delete_expired(), 1)
+            self.assertFalse(storage.exists(csv_export.file.name))
+            self.assertTrue(storage.exists(xlsx_export.file.name))
+        self.assertEqual(notify.call_count, 2)
+        self.assertEqual(csv_export.status, "Done")
+        self.assertEqual(rows[0][0], "Applied on")
+        self.assertEqual(rows[1][1:3], ["Pending", "'=cmd"])
+        self.assertIn('<t xml:space="preserve">=cmd</t>', sheet)
+        self.assertIn(b"'=cmd", content)
+        self.assertIn("attachment", response["Content-Disposition"])
+        self.assertEqual(
+            exports.from_token(exports.download_token(xlsx_export)), xlsx_export
+        )
+        self.assertIsNone(exports.from_token(exports.download_token(csv_export)))
+        self.assertIsNone(exports.from_token("tampered"))
+
+
+class explain_queries_command(TestCase):
+    def test_reports_sequential_scans(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".log") as log:
+            log.write(
+                '(0.001) SELECT "id" FROM "peeldb_jobpost" WHERE '
+                "\"description\" = 'x'; args=('x',); alias=default\n"
+                '(0.001) SELECT "id" FROM "peeldb_jobpost" WHERE '
+                "\"description\" = 'y'; args=('y',); alias=default\n"
+                "UPDATE peeldb_jobpost SET vacancies = 2;\n"
+            )
+            log.flush()
+            out = StringIO()
+            management.call_command("explain_queries", log.name, min_rows=0, stdout=out)
+        output = out.getvalue()
+        self.assertIn("Seq Scan on peeldb_jobpost", output)
+        self.assertIn("in 2 queries", output)
+        self.assertIn("Explained 1 distinct queries of 2", output)
@@ -13,7 +13,7 @@ from django.utils import timezone
 from datetime import date
 from django.db.models import Q, F, Case, When, Value
 from django.urls import reverse
-from django.template import loader, Template, Context
+from django.template import loader
 from django.db.models import Count
 from django.core import serializers
 from django.contrib.auth import authenticate, login
@@ -21,6 +21,9 @@ from django.utils.crypto import get_random_string
 from django.http import QueryDict
 from django.contrib.auth import load_backend
 
+from mpcomp.meta_registry import render_meta
+from mpcomp.page_cache import cache_anonymous_page, tag_page
+from mpcomp.pagination import KeysetPaginator
 from mpcomp.views import (
     jobseeker_login_required,
     get_prev_after_pages_count,
@@ -29,7 +32,6 @@ from mpcomp.views import (
     get_valid_locations_list,
     get_social_referer,
     get_resume_data,
-    handle_uploaded_file,
     get_valid_qualifications,
     get_meta,
     get_ordered_skill_degrees,
@@ -39,13 +41,11 @@ from mpcomp.views import (
 from peeldb.models import (
     JobPost,
     AppliedJobs,
-    MetaData,
     User,
     City,
     Industry,
     Skill,
     Subscriber,
-    VisitedJobs,
     State,
     TechnicalSkill,
     Company,
@@ -60,6 +60,8 @@ from psite.forms import (
 from .refine_search import refined_search
 from django.db.models import Prefetch
 from django.core.cache import cache
+from mpcomp import view_counter
+from mpcomp.cache import cache_key
 from dashboard.tasks import save_search_results, send_email
 
 
@@ -247,22 +249,10 @@ def job_detail(request, job_title_slug, job_id):
         if str(job.get_absolute_url()) != str(request.path):
             return redirect(job.get_absolute_url(), permanent=False)
         if job.status == "Live":
-            if request.user.is_authenticated:
-                visited_jobs = VisitedJobs.objects.filter(
-                    user=request.user, job_post=job
-                )
-                if not visited_jobs:
-                    VisitedJobs.objects.create(user=request.user, job_post=job)
+            view_counter.record_view(
+                job.id, request.user.id if request.user.is_authenticated else None
+            )
             field = get_social_referer(request)
-            if field == "fb":
-                job.fb_views += 1
-            elif field == "tw":
-                job.tw_views += 1
-            elif field == "ln":
-                job.ln_views += 1
-            else:
-                job.other_views += 1
-            job.save()
         elif job.status == "Disabled":
             if job.major_skill and job.major_skill.status == "Active":
                 return HttpResponseRedirect(job.major_skill.get_job_url())
@@ -284,13 +274,7 @@ def job_detail(request, job_title_slug, job_id):
                 status=404,
             )
         show_pop = True if field == "fb" or field == "tw" or field == "ln" else False
-        meta_title = meta_description = ""
-        meta = MetaData.objects.filter(name="job_detail_page")
-        if meta:
-            meta_title = Template(meta[0].meta_title).render(Context({"job": job}))
-            meta_description = Template(meta[0].meta_description).render(
-                Context({"job": job})
-            )
+        meta_title, meta_description, _ = render_meta("job_detail_page", {"job": job})
         template = "jobs/detail.html"
         data = {
             "job": job,
@@ -355,18 +339,9 @@ def recruiter_profile(request, recruiter_name, **kwargs):
             page, no_pages
         )
         job_list = job_list[(page - 1) * items_per_page : page * items_per_page]
-        meta_title = meta_description = h1_tag = ""
-        meta = MetaData.objects.filter(name="recruiter_profile")
-        if meta:
-            meta_title = Template(meta[0].meta_title).render(
-                Context({"current_page": page, "user": user[0]})
-            )
-            meta_description = Template(meta[0].meta_description).render(
-                Context({"current_page": page, "user": user[0]})
-            )
-            h1_tag = Template(meta[0].h1_tag).render(
-                Context({"current_page": page, "user": user[0]})
-            )
+        meta_title, meta_description, h1_tag = render_meta(
+            "recruiter_profile", {"current_page": page, "user": user[0]}
+        )
         template = "jobs/recruiter_profile.html"
         return render(
             request,
@@ -422,16 +397,17 @@ def recruiters(request, **kwargs):
             username__istartswith=request.POST.get("alphabet_value")
         )
     items_per_page = 45
-    no_pages = int(math.ceil(float(len(recruiters_list)) / items_per_page))
+    paginator = KeysetPaginator(
+        recruiters_list, items_per_page, ordering=("-num_posts", "-id")
+    )
+    no_pages = paginator.num_pages
     page = get_page_number(request, kwargs, no_pages)
     if not page:
         return HttpResponseRedirect("/recruiters/")
     prev_page, previous_page, aft_page, after_page = get_prev_after_pages_count(
         page, no_pages
     )
-    recruiters_list = recruiters_list[
-        (page - 1) * items_per_page : page * items_per_page
-    ]
+    recruiters_list = paginator.page(page)
     meta_title, meta_description, h1_tag = get_meta("recruiters_list", {"page": 1})
     template = "jobs/recruiters_list.html"
     return render(
@@ -481,14 +457,14 @@ def index(request, **kwargs):
             searched_edu,
         ) = refined_search({})
 
-    no_of_jobs = jobs_list.count()
-
     items_per_page = 20
-    no_pages = int(math.ceil(float(no_of_jobs) / items_per_page))
+    paginator = KeysetPaginator(jobs_list, items_per_page)
+    no_of_jobs = paginator.count
+    no_pages = paginator.num_pages
     page = get_page_number(request, kwargs, no_pages)
     if not page:
         return HttpResponseRedirect(reverse("jobs:index"))
-    jobs_list = jobs_list[(page - 1) * items_per_page : page * items_per_page]
+    jobs_list = paginator.page(page)
     prev_page, previous_page, aft_page, after_page = get_prev_after_pages_count(
         page, no_pages
     )
@@ -522,6 +498,7 @@ def index(request, **kwargs):
     return render(request, template, data)
 
 
+@cache_anonymous_page
 def job_locations(request, location, **kwargs):
     current_url = reverse("job_locations", kwargs={"location": location})
     if kwargs.get("page_num") == "1" or request.GET.get("page") == "1":
@@ -530,7 +507,11 @@ def job_locations(request, location, **kwargs):
         url = current_url + request.GET.get("page") + "/"
         return redirect(url, permanent=True)
     request.session["formdata"] = ""
-    final_location = get_valid_locations_list(location)
+    final_location = cache.get_or_set(
+        cache_key("final_location", location),
+        lambda: get_valid_locations_list(location),
+        60 * 60 * 24,
+    )
     state = State.objects.filter(slug__iexact=location)
     if request.POST.get("refine_search") == "True":
         (
@@ -567,25 +548,29 @@ def job_locations(request, location, **kwargs):
             searched_edu,
         ) = refined_search(search_dict)
     else:
-        job_list = []
+        job_list = None
+    items_per_page = 20
+    paginator = None
+    if job_list is not None:
+        paginator = KeysetPaginator(job_list, items_per_page)
     if request.POST.get("location"):
         save_search_results.delay(
             request.META["REMOTE_ADDR"],
             request.POST,
-            job_list.count() if job_list else 0,
+            paginator.count if paginator else 0,
             request.user.id,
         )
-    if job_list:
-        items_per_page = 20
+    if paginator and paginator.count:
         searched_industry = searched_skills = searched_edu = ""
         if request.GET.get("job_type"):
             job_list = job_list.filter_and(job_type__in=[request.GET.get("job_type")])
-        no_of_jobs = job_list.count()
-        no_pages = int(math.ceil(float(no_of_jobs) / items_per_page))
+            paginator = KeysetPaginator(job_list, items_per_page)
+        no_of_jobs = paginator.count
+        no_pages = paginator.num_pages
         page = get_page_number(request, kwargs, no_pages)
         if not page:
             return HttpResponseRedirect(current_url)
-        jobs_list = job_list[(page - 1) * items_per_page : page * items_per_page]
+        jobs_list = paginator.page(page)
         prev_page, previous_page, aft_page, after_page = get_prev_after_pages_count(
             page, no_pages
         )
@@ -624,6 +609,7 @@ def job_locations(request, location, **kwargs):
             "h1_tag": h1_tag,
             "state": state.first(),
         }
+        tag_page(request, searched_skills, searched_locations, searched_industry, state)
         template = "jobs/jobs_list_tailwind.html"
         return render(request, template, data)
     else:
@@ -655,19 +641,8 @@ def job_locations(request, location, **kwargs):
         )
 
 
-def list_deserializer(key, value, flags):
-    import ast
-
-    value = value.decode("utf-8")
-    value = ast.literal_eval(value)
-    value = [i.strip() for i in value if i.strip()]
-    return value
-
-
+@cache_anonymous_page
 def job_skills(request, skill, **kwargs):
-    from pymemcache.client.base import Client
-
-    client = Client(("localhost", 11211), deserializer=list_deserializer)
     current_url = reverse("job_skills", kwargs={"skill": skill})
     if kwargs.get("page_num") == "1" or request.GET.get("page") == "1":
         return redirect(current_url, permanent=True)
@@ -676,20 +651,16 @@ def job_skills(request, skill, **kwargs):
         url = current_url + request.GET.get("page") + "/"
         return redirect(url, permanent=True)
 
-    final_skill = client.get("final_skill" + skill)
-    if not final_skill:
-        final_skill = get_valid_skills_list(skill)
-        client.set("final_skill" + skill, final_skill, expire=60 * 60 * 24)
-    if final_skill == b"[]":
-        final_skill = []
-
-    final_edu = client.get("final_edu" + skill)
-    if not final_edu:
-        final_edu = get_valid_qualifications(skill)
-        client.set("final_edu" + skill, final_edu, expire=60 * 60 * 24)
-
-    if final_edu == b"[]":
-        final_edu = []
+    final_skill = cache.get_or_set(
+        cache_key("final_skill", skill),
+        lambda: get_valid_skills_list(skill),
+        60 * 60 * 24,
+    )
+    final_edu = cache.get_or_set(
+        cache_key("final_edu", skill),
+        lambda: get_valid_qualifications(skill),
+        60 * 60 * 24,
+    )
     if request.POST.get("refine_search") == "True":
         (
             job_list,
@@ -724,55 +695,40 @@ def job_skills(request, skill, **kwargs):
         searched_edu.filter(name__in=final_edu),
     )
 
+    paginator = KeysetPaginator(job_list, 20)
     if request.POST.get("q"):
         save_search_results.delay(
-            request.META["REMOTE_ADDR"], request.POST, job_list.count(), request.user.id
+            request.META["REMOTE_ADDR"], request.POST, paginator.count, request.user.id
         )
 
-    if job_list.count() > 0:
+    if paginator.count > 0:
 
         if request.GET.get("job_type"):
             job_list = job_list.filter_and(job_type__in=[request.GET.get("job_type")])
-        no_of_jobs = job_list.count()
-        no_pages = int(math.ceil(float(no_of_jobs) / 20))
+            paginator = KeysetPaginator(job_list, 20)
+        no_of_jobs = paginator.count
+        no_pages = paginator.num_pages
         page = get_page_number(request, kwargs, no_pages)
         if not page:
             return HttpResponseRedirect(current_url)
 
-        jobs_list = job_list[(page - 1) * 20 : page * 20]
+        jobs_list = paginator.page(page)
         prev_page, previous_page, aft_page, after_page = get_prev_after_pages_count(
             page, no_pages
         )
 
         field = get_social_referer(request)
         show_pop = True if field == "fb" or field == "tw" or field == "ln" else False
-        meta_title = meta_description = h1_tag = ""
         final_edu = ", ".join(final_edu)
         if searched_edu and not searched_skills:
-            meta = MetaData.objects.filter(name="education_jobs")
-            if meta:
-                meta_title = Template(meta[0].meta_title).render(
-                    Context({"current_page": page, "degree": final_edu})
-                )
-                meta_description = Template(meta[0].meta_description).render(
-                    Context({"current_page": page, "degree": final_edu})
-                )
-                h1_tag = Template(meta[0].h1_tag).render(
-                    Context({"current_page": page, "degree": final_edu})
-                )
+            meta_title, meta_description, h1_tag = render_meta(
+                "education_jobs", {"current_page": page, "degree": final_edu}
+            )
         elif searched_edu and searched_skills:
-            meta = MetaData.objects.filter(name="skill_education_jobs")
-            if meta:
-                search = ", ".join(searched_text)
-                meta_title = Template(meta[0].meta_title).render(
-                    Context({"current_page": page, "search": search})
-                )
-                meta_description = Template(meta[0].meta_description).render(
-                    Context({"current_page": page, "search": search})
-                )
-                h1_tag = Template(meta[0].h1_tag).render(
-                    Context({"current_page": page, "search": search})
-                )
+            meta_title, meta_description, h1_tag = render_meta(
+                "skill_education_jobs",
+                {"current_page": page, "search": ", ".join(searched_text)},
+            )
         elif searched_skills:
             meta_title, meta_description, h1_tag = get_meta_data(
                 "skill_jobs",
@@ -807,6 +763,9 @@ def job_skills(request, skill, **kwargs):
             "h1_tag": h1_tag,
             "searched_text": searched_text,
         }
+        tag_page(
+            request, searched_skills, searched_edu, searched_locations, searched_industry
+        )
         template = "jobs/jobs_list_tailwind.html"
         return render(request, template, data)
     else:
@@ -836,6 +795,7 @@ def job_skills(request, skill, **kwargs):
         )
 
 
+@cache_anonymous_page
 def job_industries(request, industry, **kwargs):
     current_url = reverse("job_industries", kwargs={"industry": industry})
     if kwargs.get("page_num") == "1" or request.GET.get("page") == "1":
@@ -844,11 +804,15 @@ def job_industries(request, industry, **kwargs):
         url = current_url + request.GET.get("page") + "/"
         return redirect(url, permanent=True)
     searched_locations = searched_skills = searched_edu = ""
-    searched_industry = Industry.objects.filter(slug=industry)
+    industry_names = cache.get_or_set(
+        cache_key("industry_names", industry),
+        lambda: list(
+            Industry.objects.filter(slug=industry).values_list("name", flat=True)
+        ),
+        60 * 60 * 24,
+    )
     search_dict = QueryDict("", mutable=True)
-    search_dict.setlist("refine_industry", [searched_industry[0].name])
-
-    print("searched_industry", searched_industry)
+    search_dict.setlist("refine_industry", industry_names[:1])
     if request.POST.get("refine_search") == "True":
         (
             job_list,
@@ -857,7 +821,7 @@ def job_industries(request, industry, **kwargs):
             searched_industry,
             searched_edu,
         ) = refined_search(request.POST)
-    else:
+    elif industry_names:
         (
             job_list,
             searched_skills,
@@ -865,6 +829,8 @@ def job_industries(request, industry, **kwargs):
             searched_industry,
             searched_edu,
         ) = refined_search(search_dict)
+    else:
+        job_list = searched_industry = []
 
     if job_list:
         no_of_jobs = job_list.count()
@@ -881,18 +847,10 @@ def job_industries(request, industry, **kwargs):
 
         field = get_social_referer(request)
         show_pop = True if field == "fb" or field == "tw" or field == "ln" else False
-        meta_title = meta_description = h1_tag = ""
-        meta = MetaData.objects.filter(name="industry_jobs")
-        if meta:
-            meta_title = Template(meta[0].meta_title).render(
-                Context({"current_page": page, "industry": searched_industry[0].name})
-            )
-            meta_description = Template(meta[0].meta_description).render(
-                Context({"current_page": page, "industry": searched_industry[0].name})
-            )
-            h1_tag = Template(meta[0].h1_tag).render(
-                Context({"current_page": page, "industry": searched_industry[0].name})
-            )
+        meta_title, meta_description, h1_tag = render_meta(
+            "industry_jobs",
+            {"current_page": page, "industry": searched_industry[0].name},
+        )
         data = {
             "job_list": jobs_list,
             "aft_page": aft_page,
@@ -915,6 +873,7 @@ def job_industries(request, industry, **kwargs):
             "meta_description": meta_description,
             "h1_tag": h1_tag,
         }
+        tag_page(request, searched_skills, searched_locations, searched_industry)
         template = "jobs/jobs_list_tailwind.html"
         return render(request, template, data)
     else:
@@ -1116,10 +1075,11 @@ def jobposts_by_date(request, year, month, date, **kwargs):
         published_on__year=int(year),
         published_on__month=int(month),
         published_on__day=int(date)
-    ).order_by("-published_on")
+    )
+    paginator = KeysetPaginator(results, 20)
     # Google Calendar integration removed
     events = JobPost.objects.none()
-    if not results:
+    if not paginator.count:
         template = "404.html"
         return render(
             request,
@@ -1132,31 +1092,25 @@ def jobposts_by_date(request, year, month, date, **kwargs):
             },
             status=404,
         )
-    no_pages = int(math.ceil(float(len(results)) / 20))
+    no_pages = paginator.num_pages
     page = get_page_number(request, kwargs, no_pages)
     if not page:
         return HttpResponseRedirect(current_url)
     prev_page, previous_page, aft_page, after_page = get_prev_after_pages_count(
         page, no_pages
     )
-    meta_title = meta_description = h1_tag = ""
-    meta = MetaData.objects.filter(name="day_calendar")
-    if meta:
-        meta_title = Template(meta[0].meta_title).render(
-            Context({"date": date, "searched_month": day.strftime("%B"), "year": year})
-        )
-        meta_description = Template(meta[0].meta_description).render(
-            Context({"date": date, "searched_month": day.strftime("%B"), "year": year})
-        )
-        h1_tag = Template(meta[0].h1_tag).render(
-            Context({"date": date, "month": day.strftime("%B"), "year": year})
-        )
+    month = day.strftime("%B")
+    # the title and description templates use "searched_month", the h1 "month"
+    meta_title, meta_description, h1_tag = render_meta(
+        "day_calendar",
+        {"date": date, "searched_month": month, "month": month, "year": year},
+    )
     return render(
         request,
         "calendar/calendar_day_results.html",
         {
-            "no_of_jobs": len(results),
-            "results": results[(page - 1) * 20 : page * 20],
+            "no_of_jobs": paginator.count,
+            "results": paginator.page(page),
             "aft_page": aft_page,
             "after_page": after_page,
             "prev_page": prev_page,
@@ -1197,16 +1151,9 @@ def jobs_by_location(request, job_type):
     )
     if request.method == "POST":
         states = states.filter(name__icontains=request.POST.get("location"))
-    meta_title = meta_description = h1_tag = ""
-    meta = MetaData.objects.filter(name="jobs_by_location")
-    if meta:
-        meta_title = Template(meta[0].meta_title).render(
-            Context({"job_type": job_type})
-        )
-        meta_description = Template(meta[0].meta_description).render(
-            Context({"job_type": job_type})
-        )
-        h1_tag = Template(meta[0].h1_tag).render(Context({"job_type": job_type}))
+    meta_title, meta_description, h1_tag = render_meta(
+        "jobs_by_location", {"job_type": job_type}
+    )
     data = {
         "states": states,
         "job_type": job_type,
@@ -1257,16 +1204,9 @@ def fresher_jobs_by_skills(request, job_type):
             all_skills = all_skills.order_by("-name")
         else:
             all_skills = all_skills.order_by("name")
-    meta_title = meta_description = h1_tag = ""
-    meta = MetaData.objects.filter(name="fresher_jobs_by_skills")
-    if meta:
-        meta_title = Template(meta[0].meta_title).render(
-            Context({"job_type": job_type})
-        )
-        meta_description = Template(meta[0].meta_description).render(
-            Context({"job_type": job_type})
-        )
-        h1_tag = Template(meta[0].h1_tag).render(Context({"job_type": job_type}))
+    meta_title, meta_description, h1_tag = render_meta(
+        "fresher_jobs_by_skills", {"job_type": job_type}
+    )
     data = {
         "all_skills": all_skills,
         "job_type": job_type,
@@ -1281,7 +1221,7 @@ def fresher_jobs_by_skills(request, job_type):
 def jobs_by_industry(request):
     all_industries = (
         Industry.objects.filter(status="Active")
-        .annotate(num_posts=Count("jobpost"))
+        .annotate(num_posts=F("live_job_count"))
         .order_by("-num_posts")
     )
     if request.method == "POST":
@@ -1509,6 +1449,7 @@ def city_internship_jobs(request, location, **kwargs):
     return render(request, template, data)
 
 
+@cache_anonymous_page
 def walkin_jobs(request, **kwargs):
     if kwargs.get("page_num") == "1" or request.GET.get("page") == "1":
         return redirect(reverse("walkin_jobs"), permanent=True)
@@ -1620,6 +1561,7 @@ def government_jobs(request, **kwargs):
     return render(request, template, data)
 
 
+@cache_anonymous_page
 def each_company_jobs(request, company_name, **kwargs):
     current_url = reverse("company_jobs", kwargs={"company_name": company_name})
     if kwargs.get("page_num") == "1" or request.GET.get("page") == "1":
@@ -1669,18 +1611,9 @@ def each_company_jobs(request, company_name, **kwargs):
         jobs_list = job_list[(page - 1) * items_per_page : page * items_per_page]
         field = get_social_referer(request)
         show_pop = True if field == "fb" or field == "tw" or field == "ln" else False
-        meta_title = meta_description = h1_tag = ""
-        meta = MetaData.objects.filter(name="company_jobs")
-        if meta:
-            meta_title = Template(meta[0].meta_title).render(
-                Context({"current_page": page, "company": company})
-            )
-            meta_description = Template(meta[0].meta_description).render(
-                Context({"current_page": page, "company": company})
-            )
-            h1_tag = Template(meta[0].h1_tag).render(
-                Context({"current_page": page, "company": company})
-            )
+        meta_title, meta_description, h1_tag = render_meta(
+            "company_jobs", {"current_page": page, "company": company}
+        )
         data = {
             "job_list": jobs_list,
             "aft_page": aft_page,
@@ -1698,6 +1631,7 @@ def each_company_jobs(request, company_name, **kwargs):
             "meta_description": meta_description,
             "h1_tag": h1_tag,
         }
+        tag_page(request, company)
         template = "jobs/company_jobs.html"
         return render(request, template, data)
 
@@ -1756,6 +1690,7 @@ def get_skills(request):
     return HttpResponse(json.dumps({"response": skills}))
 
 
+@cache_anonymous_page
 def skill_fresher_jobs(request, skill_name, **kwargs):
     current_url = reverse("skill_fresher_jobs", kwargs={"skill_name": skill_name})
     if kwargs.get("page_num") == "1" or request.GET.get("page") == "1":
@@ -1844,6 +1779,7 @@ def skill_fresher_jobs(request, skill_name, **kwargs):
             "meta_description": meta_description,
             "h1_tag": h1_tag,
         }
+        tag_page(request, searched_skills, searched_locations, searched_industry)
         template = "jobs/jobs_list_tailwind.html"
         return render(request, template, data)
     else:
@@ -1879,6 +1815,7 @@ def skill_fresher_jobs(request, skill_name, **kwargs):
         )
 
 
+@cache_anonymous_page
 def location_fresher_jobs(request, city_name, **kwargs):
     current_url = reverse("location_fresher_jobs", kwargs={"city_name": city_name})
     if kwargs.get("page_num") == "1" or request.GET.get("page") == "1":
@@ -1977,6 +1914,7 @@ def location_fresher_jobs(request, city_name, **kwargs):
             "h1_tag": h1_tag,
             "state": state.first(),
         }
+        tag_page(request, searched_skills, searched_locations, searched_industry)
         template = "jobs/jobs_list_tailwind.html"
         return render(request, template, data)
     else:
@@ -2012,6 +1950,7 @@ def location_fresher_jobs(request, city_name, **kwargs):
         )
 
 
+@cache_anonymous_page
 def skill_location_walkin_jobs(request, skill_name, **kwargs):
     if "-in-" in request.path:
         current_url = reverse("location_walkin_jobs", kwargs={"skill_name": skill_name})
@@ -2131,6 +2070,7 @@ def skill_location_walkin_jobs(request, skill_name, **kwargs):
             "h1_tag": h1_tag,
             "state": state.first(),
         }
+        tag_page(request, searched_skills, searched_locations, searched_industry)
         template = "jobs/jobs_list_tailwind.html"
         return render(request, template, data)
 
@@ -2185,6 +2125,7 @@ def skill_location_walkin_jobs(request, skill_name, **kwargs):
         )
 
 
+@cache_anonymous_page
 def skill_location_wise_fresher_jobs(request, skill_name, city_name, **kwargs):
     current_url = reverse(
         "skill_location_wise_fresher_jobs",
@@ -2273,6 +2214,7 @@ def skill_location_wise_fresher_jobs(request, skill_name, city_name, **kwargs):
             "meta_description": meta_description,
             "h1_tag": h1_tag,
         }
+        tag_page(request, searched_skills, searched_locations, searched_industry)
         template = "jobs/jobs_list_tailwind.html"
         return render(request, template, data)
     else:
@@ -2364,9 +2306,6 @@ def save_codes_and_send_mail(user, request, passwd):
 def register_using_email(request):
     if request.method == "POST":
         if request.FILES.get("get_resume"):
-            handle_uploaded_file(
-                request.FILES["get_resume"], request.FILES["get_resume"].name
-            )
             email, mobile, text = get_resume_data(request.FILES["get_resume"])
             data = {
                 "error": False,
@@ -2,12 +2,21 @@
 PeelJobs Django Sitemap Configuration
 Modern, dynamic sitemap generation using Django's sitemap framework.
 Only includes URLs for pages with actual content (jobs, skills, locations, etc.)
+
+The sections are not queried per crawler request: materialize_sitemaps()
+(run periodically by dashboard.tasks.refresh_sitemaps) renders every page
+of every section into a SitemapPage row, and psite.views serves those rows
+with ETag/Last-Modified headers.
 """
+import hashlib
+from datetime import datetime
 
 from django.contrib.sitemaps import Sitemap
+from django.contrib.sites.models import Site
+from django.template import loader
 from django.urls import reverse
-from django.db.models import Count, Q
-from peeldb.models import JobPost, Skill, City, Company
+from django.db.models import Count, Max, Q
+from peeldb.models import JobPost, Skill, City, Company, SitemapPage
 
 
 class PeelJobsSitemap(Sitemap):
@@ -44,6 +53,25 @@ class JobPostSitemap(PeelJobsSitemap):
         return f"/jobs/{slug_without_slash}"
 
 
+def skill_location_items(jobs):
+    """
+    Distinct skill/location slug pairs of ``jobs``, with the latest
+    publication among the jobs of each pair as ``lastmod``
+    """
+    combinations = jobs.values_list(
+        'skills__slug', 'location__slug'
+    ).annotate(
+        lastmod=Max('published_on')
+    ).order_by('skills__slug', 'location__slug')
+
+    # Convert to list of dicts for easier template access
+    return [
+        {'skill': skill_slug, 'city': city_slug, 'lastmod': lastmod}
+        for skill_slug, city_slug, lastmod in combinations
+        if skill_slug and city_slug  # Filter out None values
+    ]
+
+
 class SkillLocationSitemap(PeelJobsSitemap):
     """
     Sitemap for skill + location combinations (e.g., python-jobs-in-bangalore)
@@ -51,28 +79,23 @@ class SkillLocationSitemap(PeelJobsSitemap):
     """
     changefreq = "daily"
     priority = 0.8
-    limit = 10000
+    limit = 50000
 
     def items(self):
         """
         Use Django ORM to get skill+location combinations with active jobs
         This avoids the cartesian product of all skills × all locations
         """
-        # Get all skill-location pairs from live jobs
-        combinations = JobPost.objects.filter(
-            status='Live',
-            skills__status='Active',
-            location__status='Enabled'
-        ).values_list(
-            'skills__slug', 'location__slug'
-        ).distinct().order_by('skills__slug', 'location__slug')[:10000]
-
-        # Convert to list of dicts for easier template access
-        return [
-            {'skill': skill_slug, 'city': city_slug}
-            for skill_slug, city_slug in combinations
-            if skill_slug and city_slug  # Filter out None values
-        ]
+        return skill_location_items(
+            JobPost.objects.filter(
+                status='Live',
+                skills__status='Active',
+                location__status='Enabled'
+            )
+        )
+
+    def lastmod(self, item):
+        return item['lastmod']
 
     def location(self, item):
         return f"/{item['skill']}-jobs-in-{item['city']}/"
@@ -85,24 +108,21 @@ class FresherSkillLocationSitemap(PeelJobsSitemap):
     """
     changefreq = "daily"
     priority = 0.7
-    limit = 10000
+    limit = 50000
 
     def items(self):
         """Use Django ORM to get fresher job skill-location combinations"""
-        combinations = JobPost.objects.filter(
-            status='Live',
-            min_year=0,  # Fresher jobs
-            skills__status='Active',
-            location__status='Enabled'
-        ).values_list(
-            'skills__slug', 'location__slug'
-        ).distinct().order_by('skills__slug', 'location__slug')[:5000]
-
-        return [
-            {'skill': skill_slug, 'city': city_slug}
-            for skill_slug, city_slug in combinations
-            if skill_slug and city_slug
-        ]
+        return skill_location_items(
+            JobPost.objects.filter(
+                status='Live',
+                min_year=0,  # Fresher jobs
+                skills__status='Active',
+                location__status='Enabled'
+            )
+        )
+
+    def lastmod(self, item):
+        return item['lastmod']
 
     def location(self, item):
         return f"/{item['skill']}-fresher-jobs-in-{item['city']}/"
@@ -119,10 +139,8 @@ class SkillSitemap(PeelJobsSitemap):
     def items(self):
         return Skill.objects.filter(
             status='Active',
-            jobpost__status='Live'
-        ).annotate(
-            job_count=Count('jobpost', filter=Q(jobpost__status='Live'))
-        ).filter(job_count__gt=0).distinct().order_by('-job_count')
+            live_job_count__gt=0
+        ).order_by('-live_job_count')
 
     def location(self, obj):
         return f"/{obj.slug}-jobs/"
@@ -139,10 +157,8 @@ class LocationSitemap(PeelJobsSitemap):
     def items(self):
         return City.objects.filter(
             status='Enabled',
-            locations__status='Live'
-        ).annotate(
-            job_count=Count('locations', filter=Q(locations__status='Live'))
-        ).filter(job_count__gt=0).distinct().order_by('-job_count')
+            live_job_count__gt=0
+        ).order_by('-live_job_count')
 
     def location(self, obj):
         return f"/jobs-in-{obj.slug}/"
@@ -195,3 +211,54 @@ class StaticPagesSitemap(PeelJobsSitemap):
 
     def location(self, item):
         return reverse(item)
+
+
+SITEMAPS = {
+    'jobs': JobPostSitemap,
+    'skill-locations': SkillLocationSitemap,
+    'fresher-skill-locations': FresherSkillLocationSitemap,
+    'skills': SkillSitemap,
+    'locations': LocationSitemap,
+    'companies': CompanySitemap,
+    'static': StaticPagesSitemap,
+}
+
+
+def materialize_sitemaps():
+    """
+    Render every page of every section in SITEMAPS into SitemapPage rows.
+
+    A page whose content did not change keeps its ETag and last_modified,
+    so crawlers revalidating it get a 304. Returns the number of pages.
+    """
+    site = Site.objects.get_current()
+    now = datetime.now()
+    existing = {
+        (page.section, page.page): page.etag
+        for page in SitemapPage.objects.only('section', 'page', 'etag')
+    }
+    rendered = set()
+    for section, sitemap_class in SITEMAPS.items():
+        sitemap = sitemap_class()
+        for number in sitemap.paginator.page_range:
+            urls = sitemap.get_urls(page=number, site=site, protocol='https')
+            if not urls:
+                continue
+            content = loader.render_to_string('sitemap.xml', {'urlset': urls})
+            etag = hashlib.md5(content.encode('utf-8')).hexdigest()
+            rendered.add((section, number))
+            if existing.get((section, number)) == etag:
+                continue
+            SitemapPage.objects.update_or_create(
+                section=section,
+                page=number,
+                defaults={
+                    'content': content,
+                    'url_count': len(urls),
+                    'etag': etag,
+                    'last_modified': now,
+                },
+            )
+    for section, number in set(existing) - rendered:
+        SitemapPage.objects.filter(section=section, page=number).delete()
+    return len(rendered)
@@ -9,6 +9,8 @@ from django.test import TestCase
 
 # from django.test import Client
 from .forms import SimpleContactForm, SubscribeForm
+from .sitemaps import materialize_sitemaps
+from peeldb.models import SitemapPage
 
 
 class SimpleContactForm_form_test(TestCase):
@@ -45,3 +47,42 @@ class SubscribeForm_test(TestCase):
     def test_subscribe_form_invalid(self):
         form = SubscribeForm(data={"email": ""})
         self.assertFalse(form.is_valid())
+
+
+class sitemap_pages_test(TestCase):
+    def test_served_from_materialized_pages(self):
+        materialize_sitemaps()
+        page = SitemapPage.objects.get(section="static", page=1)
+
+        response = self.client.get("/sitemap-static.xml")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["ETag"], '"%s"' % page.etag)
+        self.assertContains(response, "/jobs-by-skill/")
+
+        response = self.client.get(
+            "/sitemap-static.xml", HTTP_IF_NONE_MATCH='"%s"' % page.etag
+        )
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get("/sitemap.xml")
+        self.assertContains(response, "sitemap-static.xml")
+        response = self.client.get(
+            "/sitemap.xml", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_unchanged_page_keeps_validators(self):
+        materialize_sitemaps()
+        page = SitemapPage.objects.get(section="static", page=1)
+        materialize_sitemaps()
+        self.assertEqual(
+            SitemapPage.objects.get(section="static", page=1).last_modified,
+            page.last_modified,
+        )
+
+    def test_unknown_section(self):
+        materialize_sitemaps()
+        self.assertEqual(self.client.get("/sitemap-unknown.xml").status_code, 404)
+        self.assertEqual(
+            self.client.get("/sitemap-static.xml?p=9").status_code, 404
+        )
@@ -1,3 +1,5 @@
+import hashlib
+import os
 import json
 import requests
 import math
@@ -9,12 +11,30 @@ from django.conf import settings
 from itertools import chain
 from django.template import loader
 from django.template.exceptions import TemplateDoesNotExist
+from django.contrib.sitemaps import views as sitemap_views
+from django.contrib.sites.shortcuts import get_current_site
+from django.http import FileResponse, Http404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.crypto import constant_time_compare
+from django.utils.http import http_date
 
 
-from peeldb.models import JobPost, ENQUERY_TYPES, Skill, City, Qualification, State
+from peeldb.models import (
+    JobPost,
+    ENQUERY_TYPES,
+    Skill,
+    City,
+    Qualification,
+    SitemapPage,
+    State,
+)
 from .forms import SimpleContactForm
+from .sitemaps import SITEMAPS
+from mpcomp import request_stats
+from peeldb import exports
 from mpcomp.views import get_prev_after_pages_count
-from django.db.models import Count, F
+from django.db.models import F
 from dashboard.tasks import send_email
 
 
@@ -115,6 +135,114 @@ def sitemap_xml(request):
     )
 
 
+def _conditional_xml(request, etag, last_modified, render):
+    """
+    A 304 when the crawler's copy (If-None-Match/If-Modified-Since) is
+    current, otherwise the XML from ``render()``, with validators either way.
+    """
+    etag = '"%s"' % etag
+    last_modified = int(last_modified.timestamp())
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        response = HttpResponse(render(), content_type="application/xml")
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    return response
+
+
+@sitemap_views.x_robots_tag
+def sitemap_index_xml(request):
+    """sitemap.xml, listing the pages stored by psite.sitemaps.materialize_sitemaps"""
+    order = list(SITEMAPS)
+    pages = sorted(
+        SitemapPage.objects.filter(section__in=order).values_list(
+            "section", "page", "etag", "last_modified"
+        ),
+        key=lambda row: (order.index(row[0]), row[1]),
+    )
+    if not pages:
+        # nothing materialized yet
+        return sitemap_views.index(request, SITEMAPS)
+
+    def render():
+        domain = get_current_site(request).domain
+        sitemaps = []
+        for section, page, etag, last_modified in pages:
+            location = "https://%s%s" % (
+                domain,
+                reverse(
+                    "django.contrib.sitemaps.views.sitemap",
+                    kwargs={"section": section},
+                ),
+            )
+            if page > 1:
+                location += "?p=%s" % page
+            sitemaps.append({"location": location, "last_mod": last_modified})
+        return loader.render_to_string("sitemap_index.xml", {"sitemaps": sitemaps})
+
+    etag = hashlib.md5(
+        "".join("%s:%s:%s" % row[:3] for row in pages).encode("utf-8")
+    ).hexdigest()
+    last_modified = max(row[3] for row in pages)
+    return _conditional_xml(request, etag, last_modified, render)
+
+
+@sitemap_views.x_robots_tag
+def sitemap_section_xml(request, section):
+    """One page (``?p=``) of a section stored by materialize_sitemaps"""
+    try:
+        number = int(request.GET.get("p", 1))
+    except ValueError:
+        raise Http404("No page '%s'" % request.GET["p"])
+    page = (
+        SitemapPage.objects.defer("content")
+        .filter(section=section, page=number)
+        .first()
+    )
+    if page is None:
+        if section in SITEMAPS and not SitemapPage.objects.exists():
+            # nothing materialized yet
+            return sitemap_views.sitemap(request, SITEMAPS, section=section)
+        raise Http404("No sitemap available for section: %r" % section)
+    return _conditional_xml(
+        request, page.etag, page.last_modified, lambda: page.content
+    )
+
+
+def request_metrics(request):
+    """Per view request stats in the Prometheus text format."""
+    token = settings.REQUEST_STATS_TOKEN
+    authorized = request.user.is_authenticated and request.user.is_staff
+    if token and constant_time_compare(
+        request.META.get("HTTP_AUTHORIZATION", ""), "Bearer " + token
+    ):
+        authorized = True
+    if not authorized:
+        raise Http404
+    return HttpResponse(
+        request_stats.export(), content_type="text/plain; version=0.0.4"
+    )
+
+
+def export_download(request, token):
+    """Stream the file of the export of the signed link mailed for it."""
+    export = exports.from_token(token)
+    if export is None:
+        raise Http404
+    # the link may be forwarded, but not opened from someone else's account
+    if request.user.is_authenticated and export.requested_by_id != request.user.id:
+        raise Http404
+    response = FileResponse(
+        export.file.open("rb"),
+        as_attachment=True,
+        filename=os.path.basename(export.file.name),
+    )
+    response["Cache-Control"] = "private, no-store"
+    return response
+
+
 def contact(request):
     if request.method == "POST":
         validate_simplecontactform = SimpleContactForm(request.POST)
@@ -165,12 +293,12 @@ def contact(request):
 def sitemap(request, **kwargs):
 
     locations = (
-        City.objects.annotate(num_posts=Count("locations"))
+        City.objects.annotate(num_posts=F("live_job_count"))
         .filter(status="Enabled")
         .order_by("-num_posts")
     )
     skills = (
-        Skill.objects.annotate(num_posts=Count("jobpost"))
+        Skill.objects.annotate(num_posts=F("live_job_count"))
         .filter(status="Active")
         .exclude(name="Fresher")
         .order_by("-num_posts")
@@ -0,0 +1,123 @@
+"""
+Free text search backends for job listings.
+
+A backend narrows a ``JobPost`` queryset to the jobs matching a search text
+and, when it can rank them, annotates ``search_rank`` (higher is better) so
+callers can order by relevance. A backend that returns at most a fixed number
+of matches sets ``capped`` when there were more. The backend used by the API is selected with
+the ``JOB_SEARCH_BACKEND`` setting.
+"""
+import logging
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.utils.module_loading import import_string
+from elasticsearch import ElasticsearchException
+from haystack import connections
+from haystack.constants import DJANGO_CT, DJANGO_ID, DOCUMENT_FIELD
+from haystack.utils import get_model_ct
+
+from peeldb.models import SEARCH_CONFIG, JobPost
+
+logger = logging.getLogger(__name__)
+
+
+class OrmJobSearch:
+    """Case-insensitive substring match on the job's text columns."""
+
+    def search(self, queryset, text):
+        return queryset.filter(
+            Q(title__icontains=text)
+            | Q(company_name__icontains=text)
+            | Q(description__icontains=text)
+            | Q(job_role__icontains=text)
+        )
+
+
+class ElasticsearchJobSearch:
+    """
+    Resolve matching job ids (by relevance) from the Haystack job index, then
+    filter the queryset to them so other filters and pagination stay in SQL.
+    Falls back to ``OrmJobSearch`` when the index can't be queried.
+    """
+
+    fallback = OrmJobSearch
+    # whether the last search matched more than ``max_results`` jobs
+    capped = False
+
+    def __init__(self, using="default", max_results=None):
+        self.using = using
+        self.max_results = max_results or getattr(settings, "JOB_SEARCH_MAX_RESULTS", 500)
+
+    def job_ids(self, text):
+        backend = connections[self.using].get_backend()
+        body = {
+            "query": {
+                "bool": {
+                    "must": {
+                        "multi_match": {
+                            "query": text,
+                            "fields": [
+                                DOCUMENT_FIELD,
+                                "title^3",
+                                "designation^2",
+                                "company_name^2",
+                            ],
+                        }
+                    },
+                    "filter": [
+                        {"term": {DJANGO_CT: get_model_ct(JobPost)}},
+                        {"match": {"status": "Live"}},
+                    ],
+                }
+            },
+            "_source": [DJANGO_ID],
+            # count just far enough to tell whether there are more matches
+            "track_total_hits": self.max_results + 1,
+        }
+        results = backend.conn.search(
+            index=backend.index_name, body=body, size=self.max_results
+        )
+        job_ids = [int(hit["_source"][DJANGO_ID]) for hit in results["hits"]["hits"]]
+        self.capped = results["hits"]["total"]["value"] > len(job_ids)
+        return job_ids
+
+    def search(self, queryset, text):
+        try:
+            job_ids = self.job_ids(text)
+        except ElasticsearchException:
+            logger.warning("Job search index unavailable, using ORM search", exc_info=True)
+            return self.fallback().search(queryset, text)
+        if not job_ids:
+            return queryset.none()
+        ranks = [
+            When(id=job_id, then=Value(len(job_ids) - position))
+            for position, job_id in enumerate(job_ids)
+        ]
+        return queryset.filter(id__in=job_ids).annotate(
+            search_rank=Case(*ranks, default=Value(0), output_field=IntegerField())
+        )
+
+
+class PostgresJobSearch:
+    """
+    Ranked full text search on ``JobPost.search_vector`` (GIN indexed), plus a
+    trigram match on the title so that misspelt searches still find jobs.
+    """
+
+    def search(self, queryset, text):
+        query = SearchQuery(text, search_type="websearch", config=SEARCH_CONFIG)
+        return queryset.filter(
+            Q(search_vector=query) | Q(title__trigram_similar=text)
+        ).annotate(
+            search_rank=SearchRank(F("search_vector"), query)
+            + TrigramSimilarity("title", text)
+        )
+
+
+def get_job_search():
+    """Instance of the backend named by ``settings.JOB_SEARCH_BACKEND``."""
+    return import_string(
+        getattr(settings, "JOB_SEARCH_BACKEND", "search.backends.ElasticsearchJobSearch")
+    )()
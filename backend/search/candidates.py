@@ -0,0 +1,234 @@
+"""
+Recruiter candidate search over the Haystack candidate index
+(``peeldb.search_indexes.candidateIndex``).
+
+``CandidateSearch.search()`` runs one Elasticsearch request for a page of
+ranked candidate ids, the total and the facet counts, then loads just that
+page of users. Candidates are ranked by text relevance (skills and role
+weigh more than the resume text), boosted when they are looking for a job
+and decayed by the age of their profile. When the index can't be queried,
+``OrmCandidateSearch`` answers instead, without facets and ranked by profile
+update.
+"""
+import logging
+from collections import namedtuple
+
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.functions import Cast
+from elasticsearch import ElasticsearchException
+from haystack import connections
+from haystack.constants import DJANGO_CT, DJANGO_ID, DOCUMENT_FIELD
+from haystack.utils import get_model_ct
+
+from peeldb.models import User
+
+logger = logging.getLogger(__name__)
+
+CandidatePage = namedtuple("CandidatePage", "candidates total facets")
+
+# index field of each term facet
+TERM_FACETS = {
+    "skills": "candidate_skills_exact",
+    "current_city": "current_city_exact",
+    "preferred_cities": "preferred_cities_exact",
+}
+# (key, from, to) experience buckets, in years
+EXPERIENCE_FACETS = (
+    ("0-1", 0, 1),
+    ("1-3", 1, 3),
+    ("3-5", 3, 5),
+    ("5-10", 5, 10),
+    ("10+", 10, None),
+)
+FACET_SIZE = 20
+# Elasticsearch's default index.max_result_window
+MAX_RESULT_WINDOW = 10000
+
+
+# search text, skill names (all of them), city names (current or preferred,
+# any of them), experience bounds in years and whether to only return
+# candidates looking for a job
+CandidateFilters = namedtuple(
+    "CandidateFilters",
+    "text skills cities min_experience max_experience looking_for_job",
+    defaults=("", (), (), None, None, False),
+)
+
+
+def _candidates(ids):
+    """Users of ``ids`` in that order, skipping ones no longer searchable."""
+    users = (
+        User.objects.filter(id__in=ids, user_type="JS", is_active=True)
+        .select_related("current_city")
+        .prefetch_related("skills__skill", "preferred_city")
+    )
+    by_id = {user.id: user for user in users}
+    return [by_id[user_id] for user_id in ids if user_id in by_id]
+
+
+class OrmCandidateSearch:
+    """Substring match on the profile and resume text, newest profiles first."""
+
+    def queryset(self, filters):
+        users = User.objects.filter(user_type="JS", is_active=True)
+        if filters.text:
+            users = users.filter(
+                Q(job_role__icontains=filters.text)
+                | Q(resume_title__icontains=filters.text)
+                | Q(profile_description__icontains=filters.text)
+                | Q(skills__skill__name__iexact=filters.text)
+                | Q(resume_text__icontains=filters.text)
+            )
+        for skill in filters.skills:
+            users = users.filter(skills__skill__name__iexact=skill)
+        if filters.cities:
+            users = users.filter(
+                Q(current_city__name__in=filters.cities)
+                | Q(preferred_city__name__in=filters.cities)
+            )
+        if filters.min_experience is not None or filters.max_experience is not None:
+            users = users.annotate(
+                experience_months=Case(
+                    When(year__regex=r"^\d+$", then=Cast("year", IntegerField()) * 12),
+                    default=Value(0),
+                )
+                + Case(
+                    When(month__regex=r"^\d+$", then=Cast("month", IntegerField())),
+                    default=Value(0),
+                )
+            )
+            if filters.min_experience is not None:
+                users = users.filter(experience_months__gte=filters.min_experience * 12)
+            if filters.max_experience is not None:
+                users = users.filter(experience_months__lte=filters.max_experience * 12)
+        if filters.looking_for_job:
+            users = users.filter(is_looking_for_job=True)
+        return users.distinct()
+
+    def search(self, filters, offset, limit):
+        users = self.queryset(filters)
+        ids = list(
+            users.order_by("-profile_updated", "-id").values_list("id", flat=True)[
+                offset : offset + limit
+            ]
+        )
+        return CandidatePage(_candidates(ids), users.count(), {})
+
+
+class CandidateSearch:
+    """Ranked, faceted candidate search on the Haystack candidate index."""
+
+    fallback = OrmCandidateSearch
+
+    def __init__(self, using="default"):
+        self.using = using
+
+    def query(self, filters):
+        """The Elasticsearch bool query of ``filters``."""
+        if filters.text:
+            match = {
+                "multi_match": {
+                    "query": filters.text,
+                    "fields": [
+                        DOCUMENT_FIELD,
+                        "candidate_skills^4",
+                        "candidate_role^3",
+                    ],
+                }
+            }
+        else:
+            match = {"match_all": {}}
+        conditions = [{"term": {DJANGO_CT: get_model_ct(User)}}]
+        for skill in filters.skills:
+            # indexed lower-cased
+            conditions.append({"term": {"candidate_skills_exact": skill.lower()}})
+        if filters.cities:
+            conditions.append(
+                {
+                    "bool": {
+                        "should": [
+                            {"terms": {"current_city_exact": list(filters.cities)}},
+                            {"terms": {"preferred_cities_exact": list(filters.cities)}},
+                        ]
+                    }
+                }
+            )
+        experience = {}
+        if filters.min_experience is not None:
+            experience["gte"] = filters.min_experience * 12
+        if filters.max_experience is not None:
+            experience["lte"] = filters.max_experience * 12
+        if experience:
+            conditions.append({"range": {"experience_months": experience}})
+        if filters.looking_for_job:
+            conditions.append({"term": {"looking_for_job": True}})
+        return {
+            "function_score": {
+                "query": {"bool": {"must": match, "filter": conditions}},
+                "functions": [
+                    {"filter": {"term": {"looking_for_job": True}}, "weight": 1.5},
+                    {"filter": {"term": {"open_to_offers": True}}, "weight": 1.2},
+                    {
+                        "gauss": {
+                            "profile_updated": {
+                                "origin": "now",
+                                "scale": "90d",
+                                "decay": 0.5,
+                            }
+                        }
+                    },
+                ],
+                "score_mode": "multiply",
+                "boost_mode": "multiply",
+            }
+        }
+
+    def aggregations(self):
+        aggregations = {
+            name: {"terms": {"field": field, "size": FACET_SIZE}}
+            for name, field in TERM_FACETS.items()
+        }
+        ranges = []
+        for key, start, end in EXPERIENCE_FACETS:
+            bucket = {"key": key, "from": start * 12}
+            if end is not None:
+                bucket["to"] = end * 12
+            ranges.append(bucket)
+        aggregations["experience"] = {
+            "range": {"field": "experience_months", "ranges": ranges}
+        }
+        return aggregations
+
+    def results(self, filters, offset, limit):
+        """``(ids, total, facets)`` of a page of matching candidates."""
+        backend = connections[self.using].get_backend()
+        body = {
+            "query": self.query(filters),
+            "aggs": self.aggregations(),
+            "_source": [DJANGO_ID],
+            "from": offset,
+            "size": limit,
+            "track_total_hits": True,
+        }
+        results = backend.conn.search(index=backend.index_name, body=body)
+        ids = [int(hit["_source"][DJANGO_ID]) for hit in results["hits"]["hits"]]
+        facets = {
+            name: [
+                {"value": bucket["key"], "count": bucket["doc_count"]}
+                for bucket in aggregation["buckets"]
+            ]
+            for name, aggregation in results["aggregations"].items()
+        }
+        return ids, results["hits"]["total"]["value"], facets
+
+    def search(self, filters, offset, limit):
+        """``CandidatePage`` of the ``limit`` candidates from ``offset``."""
+        limit = max(0, min(limit, MAX_RESULT_WINDOW - offset))
+        try:
+            ids, total, facets = self.results(filters, offset, limit)
+        except ElasticsearchException:
+            logger.warning(
+                "Candidate search index unavailable, using ORM search", exc_info=True
+            )
+            return self.fallback().search(filters, offset, limit)
+        return CandidatePage(_candidates(ids), total, facets)
@@ -0,0 +1,56 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+from elasticsearch import ElasticsearchException
+
+from peeldb.models import SearchIndexQueue, Skill, TechnicalSkill, User
+from peeldb.search_indexes import candidateIndex
+from search.candidates import CandidateFilters, CandidateSearch
+
+
+class candidate_search_test(TestCase):
+    def setUp(self):
+        self.skill = Skill.objects.create(name="Python", slug="python", status="Active")
+        self.user = User.objects.create(
+            email="test@mp.com",
+            username="test",
+            user_type="JS",
+            is_active=True,
+            job_role="Backend developer",
+            year="3",
+        )
+        self.recruiter = User.objects.create(
+            email="recruiter@mp.com", username="recruiter", user_type="RR"
+        )
+
+    def test_candidates_are_queued_and_searched(self):
+        SearchIndexQueue.objects.all().delete()
+        self.recruiter.save()
+        self.user.skills.add(TechnicalSkill.objects.create(skill=self.skill))
+        self.assertEqual(
+            list(SearchIndexQueue.objects.values_list("model", "object_id")),
+            [("peeldb.user", self.user.id)],
+        )
+
+        document = candidateIndex().full_prepare(self.user)
+        self.assertEqual(document["candidate_skills_exact"], [self.skill.name.lower()])
+        query = CandidateSearch().query(
+            CandidateFilters(skills=(self.skill.name.upper(),))
+        )
+        self.assertIn(
+            {"term": {"candidate_skills_exact": self.skill.name.lower()}},
+            query["function_score"]["query"]["bool"]["filter"],
+        )
+        self.assertEqual(document["experience_months"], 36)
+
+        search = CandidateSearch()
+        with patch.object(search, "results", side_effect=ElasticsearchException):
+            page = search.search(
+                CandidateFilters(skills=(self.skill.name.upper(),), min_experience=2),
+                0,
+                20,
+            )
+            self.assertEqual([user.id for user in page.candidates], [self.user.id])
+            self.assertEqual(page.total, 1)
+            page = search.search(CandidateFilters(min_experience=5), 0, 20)
+            self.assertEqual(page.total, 0)
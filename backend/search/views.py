@@ -6,12 +6,13 @@ from django.urls import reverse
 from django.http.response import HttpResponse, HttpResponseRedirect
 from django.shortcuts import redirect, render
 from django.template.defaultfilters import slugify
-from django.db.models import Q, F
 from haystack.query import SQ, SearchQuerySet
 from django.http import QueryDict
 
 # from haystack.views import SearchView
 
+from mpcomp import slug_index
+from mpcomp.pagination import KeysetPaginator
 from mpcomp.views import (
     get_prev_after_pages_count,
     get_valid_locations_list,
@@ -124,9 +125,14 @@ def custom_search(data, request):
     if data.get("walk-in"):
         jobs_list = jobs_list.filter(job_type="walk-in")
 
-    no_of_jobs = jobs_list.count()
+    if not isinstance(jobs_list, SearchQuerySet):
+        jobs_list = jobs_list.select_related("company", "user").prefetch_related(
+            "location", "skills", "industry"
+        )
     items_per_page = 20
-    no_pages = int(math.ceil(float(no_of_jobs) / items_per_page))
+    paginator = KeysetPaginator(jobs_list, items_per_page)
+    no_of_jobs = paginator.count
+    no_pages = paginator.num_pages
     page = request.POST.get("page") or data.get("page")
     if page and bool(re.search(r"[0-9]", page)) and int(page) > 0:
         if int(page) > (no_pages + 2):
@@ -135,13 +141,8 @@ def custom_search(data, request):
             page = int(page)
     else:
         page = 1
-    
-    jobs_list = jobs_list[(page - 1) * items_per_page : page * items_per_page]
-    jobs_list = (
-        jobs_list.select_related("company", "user")
-        .prefetch_related("location", "skills", "industry")
-        .distinct()
-    )
+
+    jobs_list = paginator.page(page)
 
     prev_page, previous_page, aft_page, after_page = get_prev_after_pages_count(
         page, no_pages
@@ -599,12 +600,12 @@ def state_auto_search(request):
 def search_slugs(request):
     searched = request.GET.get("q_slug", "").replace("jobs", "").replace("job", "")
     search_list = [i.strip() for i in searched.split(",") if i.strip()]
+    skill_index = slug_index.get_index("skills")
+    degree_index = slug_index.get_index("qualifications")
     slug = ""
     for search in search_list:
-        skills = Skill.objects.filter(Q(slug__iexact=search) | Q(name__iexact=search))
-        degrees = Qualification.objects.filter(
-            Q(slug__iexact=search) | Q(name__iexact=search)
-        )
+        skills = skill_index.match(search)
+        degrees = degree_index.match(search)
         for skill in skills:
             slug += ("-" + skill.slug) if slug else skill.slug
         for degree in degrees:
@@ -614,15 +615,14 @@ def search_slugs(request):
     location = request.GET.get("location", "")
     location_slug = ""
     if location:
+        city_index = slug_index.get_index("cities")
+        state_index = slug_index.get_index("states")
         search_list = [i.strip() for i in location.split(",") if i.strip()]
         for search in search_list:
-            locations = City.objects.filter(
-                Q(Q(slug__iexact=search) | Q(name__iexact=search))
-                & ~Q(state__name=F("name"))
-            )
-            states = State.objects.filter(
-                Q(slug__iexact=search) | Q(name__iexact=search)
-            )
+            locations = [
+                loc for loc in city_index.match(search) if loc.state_name != loc.name
+            ]
+            states = state_index.match(search)
             for loc in locations:
                 location_slug += ("-" + loc.slug) if location_slug else loc.slug
             for state in states:
@@ -6,6 +6,7 @@ export const load: PageServerLoad = async ({ params, url, cookies, fetch }) => {
 	const jobId = params.id;
 	const statusFilter = url.searchParams.get('status') || 'all';
 	const searchQuery = url.searchParams.get('search') || '';
+	const cursor = url.searchParams.get('cursor') || '';
 
 	// Get JWT token from cookies
 	const accessToken = cookies.get('access_token');
@@ -23,6 +24,10 @@ export const load: PageServerLoad = async ({ params, url, cookies, fetch }) => {
 		if (searchQuery) {
 			queryParams.set('search', searchQuery);
 		}
+		// Applicants come a page at a time, the next one from next_cursor
+		if (cursor) {
+			queryParams.set('cursor', cursor);
+		}
 
 		// Fetch job details and applicants
 		const [jobResponse, applicantsResponse] = await Promise.all([
@@ -62,6 +67,8 @@ export const load: PageServerLoad = async ({ params, url, cookies, fetch }) => {
 				rejected: 0
 			},
 			totalApplicants: applicantsData.total_applicants || 0,
+			cursor,
+			nextCursor: applicantsData.next_cursor || null,
 			filters: {
 				status: statusFilter,
 				search: searchQuery
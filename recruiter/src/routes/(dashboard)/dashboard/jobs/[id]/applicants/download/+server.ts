@@ -1,6 +1,7 @@
 /**
  * CSV Download Handler for Job Applicants
- * Generates CSV file with applicant data based on filters
+ * Streams a CSV file of every applicant matching the filters, converted from
+ * the applicants API's NDJSON export
  */
 
 import { error } from '@sveltejs/kit';
@@ -28,8 +29,8 @@ export const GET: RequestHandler = async ({ params, url, cookies, fetch }) => {
 		if (searchQuery) {
 			queryParams.set('search', searchQuery);
 		}
-		// Request all applicants (no pagination for CSV export)
-		queryParams.set('page_size', '10000');
+		// Stream every applicant as newline delimited JSON (the list is paginated)
+		queryParams.set('export', 'ndjson');
 
 		// Fetch applicants data from API
 		const response = await fetch(
@@ -41,16 +42,10 @@ export const GET: RequestHandler = async ({ params, url, cookies, fetch }) => {
 			}
 		);
 
-		if (!response.ok) {
+		if (!response.ok || !response.body) {
 			throw error(response.status, 'Failed to fetch applicants data');
 		}
 
-		const data = await response.json();
-		const applications = data.applications || [];
-
-		// Generate CSV content
-		const csvRows: string[] = [];
-
 		// CSV Headers
 		const headers = [
 			'Name',
@@ -65,30 +60,10 @@ export const GET: RequestHandler = async ({ params, url, cookies, fetch }) => {
 			'Remarks',
 			'Resume URL'
 		];
-		csvRows.push(headers.map((header) => escapeCSVField(header)).join(','));
-
-		// CSV Data Rows
-		for (const application of applications) {
-			const applicant = application.applicant;
-
-			const row = [
-				applicant.name || '',
-				applicant.email || '',
-				applicant.mobile || '',
-				applicant.current_location || '',
-				applicant.experience || '',
-				applicant.skills?.join('; ') || '',
-				applicant.education || '',
-				application.status || '',
-				application.applied_on || '',
-				application.remarks || '',
-				applicant.resume_url || ''
-			];
-
-			csvRows.push(row.map((field) => escapeCSVField(field)).join(','));
-		}
-
-		const csvContent = csvRows.join('\n');
+		const csvContent = response.body
+			.pipeThrough(new TextDecoderStream())
+			.pipeThrough(ndjsonToCSV(headers.map((header) => escapeCSVField(header)).join(',')))
+			.pipeThrough(new TextEncoderStream());
 
 		// Generate filename with status filter and timestamp
 		const timestamp = new Date().toISOString().split('T')[0]; // YYYY-MM-DD
@@ -109,6 +84,54 @@ export const GET: RequestHandler = async ({ params, url, cookies, fetch }) => {
 	}
 };
 
+/**
+ * Transform newline delimited JSON applications into CSV rows, after a header row
+ */
+function ndjsonToCSV(headerRow: string): TransformStream<string, string> {
+	let buffered = '';
+
+	const toRow = (line: string): string => {
+		const application = JSON.parse(line);
+		const applicant = application.applicant;
+
+		const row = [
+			applicant.name || '',
+			applicant.email || '',
+			applicant.mobile || '',
+			applicant.current_location || '',
+			applicant.experience || '',
+			applicant.skills?.join('; ') || '',
+			applicant.education || '',
+			application.status || '',
+			application.applied_on || '',
+			application.remarks || '',
+			applicant.resume_url || ''
+		];
+
+		return '\n' + row.map((field) => escapeCSVField(field)).join(',');
+	};
+
+	return new TransformStream({
+		start(controller) {
+			controller.enqueue(headerRow);
+		},
+		transform(chunk, controller) {
+			const lines = (buffered + chunk).split('\n');
+			buffered = lines.pop() ?? '';
+			for (const line of lines) {
+				if (line.trim()) {
+					controller.enqueue(toRow(line));
+				}
+			}
+		},
+		flush(controller) {
+			if (buffered.trim()) {
+				controller.enqueue(toRow(buffered));
+			}
+		}
+	});
+}
+
 /**
  * Escape CSV field to handle special characters
  */
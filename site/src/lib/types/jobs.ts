@@ -146,6 +146,8 @@ export interface JobFilterOptions {
  */
 export interface JobListResponse {
   count: number;
+  /** True when a search matched more jobs than it returns, so count is a lower bound */
+  count_capped?: boolean;
   next: string | null;
   previous: string | null;
   results: Job[];
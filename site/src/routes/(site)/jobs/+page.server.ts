@@ -148,6 +148,7 @@ export const load: PageServerLoad = async ({ url, fetch, cookies }) => {
       return {
         jobs: [],
         totalJobs: 0,
+        totalCapped: false,
         totalPages: 0,
         currentPage: params.page || 1,
         filterOptions: null,
@@ -168,6 +169,7 @@ export const load: PageServerLoad = async ({ url, fetch, cookies }) => {
 
     // Calculate pagination
     const totalJobs = jobsData.count || 0;
+    const totalCapped = jobsData.count_capped || false;
     const pageSize = params.page_size || 20;
     const totalPages = Math.ceil(totalJobs / pageSize);
     const currentPage = params.page || 1;
@@ -175,6 +177,7 @@ export const load: PageServerLoad = async ({ url, fetch, cookies }) => {
     return {
       jobs: jobsData.results || [],
       totalJobs,
+      totalCapped,
       totalPages,
       currentPage,
       filterOptions: filterOptionsData,
@@ -186,6 +189,7 @@ export const load: PageServerLoad = async ({ url, fetch, cookies }) => {
     return {
       jobs: [],
       totalJobs: 0,
+      totalCapped: false,
       totalPages: 0,
       currentPage: params.page || 1,
       filterOptions: null,